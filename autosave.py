@@ -0,0 +1,196 @@
+# autosave.py
+# 틱 경계에서 스냅샷을 잡고 백그라운드 스레드에서 기록하는 자동 저장
+
+import logging
+import os
+import queue
+import threading
+import time
+
+import persistence
+
+AUTOSAVE_DIR = "autosave"
+AUTOSAVE_KEEP = 3  # 보관할 자동 저장 파일 수
+AUTOSAVE_EVERY_TICKS = 48 * 5  # 게임 내 5일마다
+STALL_BUDGET = 0.001  # 메인 루프가 스냅샷 때문에 한 프레임에 멈춰도 되는 최대 시간 (초)
+
+_PREFIX = "autosave-"
+_SUFFIX = ".stk"
+
+
+class AutoSaver:
+    """
+    주기적 자동 저장.
+
+    maybe_save()는 메인 루프에서 next_day() 직후(틱 경계)에 호출하며, 주기가 되면 그 틱 경계의 상태를
+    persistence.Capture로 잡기 시작합니다. 회사 상태는 프레임마다 step()으로 STALL_BUDGET 안에서만 나눠
+    복사하므로 회사 수가 많아도 한 프레임의 정지 시간은 늘지 않고, 그동안에도 틱과 체결은 그대로 진행됩니다
+    (Capture는 쓰기 시 복사로, 아직 복사하지 않은 회사가 바뀌기 전에 Market.pending_capture 훅으로 먼저 복사).
+    직렬화, 파일 쓰기, fsync, 오래된 파일 정리는 전용 스레드가 처리합니다. 이전 저장이 아직 끝나지
+    않았으면 이번 저장은 건너뜁니다. 프레임별 정지 시간과 스냅샷에 쓴 프레임 수는 기록되어 로그로 남습니다.
+    """
+
+    def __init__(self, directory=AUTOSAVE_DIR, keep=AUTOSAVE_KEEP, every_ticks=AUTOSAVE_EVERY_TICKS):
+        self.directory = directory
+        self.keep = keep
+        self.every_ticks = every_ticks
+        self.last_tick = None  # 마지막으로 자동 저장한 틱
+
+        # 통계
+        self.saves = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_stall = 0.0  # 마지막 스냅샷의 프레임별 정지 시간 중 최댓값
+        self.max_stall = 0.0
+        self.over_budget = 0
+        self.last_frames = 0  # 마지막 스냅샷에 쓴 프레임 수
+        self.last_write_time = 0.0
+        self.last_path = None
+
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = None
+        self._capture = None  # 잡는 중인 스냅샷 (persistence.Capture)
+        self._stall = 0.0  # 잡는 중인 스냅샷의 프레임별 정지 시간 최댓값
+
+    def maybe_save(self, market, investors):
+        """주기가 되었으면 자동 저장을 시작합니다. 시작했으면 True"""
+        if self.last_tick is None or market.day_count < self.last_tick:
+            # 첫 호출이거나 재시작/불러오기로 틱이 되돌아간 경우 기준만 맞춤
+            self.last_tick = market.day_count
+            return False
+        if market.day_count - self.last_tick < self.every_ticks or self._capture is not None:
+            return False
+        if self._queue.full():
+            # 이전 저장이 밀려 있으면 이번 주기는 건너뜀
+            self.skipped += 1
+            self.last_tick = market.day_count
+            return False
+        self.last_tick = market.day_count
+        # 틱을 처리한 프레임은 이미 무거우므로 회사 복사는 다음 프레임의 step()부터
+        self._capture = persistence.Capture(market, investors)
+        market.pending_capture = self._capture
+        self._stall = 0.0
+        return True
+
+    def step(self, market):
+        """
+        잡는 중인 스냅샷을 STALL_BUDGET 안에서 진행합니다 (메인 루프가 매 프레임 호출).
+        끝나면 백그라운드 기록을 요청하고 True. 재시작/불러오기로 market이 바뀌었으면 스냅샷을 버립니다.
+        """
+        capture = self._capture
+        if capture is None:
+            return False
+        if capture.market is not market:
+            self._drop_capture()
+            return False
+        t0 = time.perf_counter()
+        snapshot = capture.step(STALL_BUDGET)
+        stall = time.perf_counter() - t0
+        if stall > self._stall:
+            self._stall = stall
+        if stall > self.max_stall:
+            self.max_stall = stall
+        if stall > STALL_BUDGET:
+            self.over_budget += 1
+        if snapshot is None:
+            return False
+        self._capture = None
+        self.last_stall = self._stall
+        self.last_frames = capture.steps
+        self._ensure_thread()
+        self._queue.put_nowait((snapshot, self._stall, capture.steps))
+        return True
+
+    def save_now(self, market, investors):
+        """지금 틱의 스냅샷을 한 번에 잡아 백그라운드 기록을 요청합니다 (프레임 예산 없이)."""
+        if self._queue.full():
+            self.skipped += 1
+            self.last_tick = market.day_count
+            return False
+        self._drop_capture()
+        t0 = time.perf_counter()
+        snapshot = persistence.capture(market, investors)
+        stall = time.perf_counter() - t0
+        self.last_tick = market.day_count
+        self.last_stall = stall
+        self.last_frames = 1
+        self._ensure_thread()
+        self._queue.put_nowait((snapshot, stall, 1))
+        return True
+
+    def path_for(self, tick):
+        # 재시작하면 틱이 0부터 다시 시작하므로 시각을 앞에 두어 이름순 = 저장 순서가 되게 함
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.directory, f"{_PREFIX}{stamp}-{tick:08d}{_SUFFIX}")
+
+    def saved_paths(self):
+        """보관 중인 자동 저장 파일 (오래된 순)"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, n) for n in sorted(names)
+                if n.startswith(_PREFIX) and n.endswith(_SUFFIX)]
+
+    def latest_path(self):
+        paths = self.saved_paths()
+        return paths[-1] if paths else None
+
+    def wait(self):
+        """진행 중인 자동 저장이 끝날 때까지 대기"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """남은 저장을 마치고 스레드 종료 (프로그램 종료 전 호출, 잡는 중인 스냅샷은 버림)"""
+        self._drop_capture()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _drop_capture(self):
+        if self._capture is not None:
+            self._capture.cancel()
+            self._capture = None
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, snapshot, stall, frames):
+        path = self.path_for(snapshot.tick)
+        t0 = time.perf_counter()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            persistence.write(path, snapshot, fsync=True, background=True)
+            self._prune()
+        except OSError as e:
+            self.failures += 1
+            logging.error(f"자동 저장 실패 ({path}): {e}")
+            return
+        self.last_write_time = time.perf_counter() - t0
+        self.last_path = path
+        self.saves += 1
+        level = logging.WARNING if stall > STALL_BUDGET else logging.INFO
+        logging.log(level, f"자동 저장: {path} (프레임 {frames}개에 나눠 캡처, 프레임당 정지 최대 {stall * 1000:.3f} ms, "
+                           f"기록 {self.last_write_time * 1000:.1f} ms, 전체 최대 정지 {self.max_stall * 1000:.3f} ms)")
+
+    def _prune(self):
+        paths = self.saved_paths()
+        for old in paths[:-self.keep] if self.keep > 0 else []:
+            try:
+                os.remove(old)
+            except OSError as e:
+                logging.warning(f"오래된 자동 저장 삭제 실패 ({old}): {e}")
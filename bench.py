@@ -0,0 +1,628 @@
+# bench.py
+# 성능 목표 확인용 벤치마크 (python bench.py <이름>)
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import orderbook
+
+
+def bench_orderbook(events=100_000, rounds=3):
+    """
+    호가창 매칭 엔진: 틱당 주문 이벤트 10만 건 처리 목표.
+    지정가 60%, 시장가 20%, 취소 20% 비율로 기준가 주변에 주문을 넣습니다.
+    """
+    rng = random.Random(42)
+    book = orderbook.LimitOrderBook()
+    ref = 10000.0
+    ops = []
+    for i in range(events):
+        r = rng.random()
+        side = orderbook.SIDE_BUY if rng.random() < 0.5 else orderbook.SIDE_SELL
+        qty = rng.randint(1, 50)
+        if r < 0.6:
+            offset = rng.randint(-20, 20) * 5.0
+            ops.append((0, i, side, qty, ref + offset))
+        elif r < 0.8:
+            ops.append((1, i, side, qty, None))
+        else:
+            ops.append((2, rng.randrange(max(i, 1)), side, qty, None))
+
+    best = None
+    for _ in range(rounds):
+        book = orderbook.LimitOrderBook()
+        submit = book.submit
+        cancel = book.cancel
+        t0 = time.perf_counter()
+        for kind, oid, side, qty, price in ops:
+            if kind == 2:
+                cancel(oid)
+            else:
+                submit(oid, None, side, qty, price)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    rate = events / best
+    print(f"orderbook: {events:,} events in {best * 1000:.1f} ms ({rate:,.0f} events/s, "
+          f"trades={book.trade_count:,}, resting={len(book):,})")
+    # 틱 간격(DAY_INTERVAL 0.5초) 안에 10만 건을 처리해야 함
+    print("  target 100,000 events/tick within 0.5 s:", "OK" if best < 0.5 else "MISS")
+    return best
+
+
+def _build_session(companies, days):
+    """
+    회사 companies개 x 캔들 days개 세션을 만듭니다.
+    지표 기록과 자산 곡선은 days일치 틱(x 48), 뉴스는 틱당 0.7건 비율로 채웁니다.
+    """
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import stock
+
+    random.seed(42)
+    market = stock.Market()
+    sectors = ["IT", "의약", "화학", "게임", "에너지", "금융"]
+    for _ in range(companies):
+        c = stock.Company(stock.random_company_name(), random.choice(sectors), random.uniform(1000, 50000))
+        price = c.current_price
+        for _ in range(days - 1):
+            o = price * random.uniform(0.98, 1.02)
+            price = o * random.uniform(0.98, 1.02)
+            c.candles.append_ohlc(o, max(o, price) * 1.01, min(o, price) * 0.99, price)
+        market.add_company(c)
+    investors = [stock.Investor("플레이어", 25000000)]
+    investors += [stock.Bot(f"봇{i}", 5000000, strategy=s) for i, s in enumerate(["random", "growth", "value", "momentum"])]
+    for inv in investors:
+        for c in random.sample(market.companies, 20):
+            inv.buy(c, 10)
+    ticks = days * 48
+    for t in range(ticks):
+        market.day_count = t + 1
+        market.update_sentiment()
+        market.update_economic_factors()
+        market.record_indicators()
+        if random.random() < 0.7:
+            market.generate_random_news(random)
+        for inv in investors:
+            inv.equity_curve.append(inv.get_portfolio_value())
+    return market, investors
+
+
+def _journaled_session(seed=11, ticks=600, reload_at=None):
+    """
+    플레이어가 7틱마다 시장가로 사고 바로 손절 주문을 걸며 21틱마다 가장 오래된 주문을 취소하는 저널 세션
+    (대기 주문 발동/취소가 섞임).
+    reload_at 틱에 저장했다가 불러온 상태로 이어서 진행할 수 있습니다. (journal, 종료 상태 해시) 반환
+    """
+    import journal
+    import orders
+    import persistence
+    import stock
+
+    start = {"seed": seed, "player_cash": 25000000, "use_order_book": False, "warmup_days": 0}
+    market, investors = stock.build_game(seed, start["player_cash"], False, 0)
+    session = journal.Journal(start)
+    for t in range(ticks):
+        if market.day_count == reload_at:
+            market, investors = stock.restore_game(persistence.dumps(market, investors))
+        market.journal = session
+        if t % 7 == 0:
+            listed = [c for c in market.companies if not c.is_bankrupt]
+            company = listed[(t // 7) % len(listed)]
+            if market.player_trade(investors[0], company, "buy", 10):
+                market.player_place_order(investors[0], company, orders.ORDER_STOP_LOSS,
+                                          company.current_price * 0.99, 10)
+        if t % 21 == 20:
+            pending = market.orders.orders_for(investors[0])
+            if pending:
+                market.player_cancel_order(investors[0], pending[0].order_id)
+        market.next_day(investors, 0)
+    fingerprint = persistence.fingerprint(market, investors)
+    session.record(market.day_count, journal.ACTION_END, fingerprint=fingerprint)
+    return session, fingerprint
+
+
+def bench_replay(seed=11, ticks=600):
+    """
+    리플레이: 대기 주문이 섞인 저널을 끝까지 재생한 결과와, 여러 틱으로 되감은(체크포인트에서 복원한) 뒤
+    다시 재생한 결과가 원래 세션의 종료 상태 해시와 같은지 확인하고 되감기 시간을 측정합니다.
+    """
+    import replay
+    import stock
+
+    session, _ = _journaled_session(seed, ticks)
+    replayer = replay.Replayer(session, stock.start_game, stock.restore_game)
+    t0 = time.perf_counter()
+    replayer.run_to(replayer.end_tick)
+    ok = replayer.verify()
+    print(f"replay: {ticks} ticks in {(time.perf_counter() - t0) * 1000:.0f} ms, "
+          f"{'matches' if ok else 'DIFFERS'}")
+    for tick in (ticks // 2, ticks - 10, replayer.checkpoint_every, 0):
+        t0 = time.perf_counter()
+        same = replayer.verify_seek(tick)
+        ok &= same
+        print(f"replay: seek to tick {tick:>4} and replay to end {(time.perf_counter() - t0) * 1000:.0f} ms, "
+              f"{'matches' if same else 'DIFFERS'}")
+    print("  target seek then replay matches the original session:", "OK" if ok else "MISS")
+    return ok
+
+
+def bench_persistence(companies=1000, days=360, rounds=3, seed=11, ticks=600):
+    """
+    저장/불러오기: 회사 1,000개 x 1년(캔들 360개) 세션을 1초 안에 불러오기 목표.
+    대기 주문이 섞인 ticks틱 세션을 중간에 저장했다 불러와 이어 간 결과가 끊지 않은 세션과 같은지도 확인합니다.
+    """
+    import stock
+
+    market, investors = _build_session(companies, days)
+    fd, path = tempfile.mkstemp(suffix=".stk")
+    os.close(fd)
+    try:
+        best_save = best_load = None
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            stock.save_game(market, investors, path)
+            t1 = time.perf_counter()
+            stock.load_game(path)
+            t2 = time.perf_counter()
+            best_save = t1 - t0 if best_save is None else min(best_save, t1 - t0)
+            best_load = t2 - t1 if best_load is None else min(best_load, t2 - t1)
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+    print(f"persistence: {companies:,} companies x {days} candles, {len(market.news):,} news, "
+          f"file {size / 1e6:.1f} MB, save {best_save * 1000:.1f} ms, load {best_load * 1000:.1f} ms")
+    print("  target load < 1 s:", "OK" if best_load < 1.0 else "MISS")
+
+    _, expected = _journaled_session(seed, ticks)
+    same = True
+    for reload_at in (ticks // 2, ticks - 10):
+        _, fingerprint = _journaled_session(seed, ticks, reload_at=reload_at)
+        same &= fingerprint == expected
+        print(f"persistence: save/load at tick {reload_at} and continue to {ticks}: "
+              f"{'matches' if fingerprint == expected else 'DIFFERS'} the uninterrupted session")
+    print("  target loaded game continues identically:", "OK" if same else "MISS")
+    return best_load
+
+
+def bench_autosave(companies=1000, days=360, rounds=5):
+    """
+    자동 저장: 틱 경계에서 캡처를 시작하는 비용, 회사 상태를 프레임마다 나눠 복사할 때 한 프레임의 메인 루프
+    정지 시간(목표 1 ms 미만)과 쓴 프레임 수, 복사가 끝나기 전에 다음 틱이 오면 next_day가 마저 복사하는
+    최악의 시간, 백그라운드 기록 때문에 프레임이 추가로 지연되는 시간(목표 1 ms 미만)을
+    기본 게임 규모(회사 23개)와 회사 1,000개 세션에서 측정합니다.
+    프레임 지연은 메인 스레드가 잠에서 깨어 GIL을 다시 잡기까지의 지연을 1 ms마다 재서, 기록 중의 99백분위수와
+    바로 뒤 같은 길이의 기록 없는 구간의 99백분위수의 차이로 판정합니다. 30 FPS 프레임 하나하나는 기록 스레드가
+    GIL을 쥔 순간과 드물게만 겹치고, 가상 머신처럼 기록이 없어도 깨어나기가 가끔 수 ms씩 늦는 환경이 있어서
+    프레임별 최댓값으로는 기록 스레드의 영향을 가려낼 수 없기 때문입니다.
+    복사 도중 체결이 일어나도 스냅샷이 캡처를 시작한 틱 경계의 상태와 같은지도 확인합니다.
+    """
+    import threading
+    import autosave
+    import persistence
+
+    nap = 0.001
+
+    def wakeups(until, lates):
+        """nap만큼씩 잠들며 깨어나기 지연(GIL을 다시 잡기까지 포함)을 lates에 모음"""
+        while until():
+            start = time.perf_counter()
+            time.sleep(nap)
+            lates.append(time.perf_counter() - start - nap)
+
+    def percentile(values, p):
+        values.sort()
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+    ok = True
+    for n in (23, companies):
+        market, investors = _build_session(n, days)
+        setups = []
+        flushes = []
+        stalls = []
+        frames = []
+        writing = []
+        idle = []
+        write_times = []
+        consistent = True
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "autosave.stk")
+            for _ in range(rounds):
+                # 복사가 끝나기 전에 다음 틱이 온 경우: next_day 앞에서 남은 복사를 모두 마침
+                capture = persistence.Capture(market, investors)
+                t0 = time.perf_counter()
+                capture.flush()
+                flushes.append(time.perf_counter() - t0)
+
+                # 복사 도중 아직 복사하지 않은 회사가 체결되어도 틱 경계의 상태가 기록되어야 함
+                expected = persistence.dumps(market, investors)
+                t0 = time.perf_counter()
+                capture = persistence.Capture(market, investors)
+                setups.append(time.perf_counter() - t0)
+                market.pending_capture = capture
+                snapshot = None
+                while snapshot is None:
+                    t0 = time.perf_counter()
+                    snapshot = capture.step(autosave.STALL_BUDGET)
+                    stalls.append(time.perf_counter() - t0)
+                    if capture.steps == 1:
+                        market.submit_order(investors[0], market.companies[-1], orderbook.SIDE_BUY, 1)
+                frames.append(capture.steps)
+                consistent = consistent and market.pending_capture is None
+
+                writer = threading.Thread(target=persistence.write, args=(path, snapshot),
+                                          kwargs={"fsync": True, "background": True})
+                t0 = time.perf_counter()
+                writer.start()
+                wakeups(writer.is_alive, writing)
+                writer.join()
+                write_times.append(time.perf_counter() - t0)
+                deadline = time.perf_counter() + write_times[-1]
+                wakeups(lambda: time.perf_counter() < deadline, idle)
+                with open(path, "rb") as f:
+                    consistent = consistent and f.read() == expected
+        stalls.sort()
+        stall = stalls[-1]
+        hitch = max(percentile(writing, 0.99) - percentile(idle, 0.99), 0.0)
+        print(f"autosave: {n:,} companies x {days} candles, tick-boundary setup {max(setups) * 1000:.2f} ms, "
+              f"snapshot stall per frame max {stall * 1000:.3f} ms (median {stalls[len(stalls) // 2] * 1000:.3f} ms) "
+              f"over {max(frames)} frames, in-tick flush worst {max(flushes) * 1000:.2f} ms, "
+              f"background write {min(write_times) * 1000:.0f} ms, extra frame delay p99 {hitch * 1000:.2f} ms "
+              f"(wake-up max {writing[-1] * 1000:.2f} ms writing, {idle[-1] * 1000:.2f} ms idle)")
+        print("  target snapshot stall per frame < 1 ms:", "OK" if stall < 0.001 else "MISS")
+        print("  target extra frame delay while writing < 1 ms:", "OK" if hitch < 0.001 else "MISS")
+        print("  snapshot taken across a trade matches the tick boundary:", "OK" if consistent else "MISS")
+        ok = ok and stall < 0.001 and hitch < 0.001 and consistent
+    return ok
+
+
+def bench_streams(companies=1000, ticks=20, shards=4):
+    """
+    카운터 기반 난수 스트림: 회사 companies개의 주가 갱신을 직렬로 한 결과와, 회사를 shards개로 나눠
+    조각마다 역순으로 갱신한 결과가 비트 단위로 같은지 확인하고 순차 random.Random과 속도를 비교합니다.
+    """
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import philox
+    import stock
+
+    market = stock.create_initial_market(seed=42)
+    market.add_random_companies(companies - len(market.companies))
+    data = stock.persistence.dumps(market, [])
+
+    def advance(mk, order, rng_for):
+        start = mk.day_count
+        for tick in range(start + 1, start + ticks + 1):
+            mk.day_count = tick
+            for c in order(mk.companies):
+                c.update_price_daily(econ_factor=1.0, economic_factors=mk.economic_factors,
+                                     national_factors=mk.national_factors, rng=rng_for(mk, tick, c))
+                c.check_bankruptcy(econ_factor=1.0, current_day=tick)
+
+    def stream_for(mk, tick, c):
+        return mk.streams.stream(philox.PRICE, tick, c.id)
+
+    def sharded(comps):
+        for k in range(shards):
+            yield from reversed(comps[k::shards])
+
+    serial, _ = stock.restore_game(data)
+    t0 = time.perf_counter()
+    advance(serial, list, stream_for)
+    serial_time = time.perf_counter() - t0
+
+    split, _ = stock.restore_game(data)
+    advance(split, sharded, stream_for)
+
+    sequential, _ = stock.restore_game(data)
+    t0 = time.perf_counter()
+    advance(sequential, list, lambda mk, tick, c: mk.rng)
+    sequential_time = time.perf_counter() - t0
+
+    identical = all(
+        a.candles.columns[name].tobytes() == b.candles.columns[name].tobytes()
+        and (a.capital, a.debt, a.revenue, a.net_income, a.is_bankrupt) == (b.capital, b.debt, b.revenue, b.net_income, b.is_bankrupt)
+        for a, b in zip(serial.companies, split.companies) for name in ("open", "high", "low", "close")
+    )
+    print(f"streams: {companies:,} companies x {ticks} ticks, price stage {serial_time / ticks * 1000:.1f} ms/tick "
+          f"(sequential random.Random {sequential_time / ticks * 1000:.1f} ms/tick)")
+    print(f"  {shards} shards in reverse order bit-identical to serial:", "OK" if identical else "MISS")
+    return identical
+
+
+def bench_shard(companies=20_000, ticks=5, workers=(0, 1, 2, 4), target=1_000_000):
+    """
+    샤드 시장: 회사 companies개를 워커 수별로 ticks틱 진행해 처리량(회사/초)을 재고, 워커 수와 무관하게
+    상태 해시가 같은지 확인합니다. target개 회사 유니버스의 틱당 소요 시간은 측정 처리량으로 추정합니다.
+    처리량은 코어 수까지만 늘어나므로 코어가 하나인 환경에서는 워커를 늘려도 빨라지지 않습니다.
+    """
+    import shard
+
+    digests = set()
+    print(f"shard: {companies:,} companies x {ticks} ticks on {os.cpu_count()} core(s)")
+    for w in workers:
+        with shard.ShardedMarket(companies, workers=w, seed=42) as market:
+            t0 = time.perf_counter()
+            for _ in range(ticks):
+                market.step()
+            elapsed = time.perf_counter() - t0
+            digests.add(market.digest())
+        rate = companies * ticks / elapsed
+        print(f"  workers={w}: {elapsed / ticks * 1000:.0f} ms/tick, {rate:,.0f} companies/s, "
+              f"{target:,} companies ~{target / rate:.1f} s/tick")
+    identical = len(digests) == 1
+    print("  digest identical across worker counts:", "OK" if identical else "MISS")
+    return identical
+
+
+def _shared_reader(name, stop, result):
+    """bench_sharedstate의 읽는 프로세스: 매번 모든 회사의 최신 종가와 캔들 이력 끝이 같은지 확인"""
+    import sharedstate
+
+    def check(layout, tick, slot_count):
+        for slot in range(slot_count):
+            if layout.state[slot] != sharedstate.EMPTY:
+                n = layout.candle_count[slot]
+                if n == 0 or layout.candle_data[layout.candle_base(3, slot) + n - 1] != layout.close[slot]:
+                    return False
+        return True
+
+    with sharedstate.SharedMarketReader(name) as reader:
+        reads = torn = 0
+        while not stop.is_set():
+            reads += 1
+            torn += not reader.read(check)
+        result.put((reads, torn, reader.retries))
+
+
+def bench_sharedstate(companies=1000, days=360, ticks=200):
+    """
+    공유 메모리 시장 상태: 회사 1,000개 x 캔들 360개 세션의 첫 공개/틱당 공개 시간, 읽는 쪽의 전체 캔들 이력
+    보기(복사 없음)와 피클 복사 비교, 그리고 다른 프로세스가 계속 읽는 동안 찢어진 상태를 읽지 않는지 확인합니다.
+    """
+    import multiprocessing
+    import pickle
+    import sharedstate
+
+    market, investors = _build_session(companies, days)
+    name = f"bench_{os.getpid()}"
+    with sharedstate.SharedMarketWriter(name) as writer:
+        t0 = time.perf_counter()
+        writer.publish(market)
+        first = time.perf_counter() - t0
+
+        with sharedstate.SharedMarketReader(name) as reader:
+            def total_close(layout, tick, slot_count):
+                return sum(sum(layout.candles(slot)["close"]) for slot in range(slot_count))
+            t0 = time.perf_counter()
+            reader.read(total_close)
+            view_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pickle.loads(pickle.dumps([(c.id, c.candles.columns) for c in market.companies]))
+        pickle_time = time.perf_counter() - t0
+
+        stop = multiprocessing.Event()
+        result = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_shared_reader, args=(name, stop, result))
+        process.start()
+        publish_times = []
+        for _ in range(ticks):
+            market.day_count += 1
+            for c in market.companies:
+                price = c.current_price * random.uniform(0.98, 1.02)
+                c.candles.append_ohlc(price, price, price, price)
+            t0 = time.perf_counter()
+            writer.publish(market)
+            publish_times.append(time.perf_counter() - t0)
+        time.sleep(0.2)
+        stop.set()
+        reads, torn, retries = result.get()
+        process.join()
+    publish_times.sort()
+    print(f"sharedstate: {companies:,} companies x {days} candles, first publish {first * 1000:.1f} ms, "
+          f"per tick median {publish_times[len(publish_times) // 2] * 1000:.2f} ms")
+    print(f"  reader walks all candle history in place {view_time * 1000:.1f} ms "
+          f"(pickle round trip of the same data {pickle_time * 1000:.1f} ms)")
+    print(f"  concurrent reader: {reads:,} reads, {retries:,} retried, torn snapshots:", "none (OK)" if torn == 0 else f"{torn} (MISS)")
+    return torn == 0
+
+
+def bench_logging(ticks=200, trades=250):
+    """
+    체결 로그: 틱마다 trades건씩 기록하고 프레임 남은 시간만큼 쉬는 게임 루프에서, 예전 방식(호출한 스레드에서
+    f-string 포맷 후 파일에 바로 쓰고 비움)과 logpipe(큐에 넣고 기록 스레드가 포맷/쓰기)의 틱당 메인 스레드 시간,
+    그리고 봇 체결 로그를 100건 중 1건만 남기거나 끈 경우를 비교합니다.
+    """
+    import logging
+    import logpipe
+
+    bot = logpipe.get_logger(logpipe.BOT_TRADES)
+    root = logging.getLogger()
+    saved_level = root.level
+    saved = logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing
+    rows = [(f"봇_{i % 20}", f"ABC{i % 100:02d}", i % 10 + 1) for i in range(trades)]
+
+    def run(log):
+        """틱마다 trades건 기록에 걸린 시간의 중앙값 (틱 사이에는 1/30초 쉼)"""
+        times = []
+        for _ in range(ticks):
+            t0 = time.perf_counter()
+            log()
+            times.append(time.perf_counter() - t0)
+            time.sleep(1 / 30)
+        times.sort()
+        return times[len(times) // 2]
+
+    def sync_log():
+        for name, company, quantity in rows:
+            logging.info(f"{name}이 {company}을 {quantity}주 매수했습니다.")
+
+    def queued_log():
+        for name, company, quantity in rows:
+            bot.info("%s이 %s을 %s주 매수했습니다.", name, company, quantity)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = logging.FileHandler(os.path.join(tmp, "sync.log"), encoding="utf-8")
+        handler.setFormatter(logging.Formatter(logpipe.LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        sync = run(sync_log)
+        root.removeHandler(handler)
+        handler.close()
+        print(f"logging: {trades} trades/tick, sync file write {sync * 1000:.3f} ms/tick")
+
+        for label, samples, levels in (("queue", None, None), ("queue, bots 1/100", {logpipe.BOT_TRADES: 100}, None),
+                                       ("queue, bots off", None, {logpipe.BOT_TRADES: logpipe.OFF})):
+            pipeline = logpipe.LogPipeline(os.path.join(tmp, "async.log"), levels=levels, samples=samples)
+            queued = run(queued_log)
+            pipeline.close()
+            bot.setLevel(logging.NOTSET)
+            print(f"logging: {label}: {queued * 1000:.3f} ms/tick ({sync / queued:.1f}x)")
+    root.setLevel(saved_level)
+    logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing = saved
+
+
+def bench_news(count=100_000, frames=300):
+    """
+    뉴스 기록: 레코드 하나의 크기(레코드 + 이름/자유 문장 목록 몫)를 예전 방식(dict + 본문 문자열)과 비교하고,
+    뉴스 패널(최근 27개)과 회사 상세 관련 뉴스(최근 29개)를 프레임마다 그릴 때 본문을 만드는 시간을 잽니다.
+    """
+    import random
+    import sys
+    import stock
+
+    market = stock.create_initial_market(seed=1)
+    rng = random.Random(1)
+    t0 = time.perf_counter()
+    while len(market.news) < count:
+        market.add_random_news(rng)
+    t1 = time.perf_counter()
+    log = market.news
+    n = len(log)
+    size = len(log.data) + sum(sys.getsizeof(s) for s in log.names) + sum(sys.getsizeof(s) for s in log.texts)
+    legacy = 0
+    for i in range(n):
+        msg = {"type": log.kind_name(i), "sector": log.sector(i), "company": log.company(i), "text": log.text(i)}
+        legacy += sys.getsizeof(msg) + sys.getsizeof(msg["text"])
+    print(f"news: {n:,} records, add {(t1 - t0) / n * 1e6:.2f} us/record, "
+          f"{size / n:.1f} bytes/record vs dict+str {legacy / n:.1f} bytes/record ({legacy / size:.1f}x)")
+
+    name = market.companies[0].name
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        for i in log.latest(27):
+            log.text(i)
+        for i in stock.company_news(log, name, 29):
+            log.text(i)
+    t1 = time.perf_counter()
+    print(f"news: panel + company news {(t1 - t0) / frames * 1000:.3f} ms/frame")
+
+
+def bench_warmup(days=360, rounds=5, target=0.2):
+    """워밍업: 기본 회사 23곳의 과거 캔들 1년치(360개)를 0.2초 안에 만들기 목표 (시장 생성 시간은 제외)."""
+    import stock
+    import warmup
+
+    times = []
+    for seed in range(rounds):
+        market = stock.create_initial_market(seed=seed)
+        t0 = time.perf_counter()
+        warmup.warm_up(market, days)
+        times.append(time.perf_counter() - t0)
+    best = min(times)
+    candles = days * len(market.companies)
+    print(f"warmup: {len(market.companies)} companies x {days} days, best {best * 1000:.1f} ms "
+          f"({best / candles * 1e6:.2f} us/candle), target {target * 1000:.0f} ms: {'OK' if best <= target else 'MISS'}")
+
+
+def bench_timeline(days=90, seed=7):
+    """
+    타임라인: days일 게임을 하루마다 스냅샷하며 메모리(조각 공유)를 스냅샷마다 통째로 복사할 때와 비교하고,
+    기록 시간과 여러 지점으로 되감는 시간, 되감은 상태가 기록 당시와 같은지 확인합니다.
+    """
+    import persistence
+    import stock
+    import timeline
+
+    market, investors = stock.new_game(seed)
+    tl = timeline.Timeline(budget=1 << 40)
+    marks = {}
+    record_times = []
+    full = 0  # 스냅샷마다 저장 형식으로 통째로 복사했을 때의 합
+    for _ in range(days * 48):
+        if tl.maybe_record(market, investors):
+            record_times.append(tl.last_record_time)
+            marks[market.day_count] = persistence.fingerprint(market, investors)
+            full += len(persistence.dumps(market, investors))
+        market.next_day(investors, 0)
+    print(f"timeline: {len(tl)} snapshots, {tl.nbytes / 1e6:.1f} MB shared vs {full / 1e6:.1f} MB full copies "
+          f"({full / tl.nbytes:.1f}x), record mean {sum(record_times) / len(record_times) * 1000:.2f} ms "
+          f"max {max(record_times) * 1000:.2f} ms")
+    ok = True
+    for tick in sorted(marks, reverse=True)[1::len(marks) // 4]:
+        mk, invs = tl.rewind(tick, stock.restore_sections)
+        ok &= persistence.fingerprint(mk, invs) == marks[tick]
+        print(f"timeline: rewind to tick {tick:>5} {tl.last_rewind_time * 1000:.2f} ms")
+    print(f"timeline: rewound states {'match' if ok else 'DIFFER'}")
+
+
+def bench_forecast(days=5, seed=7, paths=32, horizon=96):
+    """
+    예측 띠: 회사 하나의 paths개 경로 x horizon틱 예측을 프로세스 풀에서 계산할 때 메인 스레드가 쓰는 시간(제출과 확인)과
+    결과가 나오기까지의 시간, 같은 상태를 다시 예측하면 같은 띠가 나오는지 확인합니다.
+    """
+    import forecast
+    import stock
+
+    market, investors = stock.new_game(seed)
+    for _ in range(days * 48):
+        market.next_day(investors, 0)
+    company = market.companies[0]
+    results = []
+    for _ in range(2):
+        forecaster = forecast.Forecaster(stock.restore_game, paths, horizon)
+        calls = []
+        result = None
+        while result is None:
+            t0 = time.perf_counter()
+            result = forecaster.latest(market, investors, company)
+            calls.append(time.perf_counter() - t0)
+            time.sleep(1 / 30)  # 30 FPS 프레임마다 한 번
+        forecaster.close()
+        results.append(result)
+        print(f"forecast: {paths} paths x {horizon} ticks, {forecaster.workers} workers, ready in {result.elapsed:.2f} s "
+              f"({result.elapsed / (paths * horizon) * 1000:.2f} ms/path-tick incl. start), main thread "
+              f"submit {calls[0] * 1000:.2f} ms, poll max {max(calls[1:]) * 1000:.3f} ms over {len(calls) - 1} frames")
+    same = all(list(a) == list(b) for a, b in zip(results[0].bands, results[1].bands))
+    print(f"forecast: median {results[0].median[-1]:.0f} (now {company.current_price:.0f}), "
+          f"repeat {'matches' if same else 'DIFFERS'}")
+
+
+BENCHMARKS = {
+    "orderbook": bench_orderbook,
+    "persistence": bench_persistence,
+    "autosave": bench_autosave,
+    "streams": bench_streams,
+    "shard": bench_shard,
+    "sharedstate": bench_sharedstate,
+    "logging": bench_logging,
+    "news": bench_news,
+    "warmup": bench_warmup,
+    "timeline": bench_timeline,
+    "replay": bench_replay,
+    "forecast": bench_forecast,
+}
+
+
+def main(argv):
+    names = argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            return 1
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
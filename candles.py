@@ -0,0 +1,112 @@
+# candles.py
+# 회사별 캔들(OHLC)을 열 단위 배열로 보관하는 시계열
+
+from array import array
+
+FIELDS = ("open", "high", "low", "close")
+
+
+class CandleView:
+    """
+    CandleSeries의 캔들 하나를 dict처럼 다루기 위한 보기.
+    candle["close"] 읽기/쓰기가 원본 배열에 바로 반영됩니다.
+    """
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._columns[key][self._index]
+
+    def __setitem__(self, key, value):
+        self._columns[key][self._index] = value
+
+    def get(self, key, default=None):
+        column = self._columns.get(key)
+        return default if column is None else column[self._index]
+
+    def keys(self):
+        return FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def to_dict(self):
+        i = self._index
+        return {name: self._columns[name][i] for name in FIELDS}
+
+    def __repr__(self):
+        return f"CandleView({self.to_dict()})"
+
+
+class CandleSeries:
+    """
+    캔들 시계열. 시가/고가/저가/종가를 각각 array('d')에 저장하여 캔들 하나가 32바이트이고,
+    저장/불러오기 때는 열 배열을 그대로 읽고 씁니다.
+
+    기존 코드와의 호환을 위해 candles[-1]["close"], candles[-5:], append({...}) 형태를 지원합니다.
+    """
+    __slots__ = ("open", "high", "low", "close", "columns")
+
+    def __init__(self, opens=None, highs=None, lows=None, closes=None):
+        self.open = opens if opens is not None else array("d")
+        self.high = highs if highs is not None else array("d")
+        self.low = lows if lows is not None else array("d")
+        self.close = closes if closes is not None else array("d")
+        self.columns = {"open": self.open, "high": self.high, "low": self.low, "close": self.close}
+
+    @classmethod
+    def from_candles(cls, candles):
+        """dict 캔들 리스트로부터 생성"""
+        series = cls()
+        for c in candles:
+            series.append_ohlc(c["open"], c["high"], c["low"], c["close"])
+        return series
+
+    def append_ohlc(self, open_price, high_price, low_price, close_price):
+        self.open.append(open_price)
+        self.high.append(high_price)
+        self.low.append(low_price)
+        self.close.append(close_price)
+
+    def append(self, candle):
+        self.append_ohlc(candle["open"], candle["high"], candle["low"], candle["close"])
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, index):
+        n = len(self.close)
+        if isinstance(index, slice):
+            return [CandleView(self.columns, i) for i in range(*index.indices(n))]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("candle index out of range")
+        return CandleView(self.columns, index)
+
+    def __iter__(self):
+        columns = self.columns
+        return (CandleView(columns, i) for i in range(len(self.close)))
+
+    def aggregate(self, group_size):
+        """group_size개씩 묶은 캔들을 dict 리스트로 반환 (마지막 묶음은 모자랄 수 있음)"""
+        opens, highs, lows, closes = self.open, self.high, self.low, self.close
+        n = len(closes)
+        if group_size <= 1:
+            return [{"open": opens[i], "high": highs[i], "low": lows[i], "close": closes[i]} for i in range(n)]
+        aggregated = []
+        for i in range(0, n, group_size):
+            j = min(i + group_size, n)
+            aggregated.append({
+                "open": opens[i],
+                "high": max(highs[i:j]),
+                "low": min(lows[i:j]),
+                "close": closes[j - 1]
+            })
+        return aggregated
+
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in self.columns.values())
@@ -0,0 +1,208 @@
+# economy.py
+# 경제/국가 지표의 국면(regime)별 변동 테이블과 일괄 갱신 엔진
+
+import json
+import math
+from array import array
+
+# 경제 국면 (Market.economic_condition_list 순서와 동일)
+REGIME_BOOM = 0
+REGIME_NORMAL = 1
+REGIME_RECESSION = 2
+REGIME_CRISIS = 3
+REGIME_COUNT = 4
+
+# 국면별 주가 변동성 배율 (Market.economic_condition_factor_map)
+REGIME_VOLATILITY = (0.8, 1.0, 1.2, 1.5)
+
+# 국면별 지표 변동 테이블
+# 각 지표: 그룹(economic/national), 정수 여부, 국면별 [변동 하한, 변동 상한, 값 하한, 값 상한]
+# 국면 순서: 호황, 보통, 불황, 위기
+REGIME_TABLE = {
+    "gdp_growth": {
+        "group": "economic", "integer": False,
+        "regimes": [[0.5, 1.0, -5.0, 10.0], [-0.25, 0.1, -5.0, 10.0],
+                    [-0.75, 0.05, -5.0, 10.0], [-0.2, -0.1, -5.0, 10.0]],
+    },
+    "inflation": {
+        "group": "economic", "integer": False,
+        "regimes": [[-0.5, -0.25, -15.0, 15.0], [-0.25, 0.25, -2.0, 15.0],
+                    [-0.0125, 0.25, -2.0, 15.0], [0.25, 0.5, -2.0, 15.0]],
+    },
+    "interest_rate": {
+        "group": "economic", "integer": False,
+        "regimes": [[-0.1, -0.05, 0.5, 15.0], [-0.05, 0.05, 0.5, 15.0],
+                    [-0.025, 0.05, 0.5, 15.0], [0.05, 0.1, 0.5, 15.0]],
+    },
+    "unemployment": {
+        "group": "economic", "integer": False,
+        "regimes": [[-0.15, -0.05, 0.0, 7.0], [-0.05, 0.1, 0.0, 7.0],
+                    [-0.025, 0.1, 0.0, 7.0], [0.05, 0.1, 0.0, 7.0]],
+    },
+    "exchange_rate": {
+        "group": "economic", "integer": False,
+        "regimes": [[-3.0, -1.0, 1000.0, 1500.0], [-5.0, 5.0, 1000.0, 1500.0],
+                    [-2.5, 5.0, 1000.0, 1500.0], [5.0, 10.0, 1000.0, 1500.0]],
+    },
+    "raw_material_cost": {
+        "group": "economic", "integer": False,
+        "regimes": [[-5.0, -2.5, 50.0, 200.0], [-2.5, 2.5, 50.0, 200.0],
+                    [-1.25, 2.5, 50.0, 200.0], [2.5, 5.0, 50.0, 200.0]],
+    },
+    "political_stability": {
+        "group": "economic", "integer": False,
+        "regimes": [[0.0, 0.075, 0.0, 2.0], [-0.025, 0.025, 0.0, 2.0],
+                    [-0.0125, 0.025, 0.0, 2.0], [-0.03, 0.0, 0.0, 2.0]],
+    },
+    "innovation_index": {
+        "group": "economic", "integer": False,
+        "regimes": [[0.0, 0.075, 0.0, 2.0], [-0.025, 0.025, 0.0, 2.0],
+                    [-0.0125, 0.025, 0.0, 2.0], [-0.03, 0.0, 0.0, 2.0]],
+    },
+    "total_assets": {
+        "group": "national", "integer": False,
+        "regimes": [[-5.0, -2.5, 18000.0, 28000.0], [-2.5, 2.5, 18000.0, 28000.0],
+                    [0.0, 2.5, 18000.0, 28000.0], [2.5, 5.0, 18000.0, 28000.0]],
+    },
+    "birth_rate": {
+        "group": "national", "integer": False,
+        "regimes": [[-0.1, -0.05, 0.5, 3.0], [-0.05, 0.05, 0.5, 3.0],
+                    [0.0, 0.05, 0.5, 3.0], [0.05, 0.1, 0.5, 3.0]],
+    },
+    "population": {
+        "group": "national", "integer": True,
+        "regimes": [[-5000, -2500, 10000000, 100000000], [-2500, 2500, 10000000, 100000000],
+                    [0, 2500, 10000000, 100000000], [0, 5000, 10000000, 100000000]],
+    },
+}
+
+# 지표 초기값
+INITIAL_ECONOMIC_FACTORS = {
+    "gdp_growth": 2.0,
+    "inflation": 2.0,
+    "interest_rate": 1.5,
+    "unemployment": 1.0,
+    "exchange_rate": 1300.0,  # 초기 환율 (1달러 = 1300원)
+    "raw_material_cost": 100.0,  # 원자재 비용
+    "political_stability": 1.0,  # 정치적 안정성 (0.0 ~ 2.0)
+    "innovation_index": 1.0  # 기술 혁신 지수 (0.0 ~ 2.0)
+}
+INITIAL_NATIONAL_FACTORS = {
+    "total_assets": 23000.0,      # 국가의 총 자산 (예시 단위)
+    "birth_rate": 1.5,           # 출산율 (예: 1.5명)
+    "population": 50000000       # 인구 수 (예: 5천만 명)
+}
+
+
+def regime_of(score):
+    """정세 점수 -> 국면 번호 (Market.economic_condition과 같은 구간)"""
+    if score >= 15:
+        return REGIME_BOOM
+    elif score >= -5:
+        return REGIME_NORMAL
+    elif score > -20:
+        return REGIME_RECESSION
+    return REGIME_CRISIS
+
+
+def load_regime_table(path):
+    """JSON 파일에서 변동 테이블을 읽습니다. 파일에 없는 지표는 기본 테이블 값을 사용"""
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    table = {name: dict(spec) for name, spec in REGIME_TABLE.items()}
+    for name, spec in overrides.items():
+        table[name] = dict(table.get(name, {}), **spec)
+    return table
+
+
+def dump_regime_table(path, table=None):
+    """변동 테이블을 JSON으로 저장 (튜닝 시작점으로 사용)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table or REGIME_TABLE, f, ensure_ascii=False, indent=2)
+
+
+class RegimeEngine:
+    """
+    변동 테이블을 지표별 평탄한 배열로 미리 펼쳐 두고, 지표마다 한 번의 균등 난수로
+    '값 += 변동; 값 = clamp(값)' 을 적용합니다. 단일 시장(dict)과 다수 경제(EconomyBatch)가
+    같은 테이블과 같은 계산식을 사용합니다.
+    """
+
+    def __init__(self, table=None):
+        table = table or REGIME_TABLE
+        self.table = table
+        self.names = list(table)
+        self.groups = [table[n]["group"] for n in self.names]
+        self.integer = [bool(table[n].get("integer", False)) for n in self.names]
+        # [지표][국면] -> (하한, 폭, 최솟값, 최댓값)
+        self.params = []
+        for n in self.names:
+            rows = []
+            for lo, hi, vmin, vmax in table[n]["regimes"]:
+                if lo > hi:
+                    lo, hi = hi, lo
+                rows.append((lo, hi - lo, vmin, vmax))
+            self.params.append(rows)
+
+    @classmethod
+    def from_json(cls, path):
+        return cls(load_regime_table(path))
+
+    def step(self, economic_factors, national_factors, regime, rng):
+        """한 시장의 지표 dict를 한 틱 갱신"""
+        for name, group, is_int, rows in zip(self.names, self.groups, self.integer, self.params):
+            factors = economic_factors if group == "economic" else national_factors
+            lo, span, vmin, vmax = rows[regime]
+            u = rng.random()
+            if is_int:
+                value = factors[name] + int(lo + math.floor(u * (span + 1)))
+            else:
+                value = factors[name] + lo + span * u
+            factors[name] = max(vmin, min(value, vmax))
+
+    def step_batch(self, batch, rng):
+        """EconomyBatch의 모든 경제를 한 틱 갱신 (정세 진행 후 지표 열 단위 일괄 계산)"""
+        batch.advance_sentiment()
+        regimes = batch.regimes()
+        n = batch.size
+        rand = rng.random
+        for name, is_int, rows in zip(self.names, self.integer, self.params):
+            col = batch.columns[name]
+            us = [rand() for _ in range(n)]
+            if is_int:
+                new = [min(max(v + int(rows[r][0] + math.floor(u * (rows[r][1] + 1))), rows[r][2]), rows[r][3])
+                       for v, r, u in zip(col, regimes, us)]
+            else:
+                new = [min(max(v + rows[r][0] + rows[r][1] * u, rows[r][2]), rows[r][3])
+                       for v, r, u in zip(col, regimes, us)]
+            batch.columns[name] = array("d", new)
+
+
+class EconomyBatch:
+    """
+    서로 독립된 N개의 경제(몬테카를로 시행 등)를 지표별 열 배열로 보관합니다.
+    정세 점수도 Market.update_sentiment와 같은 사인 곡선으로 경제별로 진행합니다.
+    """
+
+    def __init__(self, size, amplitude=20, frequency=0.1, phases=None):
+        self.size = size
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.phase = array("d", phases if phases is not None else [0.0] * size)
+        self.sentiment = array("d", [0.0] * size)
+        self.columns = {}
+        for name, value in list(INITIAL_ECONOMIC_FACTORS.items()) + list(INITIAL_NATIONAL_FACTORS.items()):
+            self.columns[name] = array("d", [float(value)] * size)
+
+    def regimes(self):
+        return [regime_of(s) for s in self.sentiment]
+
+    def advance_sentiment(self):
+        amp = self.amplitude
+        freq = self.frequency
+        self.phase = array("d", [p + freq for p in self.phase])
+        self.sentiment = array("d", [amp * math.sin(p) for p in self.phase])
+
+    def row(self, i):
+        """i번째 경제의 지표 dict"""
+        return {name: col[i] for name, col in self.columns.items()}
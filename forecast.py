@@ -0,0 +1,211 @@
+# forecast.py
+# 회사 상세 차트의 앞날 예측: 지금 시장 상태를 복제해 난수 시드만 바꾼 시뮬레이션 여러 개로 선택한 회사의
+# HORIZON틱 뒤까지 주가 분포(중앙값과 백분위 띠)를 구함
+#
+# 경로마다 시장 전체(경제 지표, 뉴스, 회사 간 상호작용, 봇 매매)를 next_day로 진행하므로 한 경로가 한 틱에 1 ms 남짓 걸립니다.
+# 계산은 프로세스 풀에서 하고 메인 루프는 끝난 결과만 가져가므로 차트는 예측을 기다리지 않습니다.
+
+import collections
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import time
+import weakref
+from array import array
+from multiprocessing import shared_memory
+
+import persistence
+import philox
+import sharedstate
+
+PATHS = 32  # 예측 경로 수
+HORIZON = 96  # 예측 틱 수 (차트 캔들 96개, 게임 내 2일)
+BATCH_PATHS = 4  # 작업 하나가 맡는 경로 수 (작을수록 종료/취소가 빠름)
+REFRESH_TICKS = 48  # 같은 회사의 예측을 다시 계산하는 간격 (틱)
+PERCENTILES = (10, 25, 50, 75, 90)
+CACHE_SIZE = 16  # 남겨 두는 (회사, 틱) 예측 수
+
+
+def path_seeds(streams, tick, company_id, paths):
+    """예측 경로별 시드. 같은 시장 시드, 틱, 회사면 같은 시드가 나오므로 같은 상태의 예측은 다시 계산해도 같습니다."""
+    stream = streams.stream(philox.FORECAST, tick, company_id)
+    return [stream.next_word() | stream.next_word() << 32 for _ in range(paths)]
+
+
+def simulate_paths(restore_fn, data, company_id, horizon, seeds):
+    """
+    워커 프로세스에서 실행: persistence.dumps()로 만든 data에서 시드마다 시장을 복원해 시드를 바꾸고
+    horizon틱 진행하며 회사의 틱별 종가를 모읍니다. 파산하면 이후 가격은 0(보유 주식이 제거되므로)이고,
+    합병으로 빠지면 마지막 가격이 이어집니다.
+    """
+    paths = []
+    for seed in seeds:
+        market, investors = restore_fn(data)
+        market.seed = seed
+        market.rng.seed(seed)  # 회사들이 같은 Random 객체를 참조하므로 바꾸지 않고 다시 시드
+        market.streams = philox.Streams(seed)
+        company = market.company_by_id[company_id]
+        path = array("d")
+        for _ in range(horizon):
+            market.next_day(investors, 0)
+            path.append(0.0 if company.is_bankrupt else company.current_price)
+        paths.append(path)
+    return paths
+
+
+_worker_data = (None, None)  # 워커 프로세스: (공유 메모리 이름, 읽어 둔 상태 bytes)
+
+
+def simulate_shared(restore_fn, name, size, company_id, horizon, seeds):
+    """
+    워커 프로세스에서 실행: 예측마다 한 번 공유 메모리 name에 올린 상태(size바이트)로 simulate_paths.
+    상태를 작업마다 피클해 보내지 않고, 한 워커가 같은 예측의 작업을 여러 개 맡으면 처음 한 번만 읽습니다.
+    """
+    global _worker_data
+    if _worker_data[0] != name:
+        segment = sharedstate.attach_readonly(name)
+        try:
+            _worker_data = (name, bytes(segment.buf[:size]))
+        finally:
+            segment.close()
+    return simulate_paths(restore_fn, _worker_data[1], company_id, horizon, seeds)
+
+
+def percentile_bands(start_price, paths, percentiles=PERCENTILES):
+    """경로 목록을 틱별로 정렬해 백분위마다 [시작 가격, 1틱 뒤, ...] 배열 (최근접 순위)"""
+    bands = [array("d", [start_price]) for _ in percentiles]
+    n = len(paths)
+    ranks = [round(p / 100 * (n - 1)) for p in percentiles]
+    for values in zip(*paths):
+        values = sorted(values)
+        for band, rank in zip(bands, ranks):
+            band.append(values[rank])
+    return bands
+
+
+class Forecast:
+    """예측 결과 하나. bands는 PERCENTILES 순서의 배열이고 각 배열의 0번은 예측을 시작한 캔들의 종가입니다."""
+    __slots__ = ("company_id", "tick", "count", "paths", "bands", "elapsed")
+
+    def __init__(self, company_id, tick, count, paths, bands, elapsed):
+        self.company_id = company_id
+        self.tick = tick
+        self.count = count  # 예측을 시작할 때 회사의 캔들 수 (차트에서 띠를 놓을 위치)
+        self.paths = paths
+        self.bands = bands
+        self.elapsed = elapsed
+
+    @property
+    def median(self):
+        return self.bands[PERCENTILES.index(50)]
+
+
+class Forecaster:
+    """
+    (회사, 틱)별 예측 캐시와 비동기 계산.
+
+    latest(market, investors, company)는 화면을 그릴 때마다 부르며 그 회사의 가장 최근 예측(없으면 None)을
+    바로 돌려줍니다. 예측이 없거나 REFRESH_TICKS보다 오래됐고 계산 중인 예측이 없으면 지금 상태로 새 예측을
+    시작합니다 (상태 직렬화만 메인 스레드에서 하고 시뮬레이션은 워커 프로세스에서 함). 직렬화한 상태는
+    공유 메모리에 한 번 올려 작업들이 함께 읽습니다. 예측이 실패하면 그 회사는 refresh_ticks 동안 다시
+    시도하지 않습니다 (계속 실패할 때 프레임마다 직렬화하지 않도록).
+    재시작/불러오기/되감기로 시장이 바뀌면 캐시와 계산 중인 예측을 버립니다.
+    restore_fn(data)는 stock.restore_game처럼 persistence.dumps()의 bytes에서 (market, investors)를 복원하며
+    워커 프로세스로 넘어가므로 모듈 최상위 함수여야 합니다.
+    """
+
+    def __init__(self, restore_fn, paths=PATHS, horizon=HORIZON, workers=None, refresh_ticks=REFRESH_TICKS):
+        self.restore_fn = restore_fn
+        self.paths = paths
+        self.horizon = horizon
+        self.workers = workers or os.cpu_count() or 1
+        self.refresh_ticks = refresh_ticks
+        self.cache = collections.OrderedDict()  # (회사 id, 틱) -> Forecast (오래된 순)
+        self._executor = None
+        self._market = None  # 예측 중인 시장 (약한 참조, 바뀌면 캐시를 비움)
+        self._job = None  # 계산 중인 예측 (회사 id, 틱, 캔들 수, 시작 가격, futures, 시작 시각, 공유 메모리)
+        self._failed = {}  # 회사 id -> 마지막으로 예측이 실패한 틱
+
+        # 통계
+        self.computed = 0
+        self.last_time = 0.0
+
+    def latest(self, market, investors, company):
+        """company의 가장 최근 예측 (기다리지 않음)"""
+        if self._market is None or self._market() is not market:
+            self.clear()
+            self._market = weakref.ref(market)
+        self._poll()
+        found = None
+        for (cid, tick), result in reversed(self.cache.items()):
+            if cid == company.id:
+                found = result
+                break
+        failed = self._failed.get(company.id)
+        if (self._job is None and not company.is_bankrupt
+                and (found is None or market.day_count - found.tick >= self.refresh_ticks)
+                and (failed is None or market.day_count - failed >= self.refresh_ticks)):
+            self._submit(market, investors, company)
+        return found
+
+    def _submit(self, market, investors, company):
+        if self._executor is None:
+            # 메인 프로세스에 pygame/스레드가 있으므로 fork 대신 새 인터프리터로 워커 시작
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        data = persistence.dumps(market, investors)
+        segment = shared_memory.SharedMemory(create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        seeds = path_seeds(market.streams, market.day_count, company.id, self.paths)
+        futures = [self._executor.submit(simulate_shared, self.restore_fn, segment.name, len(data), company.id,
+                                         self.horizon, seeds[i:i + BATCH_PATHS])
+                   for i in range(0, len(seeds), BATCH_PATHS)]
+        self._job = (company.id, market.day_count, len(company.candles), company.current_price, futures,
+                     time.perf_counter(), segment)
+
+    def _poll(self):
+        """계산 중인 예측이 끝났으면 백분위를 구해 캐시에 넣음"""
+        if self._job is None:
+            return
+        company_id, tick, count, price, futures, started, segment = self._job
+        if not all(f.done() for f in futures):
+            return
+        self._job = None
+        _release(segment)
+        try:
+            paths = [path for f in futures for path in f.result()]
+        except Exception as e:
+            self._failed[company_id] = tick
+            logging.error(f"주가 예측 실패 ({self.refresh_ticks}틱 뒤 다시 시도): {e}")
+            return
+        self._failed.pop(company_id, None)
+        self.last_time = time.perf_counter() - started
+        self.computed += 1
+        self.cache[(company_id, tick)] = Forecast(company_id, tick, count, len(paths),
+                                                  percentile_bands(price, paths), self.last_time)
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    def clear(self):
+        """캐시를 비우고 계산 중인 예측을 버림"""
+        self.cache.clear()
+        self._failed.clear()
+        self._market = None
+        if self._job is not None:
+            for f in self._job[4]:
+                f.cancel()
+            _release(self._job[6])  # 이미 붙은 워커의 매핑은 닫을 때까지 유효
+            self._job = None
+
+    def close(self):
+        """남은 작업을 취소하고 워커 종료 (실행 중인 작업 하나만 끝까지 기다림)"""
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _release(segment):
+    segment.close()
+    segment.unlink()
@@ -0,0 +1,165 @@
+# history.py
+# 경제/국가 지표의 틱별 시계열 기록 (float32 링 버퍼 + 다단계 다운샘플링)
+
+from array import array
+
+TICKS_PER_DAY = 48  # next_day 48번 = 게임 내 1일
+
+# (해상도(틱), 보관 개수): 최근 30일은 틱 단위, 1년은 일 단위, 20년은 월 단위
+DEFAULT_LEVELS = (
+    (1, TICKS_PER_DAY * 30),
+    (TICKS_PER_DAY, 360),
+    (TICKS_PER_DAY * 30, 240),
+)
+
+
+class RingBuffer:
+    """고정 용량 float32 링 버퍼"""
+    __slots__ = ("data", "capacity", "head", "size")
+
+    def __init__(self, capacity):
+        self.data = array("f", bytes(4 * capacity))
+        self.capacity = capacity
+        self.head = 0  # 다음에 쓸 위치
+        self.size = 0
+
+    def append(self, value):
+        self.data[self.head] = value
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def last(self, n=None):
+        """가장 최근 n개를 오래된 순서로 반환 (n이 None이면 전체)"""
+        n = self.size if n is None else min(n, self.size)
+        if n <= 0:
+            return []
+        start = self.head - n
+        if start >= 0:
+            return self.data[start:self.head].tolist()
+        return self.data[start:].tolist() + self.data[:self.head].tolist()
+
+    def __getitem__(self, i):
+        """오래된 순서 기준 인덱스 (음수 가능)"""
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError(i)
+        return self.data[(self.head - self.size + i) % self.capacity]
+
+
+class _Level:
+    """한 해상도의 지표별 링 버퍼와 다운샘플링 누적값"""
+
+    def __init__(self, names, resolution, capacity):
+        self.resolution = resolution
+        self.buffers = {name: RingBuffer(capacity) for name in names}
+        self.sums = dict.fromkeys(names, 0.0)
+        self.pending = 0  # 현재 버킷에 누적된 틱 수
+        self.appended = 0  # 지금까지 기록한 버킷 수
+
+    def add(self, values):
+        if self.resolution == 1:
+            for name, v in values.items():
+                self.buffers[name].append(v)
+            self.appended += 1
+            return
+        sums = self.sums
+        for name, v in values.items():
+            sums[name] += v
+        self.pending += 1
+        if self.pending == self.resolution:
+            for name, total in sums.items():
+                self.buffers[name].append(total / self.resolution)
+                sums[name] = 0.0
+            self.pending = 0
+            self.appended += 1
+
+
+class IndicatorHistory:
+    """
+    지표별 시계열 기록.
+
+    매 틱 record()로 값을 넣으면 틱 단위 버퍼에 저장되고, 상위 해상도(일/월)에는 버킷 평균이
+    저장됩니다. 각 해상도는 고정 용량 링 버퍼이므로 오래 실행해도 메모리가 일정합니다.
+    """
+
+    def __init__(self, names, levels=DEFAULT_LEVELS):
+        self.names = list(names)
+        self.levels = [_Level(self.names, res, cap) for res, cap in levels]
+        self.first_tick = None
+        self.last_tick = None
+        self._spark_cache = {}
+
+    def record(self, tick, values):
+        """values: {지표 이름: 값} (모든 지표 포함)"""
+        if self.first_tick is None:
+            self.first_tick = tick
+        self.last_tick = tick
+        for level in self.levels:
+            level.add(values)
+        self._spark_cache.clear()
+
+    def __len__(self):
+        return self.levels[0].appended
+
+    def latest(self, name):
+        buf = self.levels[0].buffers[name]
+        return buf[-1] if len(buf) else None
+
+    def _level_start_tick(self, level):
+        """해당 해상도 버퍼의 가장 오래된 값이 시작하는 틱"""
+        return self.first_tick + (level.appended - len(level.buffers[self.names[0]])) * level.resolution
+
+    def range(self, name, start_tick, end_tick=None):
+        """
+        [start_tick, end_tick] 구간 값을 그 구간을 모두 보관하고 있는 가장 세밀한 해상도로 반환합니다.
+        반환값: (해상도(틱), 값 리스트)
+        """
+        if self.first_tick is None:
+            return 1, []
+        if end_tick is None:
+            end_tick = self.last_tick
+        start_tick = max(start_tick, self.first_tick)
+        for level in self.levels:
+            if level.appended == 0:
+                continue
+            level_start = self._level_start_tick(level)
+            if level_start <= start_tick or level is self.levels[-1]:
+                buf = level.buffers[name]
+                values = buf.last()
+                lo = max(0, (start_tick - level_start) // level.resolution)
+                hi = (end_tick - level_start) // level.resolution + 1
+                return level.resolution, values[lo:max(lo, hi)]
+        return 1, []
+
+    def sparkline(self, name, points=60, span_ticks=None):
+        """
+        스파크라인용 요약: 최근 span_ticks(없으면 보관 중인 전체 틱 버퍼) 구간을 points개 이하 평균값으로 축약합니다.
+        틱이 바뀌기 전까지는 캐시된 결과를 반환합니다.
+        """
+        key = (name, points, span_ticks)
+        cached = self._spark_cache.get(key)
+        if cached is not None:
+            return cached
+        if self.last_tick is None:
+            return []
+        if span_ticks is None:
+            values = self.levels[0].buffers[name].last()
+        else:
+            _, values = self.range(name, self.last_tick - span_ticks + 1)
+        n = len(values)
+        if n > points:
+            step = n / points
+            values = [sum(values[int(i * step):int((i + 1) * step)]) / (int((i + 1) * step) - int(i * step))
+                      for i in range(points)]
+        self._spark_cache[key] = values
+        return values
+
+    def memory_bytes(self):
+        return sum(buf.capacity * 4 for level in self.levels for buf in level.buffers.values())
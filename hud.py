@@ -0,0 +1,154 @@
+# hud.py
+# 게임 화면 성능 HUD(F3)에 쓰는 기록: 장면별 프레임 단계 시간, 초당 틱/프레임, 텍스트 렌더링 캐시, 캔들/메시지 메모리
+
+import sys
+import time
+from array import array
+
+# 프레임 단계 (메인 루프 순서대로)
+SIMULATION = 0  # 틱 진행과 유니버스 요약 수신
+EVENTS = 1      # 입력 이벤트 처리
+DRAWING = 2     # 장면 그리기와 화면 갱신
+PHASES = ("시뮬", "이벤트", "그리기")
+
+HISTORY = 120  # 스파크라인 길이 (프레임 기록은 최근 120프레임, 초당 기록은 최근 120초)
+SAMPLE_INTERVAL = 1.0  # 초당 프레임/틱과 메모리를 계산하는 간격 (초)
+
+
+class Ring:
+    """고정 크기 실수 링 버퍼. 값을 넣을 때 새 객체를 만들지 않음"""
+    __slots__ = ("data", "count", "_slot")
+
+    def __init__(self, size=HISTORY):
+        self.data = array("d", bytes(8 * size))
+        self.count = 0
+        self._slot = 0
+
+    def push(self, value):
+        self.data[self._slot] = value
+        self._slot = (self._slot + 1) % len(self.data)
+        self.count += 1
+
+    def values(self):
+        """기록된 값 목록 (오래된 순)"""
+        if self.count <= len(self.data):
+            return self.data[:self.count].tolist()
+        return self.data[self._slot:].tolist() + self.data[:self._slot].tolist()
+
+    @property
+    def last(self):
+        return self.data[self._slot - 1] if self.count else 0.0
+
+    def mean(self):
+        n = min(self.count, len(self.data))
+        return sum(self.data[:n]) / n if n else 0.0
+
+    def max(self):
+        n = min(self.count, len(self.data))
+        return max(self.data[:n]) if n else 0.0
+
+
+class FrameStats:
+    """
+    메인 루프 프레임마다 begin() -> lap(단계) ... -> end(scene, market)로 단계별 시간을 기록합니다.
+    단계 시간은 장면별 링 버퍼에, 프레임 전체 시간은 공용 링 버퍼에 넣고,
+    SAMPLE_INTERVAL마다 초당 프레임/틱과 캔들/메시지 메모리를 계산합니다.
+    """
+
+    def __init__(self):
+        self.frame = Ring()  # 프레임 처리 시간 (초, clock.tick 대기 제외)
+        self.scenes = {}  # 장면 -> 단계별 Ring
+        self.hud = Ring()  # HUD 그리기 시간 (초)
+        self.fps = Ring()
+        self.tick_rate = Ring()
+        self.candle_bytes = 0
+        self.candle_count = 0
+        self.message_bytes = 0
+        self.message_count = 0
+        self.samples = 0  # 초당 기록 횟수 (HUD 글자를 다시 만들 때 비교)
+        self._phases = [0.0] * len(PHASES)
+        self._start = self._last = time.perf_counter()
+        self._frames = 0
+        self._ticks = 0
+        self._sample_start = self._start
+
+    def begin(self):
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self._phases[phase] += now - self._last
+        self._last = now
+
+    def tick(self):
+        self._ticks += 1
+
+    def end(self, scene, market):
+        rings = self.scenes.get(scene)
+        if rings is None:
+            rings = self.scenes[scene] = [Ring() for _ in PHASES]
+        phases = self._phases
+        for phase in range(len(PHASES)):
+            rings[phase].push(phases[phase])
+            phases[phase] = 0.0
+        self.frame.push(self._last - self._start)
+        self._frames += 1
+
+        elapsed = self._last - self._sample_start
+        if elapsed >= SAMPLE_INTERVAL:
+            self.fps.push(self._frames / elapsed)
+            self.tick_rate.push(self._ticks / elapsed)
+            self._frames = self._ticks = 0
+            self._sample_start = self._last
+            self.sample_memory(market)
+            self.samples += 1
+
+    def sample_memory(self, market):
+        """캔들 배열 크기와 뉴스 기록 크기 (고정 크기 레코드 + 이름/자유 문장 문자열)"""
+        count = nbytes = 0
+        for companies in (market.companies, market.bankrupt_companies):
+            for c in companies:
+                count += len(c.candles)
+                nbytes += c.candles.nbytes()
+        self.candle_count, self.candle_bytes = count, nbytes
+
+        log = market.news
+        getsizeof = sys.getsizeof
+        self.message_count = len(log)
+        self.message_bytes = (len(log.data) + sum(getsizeof(name) for name in log.names)
+                              + sum(getsizeof(text) for text in log.texts))
+
+    def scene_means(self, scene):
+        """장면의 단계별 평균 시간 (초)"""
+        rings = self.scenes.get(scene)
+        return [ring.mean() for ring in rings] if rings else [0.0] * len(PHASES)
+
+
+class TextCache:
+    """
+    (폰트, 글자, 색) -> 렌더링된 Surface. 한 프레임에 수십 줄을 그리지만 대부분 프레임마다 같은 글자이므로
+    바뀐 글자만 다시 렌더링합니다. capacity를 넘으면 먼저 넣은 절반을 버립니다.
+    """
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+        if len(self.surfaces) >= self.capacity:
+            for old in list(self.surfaces)[:self.capacity // 2]:
+                del self.surfaces[old]
+        surface = self.surfaces[key] = font.render(text, True, color)
+        return surface
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,77 @@
+# journal.py
+# 플레이어 입력 저널 (JSON Lines, 덧붙이기 전용)
+
+import json
+import os
+
+# 입력 종류
+ACTION_TRADE = "trade"                    # 시장가 매수/매도
+ACTION_PLACE_ORDER = "place_order"        # 지정가/손절/익절 주문 등록
+ACTION_CANCEL_ORDER = "cancel_order"      # 대기 주문 취소
+ACTION_REMOVE_HOLDING = "remove_holding"  # 포트폴리오에서 종목 제거
+ACTION_END = "end"                        # 세션 종료 (상태 해시 기록, 재생 검증용)
+
+# 2: 주가/뉴스/상호작용/봇 난수를 카운터 기반 스트림(philox.py)으로 바꿈 (1의 저널은 같은 결과로 재생되지 않음)
+JOURNAL_VERSION = 2
+
+
+class Journal:
+    """
+    시뮬레이션의 비결정적 입력(플레이어 거래와 그 틱)을 순서대로 기록합니다.
+
+    첫 줄은 시작 조건(시드와 설정, 또는 시작 저장 파일), 이후 한 줄에 입력 하나입니다.
+    시장의 난수는 시드로 정해지므로 시작 조건과 이 입력만 있으면 세션 전체를 다시 만들 수 있습니다.
+    """
+
+    def __init__(self, start, path=None):
+        self.start = dict(start)
+        self.entries = []
+        self.path = path
+        self._file = None
+        if path is not None:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write_line(dict(self.start, version=JOURNAL_VERSION))
+
+    @classmethod
+    def load(cls, path):
+        """저장된 저널 읽기 (시작 저장 파일 경로는 저널 파일 기준으로 풀어 둠)"""
+        journal = cls.__new__(cls)
+        journal.path = path
+        journal._file = None
+        journal.entries = []
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if not lines:
+            raise ValueError(f"빈 저널 파일입니다: {path}")
+        start = json.loads(lines[0])
+        if start.pop("version", None) != JOURNAL_VERSION:
+            raise ValueError(f"지원하지 않는 저널 버전입니다: {path}")
+        if "save" in start and not os.path.isabs(start["save"]):
+            start["save"] = os.path.join(os.path.dirname(os.path.abspath(path)), start["save"])
+        journal.start = start
+        journal.entries = [json.loads(line) for line in lines[1:]]
+        return journal
+
+    def record(self, tick, action, **fields):
+        entry = {"tick": tick, "action": action}
+        entry.update(fields)
+        self.entries.append(entry)
+        if self._file is not None:
+            self._write_line(entry)
+        return entry
+
+    def _write_line(self, obj):
+        # 비정상 종료에도 남도록 한 줄씩 바로 flush
+        self._file.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def last_tick(self):
+        return self.entries[-1]["tick"] if self.entries else None
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,352 @@
+# ledger.py
+# 체결 원장: 모든 체결을 고정 크기 바이너리 레코드로 덧붙이기만 하고(메모리 맵, 파일이면 묶어서 디스크에 반영),
+# 투자자/종목별 색인과 선입선출(FIFO) 매수 묶음으로 실현/평가 손익을 바로 조회
+
+import argparse
+import atexit
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections import deque, namedtuple
+
+# 레코드 종류
+BUY = 0           # 매수
+SELL = 1          # 매도 (FIFO로 실현 손익 계산)
+WRITE_OFF = 2     # 상장 폐지/파산/포트폴리오 제거로 사라진 주식 (0원 매도로 처리)
+TRANSFER_OUT = 3  # 합병으로 넘겨준 주식 (가격 = 넘겨준 묶음의 평균 원가, 손익 없음)
+TRANSFER_IN = 4   # 합병으로 받은 주식 (가격 = 넘겨준 묶음의 원가를 이어받은 평균 원가)
+KIND_NAMES = ("buy", "sell", "write_off", "transfer_out", "transfer_in")
+
+# 파일 구조: [헤더 32바이트][레코드 32바이트 x N], 회사/투자자 이름표는 경로 + ".ids" (JSON)
+MAGIC = b"STKLEDG\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sH6xQ8x")  # 매직, 버전, 레코드 수
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = 16
+_RECORD = struct.Struct("<IIHBxqd4x")  # 틱, 회사 번호, 투자자 번호, 종류, 수량, 가격
+RECORD_SIZE = _RECORD.size
+
+INITIAL_CAPACITY = 4096  # 처음 확보할 레코드 수 (넘으면 두 배씩 늘림)
+FLUSH_EVERY = 1024  # 파일 원장은 레코드가 이만큼 쌓일 때마다 디스크에 반영
+
+Trade = namedtuple("Trade", "tick investor company name kind quantity price")
+
+
+class LedgerFormatError(ValueError):
+    """원장 파일이 손상되었거나 지원하지 않는 형식"""
+
+
+class Ledger:
+    """
+    체결 원장. path가 None이면 익명 메모리 맵(저장 파일에 함께 기록됨), 주면 그 파일에 새로 기록합니다.
+    record()는 레코드 하나를 맵에 쓰고 색인과 FIFO 묶음을 갱신할 뿐이므로 체결마다 호출해도 가볍습니다.
+    tick은 Market.next_day가 매 틱 갱신합니다.
+    """
+
+    def __init__(self, path=None, capacity=INITIAL_CAPACITY, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.tick = 0
+        self.count = 0
+        self.investors = []  # 투자자 번호 -> 이름
+        self.companies = []  # 회사 번호 -> [회사 id, 이름] (상장 폐지된 회사도 이름으로 조회)
+        self._investor_ids = {}
+        self._company_ids = {}
+        self.by_investor = []  # 투자자 번호 -> 레코드 번호 배열
+        self.by_company = []  # 회사 번호 -> 레코드 번호 배열
+        self.lots = {}  # (투자자 번호, 회사 번호) -> deque([수량, 단가], ...) 오래된 묶음부터
+        self.realized = {}  # (투자자 번호, 회사 번호) -> 실현 손익
+        self._carry = {}  # 투자자 번호 -> [수량, 원가] 합병으로 넘겨주고 아직 받지 않은 주식
+        self._unflushed = 0
+        self._ids_dirty = False
+        self._file = None
+        self.capacity = max(1, capacity)
+        size = _HEADER.size + self.capacity * RECORD_SIZE
+        if path is None:
+            self._map = mmap.mmap(-1, size)
+        else:
+            self._file = open(path, "w+b")
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+            atexit.register(self.close)  # 종료할 때 남은 레코드와 이름표를 반영
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0)
+
+    @classmethod
+    def open(cls, path):
+        """기록된 원장 파일을 읽어 메모리 원장으로 (사후 분석용, 원래 파일은 바꾸지 않음)"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise LedgerFormatError("원장 파일이 너무 짧습니다.")
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise LedgerFormatError("체결 원장 파일이 아닙니다.")
+        if version != VERSION:
+            raise LedgerFormatError(f"지원하지 않는 원장 버전입니다: {version}")
+        end = _HEADER.size + count * RECORD_SIZE
+        if end > len(data):
+            raise LedgerFormatError("원장 파일이 잘렸습니다.")
+        with open(path + ".ids", encoding="utf-8") as f:
+            ids = json.load(f)
+        led = cls(capacity=count)
+        led.load(data[_HEADER.size:end], ids)
+        return led
+
+    # 기록
+
+    def _investor_id(self, name):
+        iid = self._investor_ids.get(name)
+        if iid is None:
+            iid = self._investor_ids[name] = len(self.investors)
+            self.investors.append(name)
+            self.by_investor.append(array("I"))
+            self._ids_dirty = True
+        return iid
+
+    def _company_id(self, key, name):
+        cid = self._company_ids.get(key)
+        if cid is None:
+            cid = self._company_ids[key] = len(self.companies)
+            self.companies.append([key, name])
+            self.by_company.append(array("I"))
+            self._ids_dirty = True
+        return cid
+
+    def record(self, kind, investor, company, quantity, price=0.0):
+        """체결 하나를 기록. 합병 이전(TRANSFER_OUT/IN)의 가격은 FIFO 묶음에서 정하므로 넘긴 값은 대신 쓸 값"""
+        iid = self._investor_id(investor.name)
+        cid = self._company_id(company.id, company.name)
+        if kind == TRANSFER_OUT:
+            cost = self.cost_basis(iid, cid, quantity)
+            carry = self._carry.setdefault(iid, [0, 0.0])
+            carry[0] += quantity
+            carry[1] += cost
+            price = cost / quantity if quantity else 0.0
+        elif kind == TRANSFER_IN:
+            carry = self._carry.pop(iid, None)
+            # 넘겨준 수량과 받는 수량이 같을 때만 원가를 이어받음 (원장 없이 생긴 보유분 등은 평균 단가 사용)
+            if carry is not None and carry[0] == quantity and quantity:
+                price = carry[1] / quantity
+        self._append(self.tick, cid, iid, kind, int(quantity), float(price))
+
+    def _append(self, tick, cid, iid, kind, quantity, price):
+        n = self.count
+        if n >= self.capacity:
+            self._grow()
+        _RECORD.pack_into(self._map, _HEADER.size + n * RECORD_SIZE, tick, cid, iid, kind, quantity, price)
+        self.count = n + 1
+        _COUNT.pack_into(self._map, _COUNT_OFFSET, n + 1)
+        self.by_investor[iid].append(n)
+        self.by_company[cid].append(n)
+        self._apply(iid, cid, kind, quantity, price)
+        if self._file is not None:
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self.flush()
+
+    def _apply(self, iid, cid, kind, quantity, price):
+        """FIFO 묶음 갱신. 매도/제거는 오래된 묶음부터 소진하고 실현 손익을 더함"""
+        key = (iid, cid)
+        lots = self.lots.get(key)
+        if kind == BUY or kind == TRANSFER_IN:
+            if lots is None:
+                lots = self.lots[key] = deque()
+            lots.append([quantity, price])
+            return
+        if lots is None:
+            return  # 원장 밖에서 생긴 보유분 (원장이 없던 저장 파일)은 원가를 모르므로 손익 없음
+        remaining = quantity
+        pnl = 0.0
+        while remaining and lots:
+            lot = lots[0]
+            take = lot[0] if lot[0] < remaining else remaining
+            pnl += take * (price - lot[1])
+            lot[0] -= take
+            remaining -= take
+            if not lot[0]:
+                lots.popleft()
+        if not lots:
+            del self.lots[key]
+        if kind != TRANSFER_OUT:
+            self.realized[key] = self.realized.get(key, 0.0) + pnl
+
+    def _grow(self):
+        used = _HEADER.size + self.count * RECORD_SIZE
+        self.capacity *= 2
+        size = _HEADER.size + self.capacity * RECORD_SIZE
+        old = self._map
+        if self._file is None:
+            self._map = mmap.mmap(-1, size)
+            self._map[:used] = old[:used]
+            old.close()
+        else:
+            old.flush()
+            old.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+
+    def flush(self):
+        """파일 원장을 디스크에 반영 (이름표는 바뀌었을 때만 다시 씀)"""
+        if self._file is None:
+            return
+        self._map.flush()
+        self._unflushed = 0
+        if self._ids_dirty:
+            tmp_path = self.path + ".ids.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.ids(), f, ensure_ascii=False)
+            os.replace(tmp_path, self.path + ".ids")
+            self._ids_dirty = False
+
+    def close(self):
+        if self._map.closed:
+            return
+        if self._file is not None:
+            self.flush()
+            self._map.close()
+            self._file.truncate(_HEADER.size + self.count * RECORD_SIZE)  # 늘려 둔 빈 공간은 잘라냄
+            self._file.close()
+            self._file = None
+        else:
+            self._map.close()
+
+    # 저장/불러오기
+
+    def ids(self):
+        return {"investors": list(self.investors), "companies": [list(c) for c in self.companies]}
+
+    def records(self, start=0, stop=None):
+        """start~stop번 레코드 bytes (기본: 지금까지 전부, 저장 파일에 넣을 사본)"""
+        stop = self.count if stop is None else min(stop, self.count)
+        return self._map[_HEADER.size + start * RECORD_SIZE:_HEADER.size + stop * RECORD_SIZE]
+
+    def load(self, data, ids):
+        """records()/ids()로 저장한 내용을 이어서 기록 (색인과 FIFO 묶음은 레코드를 다시 적용해 복원)"""
+        for name in ids["investors"]:
+            self._investor_id(name)
+        for key, name in ids["companies"]:
+            self._company_id(key, name)
+        append = self._append
+        for tick, cid, iid, kind, quantity, price in _RECORD.iter_unpack(data):
+            append(tick, cid, iid, kind, quantity, price)
+
+    # 조회
+
+    def _lookup(self, investor=None, company=None):
+        iid = cid = None
+        if investor is not None:
+            iid = self._investor_ids.get(getattr(investor, "name", investor), -1)
+        if company is not None:
+            cid = self._company_ids.get(getattr(company, "id", company), -1)
+        return iid, cid
+
+    def trade(self, n):
+        tick, cid, iid, kind, quantity, price = _RECORD.unpack_from(self._map, _HEADER.size + n * RECORD_SIZE)
+        key, name = self.companies[cid]
+        return Trade(tick, self.investors[iid], key, name, KIND_NAMES[kind], quantity, price)
+
+    def trades(self, investor=None, company=None, limit=None):
+        """투자자 또는 종목(둘 다 주면 둘 다 맞는) 체결 목록, 오래된 순. limit이면 최근 limit개"""
+        iid, cid = self._lookup(investor, company)
+        if iid == -1 or cid == -1:
+            return []
+        if iid is None and cid is None:
+            index = range(self.count)
+        elif cid is None:
+            index = self.by_investor[iid]
+        elif iid is None:
+            index = self.by_company[cid]
+        else:
+            # 짧은 쪽 색인을 훑으며 나머지 조건 확인
+            a, b = self.by_investor[iid], self.by_company[cid]
+            short, other = (a, cid) if len(a) <= len(b) else (b, iid)
+            field = 1 if short is a else 2
+            index = [n for n in short
+                     if _RECORD.unpack_from(self._map, _HEADER.size + n * RECORD_SIZE)[field] == other]
+        if limit is not None:
+            index = index[max(0, len(index) - limit):]
+        return [self.trade(n) for n in index]
+
+    def cost_basis(self, iid, cid, quantity=None):
+        """FIFO 묶음의 원가 합 (quantity면 오래된 묶음부터 그 수량까지)"""
+        lots = self.lots.get((iid, cid))
+        if not lots:
+            return 0.0
+        total = 0.0
+        remaining = quantity
+        for qty, price in lots:
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                qty = min(qty, remaining)
+                remaining -= qty
+            total += qty * price
+        return total
+
+    def realized_pnl(self, investor, company=None):
+        """실현 손익 (종목을 주면 그 종목만)"""
+        iid, cid = self._lookup(investor, company)
+        if iid is None or iid == -1 or cid == -1:
+            return 0.0
+        if cid is not None:
+            return self.realized.get((iid, cid), 0.0)
+        return sum(pnl for (i, _), pnl in self.realized.items() if i == iid)
+
+    def unrealized_pnl(self, investor, prices):
+        """평가 손익 = 남은 FIFO 묶음의 (현재가 - 단가) 합. prices: {회사 id: 현재가} (없는 회사는 0원)"""
+        iid, _ = self._lookup(investor)
+        if iid is None or iid == -1:
+            return 0.0
+        total = 0.0
+        for (i, cid), lots in self.lots.items():
+            if i != iid:
+                continue
+            price = prices.get(self.companies[cid][0], 0.0)
+            for qty, cost in lots:
+                total += qty * (price - cost)
+        return total
+
+    def positions(self, investor):
+        """[(회사 id, 이름, 남은 수량, 원가, 실현 손익)] 원장에 기록된 종목 전체"""
+        iid, _ = self._lookup(investor)
+        if iid is None or iid == -1:
+            return []
+        result = []
+        for cid, (key, name) in enumerate(self.companies):
+            lots = self.lots.get((iid, cid))
+            realized = self.realized.get((iid, cid))
+            if lots is None and realized is None:
+                continue
+            qty = sum(q for q, _ in lots) if lots else 0
+            result.append((key, name, qty, self.cost_basis(iid, cid), realized or 0.0))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="체결 원장 사후 분석")
+    parser.add_argument("path", help="--ledger로 기록한 원장 파일")
+    parser.add_argument("--investor", help="이 투자자의 체결과 종목별 손익")
+    parser.add_argument("--company", help="이 회사 id의 체결")
+    parser.add_argument("--limit", type=int, default=20, help="보여 줄 최근 체결 수")
+    args = parser.parse_args()
+
+    led = Ledger.open(args.path)
+    print(f"체결 {led.count}건, 투자자 {len(led.investors)}명, 종목 {len(led.companies)}개")
+    if args.investor is None and args.company is None:
+        ranked = sorted(led.investors, key=led.realized_pnl, reverse=True)
+        for name in ranked[:args.limit]:
+            print(f"  {name:<12} 체결 {len(led.by_investor[led._investor_ids[name]]):>6}건"
+                  f"  실현 손익 {led.realized_pnl(name):>16,.0f}원")
+        return
+    if args.investor is not None and args.company is None:
+        positions = sorted(led.positions(args.investor), key=lambda p: (p[2] == 0, -abs(p[4])))
+        for key, name, qty, cost, realized in positions[:args.limit]:
+            print(f"  {name:<10} 보유 {qty:>8,}주  원가 {cost:>16,.0f}원  실현 손익 {realized:>14,.0f}원")
+    for t in led.trades(args.investor, args.company, args.limit):
+        print(f"  틱 {t.tick:>6}  {t.investor:<12} {t.name:<10} {t.kind:<12} {t.quantity:>8,}주 @ {t.price:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# logpipe.py
+# 큐 기반 비동기 로깅: 호출한 스레드는 레코드만 큐에 넣고, 메시지 포맷과 파일 쓰기/회전/압축은 전용 스레드에서 처리
+
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+
+LOG_PATH = "simulation.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+MAX_BYTES = 10 * 1024 * 1024  # 이 크기를 넘으면 회전
+BACKUP_COUNT = 5  # 보관할 압축 파일 수 (simulation.log.1.gz ~ .5.gz)
+
+# 분류 (로거 이름). 분류별 수준과 샘플링은 "trade.bot=warning"처럼 stock. 뒤 이름으로 지정
+PLAYER_TRADES = "stock.trade.player"
+BOT_TRADES = "stock.trade.bot"
+OFF = logging.CRITICAL + 1  # 분류를 끌 때의 수준
+
+_pipeline = None
+_STOP = object()  # 기록 스레드 종료 표시
+
+
+def category(name):
+    return name if name == "stock" or name.startswith("stock.") else "stock." + name
+
+
+def parse_levels(spec):
+    """"trade.bot=off,trade.player=info" -> {로거 이름: 수준}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, value = item.partition("=")
+        value = value.strip().upper()
+        if value == "OFF":
+            levels[category(name.strip())] = OFF
+        elif isinstance(logging.getLevelName(value), int):
+            levels[category(name.strip())] = logging.getLevelName(value)
+        else:
+            raise ValueError(f"알 수 없는 로그 수준: {item}")
+    return levels
+
+
+def parse_samples(spec):
+    """"trade.bot=100" -> {로거 이름: 100} (100개 중 1개만 기록)"""
+    samples = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, value = item.partition("=")
+        samples[category(name.strip())] = max(1, int(value))
+    return samples
+
+
+class SampledLogger(logging.Logger):
+    """
+    sample_every개 중 첫 번째만 기록하는 분류 로거. 수준 검사 단계에서 걸러내므로 버려지는 호출은
+    레코드를 만들지 않습니다 (시뮬레이션 난수를 건드리지 않도록 카운터로 셈).
+    """
+    sample_every = 1
+    _seen = 0
+
+    def isEnabledFor(self, level):
+        if not super().isEnabledFor(level):
+            return False
+        if self.sample_every == 1:
+            return True
+        self._seen += 1
+        return (self._seen - 1) % self.sample_every == 0
+
+
+def get_logger(name):
+    """분류 로거 (샘플링을 지원하는 SampledLogger)"""
+    manager = logging.Logger.manager
+    previous = manager.loggerClass
+    manager.setLoggerClass(SampledLogger)
+    try:
+        return logging.getLogger(name)
+    finally:
+        manager.loggerClass = previous
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler는 큐에 넣기 전에 호출한 스레드에서 메시지를 포맷하지만, 여기서는 레코드를 그대로 넣어
+    "%s" 인자 포맷까지 기록 스레드로 미룹니다. 그래서 인자로는 바뀌지 않는 값(문자열/숫자)만 넘겨야 합니다.
+    예외 정보만 트레이스백이 사라지기 전에 문자열로 만들어 둡니다.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_rotate(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class RotatingGzipHandler(logging.handlers.RotatingFileHandler):
+    """크기(max_bytes)나 시간(interval초)이 넘으면 회전하고, 지난 파일은 gzip으로 압축 (기록 스레드에서 실행)"""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, interval=None):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.interval = interval
+        self.opened_at = time.time()
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotate
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() - self.opened_at >= self.interval:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+    def flush(self):
+        """레코드마다 비우지 않음. 기록 스레드가 큐를 다 비운 뒤 flush_batch()로 한 번에 비움"""
+
+    def flush_batch(self):
+        logging.StreamHandler.flush(self)
+
+
+class LogPipeline:
+    """
+    루트 로거에 큐 핸들러를 달고, 큐를 비우는 기록 스레드를 돌림.
+    기록 스레드는 큐에 쌓인 레코드를 한꺼번에 쓰고 파일을 한 번만 비우므로 레코드마다 시스템 호출을 하지 않습니다.
+    """
+
+    def __init__(self, path=LOG_PATH, level=logging.INFO, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                 interval=None, levels=None, samples=None):
+        self.queue = queue.SimpleQueue()
+        self.file_handler = RotatingGzipHandler(path, max_bytes, backup_count, interval)
+        self.file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.handler = _DeferredQueueHandler(self.queue)
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+
+        # 형식에 쓰지 않는 호출 위치/스레드/프로세스 정보는 레코드마다 모으지 않음 (logging HOWTO의 최적화 항목)
+        logging._srcfile = None
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(self.handler)
+        for name, value in (levels or {}).items():
+            logging.getLogger(name).setLevel(value)
+        self.sampled = []
+        for name, every in (samples or {}).items():
+            logger = get_logger(name)
+            if not isinstance(logger, SampledLogger):
+                raise ValueError(f"샘플링할 수 없는 분류: {name}")
+            logger.sample_every = every
+            self.sampled.append(logger)
+        self.thread.start()
+
+    def _run(self):
+        q = self.queue
+        handler = self.file_handler
+        while True:
+            record = q.get()
+            while record is not _STOP:
+                handler.handle(record)
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+            handler.flush_batch()
+            if record is _STOP:
+                return
+
+    def close(self):
+        """큐에 남은 레코드를 모두 쓰고 기록 스레드를 멈춤"""
+        logging.getLogger().removeHandler(self.handler)
+        for logger in self.sampled:
+            logger.sample_every = 1
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.file_handler.close()
+
+
+def configure(path=LOG_PATH, level=logging.INFO, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+              interval=None, levels=None, samples=None):
+    """로깅 파이프라인을 한 번만 설정하고 반환 (이미 설정되어 있으면 그대로 반환). 종료할 때 자동으로 닫힘"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LogPipeline(path, level, max_bytes, backup_count, interval, levels, samples)
+        atexit.register(shutdown)
+    return _pipeline
+
+
+def shutdown():
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.close()
+        _pipeline = None
@@ -0,0 +1,326 @@
+# metrics.py
+# 장시간/헤드리스 세션용 지표: 카운터/게이지/히스토그램을 주기적으로 Prometheus 텍스트와 CSV로 기록하고,
+# 원하면 localhost HTTP(/metrics)로도 제공
+
+import bisect
+import csv
+import gc
+import http.server
+import logging
+import os
+import threading
+import time
+from array import array
+
+TICK_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)  # 초
+TRADE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)  # 틱당 체결 수
+MESSAGE_BUCKETS = (0, 1, 2, 3, 5, 10, 20)  # 틱당 메시지 수
+GC_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)  # 초
+MERGE_TYPES = ("merge", "acquisition")
+
+EXPORT_INTERVAL = 10.0  # 파일 기록 간격 (초)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Counter:
+    """증가만 하는 값. inc()는 숫자 필드 하나만 바꿈"""
+    kind = "counter"
+    __slots__ = ("name", "help", "labels", "value")
+
+    def __init__(self, name, help, labels=""):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    """현재 값"""
+    kind = "gauge"
+    __slots__ = ("name", "help", "labels", "value")
+
+    def __init__(self, name, help, labels=""):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    """
+    구간별 누적 개수. 구간 경계는 만들 때 정하고 개수는 미리 만든 배열에 더하므로
+    observe()는 새 컨테이너나 문자열을 만들지 않습니다.
+    """
+    kind = "histogram"
+    __slots__ = ("name", "help", "labels", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name, help, buckets, labels=""):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = array("q", bytes(8 * (len(self.buckets) + 1)))  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        inner = self.labels[1:-1] + "," if self.labels else ""
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            yield self.name + "_bucket", "{" + inner + f'le="{bound}"' + "}", cumulative
+        yield self.name + "_bucket", "{" + inner + 'le="+Inf"}', cumulative + self.counts[-1]
+        yield self.name + "_sum", self.labels, self.sum
+        yield self.name + "_count", self.labels, self.count
+
+
+class Registry:
+    """지표 목록. collectors는 내보내기 직전에 호출되어 RSS처럼 그때 재는 값을 갱신합니다."""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=None):
+        return self._add(Counter(name, help, _label_text(labels)))
+
+    def gauge(self, name, help, labels=None):
+        return self._add(Gauge(name, help, _label_text(labels)))
+
+    def histogram(self, name, help, buckets, labels=None):
+        return self._add(Histogram(name, help, buckets, _label_text(labels)))
+
+    def collect(self):
+        for fn in self.collectors:
+            fn()
+
+    def samples(self):
+        """(이름, 라벨 문자열, 값) 전체"""
+        for metric in list(self.metrics):
+            yield from metric.samples()
+
+    def prometheus(self):
+        """Prometheus 텍스트 형식 (같은 이름의 라벨별 지표는 HELP/TYPE을 한 번만 씀)"""
+        families = {}
+        for metric in list(self.metrics):
+            families.setdefault(metric.name, []).append(metric)
+        lines = []
+        for name, members in families.items():
+            lines.append(f"# HELP {name} {members[0].help}")
+            lines.append(f"# TYPE {name} {members[0].kind}")
+            for metric in members:
+                for sample, labels, value in metric.samples():
+                    lines.append(f"{sample}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory():
+    """현재 프로세스 RSS (바이트). /proc가 없으면 최대 RSS, 둘 다 없으면 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+
+class MarketMetrics:
+    """
+    시뮬레이션 지표. Market.metrics에 연결하면 next_day가 처음과 끝에 begin()/end()를 부르고,
+    연결하지 않으면(None) None 검사만 합니다. 만들 때 GC 콜백을 등록하므로 다 쓰면 close()를 부릅니다.
+    """
+
+    def __init__(self, registry=None):
+        r = self.registry = registry if registry is not None else Registry()
+        self.ticks = r.counter("stock_ticks_total", "진행한 틱 수")
+        self.tick_seconds = r.histogram("stock_tick_seconds", "Market.next_day 처리 시간 (초)", TICK_BUCKETS)
+        self.companies = r.gauge("stock_companies", "상장 중인 회사 수")
+        self.bankruptcies = r.counter("stock_bankruptcies_total", "파산한 회사 수")
+        self.merges = r.counter("stock_merges_total", "합병/인수 수")
+        self.trades = r.counter("stock_trades_total", "체결된 매수/매도 수 (플레이어와 봇)")
+        self.trades_per_tick = r.histogram("stock_trades_per_tick", "틱당 체결 수", TRADE_BUCKETS)
+        self.messages_per_tick = r.histogram("stock_messages_per_tick", "틱당 뉴스/이벤트 메시지 수", MESSAGE_BUCKETS)
+        self.messages = {}  # 메시지 종류 -> Counter (처음 나온 종류만 새로 만듦)
+        self.rss = r.gauge("process_resident_memory_bytes", "프로세스 RSS (바이트)")
+        self.gc_pause = r.histogram("python_gc_pause_seconds", "GC 한 번의 정지 시간 (초)", GC_BUCKETS)
+        r.collectors.append(self.collect)
+
+        self._start = 0.0
+        self._messages = 0
+        self._trades = 0
+        self._gc_start = 0.0
+        gc.callbacks.append(self._on_gc)
+
+    def begin(self, market):
+        self._messages = len(market.news)
+        self._start = time.perf_counter()
+
+    def end(self, market, investors):
+        self.tick_seconds.observe(time.perf_counter() - self._start)
+        self.ticks.inc()
+        self.companies.set(len(market.companies))
+
+        log = market.news
+        n = len(log) - self._messages
+        self.messages_per_tick.observe(n)
+        for i in range(self._messages, len(log)):
+            kind = log.kind_name(i)
+            counter = self.messages.get(kind)
+            if counter is None:
+                counter = self.messages[kind] = self.registry.counter(
+                    "stock_messages_total", "종류별 뉴스/이벤트 메시지 수", {"type": kind})
+            counter.inc()
+            if kind == "bankrupt":
+                self.bankruptcies.inc()
+            elif kind in MERGE_TYPES:
+                self.merges.inc()
+
+        trades = 0
+        for investor in investors:
+            trades += investor.trades
+        # 불러오기/재시작으로 투자자가 바뀌어 누적 체결 수가 줄었으면 새 투자자 기준으로 다시 셈
+        delta = trades - self._trades if trades >= self._trades else trades
+        self._trades = trades
+        self.trades.inc(delta)
+        self.trades_per_tick.observe(delta)
+
+    def collect(self):
+        rss = resident_memory()
+        if rss is not None:
+            self.rss.set(rss)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            self.gc_pause.observe(time.perf_counter() - self._gc_start)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+
+class MetricsExporter:
+    """
+    interval초마다 전용 스레드에서 path.prom(Prometheus 텍스트, 매번 통째로 교체)과
+    path.csv(시각, 이름, 라벨, 값 행을 이어 씀)를 기록합니다. path가 None이면 파일은 쓰지 않습니다.
+    port를 주면 127.0.0.1:port/metrics로 같은 텍스트를 제공합니다.
+    """
+
+    def __init__(self, registry, path=None, interval=EXPORT_INTERVAL, port=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.writes = 0
+        self.failures = 0
+        self.server = None
+        self._lock = threading.Lock()  # 주기 기록과 HTTP 요청이 collect()를 동시에 부르지 않도록
+        self._stop = threading.Event()
+        self._thread = None
+        if path is not None:
+            self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+            self._thread.start()
+        if port is not None:
+            self._serve(port)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        """지금 값을 파일에 기록"""
+        if self.path is None:
+            return
+        with self._lock:
+            self.registry.collect()
+            text = self.registry.prometheus()
+            samples = list(self.registry.samples())
+        now = time.time()
+        try:
+            tmp_path = self.path + ".prom.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.path + ".prom")
+            csv_path = self.path + ".csv"
+            new_file = not os.path.exists(csv_path)
+            with open(csv_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["time", "name", "labels", "value"])
+                writer.writerows([f"{now:.3f}", name, labels, value] for name, labels, value in samples)
+            self.writes += 1
+        except OSError as e:
+            self.failures += 1
+            logging.warning(f"지표 기록 실패: {e}")
+
+    def _serve(self, port):
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                with exporter._lock:
+                    exporter.registry.collect()
+                    body = exporter.registry.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def close(self):
+        """기록 스레드와 HTTP 서버를 멈추고 마지막 값을 기록"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
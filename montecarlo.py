@@ -0,0 +1,265 @@
+# montecarlo.py
+# 시드를 바꿔 가며 헤드리스 게임을 여러 번 돌려 봇 전략과 목표(90일 내 1억) 달성 가능성을 평가
+#
+# 게임마다 시드가 다르고 게임끼리 공유하는 상태가 없으므로 프로세스 풀에서 코어 수만큼 동시에 돌립니다.
+# 결과는 끝나는 대로 집계 표에 반영하고, 모든 전략의 신뢰구간이 충분히 좁아지면 남은 게임을 취소합니다.
+
+import argparse
+import concurrent.futures
+import csv
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import stock
+
+STRATEGIES = ("random", "growth", "sector", "value", "momentum")
+Z95 = 1.96  # 95% 신뢰구간
+
+
+def max_drawdown(curve):
+    """자산 곡선의 최대 낙폭 (고점 대비 하락 비율, 0~1)"""
+    peak = 0.0
+    worst = 0.0
+    for value in curve:
+        if value > peak:
+            peak = value
+        elif peak > 0:
+            worst = max(worst, (peak - value) / peak)
+    return worst
+
+
+def realized_volatility(market):
+    """회사별 틱 수익률 표준편차의 평균 (상장 중인 회사와 상장 폐지 전 파산 회사)"""
+    values = []
+    for c in list(market.companies) + list(market.bankrupt_companies):
+        closes = c.candles.close
+        returns = [closes[i] / closes[i - 1] - 1 for i in range(1, len(closes)) if closes[i - 1]]
+        if len(returns) > 1:
+            mean = sum(returns) / len(returns)
+            values.append(math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)))
+    return sum(values) / len(values) if values else 0.0
+
+
+def run_game(seed, days=stock.GOAL_DAYS, stake=None, configure=None):
+    """
+    시드 하나로 헤드리스 게임을 days일 진행하고 전략별 결과를 반환합니다 (워커 프로세스에서 실행).
+    stake를 주면 모든 봇이 그 금액으로 시작하므로 목표 금액(GOAL_AMOUNT)을 플레이어와 같은 조건으로 비교할 수 있습니다.
+    목표 달성은 게임과 같이 현금이 GOAL_AMOUNT 이상이 된 첫 틱으로 판정합니다.
+    configure(market)가 있으면 첫 틱 전에 호출합니다 (파라미터 스윕에서 시장 설정 변경용).
+    """
+    market, investors = stock.new_game(seed, use_order_book=stock.USE_ORDER_BOOK)
+    if configure is not None:
+        configure(market)
+    bots = [inv for inv in investors if isinstance(inv, stock.Bot)]
+    if stake is not None:
+        for bot in bots:
+            bot.cash = stake
+    start = {bot.name: bot.get_portfolio_value() for bot in bots}
+    goal_tick = {}
+    bankruptcies = 0
+    for _ in range(days * 48):
+        market.next_day(investors, 0)
+        bankruptcies += sum(1 for c in market.bankrupt_companies if c.bankrupt_day == market.day_count)
+        for bot in bots:
+            if bot.name not in goal_tick and bot.cash >= stock.GOAL_AMOUNT:
+                goal_tick[bot.name] = market.day_count
+
+    strategies = {}
+    for bot in bots:
+        final = bot.get_portfolio_value()
+        strategies[bot.strategy] = {
+            "start": start[bot.name],
+            "final": final,
+            "return": final / start[bot.name] - 1 if start[bot.name] else 0.0,
+            "drawdown": max_drawdown(bot.equity_curve),
+            "goal_day": goal_tick[bot.name] / 48 if bot.name in goal_tick else None,
+        }
+    return {"seed": seed, "days": days, "bankruptcies": bankruptcies, "companies": len(market.companies),
+            "volatility": realized_volatility(market), "strategies": strategies}
+
+
+class Stat:
+    """평균/표준편차를 한 번에 누적 (Welford)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def half_width(self):
+        """평균의 95% 신뢰구간 반폭 (표본이 2개 미만이면 무한대)"""
+        return Z95 * self.std / math.sqrt(self.n) if self.n > 1 else math.inf
+
+
+class Proportion:
+    """비율과 Wilson 95% 신뢰구간 (비율이 0이나 1에 가까워도 폭이 0이 되지 않음)"""
+
+    def __init__(self):
+        self.n = 0
+        self.hits = 0
+
+    def add(self, hit):
+        self.n += 1
+        self.hits += bool(hit)
+
+    @property
+    def rate(self):
+        return self.hits / self.n if self.n else 0.0
+
+    def interval(self):
+        if not self.n:
+            return 0.0, 1.0
+        p, n, z2 = self.rate, self.n, Z95 * Z95
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        spread = Z95 * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return max(0.0, center - spread), min(1.0, center + spread)
+
+    def half_width(self):
+        low, high = self.interval()
+        return (high - low) / 2
+
+
+class Aggregate:
+    """게임 결과 누적: 전략별 수익률/최종 자산/최대 낙폭/목표 달성률, 게임당 파산 수"""
+
+    def __init__(self):
+        self.games = 0
+        self.bankruptcies = Stat()
+        self.returns = {s: Stat() for s in STRATEGIES}
+        self.finals = {s: Stat() for s in STRATEGIES}
+        self.drawdowns = {s: Stat() for s in STRATEGIES}
+        self.goals = {s: Proportion() for s in STRATEGIES}
+
+    def add(self, result):
+        self.games += 1
+        self.bankruptcies.add(result["bankruptcies"])
+        for strategy, r in result["strategies"].items():
+            if strategy not in self.returns:
+                continue
+            self.returns[strategy].add(r["return"])
+            self.finals[strategy].add(r["final"])
+            self.drawdowns[strategy].add(r["drawdown"])
+            self.goals[strategy].add(r["goal_day"] is not None)
+
+    def converged(self, return_tolerance, goal_tolerance):
+        """모든 전략의 평균 수익률과 목표 달성률 신뢰구간 반폭이 허용치 이하인지"""
+        return all(self.returns[s].half_width() <= return_tolerance and self.goals[s].half_width() <= goal_tolerance
+                   for s in STRATEGIES if self.returns[s].n)
+
+    def table(self):
+        lines = [f"{'strategy':<10} {'games':>6} {'return':>16} {'final (mean)':>14} {'max DD':>8} {'goal hit':>18}"]
+        for s in STRATEGIES:
+            ret, goal = self.returns[s], self.goals[s]
+            if not ret.n:
+                continue
+            low, high = goal.interval()
+            lines.append(f"{s:<10} {ret.n:>6} {ret.mean * 100:>+8.2f}% ±{ret.half_width() * 100:5.2f} "
+                         f"{self.finals[s].mean:>14,.0f} {self.drawdowns[s].mean * 100:>7.2f}% "
+                         f"{goal.rate * 100:>6.1f}% [{low * 100:4.1f}-{high * 100:4.1f}]")
+        lines.append(f"bankruptcies per game: {self.bankruptcies.mean:.2f} ±{self.bankruptcies.half_width():.2f}")
+        return "\n".join(lines)
+
+
+def run(games, days=stock.GOAL_DAYS, workers=None, seed=0, stake=None, return_tolerance=0.005,
+        goal_tolerance=0.02, min_games=30, on_result=None):
+    """
+    seed, seed+1, ... 시드로 최대 games개 게임을 돌리고 Aggregate를 반환합니다.
+    workers=0이면 같은 프로세스에서 차례로 실행합니다. 최소 min_games개 이후 신뢰구간이 수렴하면 일찍 멈춥니다.
+    on_result(result, aggregate)는 게임이 끝날 때마다 호출됩니다 (완료 순서, 시드 순서 아님).
+    """
+    aggregate = Aggregate()
+
+    def collect(result):
+        aggregate.add(result)
+        if on_result is not None:
+            on_result(result, aggregate)
+        return aggregate.games >= min_games and aggregate.converged(return_tolerance, goal_tolerance)
+
+    if workers == 0:
+        for i in range(games):
+            if collect(run_game(seed + i, days, stake)):
+                break
+        return aggregate
+
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        next_game = 0
+        pending = set()
+        stop = False
+        while not stop and (pending or next_game < games):
+            # 일찍 멈출 수 있도록 한 번에 워커 수의 두 배까지만 제출
+            while next_game < games and len(pending) < workers * 2:
+                pending.add(pool.submit(run_game, seed + next_game, days, stake))
+                next_game += 1
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if collect(future.result()):
+                    stop = True
+        for future in pending:
+            future.cancel()
+    return aggregate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="봇 전략/목표 달성 가능성 몬테카를로 평가")
+    parser.add_argument("--games", type=int, default=1000, help="최대 게임 수")
+    parser.add_argument("--days", type=int, default=stock.GOAL_DAYS, help="게임당 진행 일수")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수, 0: 같은 프로세스)")
+    parser.add_argument("--seed", type=int, default=0, help="첫 게임 시드 (게임마다 1씩 증가)")
+    parser.add_argument("--stake", type=float, default=None,
+                        help="모든 봇의 시작 자금 (예: 25000000이면 플레이어와 같은 조건으로 목표 달성률 비교)")
+    parser.add_argument("--tolerance", type=float, default=0.005, help="평균 수익률 신뢰구간 반폭 허용치 (0.005 = 0.5%%p)")
+    parser.add_argument("--goal-tolerance", type=float, default=0.02, help="목표 달성률 신뢰구간 반폭 허용치")
+    parser.add_argument("--min-games", type=int, default=30, help="일찍 멈추기 전 최소 게임 수")
+    parser.add_argument("--report", type=float, default=5.0, help="집계 표 출력 간격 (초)")
+    parser.add_argument("--csv", metavar="PATH", help="게임/전략별 결과를 CSV로 기록")
+    args = parser.parse_args(argv)
+
+    out = writer = None
+    if args.csv:
+        out = open(args.csv, "w", newline="", encoding="utf-8")
+        writer = csv.writer(out)
+        writer.writerow(["seed", "days", "bankruptcies", "strategy", "start", "final", "return", "drawdown", "goal_day"])
+    started = time.perf_counter()
+    last_report = [started]
+
+    def on_result(result, aggregate):
+        if writer is not None:
+            for strategy, r in sorted(result["strategies"].items()):
+                writer.writerow([result["seed"], result["days"], result["bankruptcies"], strategy, r["start"],
+                                 r["final"], r["return"], r["drawdown"], r["goal_day"]])
+        now = time.perf_counter()
+        if now - last_report[0] >= args.report:
+            last_report[0] = now
+            print(f"--- {aggregate.games} games, {now - started:.0f} s ---")
+            print(aggregate.table(), flush=True)
+
+    try:
+        aggregate = run(args.games, args.days, args.workers, args.seed, args.stake, args.tolerance,
+                        args.goal_tolerance, args.min_games, on_result)
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - started
+    stopped = " (converged early)" if aggregate.games < args.games else ""
+    print(f"=== {aggregate.games} games x {args.days} days in {elapsed:.1f} s{stopped} ===")
+    print(aggregate.table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
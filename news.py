@@ -0,0 +1,206 @@
+# news.py
+# 뉴스 기록: 본문 문자열 대신 (틱, 종류, 템플릿 번호, 섹터/회사 이름 번호, 숫자 인자)를 고정 크기 레코드로 덧붙이고,
+# 본문은 화면에 표시할 때만 템플릿으로 만듦
+
+import struct
+
+import Message
+
+# 메시지 풀 색인: 모든 템플릿 원문을 TEMPLATES 한 목록에 넣고, 풀은 템플릿 번호 튜플로 가리킴
+TEMPLATES = []
+
+
+def _index(texts):
+    start = len(TEMPLATES)
+    TEMPLATES.extend(texts)
+    return tuple(range(start, len(TEMPLATES)))
+
+
+POSITIVE = {sector: _index(texts) for sector, texts in Message.POSITIVE_MESSAGES_BY_SECTOR.items()}
+NEGATIVE = {sector: _index(texts) for sector, texts in Message.NEGATIVE_MESSAGES_BY_SECTOR.items()}
+POLICY = {sector: _index(texts) for sector, texts in Message.POLICY_MESSAGES_BY_SECTOR.items()}
+ECONOMIC_POSITIVE = _index([text for text, _ in Message.ECONOMIC_NEWS_POSITIVE])
+ECONOMIC_NEGATIVE = _index([text for text, _ in Message.ECONOMIC_NEWS_NEGATIVE])
+ECONOMIC_DELTA = dict(zip(ECONOMIC_POSITIVE + ECONOMIC_NEGATIVE,
+                          [delta for _, delta in Message.ECONOMIC_NEWS_POSITIVE + Message.ECONOMIC_NEWS_NEGATIVE]))
+UNKNOWN_REASON = _index(["이유 불명"])
+
+# 뉴스 종류 (레코드에는 번호로 기록. 새 종류는 끝에만 추가)
+TYPES = (
+    "surge", "investment", "acquisition", "merge", "partner", "new", "natural_disaster", "political_event",
+    "positive", "negative", "policy", "economic", "player_event", "contract", "patent", "product",
+    "regulation", "labor", "supply", "delist", "bankrupt", "trade",
+)
+TYPE_IDS = {name: i for i, name in enumerate(TYPES)}
+
+# 종류별 본문 형식. {0}~{2}는 이름 칸, {v}는 숫자 인자, {t}는 템플릿 원문, {s}는 섹터
+FORMATS = {
+    "surge": "[주가 상승] {0}가 {t}으로 인해 주가 상승 예정!",
+    "investment": "[투자] {0}가 {1}에 {v:,.0f}원을 투자",
+    "acquisition": "[지분 인수] {0}가 {1}의 {v:.1f}% 지분을 인수",
+    "merge": "[합병] {1}와 {2}가 합병하여 {0}로 새롭게 출범",
+    "partner": "[제휴] {0}와 {1}가 전략적 제휴 체결",
+    "new": "[신규 상장] {0} ({s})",
+    "natural_disaster": "[자연재해] {0}가 자연재해로 인해 주가가 {v:.2f}% 하락했습니다.",
+    "player_event": "[플레이어 이벤트] {0}에 대한 긍정적인 플레이어 이벤트로 주가가 {v:.2f}% 상승했습니다.",
+    "contract": "[계약 체결] {0}와 {1}가 {v:,.0f}원 규모의 계약을 체결",
+    "patent": "[특허 획득] {0}가 새로운 특허를 획득했습니다.",
+    "product": "[신제품 출시] {0}가 신제품을 발표했습니다.",
+    "regulation": "[규제 강화] {0}가 강화된 규제를 받습니다.",
+    "labor": "[노사 갈등] {0}가 노사 갈등을 겪고 있습니다.",
+    "supply": "[공급망 문제] {0}가 공급망 문제를 겪고 있습니다.",
+    "delist": "[상장 폐지] {0} - 파산 {v:.0f}일 경과로 상장 폐지",
+    "bankrupt": "[파산] {0} - 장기적 악화로 인한 파산",
+}
+# 회사 칸이 두 회사를 잇는 종류 (나머지는 첫 이름 칸만 회사)
+PAIR_FORMATS = {"investment": "{0} -> {1}", "acquisition": "{0} -> {1}", "contract": "{0} - {1}", "partner": "{0}-{1}"}
+_PAIR_KINDS = frozenset(TYPE_IDS[name] for name in PAIR_FORMATS)
+
+# 레코드: 틱, 종류, 템플릿, 섹터, 이름 칸 3개 (이름 번호, 없으면 -1), 숫자 인자 = 36바이트
+# 템플릿 칸은 TEMPLATES 번호이고, 자유 문장이면 -2 - (texts 번호)
+_RECORD = struct.Struct("<IH2xiiiiid")
+RECORD_SIZE = _RECORD.size
+NONE = -1
+
+RENDER_CACHE = 512  # 만들어 둔 본문을 보관할 개수 (표시 중인 뉴스는 매 프레임 다시 만들지 않음)
+
+
+class NewsLog:
+    """
+    덧붙이기만 하는 뉴스 목록. 레코드는 bytearray에 고정 크기로 쌓고, 회사/섹터 이름과
+    템플릿이 없는 자유 문장(플레이어 체결 알림)은 각각 names/texts 목록에 한 번만 넣어 번호로 가리킵니다.
+    본문은 text(i)를 부를 때 만들며, 뉴스 패널처럼 최근 몇 개만 보여 줄 때는 latest()로 번호를 먼저 고릅니다.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.names = []
+        self.texts = []
+        self._name_ids = {}
+        self._rendered = {}
+
+    def __len__(self):
+        return len(self.data) // RECORD_SIZE
+
+    def _name(self, name):
+        if name is None:
+            return NONE
+        nid = self._name_ids.get(name)
+        if nid is None:
+            nid = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return nid
+
+    def add(self, tick, kind, sector=None, names=(), template=NONE, value=0.0):
+        """레코드 하나를 덧붙임. names는 이름 칸 순서대로의 회사 이름 (최대 3개)"""
+        n0 = n1 = n2 = NONE
+        if names:
+            n0 = self._name(names[0])
+            if len(names) > 1:
+                n1 = self._name(names[1])
+                if len(names) > 2:
+                    n2 = self._name(names[2])
+        self.data += _RECORD.pack(tick, TYPE_IDS[kind], template, self._name(sector), n0, n1, n2, value)
+
+    def add_text(self, tick, kind, text, sector=None, company=None):
+        """템플릿 없이 본문을 그대로 기록 (플레이어 체결 알림, 이전 형식 저장 파일의 뉴스)"""
+        self.texts.append(text)
+        self.add(tick, kind, sector, () if company is None else (company,), -1 - len(self.texts))
+
+    def record(self, i):
+        """(틱, 종류 번호, 템플릿, 섹터, 이름 칸 3개, 숫자 인자)"""
+        return _RECORD.unpack_from(self.data, i * RECORD_SIZE)
+
+    def kind(self, i):
+        return self.data[i * RECORD_SIZE + 4]
+
+    def kind_name(self, i):
+        return TYPES[self.data[i * RECORD_SIZE + 4]]
+
+    def sector(self, i):
+        s = self.record(i)[3]
+        return self.names[s] if s != NONE else None
+
+    def company(self, i):
+        """기존 뉴스 dict의 "company" 값과 같은 표시용 회사 문자열 (회사가 없으면 None)"""
+        _, kind, template, _, n0, n1, _, _ = self.record(i)
+        if n0 == NONE:
+            return None
+        if kind in _PAIR_KINDS and template > -2:
+            return PAIR_FORMATS[TYPES[kind]].format(self.names[n0], self.names[n1])
+        return self.names[n0]
+
+    def mentions(self, i, name):
+        """회사 문자열에 name이 들어 있는지 (company(i)를 만들지 않고 이름 칸으로 확인)"""
+        _, kind, template, _, n0, n1, _, _ = self.record(i)
+        if n0 == NONE:
+            return False
+        if name in self.names[n0]:
+            return True
+        return kind in _PAIR_KINDS and template > -2 and name in self.names[n1]
+
+    def text(self, i):
+        """본문 (최근에 만든 본문은 보관해 두고 다시 씀)"""
+        text = self._rendered.get(i)
+        if text is None:
+            if len(self._rendered) >= RENDER_CACHE:
+                self._rendered.clear()
+            text = self._rendered[i] = self._render(i)
+        return text
+
+    def _render(self, i):
+        _, kind, template, sector, n0, n1, n2, value = self.record(i)
+        if template <= -2:
+            return self.texts[-2 - template]
+        name = TYPES[kind]
+        names = self.names
+        fmt = FORMATS.get(name)
+        if fmt is None:
+            if name == "political_event":
+                tone = "긍정적인" if value > 0 else "부정적인"
+                return f"[정치적 사건] {names[n0]}가 {tone} 정치적 사건으로 인해 주가가 {value:.2f}% 변동했습니다."
+            if name == "policy":
+                return TEMPLATES[template].replace("{sector}", names[sector])
+            if n0 != NONE:
+                return TEMPLATES[template].replace("{company}", names[n0])  # 호재/악재
+            return TEMPLATES[template]  # 경제
+        return fmt.format(names[n0] if n0 != NONE else "", names[n1] if n1 != NONE else "",
+                          names[n2] if n2 != NONE else "", v=value,
+                          t=TEMPLATES[template] if template != NONE else "",
+                          s=names[sector] if sector != NONE else "")
+
+    def latest(self, limit, match=None):
+        """조건(match(i))에 맞는 최근 limit개 레코드 번호 (오래된 순). 끝에서부터 찾다가 다 차면 멈춤"""
+        found = []
+        i = len(self)
+        while i > 0 and len(found) < limit:
+            i -= 1
+            if match is None or match(i):
+                found.append(i)
+        found.reverse()
+        return found
+
+    # 저장/불러오기
+
+    def state(self):
+        """저장용 (레코드 bytes, 이름 목록, 자유 문장 목록). 덧붙이기만 하므로 캡처 시점의 길이로 자름"""
+        return bytes(self.data), list(self.names), list(self.texts)
+
+    @classmethod
+    def restore(cls, data, names, texts):
+        log = cls()
+        log.data = bytearray(data)
+        log.names = list(names)
+        log.texts = list(texts)
+        log._name_ids = {name: i for i, name in enumerate(log.names)}
+        return log
+
+    @classmethod
+    def from_dicts(cls, messages):
+        """이전 형식(뉴스 dict 목록)의 저장 파일을 변환. 본문은 자유 문장으로 그대로 둠"""
+        log = cls()
+        for msg in messages:
+            kind = msg.get("type")
+            log.add_text(0, kind if kind in TYPE_IDS else "trade", msg.get("text", ""), msg.get("sector"),
+                         msg.get("company"))
+        return log
@@ -0,0 +1,257 @@
+# orderbook.py
+# 회사별 호가창(limit order book)과 가격-시간 우선 매칭 엔진
+
+import heapq
+import itertools
+
+SIDE_BUY = "buy"
+SIDE_SELL = "sell"
+
+INF = float("inf")
+
+
+class BookOrder:
+    """호가창에 올라간 주문. investor가 None이면 유동성 공급자(마켓 메이커) 주문"""
+    __slots__ = ("order_id", "investor", "side", "price", "quantity")
+
+    def __init__(self, order_id, investor, side, price, quantity):
+        self.order_id = order_id
+        self.investor = investor
+        self.side = side
+        self.price = price
+        self.quantity = quantity  # 남은 수량 (0이면 체결 완료 또는 취소)
+
+
+class LimitOrderBook:
+    """
+    힙 기반 호가창.
+
+    매수 호가는 (-가격, 순번), 매도 호가는 (가격, 순번) 힙으로 관리하여 가격 우선, 같은 가격에서는
+    먼저 들어온 주문이 우선 체결됩니다. 취소는 수량을 0으로 만드는 지연 삭제이며, 죽은 주문이
+    살아 있는 주문보다 많아지면 힙을 다시 만듭니다.
+
+    capacity(order, price): 해당 주문의 투자자가 지금 체결할 수 있는 최대 수량 (잔고/보유 수량 확인)
+    on_fill(buy_order, sell_order, quantity, price): 체결 1건마다 호출 (정산)
+    """
+
+    def __init__(self, capacity=None, on_fill=None):
+        self.bids = []
+        self.asks = []
+        self.live = {}  # order_id -> BookOrder (미체결 주문)
+        self.capacity = capacity
+        self.on_fill = on_fill
+        self._seq = itertools.count()
+        self._dead = 0
+        self.reset_tick_stats()
+
+    def reset_tick_stats(self):
+        """틱 단위 체결 통계 (캔들 OHLC 반영용) 초기화"""
+        self.trade_open = None
+        self.trade_high = -INF
+        self.trade_low = INF
+        self.trade_close = None
+        self.volume = 0
+        self.trade_count = 0
+
+    @property
+    def best_bid(self):
+        self._drop_dead_top(self.bids)
+        return -self.bids[0][0] if self.bids else None
+
+    @property
+    def best_ask(self):
+        self._drop_dead_top(self.asks)
+        return self.asks[0][0] if self.asks else None
+
+    def _drop_dead_top(self, heap):
+        while heap and heap[0][2].quantity <= 0:
+            heapq.heappop(heap)
+            self._dead -= 1
+
+    def submit(self, order_id, investor, side, quantity, price=None):
+        """
+        주문 제출. price가 None이면 시장가 주문(남은 수량은 버림), 아니면 지정가 주문(남은 수량은 호가창에 대기).
+        체결된 수량을 반환합니다.
+        """
+        if quantity <= 0:
+            return 0
+        order = BookOrder(order_id, investor, side, INF if price is None and side == SIDE_BUY else (price or 0.0), quantity)
+        if side == SIDE_BUY:
+            filled, blocked = self._match(order, self.asks, 1)
+        else:
+            filled, blocked = self._match(order, self.bids, -1)
+        if order.quantity > 0 and price is not None and not blocked:
+            self._rest(order)
+        return filled
+
+    def _match(self, order, opposite, sign):
+        """반대편 호가와 매칭. (체결 수량, 잔고 부족으로 중단 여부) 반환"""
+        capacity = self.capacity
+        on_fill = self.on_fill
+        limit = order.price
+        filled = 0
+        heappop = heapq.heappop
+        while order.quantity > 0 and opposite:
+            top = opposite[0]
+            resting = top[2]
+            if resting.quantity <= 0:
+                heappop(opposite)
+                self._dead -= 1
+                continue
+            price = resting.price
+            # 매수는 가격이 지정가 이하일 때, 매도는 지정가 이상일 때만 체결
+            if (price > limit) if sign > 0 else (price < limit):
+                break
+            qty = order.quantity if order.quantity < resting.quantity else resting.quantity
+            if capacity is not None:
+                avail = capacity(order, price)
+                if avail <= 0:
+                    return filled, True
+                if avail < qty:
+                    qty = avail
+                ravail = capacity(resting, price)
+                if ravail <= 0:
+                    # 대기 주문의 투자자가 잔고/보유 수량이 부족하면 그 주문을 취소하고 계속
+                    self.cancel(resting.order_id)
+                    continue
+                if ravail < qty:
+                    qty = ravail
+            if on_fill is not None:
+                if sign > 0:
+                    on_fill(order, resting, qty, price)
+                else:
+                    on_fill(resting, order, qty, price)
+            order.quantity -= qty
+            resting.quantity -= qty
+            filled += qty
+            if resting.quantity <= 0:
+                heappop(opposite)
+                del self.live[resting.order_id]
+            self._record_trade(price, qty)
+        return filled, False
+
+    def _record_trade(self, price, qty):
+        if self.trade_open is None:
+            self.trade_open = price
+        if price > self.trade_high:
+            self.trade_high = price
+        if price < self.trade_low:
+            self.trade_low = price
+        self.trade_close = price
+        self.volume += qty
+        self.trade_count += 1
+
+    def _rest(self, order):
+        self.live[order.order_id] = order
+        if order.side == SIDE_BUY:
+            heapq.heappush(self.bids, (-order.price, next(self._seq), order))
+        else:
+            heapq.heappush(self.asks, (order.price, next(self._seq), order))
+
+    def cancel(self, order_id):
+        order = self.live.pop(order_id, None)
+        if order is None:
+            return False
+        order.quantity = 0
+        self._dead += 1
+        if self._dead > 64 and self._dead > len(self.live):
+            self._compact()
+        return True
+
+    def _compact(self):
+        """
+        지연 삭제된 주문을 힙에서 걷어냄. _match 도중 cancel()에서 불릴 수 있고 _match는 힙 리스트를
+        참조로 들고 있으므로 새 리스트로 바꾸지 않고 제자리에서 고침
+        """
+        for heap in (self.bids, self.asks):
+            heap[:] = [e for e in heap if e[2].quantity > 0]
+            heapq.heapify(heap)
+        self._dead = 0
+
+    def __len__(self):
+        return len(self.live)
+
+
+class Exchange:
+    """
+    회사별 호가창 모음과 유동성 공급자.
+
+    매 틱 시작 시 마켓 메이커가 기준가(직전 종가) 주변에 호가를 다시 걸고, 봇과 플레이어의 주문은
+    이 호가를 소진하면서 가격을 움직입니다. 체결 결과는 fold_into_candle()로 틱 캔들에 반영됩니다.
+    """
+    MM_LEVELS = 5  # 마켓 메이커 호가 단계 수
+    MM_TICK = 0.001  # 호가 단계 간격 (0.1%)
+    MM_DEPTH = 40  # 단계별 수량
+
+    def __init__(self):
+        self.books = {}  # company_id -> LimitOrderBook
+        self.mm_orders = {}  # company_id -> 마켓 메이커 주문 id 목록
+        self._ids = itertools.count(1)
+
+    def book_for(self, company):
+        book = self.books.get(company.id)
+        if book is None:
+            book = self.books[company.id] = LimitOrderBook(
+                capacity=lambda order, price, c=company: self._capacity(c, order, price),
+                on_fill=lambda b, s, qty, price, c=company: self._settle(c, b, s, qty, price))
+        return book
+
+    def next_order_id(self):
+        return next(self._ids)
+
+    @staticmethod
+    def _capacity(company, order, price):
+        investor = order.investor
+        if investor is None:
+            return order.quantity
+        if order.side == SIDE_BUY:
+            return int(investor.cash // price) if price > 0 else 0
+        return investor.holdings.get(company.id, {}).get("quantity", 0)
+
+    @staticmethod
+    def _settle(company, buy_order, sell_order, qty, price):
+        if buy_order.investor is not None:
+            buy_order.investor.buy(company, qty, price=price)
+        if sell_order.investor is not None:
+            sell_order.investor.sell(company, qty, price=price)
+
+    def requote(self, company):
+        """마켓 메이커 호가를 현재가 주변으로 다시 걸기"""
+        book = self.book_for(company)
+        for oid in self.mm_orders.get(company.id, ()):
+            book.cancel(oid)
+        ref = company.current_price
+        ids = []
+        if ref > 0:
+            for k in range(1, self.MM_LEVELS + 1):
+                bid_id = next(self._ids)
+                book.submit(bid_id, None, SIDE_BUY, self.MM_DEPTH, ref * (1 - self.MM_TICK * k))
+                ask_id = next(self._ids)
+                book.submit(ask_id, None, SIDE_SELL, self.MM_DEPTH, ref * (1 + self.MM_TICK * k))
+                ids.append(bid_id)
+                ids.append(ask_id)
+        self.mm_orders[company.id] = ids
+
+    def submit(self, investor, company, side, quantity, price=None):
+        """투자자 주문 제출 후 체결 결과를 캔들에 반영. 체결 수량 반환"""
+        book = self.book_for(company)
+        filled = book.submit(next(self._ids), investor, side, quantity, price)
+        if book.trade_count:
+            self.fold_into_candle(company, book)
+        return filled
+
+    @staticmethod
+    def fold_into_candle(company, book):
+        """체결 가격을 현재 틱 캔들의 고가/저가/종가에 반영"""
+        cndl = company.candles[-1]
+        if book.trade_high > cndl["high"]:
+            cndl["high"] = book.trade_high
+        if book.trade_low < cndl["low"]:
+            cndl["low"] = book.trade_low
+        cndl["close"] = book.trade_close
+        book.reset_tick_stats()
+
+    def remove(self, company_id):
+        """상장 폐지/합병/파산한 회사의 호가창 제거"""
+        self.books.pop(company_id, None)
+        self.mm_orders.pop(company_id, None)
@@ -0,0 +1,253 @@
+# orders.py
+# 지정가/손절/익절 대기 주문과 가격대별 트리거 인덱스
+
+import bisect
+from collections import deque
+
+# 주문 유형
+ORDER_LIMIT_BUY = "limit_buy"      # 지정가 매수: 가격이 내려와야 체결
+ORDER_LIMIT_SELL = "limit_sell"    # 지정가 매도: 가격이 올라가야 체결
+ORDER_STOP_LOSS = "stop_loss"      # 손절: 가격이 내려오면 매도
+ORDER_TAKE_PROFIT = "take_profit"  # 익절: 가격이 올라가면 매도
+
+FALLING_ORDER_TYPES = (ORDER_LIMIT_BUY, ORDER_STOP_LOSS)
+RISING_ORDER_TYPES = (ORDER_LIMIT_SELL, ORDER_TAKE_PROFIT)
+
+ORDER_TYPE_LABELS = {
+    ORDER_LIMIT_BUY: "지정가 매수",
+    ORDER_LIMIT_SELL: "지정가 매도",
+    ORDER_STOP_LOSS: "손절",
+    ORDER_TAKE_PROFIT: "익절",
+}
+
+# 주문 상태
+STATUS_OPEN = "open"
+STATUS_FILLED = "filled"
+STATUS_CANCELLED = "cancelled"
+STATUS_REJECTED = "rejected"  # 발동했지만 잔고/보유 수량 부족으로 체결 실패
+
+
+class RestingOrder:
+    """체결 대기 중인 주문"""
+    __slots__ = ("order_id", "investor", "company_id", "order_type", "price", "quantity", "status", "fill_price",
+                 "sibling")
+
+    def __init__(self, order_id, investor, company_id, order_type, price, quantity):
+        self.order_id = order_id
+        self.investor = investor
+        self.company_id = company_id
+        self.order_type = order_type
+        self.price = price
+        self.quantity = quantity
+        self.status = STATUS_OPEN
+        self.fill_price = None
+        self.sibling = None  # 한쪽이 체결되면 취소되는 짝 주문 (OCO, 없으면 None)
+
+    @property
+    def is_buy(self):
+        return self.order_type == ORDER_LIMIT_BUY
+
+    @property
+    def is_open(self):
+        return self.status == STATUS_OPEN
+
+
+class PriceLevelIndex:
+    """
+    한 방향(하락 발동 / 상승 발동)의 가격대 인덱스.
+
+    가격대 키를 정렬된 리스트로 유지하되, 발동할 가격대가 항상 리스트 끝에 오도록
+    하락 발동은 가격 그대로, 상승 발동은 부호를 뒤집어 저장합니다.
+    따라서 발동 검사는 끝에서부터 pop 하기만 하면 되어 O(발동 수)이고, 새 가격대 추가와 빈 가격대 제거는
+    이진 탐색 뒤 리스트 삽입/삭제라 O(가격대 수)입니다 (원소 이동은 memmove라 수천 개까지는 무시할 만함).
+    가격대마다 미체결 주문 수를 세어 취소로 0이 되면 바로 가격대를 지우므로, 취소된 주문만 남은 가격대는 없습니다.
+    """
+
+    def __init__(self, falling):
+        self.sign = 1 if falling else -1
+        self.keys = []  # 정렬된 가격대 키
+        self.levels = {}  # 키 -> 해당 가격대의 주문 deque (시간 우선, 취소된 주문이 섞여 있을 수 있음)
+        self.live = {}  # 키 -> 해당 가격대의 미체결 주문 수
+
+    def add(self, order):
+        key = self.sign * order.price
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = deque()
+            self.live[key] = 0
+            bisect.insort(self.keys, key)
+        level.append(order)
+        self.live[key] += 1
+
+    def discard(self, order):
+        """인덱스에 있는 미체결 주문 하나가 취소됨. 가격대에 미체결 주문이 남지 않으면 가격대를 지움"""
+        key = self.sign * order.price
+        left = self.live[key] - 1
+        if left:
+            self.live[key] = left
+            return
+        del self.levels[key]
+        del self.live[key]
+        keys = self.keys
+        del keys[bisect.bisect_left(keys, key)]
+
+    def pop_triggered(self, bound):
+        """bound 가격에 도달해 발동한 주문을 가격 우선/시간 우선 순서로 꺼냅니다."""
+        threshold = self.sign * bound
+        keys = self.keys
+        triggered = []
+        while keys and keys[-1] >= threshold:
+            key = keys.pop()
+            del self.live[key]
+            triggered.extend(o for o in self.levels.pop(key) if o.status == STATUS_OPEN)
+        return triggered
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class CompanyTriggers:
+    """회사 하나의 대기 주문 트리거"""
+
+    def __init__(self):
+        self.falling = PriceLevelIndex(falling=True)
+        self.rising = PriceLevelIndex(falling=False)
+        self.live = 0  # 인덱스에 남은 미체결 주문 수
+
+    def index_for(self, order):
+        return self.falling if order.order_type in FALLING_ORDER_TYPES else self.rising
+
+    def add(self, order):
+        self.index_for(order).add(order)
+        self.live += 1
+
+    def discard(self, order):
+        self.index_for(order).discard(order)
+        self.live -= 1
+
+    def pop_triggered(self, high, low):
+        triggered = self.falling.pop_triggered(low) + self.rising.pop_triggered(high)
+        self.live -= len(triggered)
+        return triggered
+
+    def is_empty(self):
+        return self.live == 0
+
+
+class OrderManager:
+    """플레이어와 봇의 대기 주문 관리"""
+
+    def __init__(self):
+        self.orders = {}  # order_id -> RestingOrder (미체결이고 아직 발동하지 않은 주문만)
+        self.triggers = {}  # company_id -> CompanyTriggers (미체결 주문이 있는 회사만)
+        self.by_investor = {}  # investor -> {order_id: RestingOrder}
+        self.next_id = 1
+
+    def place(self, investor, company_id, order_type, price, quantity):
+        """대기 주문을 등록합니다. 잘못된 주문이면 None 반환"""
+        if order_type not in ORDER_TYPE_LABELS or quantity <= 0 or price <= 0:
+            return None
+        order_id = self.next_id
+        self.next_id += 1
+        return self.restore(order_id, investor, company_id, order_type, price, quantity)
+
+    def restore(self, order_id, investor, company_id, order_type, price, quantity):
+        """주문 번호를 그대로 유지하여 주문을 등록 (저장 파일 불러오기용, 등록 순서대로 호출)"""
+        order = RestingOrder(order_id, investor, company_id, order_type, price, quantity)
+        if order_id >= self.next_id:
+            self.next_id = order_id + 1
+        self.orders[order.order_id] = order
+        self.by_investor.setdefault(investor, {})[order.order_id] = order
+        triggers = self.triggers.get(company_id)
+        if triggers is None:
+            triggers = self.triggers[company_id] = CompanyTriggers()
+        triggers.add(order)
+        return order
+
+    def cancel(self, order_id):
+        order = self._forget(order_id)
+        if order is None:
+            return False
+        order.status = STATUS_CANCELLED
+        self._discard(order)
+        return True
+
+    def link(self, first, second):
+        """두 주문을 OCO(one-cancels-other)로 묶음: 한쪽이 체결되면 다른 쪽은 cancel_sibling()으로 취소"""
+        first.sibling = second
+        second.sibling = first
+
+    def cancel_sibling(self, order):
+        """order와 OCO로 묶인 주문이 아직 미체결이면 취소 (같은 틱에 함께 발동해 인덱스에서 이미 꺼낸 경우 포함)"""
+        sibling = order.sibling
+        if sibling is None:
+            return False
+        order.sibling = sibling.sibling = None
+        if sibling.status != STATUS_OPEN:
+            return False
+        sibling.status = STATUS_CANCELLED
+        if self._forget(sibling.order_id) is not None:
+            self._discard(sibling)  # 같은 틱에 발동해 이미 꺼낸 주문은 인덱스에 없음
+        return True
+
+    def cancel_sells(self, investor, company_id):
+        """투자자의 해당 회사 미체결 매도 주문(지정가 매도/손절/익절)을 모두 취소. 취소한 수 반환"""
+        cancelled = 0
+        for order in self.orders_for(investor, company_id):
+            if not order.is_buy:
+                self.cancel(order.order_id)
+                cancelled += 1
+        return cancelled
+
+    def cancel_company(self, company_id):
+        """상장 폐지/합병/파산한 회사의 주문을 모두 취소"""
+        triggers = self.triggers.pop(company_id, None)
+        if triggers is None:
+            return
+        for index in (triggers.falling, triggers.rising):
+            for level in index.levels.values():
+                for order in level:
+                    if order.status == STATUS_OPEN:
+                        order.status = STATUS_CANCELLED
+                        self._forget(order.order_id)
+
+    def companies(self):
+        """미체결 주문이 있는 회사 id (정렬). 발동 검사 순서가 주문 이력이 아닌 저장되는 상태로만 정해지게 함"""
+        return sorted(self.triggers)
+
+    def pop_triggered(self, company_id, high, low):
+        """해당 회사에서 이번 틱 고가/저가로 발동한 주문 목록"""
+        triggers = self.triggers.get(company_id)
+        if triggers is None:
+            return []
+        triggered = triggers.pop_triggered(high, low)
+        for order in triggered:
+            self._forget(order.order_id)
+        if triggers.is_empty():
+            del self.triggers[company_id]
+        return triggered
+
+    def orders_for(self, investor, company_id=None):
+        """투자자의 미체결 주문 목록 (등록 순)"""
+        mine = self.by_investor.get(investor, {})
+        return [o for o in mine.values() if company_id is None or o.company_id == company_id]
+
+    def _discard(self, order):
+        """취소된 주문을 가격대 인덱스에서 빼고, 회사에 미체결 주문이 남지 않으면 회사도 지움"""
+        triggers = self.triggers[order.company_id]
+        triggers.discard(order)
+        if triggers.is_empty():
+            del self.triggers[order.company_id]
+
+    def _forget(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            mine = self.by_investor.get(order.investor)
+            if mine is not None:
+                mine.pop(order_id, None)
+                if not mine:
+                    del self.by_investor[order.investor]
+        return order
+
+    def __len__(self):
+        return len(self.orders)
@@ -0,0 +1,650 @@
+# persistence.py
+# 시장 전체 상태(회사, 캔들, 투자자, 대기 주문, 지표 기록, 난수 상태)의 바이너리 저장/불러오기
+
+import gc
+import hashlib
+import io
+import itertools
+import json
+import operator
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterator
+
+import candles
+import economy
+import history
+import ledger
+import news
+
+# 파일 구조: [헤더][메타데이터 JSON][배열 구역들]
+#   헤더: 매직(8바이트), 형식 버전(uint16), 메타데이터 길이(uint32)
+#   메타데이터: 스칼라 값과 구조 정보, 뒤따르는 배열 구역 목록 [이름, 타입코드, 원소 수]
+#   배열 구역: 캔들 열, 자산 곡선, 지표 기록을 array.tofile()로 그대로 기록하고, 뉴스/체결 원장은 레코드 bytes 그대로
+# 버전 2: 뉴스를 dict 목록 대신 news.NewsLog 레코드로 기록 (버전 1 파일의 뉴스는 본문 그대로 변환)
+MAGIC = b"STKSAVE\0"
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+_HEADER = struct.Struct("<8sHI")
+
+# 백그라운드 기록 중 GIL 전환 간격 (메인 루프가 GIL을 기다리는 최대 시간)
+BACKGROUND_SWITCH_INTERVAL = 0.0005
+# 백그라운드 기록은 BACKGROUND_SLICE(초)만큼 일하고 BACKGROUND_REST(초)만큼 잠들어 메인 루프에 GIL을 넘김
+BACKGROUND_SLICE = 0.0002
+BACKGROUND_REST = 0.001
+BACKGROUND_BATCH = 32  # 백그라운드에서 한 번에 C 인코더로 인코딩하는 리스트 항목 수
+BACKGROUND_PIECE = 8192  # 백그라운드에서 한 번에 잘라 쓰는 배열 항목 수
+
+COMPANY_FIELDS = (
+    "id", "name", "sector", "is_bankrupt", "bankrupt_day", "bankruptcy_warning_days",
+    "news_impact", "news_impact_days", "capital", "debt", "revenue", "net_income",
+    "market_share", "competitors",
+)
+MARKET_FIELDS = (
+    "day_count", "policy_sentiment_score", "sentiment_amplitude", "sentiment_frequency",
+    "sentiment_phase", "current_timeframe", "time_since_last_update",
+    "economic_factors", "national_factors",
+)
+
+
+class SaveFormatError(ValueError):
+    """저장 파일이 손상되었거나 지원하지 않는 형식"""
+
+
+def save(path, market, investors, fsync=False):
+    """market과 investors 전체를 path에 저장합니다. 임시 파일에 쓴 뒤 교체하므로 실패해도 기존 파일은 유지됩니다."""
+    write(path, capture(market, investors), fsync=fsync)
+
+
+class Snapshot:
+    """
+    틱 경계에서 잡은 저장용 상태 (capture()로 만들고 write()로 기록).
+
+    캔들 열, 자산 곡선, 뉴스 기록은 덧붙이기만 하므로 참조와 길이만 기록하고, 그 뒤에도 바뀔 수 있는
+    마지막 캔들 값과 작은 상태(보유 내역, 지표 링 버퍼 등)만 복사합니다. 따라서 시뮬레이션이
+    계속 진행되는 동안 다른 스레드에서 기록해도 캡처 시점의 상태가 저장됩니다.
+    """
+    __slots__ = ("tick", "market", "companies", "investors", "history", "random_state", "ledger")
+
+    def __init__(self, tick, market, companies, investors, history, random_state, ledger=None):
+        self.tick = tick
+        self.market = market
+        self.companies = companies  # (필드 값 튜플, 캔들 시계열, 캔들 수, 마지막 캔들 OHLC, 보유자 번호)
+        self.investors = investors  # (메타데이터 dict, 자산 곡선, 길이)
+        self.history = history  # (메타데이터 dict, 해상도별 배열 사본 리스트)
+        self.random_state = random_state
+        self.ledger = ledger  # (이름표 dict, 레코드 bytes 또는 bytearray) 체결 원장 사본, 없으면 None
+
+    def meta(self, lazy=False):
+        """
+        파일에 기록할 메타데이터 dict.
+        lazy이면 회사 레코드를 리스트 대신 이터레이터로 두어 인코딩하면서 만들고 바로 버립니다 (백그라운드 기록에서
+        레코드 수천 개가 기록 내내 살아 있으면 그 스레드의 할당이 순환 GC를 일으켜 메인 루프를 멈추게 함).
+        """
+        companies = self._company_records()
+        if not lazy:
+            companies = list(companies)
+        investors = []
+        for rec, _, n in self.investors:
+            rec = dict(rec)
+            rec["equity"] = n
+            investors.append(rec)
+        market = dict(self.market)
+        log, _, names, texts = market["news"]
+        market["news"] = {"names": log.names[:names], "texts": log.texts[:texts]}
+        market["history"] = self.history[0]
+        if self.ledger is not None:
+            market["ledger"] = self.ledger[0]
+        return {
+            "market": market,
+            "companies": companies,
+            "investors": investors,
+            "random_state": self.random_state,
+        }
+
+    def _company_records(self):
+        for fields, _, n, _, holders in self.companies:
+            rec = dict(zip(COMPANY_FIELDS, fields))
+            rec["candles"] = n
+            rec["holders"] = holders
+            yield rec
+
+    def sections(self):
+        """[(구역 이름, 타입코드, 조각 목록)] 조각은 (배열, 길이, 마지막 값 또는 None)"""
+        sections = []
+        for k, name in enumerate(candles.FIELDS):
+            sections.append((f"candles.{name}", "d", _CandleParts(self.companies, k, name)))
+        sections.append(("equity", "d", [(curve, n, None) for _, curve, n in self.investors]))
+        log, nbytes, _, _ = self.market["news"]
+        sections.append(("news", "B", [(log.data, nbytes, None)]))
+        for k, arrays in enumerate(self.history[1]):
+            sections.append((f"history.{k}", "f", [(arr, len(arr), None) for arr in arrays]))
+        if self.ledger is not None:
+            records = self.ledger[1]
+            sections.append(("ledger", "B", [(records, len(records), None)]))
+        return sections
+
+
+class _CandleParts:
+    """
+    회사별 캔들 열 조각 목록. 순회할 때마다 조각을 새로 만들어 내므로 회사 수만큼의 튜플을 기록 내내
+    들고 있지 않습니다 (백그라운드 기록 스레드의 할당이 순환 GC를 일으키지 않도록, meta(lazy=True)와 같은 이유).
+    """
+    __slots__ = ("companies", "k", "name")
+
+    def __init__(self, companies, k, name):
+        self.companies = companies
+        self.k = k
+        self.name = name
+
+    def __iter__(self):
+        k, name = self.k, self.name
+        for _, series, n, last, _ in self.companies:
+            yield series.columns[name], n, last[k]
+
+
+def capture(market, investors):
+    """현재 상태의 Snapshot을 만듭니다. 틱 사이(next_day 호출 밖)에서 호출해야 합니다."""
+    return Capture(market, investors).step()
+
+
+class Capture:
+    """
+    틱 경계의 Snapshot을 여러 프레임에 나눠 잡는 쓰기 시 복사(copy-on-write) 캡처 (자동 저장용).
+
+    만들 때 크기가 회사 수와 무관한 상태(시장 값, 투자자, 대기 주문, 지표 기록, 원장 레코드 수)를 바로 잡고,
+    회사 상태와 원장 레코드는 step(budget)마다 budget의 COPY_SHARE만큼씩 복사합니다. 그동안 시뮬레이션은
+    멈추지 않으며, 아직 복사하지 않은 회사를 바꾸는 쪽이 먼저 복사를 요청합니다 (Market.pending_capture 훅):
+      - 시장가 체결과 포트폴리오 제거는 그 회사 하나를 preserve()로 먼저 복사
+      - next_day()는 모든 회사를 바꾸므로 시작할 때 flush()로 남은 것을 모두 복사
+    결과는 항상 캡처를 만든 틱 경계의 상태입니다. 틱 사이 프레임의 정지 시간은 회사 수와 관계없고,
+    틱 안에서 마저 복사하는 양은 그 틱의 회사 갱신 비용보다 훨씬 작습니다.
+    다 복사하면 훅을 스스로 풉니다. 중간에 버릴 때는 cancel()을 부릅니다.
+    """
+
+    CHECK_EVERY = 16  # 시간을 확인하는 복사 간격 (회사 수)
+    LEDGER_CHUNK = 4096  # 한 번에 복사하는 원장 레코드 수
+    COPY_SHARE = 0.7  # step 예산 중 복사에 쓰는 비율 (나머지는 시간 확인 간격과 스케줄링의 여유)
+
+    def __init__(self, market, investors):
+        self.market = market
+        self.investors = investors
+        self.steps = 0
+        self.investor_index = {inv: i for i, inv in enumerate(investors)}
+        self.tick = market.day_count
+
+        # 회사: company_by_id를 먼저, 그 밖의 목록에만 남은 회사를 뒤에 (id 중복 제거는 복사하면서)
+        self.pending = list(market.company_by_id.values())
+        self.pending += market.companies
+        self.pending += market.bankrupt_companies
+        self.sizes = (len(market.company_by_id), len(market.companies))
+        self.position = 0
+        self.known = set()
+        self.preserved = {}  # 차례가 오기 전에 preserve()로 먼저 복사한 회사 id -> 상태
+        self.company_state = []
+        self.ids = []  # pending 순서의 회사 id (시장 메타데이터의 id 목록을 마지막에 잘라 씀)
+
+        # 원장 레코드는 덧붙이기만 하므로 지금 개수까지만 나중에 복사
+        led = getattr(market, "ledger", None)
+        self.ledger_count = led.count if led is not None else 0
+        self.ledger_records = bytearray(self.ledger_count * ledger.RECORD_SIZE) if led is not None else None
+        self.ledger_ids = led.ids() if led is not None else None
+        self.ledger_position = 0
+
+        self._capture_small()
+
+    @property
+    def done(self):
+        return self.position >= len(self.pending) and self.ledger_position >= self.ledger_count
+
+    def step(self, budget=None):
+        """
+        budget(초) 안에서 복사를 진행합니다. 다 복사했으면 Snapshot, 아니면 None. budget이 None이면 한 번에 끝까지.
+        budget이 있으면 그동안 순환 GC를 미룹니다. 복사 중 할당이 문턱을 넘기면 힙 전체를 도는 수 ms짜리
+        수집이 step 안에서 일어날 수 있어서이며, 미룬 수집은 step이 끝난 뒤 게임의 다음 할당에서 일어납니다.
+        """
+        self.steps += 1
+        if budget is None:
+            self.flush()
+            return self._snapshot()
+        if not gc.isenabled():
+            return self._step(budget)
+        gc.disable()
+        try:
+            return self._step(budget)
+        finally:
+            gc.enable()
+
+    def _step(self, budget):
+        self._copy(time.perf_counter() + budget * self.COPY_SHARE)
+        return self._snapshot() if self.done else None
+
+    def flush(self):
+        """남은 회사와 원장 레코드를 모두 복사 (next_day가 회사를 바꾸기 전에 호출)"""
+        self._copy(None)
+
+    def preserve(self, company):
+        """company를 바꾸기 전에 호출: 아직 복사하지 않았으면 지금 상태를 복사해 둠"""
+        cid = company.id
+        if cid not in self.known and cid not in self.preserved:
+            self.preserved[cid] = self._company_state(company)
+
+    def cancel(self):
+        """캡처를 버림 (훅 해제)"""
+        if self.market.pending_capture is self:
+            self.market.pending_capture = None
+
+    def _copy(self, deadline):
+        if self._copy_companies(deadline) and self._copy_ledger(deadline):
+            self.cancel()  # 다 복사했으므로 더는 먼저 복사할 것이 없음
+
+    def _company_state(self, c):
+        series = c.candles
+        n = len(series.close)
+        last = (series.open[-1], series.high[-1], series.low[-1], series.close[-1]) if n else None
+        investor_index = self.investor_index
+        holders = [investor_index[h] for h in c.holders if h in investor_index] if c.holders else []
+        return (_get_company_fields(c), series, n, last, holders)
+
+    def _copy_companies(self, deadline):
+        pending = self.pending
+        known = self.known
+        preserved = self.preserved
+        state = self._company_state
+        append = self.company_state.append
+        append_id = self.ids.append
+        check = self.CHECK_EVERY
+        i = self.position
+        end = len(pending)
+        while i < end:
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.position = i
+                return False
+            for c in pending[i:i + check]:
+                cid = c.id
+                append_id(cid)
+                if cid in known:
+                    continue
+                known.add(cid)
+                copied = preserved.pop(cid, None)
+                append(copied if copied is not None else state(c))
+            i += check
+        self.position = end
+        return True
+
+    def _copy_ledger(self, deadline):
+        if self.ledger_records is None:
+            return True
+        led = self.market.ledger
+        size = ledger.RECORD_SIZE
+        chunk = self.LEDGER_CHUNK
+        i = self.ledger_position
+        while i < self.ledger_count:
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.ledger_position = i
+                return False
+            stop = min(i + chunk, self.ledger_count)
+            self.ledger_records[i * size:stop * size] = led.records(i, stop)
+            i = stop
+        self.ledger_position = i
+        return True
+
+    def _capture_small(self):
+        """회사 수와 무관한 작은 상태를 지금 복사"""
+        market = self.market
+        investors = self.investors
+        investor_index = self.investor_index
+
+        investor_state = []
+        for inv in investors:
+            rec = {
+                "class": type(inv).__name__,
+                "name": inv.name,
+                "cash": inv.cash,
+                "holdings": {cid: dict(h) for cid, h in inv.holdings.items()},
+                "marks": dict(inv.marks),
+                "holdings_value": inv.holdings_value,
+            }
+            if hasattr(inv, "strategy"):
+                rec["strategy"] = inv.strategy
+                rec["focus_sector"] = inv.focus_sector
+            investor_state.append((rec, inv.equity_curve, len(inv.equity_curve)))
+
+        market_meta = {name: getattr(market, name) for name in MARKET_FIELDS}
+        market_meta["economic_factors"] = dict(market.economic_factors)
+        market_meta["national_factors"] = dict(market.national_factors)
+        log = market.news
+        market_meta["news"] = (log, len(log.data), len(log.names), len(log.texts))
+        market_meta["seed"] = market.seed
+        market_meta["use_order_book"] = market.exchange is not None
+        market_meta["regime_table"] = None if market.regime_engine.table is economy.REGIME_TABLE else market.regime_engine.table
+        for name in ("company_by_id", "companies", "bankrupt_companies"):
+            market_meta[name] = None  # 회사를 다 복사한 뒤 _snapshot에서 채움 (키 순서 유지)
+        market_meta["next_order_id"] = market.orders.next_id
+        market_meta["orders"] = [
+            [o.order_id, investor_index[o.investor], o.company_id, o.order_type, o.price, o.quantity,
+             o.sibling.order_id if o.sibling is not None else None]
+            for o in market.orders.orders.values() if o.investor in investor_index
+        ]
+
+        # 지표 링 버퍼는 제자리에서 덮어쓰므로 복사 (크기가 고정되어 있어 작음)
+        hist = market.history
+        first = hist.names[0]
+        history_meta = {
+            "names": list(hist.names),
+            "first_tick": hist.first_tick,
+            "last_tick": hist.last_tick,
+            "levels": [
+                {
+                    "resolution": level.resolution,
+                    "capacity": level.buffers[first].capacity,
+                    "head": level.buffers[first].head,
+                    "size": level.buffers[first].size,
+                    "sums": dict(level.sums),
+                    "pending": level.pending,
+                    "appended": level.appended,
+                }
+                for level in hist.levels
+            ],
+        }
+        history_arrays = [[level.buffers[name].data[:] for name in hist.names] for level in hist.levels]
+
+        self.market_meta = market_meta
+        self.investor_state = investor_state
+        self.history_state = (history_meta, history_arrays)
+        self.random_state = market.rng.getstate()
+
+    def _snapshot(self):
+        market_meta = dict(self.market_meta)
+        by_id, listed = self.sizes
+        market_meta["company_by_id"] = self.ids[:by_id]
+        market_meta["companies"] = self.ids[by_id:by_id + listed]
+        market_meta["bankrupt_companies"] = self.ids[by_id + listed:]
+        # 체결 원장 (레코드는 리틀 엔디언 고정 형식이라 바이트 그대로 기록)
+        ledger_state = (self.ledger_ids, self.ledger_records) if self.ledger_records is not None else None
+        return Snapshot(self.tick, market_meta, self.company_state, self.investor_state,
+                        self.history_state, self.random_state, ledger_state)
+
+
+_get_company_fields = operator.attrgetter(*COMPANY_FIELDS)
+
+
+def write(path, snapshot, fsync=False, background=False):
+    """
+    Snapshot을 파일로 기록합니다.
+    fsync: 교체 전에 디스크에 반영 (자동 저장용)
+    background: 다른 스레드에서 기록할 때 메타데이터와 배열을 작은 조각으로 나눠 BACKGROUND_SLICE마다 잠들며,
+                기록하는 동안 GIL 전환 간격을 줄여 메인 루프가 오래 기다리지 않게 합니다.
+    """
+    if not background:
+        _write(path, snapshot, fsync, False)
+        return
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(interval, BACKGROUND_SWITCH_INTERVAL))
+    try:
+        _write(path, snapshot, fsync, True)
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def dumps(market, investors):
+    """현재 상태를 저장 파일과 같은 형식의 bytes로 반환 (메모리 내 체크포인트용)"""
+    buf = io.BytesIO()
+    _write_stream(buf, capture(market, investors), False)
+    return buf.getvalue()
+
+
+def fingerprint(market, investors):
+    """
+    시뮬레이션 상태의 해시. 차트 타임프레임처럼 화면에서만 바뀌는 값은 제외하므로
+    같은 시드와 같은 입력으로 재생한 결과가 원래 세션과 같은지 비교하는 데 씁니다.
+    체결 원장은 보유 내역에서 파생된 기록이므로 제외합니다 (원장 도입 전 저널의 해시와도 비교 가능).
+    """
+    snapshot = capture(market, investors)
+    snapshot.market = dict(snapshot.market, current_timeframe=None)
+    snapshot.ledger = None
+    buf = io.BytesIO()
+    _write_stream(buf, snapshot, False)
+    return hashlib.sha256(buf.getvalue()).hexdigest()[:16]
+
+
+def _write(path, snapshot, fsync, background):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        _write_stream(f, snapshot, background)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _write_stream(f, snapshot, background):
+    meta = snapshot.meta(lazy=background)
+    sections = snapshot.sections()
+    meta["byteorder"] = sys.byteorder
+    meta["sections"] = [[name, typecode, sum(n for _, n, _ in parts)] for name, typecode, parts in sections]
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    if background:
+        chunks = [chunk.encode("utf-8") for chunk in _yielding(_encode_chunks(meta, encoder, BACKGROUND_BATCH))]
+        meta_len = sum(len(chunk) for chunk in chunks)
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, meta_len))
+        f.writelines(chunks)
+        for _, _, parts in sections:
+            for chunk in _yielding(_pieces(parts, BACKGROUND_PIECE)):
+                f.write(chunk)
+    else:
+        meta_bytes = encoder.encode(meta).encode("utf-8")
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for _, _, parts in sections:
+            f.writelines(_pieces(parts))
+
+
+def _pieces(parts, size=None):
+    """조각 목록을 기록할 배열 조각으로. 캡처 이후 덧붙여진 값은 잘라내고, 캡처 시점의 마지막 값으로 덮어씀"""
+    for arr, n, last in parts:
+        if n <= 0:
+            continue
+        step = n if size is None else size
+        for i in range(0, n, step):
+            chunk = arr[i:min(i + step, n)]
+            if last is not None and i + step >= n:
+                chunk[-1] = last
+            yield chunk
+
+
+def _encode_chunks(value, encoder, batch=256):
+    """JSON을 조각으로 인코딩. dict는 항목별로, 긴 리스트와 이터레이터는 batch개씩 C 인코더로 인코딩"""
+    if isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + encoder.encode(str(key)) + ":"
+            yield from _encode_chunks(item, encoder, batch)
+        yield "}"
+    elif isinstance(value, list) and len(value) > batch:
+        yield "["
+        for i in range(0, len(value), batch):
+            yield ("," if i else "") + encoder.encode(value[i:i + batch])[1:-1]
+        yield "]"
+    elif isinstance(value, Iterator):
+        yield "["
+        for i, items in enumerate(iter(lambda: list(itertools.islice(value, batch)), [])):
+            yield ("," if i else "") + encoder.encode(items)[1:-1]
+        yield "]"
+    else:
+        yield encoder.encode(value)
+
+
+def _yielding(iterable, work=BACKGROUND_SLICE, rest=BACKGROUND_REST):
+    """work(초)만큼 일할 때마다 rest(초)만큼 잠들며 순회 (잠든 동안 메인 루프가 GIL을 씀)"""
+    clock = time.perf_counter
+    start = clock()
+    for item in iterable:
+        yield item
+        if clock() - start >= work:
+            time.sleep(rest)
+            start = clock()
+
+
+def _fsync_directory(directory):
+    """파일 교체(rename)가 디스크에 반영되도록 디렉터리도 fsync (지원하지 않는 플랫폼은 건너뜀)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read(path):
+    """파일을 읽어 (메타데이터, {구역 이름: 배열}) 반환"""
+    with open(path, "rb") as f:
+        return parse(f.read())
+
+
+def parse(data):
+    """저장 형식의 bytes를 (메타데이터, {구역 이름: 배열})로 해석"""
+    if len(data) < _HEADER.size:
+        raise SaveFormatError("저장 파일이 너무 짧습니다.")
+    magic, version, meta_len = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveFormatError("주식 시뮬레이션 저장 파일이 아닙니다.")
+    if version not in SUPPORTED_VERSIONS:
+        raise SaveFormatError(f"지원하지 않는 저장 파일 버전입니다: {version}")
+    view = memoryview(data)
+    offset = _HEADER.size
+    meta = json.loads(bytes(view[offset:offset + meta_len]).decode("utf-8"))
+    offset += meta_len
+
+    swap = meta.get("byteorder", sys.byteorder) != sys.byteorder
+    sections = {}
+    for name, typecode, count in meta["sections"]:
+        arr = array(typecode)
+        end = offset + count * arr.itemsize
+        if end > len(data):
+            raise SaveFormatError(f"저장 파일이 잘렸습니다: {name}")
+        arr.frombytes(view[offset:end])
+        if swap:
+            arr.byteswap()
+        sections[name] = arr
+        offset = end
+    return meta, sections
+
+
+def load(path, market_cls, company_cls, investor_classes):
+    """
+    저장 파일에서 (market, investors)를 복원합니다.
+    investor_classes: {클래스 이름: 클래스} (예: {"Investor": Investor, "Bot": Bot})
+    시장 난수 생성기의 상태도 저장 시점으로 되돌립니다.
+    """
+    return _restore(*read(path), market_cls, company_cls, investor_classes)
+
+
+def loads(data, market_cls, company_cls, investor_classes):
+    """dumps()로 만든 bytes에서 (market, investors) 복원"""
+    return _restore(*parse(data), market_cls, company_cls, investor_classes)
+
+
+def restore(meta, sections, market_cls, company_cls, investor_classes):
+    """parse()와 같은 모양의 (메타데이터, {구역 이름: 배열})에서 (market, investors) 복원 (timeline.py 되감기용)"""
+    return _restore(meta, sections, market_cls, company_cls, investor_classes)
+
+
+def _restore(meta, sections, market_cls, company_cls, investor_classes):
+    mm = meta["market"]
+
+    # 투자자
+    investors = []
+    for rec in meta["investors"]:
+        cls = investor_classes[rec["class"]]
+        if "strategy" in rec:
+            inv = cls(rec["name"], rec["cash"], strategy=rec["strategy"])
+            inv.focus_sector = rec["focus_sector"]
+        else:
+            inv = cls(rec["name"], rec["cash"])
+        inv.holdings = rec["holdings"]
+        inv.marks = rec["marks"]
+        inv.holdings_value = rec["holdings_value"]
+        investors.append(inv)
+    equity = sections["equity"]
+    offset = 0
+    for inv, rec in zip(investors, meta["investors"]):
+        inv.equity_curve = equity[offset:offset + rec["equity"]]
+        offset += rec["equity"]
+
+    # 시장
+    market = market_cls(use_order_book=mm["use_order_book"], regime_table=mm["regime_table"], seed=mm.get("seed"))
+    for name in MARKET_FIELDS:
+        setattr(market, name, mm[name])
+
+    # 뉴스 (버전 1 파일은 dict 목록)
+    if "news" in sections:
+        market.news = news.NewsLog.restore(sections["news"].tobytes(), mm["news"]["names"], mm["news"]["texts"])
+    else:
+        market.news = news.NewsLog.from_dicts(mm.get("all_messages", []))
+
+    # 회사와 캔들 (열 배열을 회사별로 잘라 씀)
+    opens, highs = sections["candles.open"], sections["candles.high"]
+    lows, closes = sections["candles.low"], sections["candles.close"]
+    by_id = {}
+    offset = 0
+    for rec in meta["companies"]:
+        c = company_cls(rec["name"], rec["sector"], 0.0, rng=market.rng)
+        for name in COMPANY_FIELDS:
+            setattr(c, name, rec[name])
+        end = offset + rec["candles"]
+        c.candles = candles.CandleSeries(opens[offset:end], highs[offset:end], lows[offset:end], closes[offset:end])
+        offset = end
+        c.holders = {investors[i]: None for i in rec["holders"]}
+        by_id[c.id] = c
+    market.companies = [by_id[cid] for cid in mm["companies"]]
+    market.bankrupt_companies = [by_id[cid] for cid in mm["bankrupt_companies"]]
+    market.company_by_id = {cid: by_id[cid] for cid in mm["company_by_id"]}
+
+    # 대기 주문 (등록 순서대로 복원하여 가격대별 시간 우선순위 유지)
+    # OCO 짝 번호는 나중에 추가된 칸이라 예전 파일에는 없음
+    siblings = []
+    for order_id, inv_index, company_id, order_type, price, quantity, *rest in mm["orders"]:
+        order = market.orders.restore(order_id, investors[inv_index], company_id, order_type, price, quantity)
+        if rest and rest[0] is not None:
+            siblings.append((order, rest[0]))
+    for order, sibling_id in siblings:
+        sibling = market.orders.orders.get(sibling_id)
+        if sibling is not None:
+            market.orders.link(order, sibling)
+    market.orders.next_id = mm["next_order_id"]
+
+    # 지표 기록
+    hm = mm["history"]
+    hist = history.IndicatorHistory(hm["names"], [(lv["resolution"], lv["capacity"]) for lv in hm["levels"]])
+    hist.first_tick = hm["first_tick"]
+    hist.last_tick = hm["last_tick"]
+    for k, (level, lv) in enumerate(zip(hist.levels, hm["levels"])):
+        data = sections[f"history.{k}"]
+        cap = lv["capacity"]
+        for j, name in enumerate(hist.names):
+            buf = level.buffers[name]
+            buf.data = data[j * cap:(j + 1) * cap]
+            buf.head = lv["head"]
+            buf.size = lv["size"]
+        level.sums = lv["sums"]
+        level.pending = lv["pending"]
+        level.appended = lv["appended"]
+    market.history = hist
+
+    # 체결 원장 (원장 도입 전 저장 파일에는 없음)
+    if "ledger" in sections:
+        market.ledger.load(sections["ledger"].tobytes(), mm["ledger"])
+
+    version, internal, gauss_next = meta["random_state"]
+    market.rng.setstate((version, tuple(internal), gauss_next))
+    return market, investors
@@ -0,0 +1,170 @@
+# philox.py
+# 카운터 기반 난수 (Philox4x32-10): (시드, 틱, 대상, 용도)마다 독립된 난수 스트림
+
+import hashlib
+
+# 스트림 용도 (같은 틱, 같은 대상이라도 용도가 다르면 서로 독립)
+PRICE = 1        # 회사 주가/재무 갱신
+NEWS = 2         # 뉴스와 특별 이벤트 (틱당 하나)
+INTERACTION = 3  # 회사 간 상호작용 (주도하는 회사 기준)
+BOT = 4          # 봇 투자자 매매 결정
+ECONOMY = 5      # 경제/국가 지표 변동 (틱당 하나)
+LISTING = 6      # 샤드 유니버스 회사 상장 시 초기값 (회사 번호 기준)
+STRUCTURE = 7    # 샤드 유니버스 합병/상장 결정 (틱당 하나)
+WARMUP = 8       # 게임 시작 전 과거 주가 기록 (회사 기준)
+FORECAST = 9     # 회사 상세 차트의 앞날 예측 경로 시드 (회사 기준)
+
+_M32 = 0xFFFFFFFF
+_WEYL0 = 0x9E3779B9
+_WEYL1 = 0xBB67AE85
+_TO_UNIT = 1.0 / 4294967296.0  # 2**-32
+
+
+def key_schedule(key):
+    """64비트 키로부터 10라운드 각각의 (k0, k1)을 미리 계산해 평탄한 튜플로 반환"""
+    k0 = key & _M32
+    k1 = (key >> 32) & _M32
+    schedule = []
+    for _ in range(10):
+        schedule += (k0, k1)
+        k0 = (k0 + _WEYL0) & _M32
+        k1 = (k1 + _WEYL1) & _M32
+    return tuple(schedule)
+
+
+def philox_block(c0, c1, c2, c3, schedule):
+    """
+    Philox4x32-10 블록 함수: 128비트 카운터(32비트 4개)로 32비트 정수 4개를 만듭니다.
+    순수 파이썬에서 가장 빠르도록 라운드를 풀어 쓰고 키 스케줄은 key_schedule()로 미리 계산합니다.
+    """
+    (k0, k1, k2, k3, k4, k5, k6, k7, k8, k9,
+     k10, k11, k12, k13, k14, k15, k16, k17, k18, k19) = schedule
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k0, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k1, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k2, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k3, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k4, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k5, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k6, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k7, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k8, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k9, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k10, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k11, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k12, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k13, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k14, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k15, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k16, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k17, p0 & 0xFFFFFFFF
+    p0 = 0xD2511F53 * c0
+    p1 = 0xCD9E8D57 * c2
+    c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k18, p1 & 0xFFFFFFFF, (p0 >> 32) ^ c3 ^ k19, p0 & 0xFFFFFFFF
+    return c0, c1, c2, c3
+
+
+def philox4x32(c0, c1, c2, c3, k0, k1):
+    """키를 32비트 두 개로 받는 Philox4x32-10 (Random123 기준값 검증용)"""
+    return philox_block(c0, c1, c2, c3, key_schedule(k0 | (k1 << 32)))
+
+
+def key_of(text):
+    """문자열(회사 id, 봇 이름 등)을 64비트 정수로. hash()와 달리 프로세스와 무관하게 고정"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class Stream:
+    """
+    스트림 하나. 블록 번호만 늘려 가며 Philox 블록을 계산하므로 다른 스트림의 소비량과 무관하며,
+    random.Random 중 시뮬레이션에서 쓰는 메서드(random, uniform, randint, choice, sample)를 제공합니다.
+    난수 하나에 32비트 정수 하나를 쓰므로 random()의 해상도는 2**-32입니다.
+    """
+    __slots__ = ("_schedule", "_c1", "_c2", "_c3", "_block", "_words", "_pos")
+
+    def __init__(self, schedule, tick, subject):
+        self._schedule = schedule
+        self._c1 = tick & _M32
+        self._c2 = subject & _M32
+        self._c3 = (subject >> 32) & _M32
+        self._block = 0
+        self._words = ()
+        self._pos = 4
+
+    def next_word(self):
+        pos = self._pos
+        if pos == 4:
+            self._words = philox_block(self._block, self._c1, self._c2, self._c3, self._schedule)
+            self._block += 1
+            pos = 0
+        self._pos = pos + 1
+        return self._words[pos]
+
+    def random(self):
+        return self.next_word() * _TO_UNIT
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.next_word() * _TO_UNIT
+
+    def randbelow(self, n):
+        return int(n * self.next_word() * _TO_UNIT)
+
+    def randint(self, a, b):
+        return a + self.randbelow(b - a + 1)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randbelow(len(seq))]
+
+    def sample(self, population, k):
+        """부분 Fisher-Yates 셔플로 k개 비복원 추출"""
+        pool = list(population)
+        n = len(pool)
+        if not 0 <= k <= n:
+            raise ValueError("Sample larger than population or is negative")
+        for i in range(k):
+            j = i + self.randbelow(n - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+
+class Streams:
+    """
+    시장 하나의 스트림 공급자. stream(용도, 틱, 대상)은 같은 인자에 대해 항상 같은 난수열을 돌려주므로
+    회사를 어떤 순서로, 어느 스레드/프로세스에서 갱신해도 결과가 같습니다.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._schedules = {}  # 용도 -> Philox 키 스케줄 (키는 시드와 용도에서 유도)
+        self._subjects = {}  # 대상 문자열 -> 64비트 키
+
+    def schedule(self, purpose):
+        schedule = self._schedules.get(purpose)
+        if schedule is None:
+            schedule = key_schedule(key_of(f"{self.seed}:{purpose}"))
+            self._schedules[purpose] = schedule
+        return schedule
+
+    def subject(self, text):
+        value = self._subjects.get(text)
+        if value is None:
+            value = key_of(text)
+            self._subjects[text] = value
+        return value
+
+    def stream(self, purpose, tick, subject=""):
+        return Stream(self.schedule(purpose), tick, self.subject(subject) if subject else 0)
+
+    def keyed(self, purpose, tick, key):
+        """대상이 이미 정수 키인 경우 (샤드 유니버스의 회사 번호 등). 0은 대상 없는 스트림과 같음"""
+        return Stream(self.schedule(purpose), tick, key)
@@ -0,0 +1,100 @@
+# prebuild.py
+# 다음 게임을 백그라운드 스레드에서 미리 만들어 두고, 끝난 게임의 시장은 같은 스레드에서 정리
+
+import concurrent.futures
+import logging
+import time
+
+RELEASE_CHUNK = 64  # 정리할 때 한 번에 놓는 회사/투자자 수 (사이사이 메인 스레드가 GIL을 얻을 수 있도록)
+
+
+class GamePrebuilder:
+    """
+    재시작용 다음 게임 준비.
+
+    prepare(key, build, *args)는 목표 성공/실패 화면에 들어갈 때 부르며, 전용 스레드가 build(*args)로
+    (market, investors)를 만듭니다. take(key)는 재시작 버튼에서 부르며 준비된 게임을 돌려주므로 클릭은
+    교체만 합니다 (아직 만드는 중이면 끝날 때까지 기다리고, 같은 key로 준비하지 않았으면 None).
+    release(market, investors)는 더 쓰지 않는 게임을 넘겨 큰 객체 해제를 같은 스레드에서 하게 합니다.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._key = None
+        self._future = None
+
+        # 통계
+        self.built = 0
+        self.waited = 0  # take()가 준비를 기다려야 했던 횟수
+        self.last_build_time = 0.0
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="prebuild")
+        return self._executor.submit(fn, *args)
+
+    def prepare(self, key, build, *args):
+        """key 조건의 다음 게임 준비를 시작 (이미 같은 key로 준비 중이거나 준비됐으면 그대로 둠)"""
+        if self._future is not None and self._key == key:
+            return
+        self.cancel()
+        self._key = key
+        self._future = self._submit(self._build, build, args)
+
+    def _build(self, build, args):
+        t0 = time.perf_counter()
+        game = build(*args)
+        self.last_build_time = time.perf_counter() - t0
+        self.built += 1
+        logging.info(f"다음 게임 준비 완료 ({self.last_build_time * 1000:.1f} ms)")
+        return game
+
+    def take(self, key):
+        """준비된 (market, investors). key가 다르거나 준비하지 않았거나 준비 중 오류가 났으면 None"""
+        future, self._future = self._future, None
+        if future is None or self._key != key:
+            return None
+        if not future.done():
+            self.waited += 1
+        try:
+            return future.result()
+        except Exception as e:
+            logging.error(f"다음 게임 준비 실패: {e}")
+            return None
+
+    def cancel(self):
+        """준비 중이거나 준비된 게임을 버림 (만든 게임은 정리 스레드에서 해제)"""
+        future, self._future = self._future, None
+        if future is not None and not future.cancel():
+            future.add_done_callback(lambda f: f.exception() is None and self.release(*f.result()))
+
+    def release(self, market, investors):
+        """끝난 게임을 백그라운드에서 해제. 호출한 쪽은 넘긴 뒤 자신의 참조를 놓아야 합니다."""
+        try:
+            self._submit(_release, [market, list(investors)])
+        except RuntimeError:
+            pass  # 이미 닫혔으면 참조가 사라질 때 그 자리에서 해제됨
+
+    def close(self):
+        """남은 준비/정리를 취소하고 스레드 종료 (프로그램 종료 전 호출)"""
+        self._future = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _release(game):
+    """
+    game은 [market, investors] 목록으로 받아 비우므로 작업 항목이 참조를 계속 쥐고 있지 않습니다.
+    시장이 가진 회사 목록을 따로 잡은 뒤 시장을 먼저 놓고(뉴스/원장 같은 큰 버퍼 해제),
+    회사와 투자자는 RELEASE_CHUNK개씩 놓습니다. 한 번에 놓으면 해제가 끝날 때까지 GIL을 쥐고 있으므로
+    메인 스레드의 프레임이 그만큼 밀립니다.
+    """
+    market, investors = game
+    game.clear()
+    companies = list(market.companies) + list(market.bankrupt_companies)
+    del market
+    for objects in (companies, investors):
+        while objects:
+            del objects[-RELEASE_CHUNK:]
+            time.sleep(0)
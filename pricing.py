@@ -0,0 +1,97 @@
+# pricing.py
+# 회사 한 곳의 틱 단위 주가/재무 변화와 파산 판정 (Company와 샤드 워커가 같은 식을 사용)
+
+MAX_PRICE = 30000000
+LOW_PRICE_THRESHOLD = 10000  # 이보다 낮으면 파산 경고일수 빠르게 증가
+HIGH_PRICE_THRESHOLD = 70000  # 주가가 높다고 판단하는 기준
+HIGH_DEBT_THRESHOLD = 2.0  # 부채 비율이 높은 기준 (완화)
+BANKRUPTCY_WARNING_DAYS = 10  # 경고일수가 이 이상이면 파산
+MIN_CAPITAL = 500  # 자본이 이보다 적으면 파산
+
+# 틱당 변동 범위 (경제 국면 배율 적용 전)
+VOLATILITY_MIN = 0.00005
+VOLATILITY_MAX = 0.00025
+TREND_RANGE = 0.00025  # 추세 배율 1 ± TREND_RANGE
+
+
+def price_adjustment(economic_factors=None, national_factors=None):
+    """경제/국가 지표에 따른 종가 변동 배율 (틱마다 모든 회사에 공통)"""
+    adjustment = 1.0
+    if economic_factors:
+        adjustment += 0.00005 * economic_factors.get('gdp_growth', 2.0)
+        adjustment -= 0.00005 * economic_factors.get('inflation', 2.0)
+        adjustment -= 0.00002 * economic_factors.get('interest_rate', 1.5)
+        adjustment -= 0.00005 * economic_factors.get('unemployment', 1.0)
+    if national_factors:
+        # 국가 요인이 주가에 미치는 영향 (예시로 총 자산, 출산율, 인구 추가)
+        adjustment += 0.00003 * national_factors.get('total_assets', 23000.0)
+        adjustment += 0.00002 * national_factors.get('birth_rate', 1.5)
+        adjustment += 0.00001 * national_factors.get('population', 1000000)
+    return adjustment
+
+
+def step(prev_close, capital, debt, revenue, net_income, news_impact, news_impact_days,
+         econ_factor, adjustment, rng):
+    """
+    한 틱 진행. 난수는 rng에서 항상 같은 순서로 9개를 뽑습니다.
+    반환: (시가, 고가, 저가, 종가, 자본, 부채, 매출, 순이익, 남은 뉴스 영향 일수)
+    """
+    # 기본 변동성 축소
+    base_volatility = econ_factor * rng.uniform(VOLATILITY_MIN, VOLATILITY_MAX)  # 절반으로 축소
+    trend_factor = 1 + rng.uniform(-TREND_RANGE, TREND_RANGE)  # 절반으로 축소
+
+    # 뉴스로 인한 추가 변동 적용 (점진적으로 완화)
+    if news_impact_days > 0:
+        news_impact_days -= 1
+        trend_factor += news_impact * 0.5
+
+    # 가격 변동 계산
+    change_factor = rng.uniform(-base_volatility, base_volatility)
+    open_price = prev_close * trend_factor
+    high_price = open_price * (1 + rng.uniform(0, base_volatility))
+    low_price = open_price * (1 - rng.uniform(0, base_volatility))
+    close_price = open_price * (1 + change_factor * adjustment)
+
+    # 가격 제한 적용
+    high_price = min(high_price, MAX_PRICE)
+    low_price = max(low_price, 0)
+    close_price = max(min(close_price, MAX_PRICE), 0)
+
+    if high_price < low_price:
+        high_price, low_price = low_price, high_price
+
+    price_change = (close_price - prev_close) / prev_close if prev_close != 0 else 0
+    capital += capital * price_change / rng.uniform(1.0, 1.5)  # 영향 감소
+    # 자본이 음수가 되지 않도록 제한
+    if capital < 0:
+        capital = 0
+
+    debt += debt * -1 * price_change / rng.uniform(0.5, 0.8)
+    if debt < 0:
+        debt = 0
+
+    # 재무 정보 업데이트 (매출과 순이익, 순이익은 음수가 될 수도 있음)
+    revenue += rng.uniform(-50000, 50000)
+    revenue = max(100000, revenue)  # 최소 매출 제한
+    net_income += rng.uniform(-50000, 50000)
+
+    return open_price, high_price, low_price, close_price, capital, debt, revenue, net_income, news_impact_days
+
+
+def bankruptcy_step(price, capital, debt, warning_days):
+    """파산 경고일수 갱신. 반환: (경고일수, 파산 여부)"""
+    debt_ratio = debt / max(capital, 1)  # 자본이 0일 경우 방지
+
+    # 주가가 낮으면 파산 경고일수 증가
+    if price < LOW_PRICE_THRESHOLD:
+        warning_days += 0.7  # 더 빠르게 경고일수 증가
+    elif debt_ratio > HIGH_DEBT_THRESHOLD:
+        if price > HIGH_PRICE_THRESHOLD:
+            warning_days += 0.2  # 주가가 높으면 증가량 감소
+        else:
+            warning_days += 0.5
+    else:
+        warning_days = 0  # 부채가 안정되면 초기화
+
+    # 파산 조건 확인
+    return warning_days, warning_days >= BANKRUPTCY_WARNING_DAYS or capital < MIN_CAPITAL
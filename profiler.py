@@ -0,0 +1,290 @@
+# profiler.py
+# Market.next_day 단계별 소요 시간과 틱당 이벤트(뉴스/파산/합병 등) 수 기록,
+# 그리고 필요할 때만 켜는 cProfile/스택 샘플링 기록 (다음 N프레임 또는 N틱)
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from array import array
+
+# next_day 단계 (순서대로)
+SENTIMENT = 0     # 정세 갱신
+ECONOMY = 1       # 경제/국가 지표 갱신
+PRICES = 2        # 회사 주가/재무 갱신과 파산 판정
+INTERACTIONS = 3  # 회사 간 상호작용 (합병/계약/투자)
+BOTS = 4          # 마켓 메이커 호가 갱신과 봇 매매
+BANKRUPTCY = 5    # 파산 처리와 상장 폐지
+LISTINGS = 6      # 신규 상장
+ORDERS = 7        # 대기 주문 발동
+MARKING = 8       # 투자자 평가액 갱신
+NEWS = 9          # 뉴스 생성
+INDICATORS = 10   # 지표 시계열 기록
+PHASES = ("sentiment", "economy", "prices", "interactions", "bots", "bankruptcy",
+          "listings", "orders", "marking", "news", "indicators")
+TOTAL = len(PHASES)  # 틱 전체 (샘플 배열의 마지막 칸)
+
+WINDOW = 1024  # 백분위를 계산하는 최근 틱 수
+
+# 함수 단위 기록 (Capture)
+FRAMES = "frames"
+TICKS = "ticks"
+CAPTURE_FRAMES = 90  # F9 한 번에 기록할 프레임 수 (30 FPS 기준 3초)
+CAPTURE_TICKS = 48  # Shift+F9 한 번에 기록할 틱 수 (게임 내 하루)
+CAPTURE_DIR = "profiles"
+STACK_DEPTH = 64  # 호출 그래프에서 스택을 복원할 때 최대 깊이
+
+
+class TickProfiler:
+    """
+    단계별 소요 시간 기록. Market.profiler에 연결하면 next_day가 단계마다 lap()을 부르고, 연결하지 않으면
+    (None) 단계마다 None 검사만 하므로 비용이 없습니다.
+
+    최근 WINDOW틱의 단계별 시간은 고정 크기 배열에 돌려 가며 쓰고(틱마다 새 객체를 만들지 않음),
+    백분위는 조회할 때만 정렬해서 계산합니다.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.samples = [array("d", bytes(8 * window)) for _ in range(TOTAL + 1)]
+        self.totals = [0.0] * (TOTAL + 1)  # 단계별 누적 시간 (초)
+        self.ticks = 0
+        self.events = {}  # 이벤트 종류 -> 누적 수
+        self.last_events = {}  # 마지막 틱의 이벤트 종류 -> 수
+        self._slot = 0
+        self._start = 0.0
+        self._last = 0.0
+        self._messages = 0
+
+    def begin(self, market):
+        self._messages = len(market.news)
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.samples[phase][self._slot] = elapsed
+        self.totals[phase] += elapsed
+        self._last = now
+
+    def end(self, market):
+        elapsed = self._last - self._start
+        self.samples[TOTAL][self._slot] = elapsed
+        self.totals[TOTAL] += elapsed
+        # 이번 틱에 추가된 메시지를 종류별로 셈
+        log = market.news
+        counts = {}
+        for i in range(self._messages, len(log)):
+            kind = log.kind_name(i)
+            counts[kind] = counts.get(kind, 0) + 1
+        for kind, n in counts.items():
+            self.events[kind] = self.events.get(kind, 0) + n
+        self.last_events = counts
+        self.ticks += 1
+        self._slot = (self._slot + 1) % self.window
+
+    def reset(self):
+        self.__init__(self.window)
+
+    def recent(self, phase):
+        """최근 기록된 틱들의 해당 단계 시간 목록 (초, 오래된 순)"""
+        n = min(self.ticks, self.window)
+        column = self.samples[phase]
+        if self.ticks <= self.window:
+            return column[:n].tolist()
+        return column[self._slot:].tolist() + column[:self._slot].tolist()
+
+    def percentiles(self, phase, qs=(50, 95, 99)):
+        """최근 틱 기준 백분위 (초). 기록이 없으면 0"""
+        values = sorted(self.recent(phase))
+        if not values:
+            return tuple(0.0 for _ in qs)
+        last = len(values) - 1
+        return tuple(values[min(last, int(round(q / 100 * last)))] for q in qs)
+
+    def summary(self):
+        """단계별 {p50, p95, p99, max, mean, share} (ms)와 이벤트 수"""
+        phases = {}
+        total = self.totals[TOTAL] or 1.0
+        for phase, name in enumerate(PHASES + ("total",)):
+            p50, p95, p99 = self.percentiles(phase)
+            recent = self.recent(phase)
+            phases[name] = {
+                "p50": p50 * 1000, "p95": p95 * 1000, "p99": p99 * 1000,
+                "max": max(recent) * 1000 if recent else 0.0,
+                "mean": self.totals[phase] / self.ticks * 1000 if self.ticks else 0.0,
+                "share": self.totals[phase] / total,
+            }
+        return {"ticks": self.ticks, "phases": phases, "events": dict(self.events)}
+
+    def slowest(self):
+        """최근 p95 기준으로 가장 느린 단계 이름"""
+        return max(range(TOTAL), key=lambda phase: self.percentiles(phase, (95,))[0], default=0) if self.ticks else None
+
+    def report(self):
+        """표 형태 문자열 (헤드리스 출력용)"""
+        s = self.summary()
+        lines = [f"tick profile: {s['ticks']} ticks (percentiles over last {min(s['ticks'], self.window)})",
+                 f"{'phase':<13} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mean ms':>8} {'share':>6}"]
+        for name, p in s["phases"].items():
+            lines.append(f"{name:<13} {p['p50']:>8.3f} {p['p95']:>8.3f} {p['p99']:>8.3f} {p['max']:>8.3f} "
+                         f"{p['mean']:>8.3f} {p['share'] * 100:>5.1f}%")
+        if s["events"]:
+            per_tick = ", ".join(f"{kind} {n / s['ticks']:.3f}" for kind, n in sorted(s["events"].items()))
+            lines.append(f"events per tick: {per_tick}")
+        return "\n".join(lines)
+
+
+def _label(func):
+    filename, _, name = func
+    if filename == "~":  # 내장 함수
+        return name.strip("<>")
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def collapsed_stacks(stats):
+    """
+    cProfile 통계(pstats.Stats.stats)에서 접힌 스택(flame graph 입력) {"a;b;c": 마이크로초}을 추정합니다.
+    cProfile은 호출자-피호출자 관계만 기록하므로, 함수의 자체 시간을 호출자별 몫으로 나누고
+    그 위는 호출자의 누적 시간 비율로 나눠 올라갑니다 (재귀와 STACK_DEPTH를 넘는 부분은 잘림).
+    """
+    stacks = {}
+
+    def up(func, weight, path, seen):
+        callers = stats[func][4] if func in stats else {}
+        callers = {c: v for c, v in callers.items() if c not in seen}
+        total = sum(v[3] for v in callers.values())
+        if not callers or total <= 0 or len(path) >= STACK_DEPTH:
+            key = ";".join(reversed(path))
+            stacks[key] = stacks.get(key, 0.0) + weight
+            return
+        for caller, v in callers.items():
+            share = weight * v[3] / total
+            if share > 1e-7:
+                up(caller, share, path + [_label(caller)], seen | {caller})
+
+    for func, (_, _, tt, _, callers) in stats.items():
+        if tt <= 0:
+            continue
+        if not callers:
+            up(func, tt, [_label(func)], {func})
+            continue
+        for caller, v in callers.items():
+            if v[2] > 0:
+                up(caller, v[2], [_label(func), _label(caller)], {func, caller})
+    return {key: round(seconds * 1e6) for key, seconds in stacks.items() if seconds * 1e6 >= 0.5}
+
+
+class _StackSampler(threading.Thread):
+    """active인 동안 interval초마다 대상 스레드의 호출 스택을 접힌 스택 문자열로 세는 스레드"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.active = False
+        self._halt = threading.Event()
+
+    def run(self):
+        current_frames = sys._current_frames
+        while not self._halt.wait(self.interval):
+            if not self.active:
+                continue
+            frame = current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def close(self):
+        self._halt.set()
+        self.join()
+
+
+class Capture:
+    """
+    다음 count개 프레임(또는 next_day 호출)만 함수 단위로 기록합니다. 기록할 구간 앞뒤로 start()/stop()을
+    부르고(또는 run(fn, ...)), count개가 차면 directory에 {unit}-{시각}.pstats와 .collapsed를 씁니다.
+    기본은 cProfile이고, sample_interval(초)을 주면 그 간격으로 호출 스택만 훑는 샘플링으로 기록하며
+    (부담이 적지만 pstats는 없음) 접힌 스택에는 실제 스택별 샘플 수가 들어갑니다.
+    Capture가 없는 프레임/틱은 호출하는 쪽의 None 검사 외에 비용이 없습니다.
+    """
+
+    def __init__(self, count, unit=FRAMES, sample_interval=None, directory=CAPTURE_DIR):
+        self.count = count
+        self.unit = unit
+        self.directory = directory
+        self.done = 0
+        self.finished = False
+        self.paths = []
+        self.stamp = time.strftime("%Y%m%d-%H%M%S")
+        self._running = False
+        self._profile = None
+        self._sampler = None
+        if sample_interval:
+            self._sampler = _StackSampler(threading.get_ident(), sample_interval)
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+
+    def start(self):
+        if self.finished or self._running:
+            return
+        self._running = True
+        if self._profile is not None:
+            self._profile.enable()
+        else:
+            self._sampler.active = True
+
+    def stop(self):
+        """구간 하나를 마칩니다. count개가 차서 파일을 썼으면 True"""
+        if not self._running:
+            return False
+        if self._profile is not None:
+            self._profile.disable()
+        else:
+            self._sampler.active = False
+        self._running = False
+        self.done += 1
+        if self.done >= self.count:
+            self.finish()
+            return True
+        return False
+
+    def run(self, fn, *args):
+        """fn(*args)를 구간 하나로 기록하고 결과를 반환"""
+        self.start()
+        try:
+            return fn(*args)
+        finally:
+            self.stop()
+
+    def finish(self):
+        """지금까지 기록한 것을 파일로 쓰고 경로 목록을 반환 (count를 못 채웠어도 씀)"""
+        if self.finished:
+            return self.paths
+        if self._running:
+            self.stop()
+            if self.finished:
+                return self.paths
+        self.finished = True
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.unit}-{self.stamp}")
+        if self._profile is not None:
+            self.paths.append(base + ".pstats")
+            self._profile.dump_stats(base + ".pstats")
+            stacks = collapsed_stacks(pstats.Stats(self._profile).stats) if self.done else {}
+        else:
+            self._sampler.close()
+            stacks = self._sampler.stacks
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for key, weight in sorted(stacks.items()):
+                f.write(f"{key} {weight}\n")
+        self.paths.append(base + ".collapsed")
+        return self.paths
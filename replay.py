@@ -0,0 +1,94 @@
+# replay.py
+# 저널 재생: 같은 시작 조건에서 다시 시뮬레이션하며 플레이어 입력을 기록된 틱에 적용
+
+import persistence
+
+CHECKPOINT_EVERY = 48 * 5  # 체크포인트 간격 (틱, 게임 내 5일)
+
+
+class Replayer:
+    """
+    저널을 헤드리스로 재생합니다.
+
+    start_fn(start): 저널의 시작 조건으로 (market, investors)를 만듭니다.
+    restore_fn(data): persistence.dumps()로 만든 체크포인트 바이트에서 (market, investors)를 복원합니다.
+
+    재생하면서 checkpoint_every 틱마다 체크포인트를 남기므로, seek()은 목표 틱 이전의 가장 가까운
+    체크포인트에서부터만 다시 시뮬레이션합니다.
+    """
+
+    def __init__(self, journal, start_fn, restore_fn, checkpoint_every=CHECKPOINT_EVERY):
+        self.journal = journal
+        self.restore_fn = restore_fn
+        self.checkpoint_every = checkpoint_every
+        self.inputs = {}  # 틱 -> 그 틱에 적용할 입력 목록 (기록 순서)
+        self.expected = {}  # 틱 -> 세션 종료 시 기록된 상태 해시
+        for entry in journal.entries:
+            if entry["action"] == "end":
+                self.expected[entry["tick"]] = entry.get("fingerprint")
+            else:
+                self.inputs.setdefault(entry["tick"], []).append(entry)
+        self.market, self.investors = start_fn(journal.start)
+        self.market.journal = None
+        self.start_tick = self.market.day_count
+        self.checkpoints = {}  # 틱 -> 상태 바이트
+        self._checkpoint()
+
+    @property
+    def tick(self):
+        return self.market.day_count
+
+    @property
+    def end_tick(self):
+        """저널에 기록된 마지막 틱 (입력 또는 종료 기록)"""
+        ticks = list(self.inputs) + list(self.expected)
+        return max(ticks) if ticks else self.start_tick
+
+    def _checkpoint(self):
+        tick = self.market.day_count
+        if tick not in self.checkpoints:
+            self.checkpoints[tick] = persistence.dumps(self.market, self.investors)
+
+    def step(self):
+        """이 틱에 기록된 입력을 적용한 뒤 한 틱 진행"""
+        market = self.market
+        if (market.day_count - self.start_tick) % self.checkpoint_every == 0:
+            self._checkpoint()
+        player = self.investors[0]
+        for entry in self.inputs.get(market.day_count, ()):
+            market.apply_input(player, entry)
+        market.next_day(self.investors, 0)
+
+    def run_to(self, tick):
+        while self.market.day_count < tick:
+            self.step()
+        return self.market, self.investors
+
+    def seek(self, tick):
+        """
+        tick 시점(그 틱의 입력 적용 전)으로 이동합니다. 앞으로 가는 경우 현재 상태가 체크포인트보다
+        가까우면 그대로 이어서 진행하고, 아니면 가장 가까운 이전 체크포인트에서 다시 시뮬레이션합니다.
+        """
+        tick = max(tick, self.start_tick)
+        base = max(t for t in self.checkpoints if t <= tick)
+        current = self.market.day_count
+        if not base <= current <= tick:
+            self.market, self.investors = self.restore_fn(self.checkpoints[base])
+            self.market.journal = None
+        return self.run_to(tick)
+
+    def verify(self):
+        """현재 틱에 기록된 종료 상태 해시와 비교. 기록이 없으면 None"""
+        expected = self.expected.get(self.market.day_count)
+        if expected is None:
+            return None
+        return persistence.fingerprint(self.market, self.investors) == expected
+
+    def verify_seek(self, tick, end=None):
+        """
+        tick으로 되감은(체크포인트에서 복원한) 뒤 end(기본: 저널 끝)까지 다시 재생해 verify().
+        복원한 상태가 원래 세션과 같은 결과로 이어지는지, 즉 저장 상태에 빠진 것이 없는지 확인합니다.
+        """
+        self.seek(tick)
+        self.run_to(self.end_tick if end is None else end)
+        return self.verify()
@@ -0,0 +1,595 @@
+# shard.py
+# 회사 유니버스를 여러 워커 프로세스에 나눠 진행하는 샤드 시장 (수십만~100만 개 회사용)
+#
+# 게임 화면의 Market과는 별개의 대규모 유니버스입니다. 회사는 정수 번호(cid)로 구분하고
+# 번호 % 워커 수로 샤드를 정합니다. 워커는 자기 샤드 회사의 주가/재무와 파산만 진행하고,
+# 여러 샤드에 걸친 일(경제 지표, 뉴스 효과, 합병, 신규 상장)은 코디네이터가 틱 사이에 처리합니다.
+# 모든 난수는 philox 스트림(용도, 틱, 회사 번호)에서 나오므로 워커 수와 무관하게 결과가 같습니다.
+
+import hashlib
+import heapq
+import math
+import multiprocessing
+import struct
+import time
+from array import array
+
+import Message
+import economy
+import philox
+import pricing
+
+SECTORS = ("IT", "의약", "화학", "게임", "에너지", "금융")
+TOP_MOVERS = 5  # 스냅샷에 담는 상승/하락 상위 회사 수
+MERGE_PROB = 0.02  # 틱당 합병 발생 확률
+NEWS_PROB = 0.7  # 틱당 뉴스 발생 확률 (Market.next_day와 같음)
+ECONOMIC_NEWS_FRACTION = 0.2  # 경제 뉴스가 영향을 주는 회사 비율
+FIXED_POINT = 10000  # 섹터 합계를 정수로 더해 샤드 나누는 방식과 무관하게 같은 값이 되도록 하는 배율
+
+# 회사 상태 레코드 (샤드 간 이동/조회용): cid, 섹터, 시가, 고가, 저가, 종가, 자본, 부채, 매출, 순이익,
+# 뉴스 영향, 뉴스 영향 일수, 파산 경고일수
+_RECORD = struct.Struct("<qbdddddddddid")
+
+
+def company_name(cid):
+    return f"U{cid:07d}"
+
+
+class Shard:
+    """
+    샤드 하나의 회사 상태를 열 배열로 보관하고 진행합니다 (워커 프로세스 안에서 실행).
+    행 순서는 삭제 시 마지막 행과 바꾸므로 회사 번호 순서와 다를 수 있지만, 계산이 회사별 스트림만
+    쓰므로 결과는 행 순서와 무관합니다.
+    """
+
+    def __init__(self, seed):
+        self.streams = philox.Streams(seed)
+        self.rows = {}  # cid -> 행 번호
+        self.cid = array("q")
+        self.sector = array("b")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.capital = array("d")
+        self.debt = array("d")
+        self.revenue = array("d")
+        self.net_income = array("d")
+        self.news_impact = array("d")
+        self.news_days = array("i")
+        self.warning = array("d")
+        self._columns = (self.sector, self.open, self.high, self.low, self.close, self.capital, self.debt,
+                         self.revenue, self.net_income, self.news_impact, self.news_days, self.warning)
+
+    def __len__(self):
+        return len(self.cid)
+
+    def list_companies(self, cids):
+        """신규 상장. 초기값은 회사 번호의 LISTING 스트림에서 정해짐 (Company.__init__과 같은 범위)"""
+        for cid in cids:
+            rng = self.streams.keyed(philox.LISTING, 0, cid)
+            sector = rng.randbelow(len(SECTORS))
+            price = rng.uniform(1000, 50000)
+            capital = rng.randint(5000000, 10000000)
+            debt = rng.randint(1000, 5000000)
+            revenue = rng.uniform(1000000, 5000000)
+            net_income = rng.uniform(-500000, 500000)
+            self._append((cid, sector, price, price, price, price, capital, debt, revenue, net_income, 0.0, 0, 0.0))
+        return len(self.cid)
+
+    def add(self, records):
+        """다른 샤드에서 옮겨 오거나 코디네이터가 만든 회사 추가 (bytes 레코드 목록)"""
+        for rec in records:
+            self._append(_RECORD.unpack(rec))
+        return len(self.cid)
+
+    def _append(self, values):
+        self.rows[values[0]] = len(self.cid)
+        self.cid.append(values[0])
+        for column, value in zip(self._columns, values[1:]):
+            column.append(value)
+
+    def _record(self, row):
+        return _RECORD.pack(self.cid[row], *(column[row] for column in self._columns))
+
+    def fetch(self, cids):
+        """회사 상태 레코드 조회 (없는 회사는 None)"""
+        rows = self.rows
+        return [self._record(rows[cid]) if cid in rows else None for cid in cids]
+
+    def remove(self, cids):
+        """회사 제거 후 제거한 회사의 레코드 반환 (마지막 행을 빈 자리로 옮겨 O(1))"""
+        removed = []
+        for cid in cids:
+            row = self.rows.pop(cid, None)
+            if row is None:
+                continue
+            removed.append(self._record(row))
+            last = len(self.cid) - 1
+            if row != last:
+                moved = self.cid[last]
+                self.cid[row] = moved
+                for column in self._columns:
+                    column[row] = column[last]
+                self.rows[moved] = row
+            self.cid.pop()
+            for column in self._columns:
+                column.pop()
+        return removed
+
+    def apply_effects(self, tick, effects):
+        """
+        코디네이터가 정한 뉴스 효과 적용.
+        ("company", cid, 일별 영향, 일수) / ("sector", 섹터, 비율, 일별 영향, 일수) / ("all", 비율, 일별 영향, 일수)
+        비율로 고르는 경우 회사마다 (NEWS, 틱, 회사 번호) 스트림으로 포함 여부를 정합니다.
+        """
+        keyed = self.streams.keyed
+        for effect in effects:
+            kind = effect[0]
+            if kind == "company":
+                _, cid, impact, days = effect
+                row = self.rows.get(cid)
+                if row is not None:
+                    self.news_impact[row] = impact
+                    self.news_days[row] = days
+                continue
+            if kind == "sector":
+                _, sector, fraction, impact, days = effect
+            else:
+                _, fraction, impact, days = effect
+                sector = None
+            for row, cid in enumerate(self.cid):
+                if sector is not None and self.sector[row] != sector:
+                    continue
+                if fraction < 1.0 and keyed(philox.NEWS, tick, cid).random() >= fraction:
+                    continue
+                self.news_impact[row] = impact
+                self.news_days[row] = days
+
+    def step(self, tick, econ_factor, adjustment, effects=()):
+        """
+        한 틱 진행 후 요약 반환. 파산한 회사는 샤드에서 제거합니다.
+        요약: 회사 수, 파산한 회사 번호, 섹터별 종가 합(고정소수점 정수)과 회사 수, 상승/하락 상위, 소요 시간
+        """
+        t0 = time.perf_counter()
+        if effects:
+            self.apply_effects(tick, effects)
+        keyed = self.streams.keyed
+        price_step = pricing.step
+        bankruptcy_step = pricing.bankruptcy_step
+        cid, sector = self.cid, self.sector
+        opens, highs, lows, closes = self.open, self.high, self.low, self.close
+        capital, debt, revenue, net_income = self.capital, self.debt, self.revenue, self.net_income
+        news_impact, news_days, warning = self.news_impact, self.news_days, self.warning
+        sector_sum = [0] * len(SECTORS)
+        sector_count = [0] * len(SECTORS)
+        changes = array("d", bytes(8 * len(cid)))
+        bankrupt = []
+        for row in range(len(cid)):
+            c = cid[row]
+            prev = closes[row]
+            (o, h, l, close, cap, dbt, rev, ni, days) = price_step(
+                prev, capital[row], debt[row], revenue[row], net_income[row], news_impact[row], news_days[row],
+                econ_factor, adjustment, keyed(philox.PRICE, tick, c))
+            opens[row] = o
+            highs[row] = h
+            lows[row] = l
+            closes[row] = close
+            capital[row] = cap
+            debt[row] = dbt
+            revenue[row] = rev
+            net_income[row] = ni
+            news_days[row] = days
+            warning[row], is_bankrupt = bankruptcy_step(close, cap, dbt, warning[row])
+            if is_bankrupt:
+                bankrupt.append(c)
+                continue
+            changes[row] = (close - prev) / prev if prev else 0.0
+            s = sector[row]
+            sector_sum[s] += round(close * FIXED_POINT)
+            sector_count[s] += 1
+
+        if bankrupt:
+            gone = set(bankrupt)
+            live = [row for row in range(len(cid)) if cid[row] not in gone]
+        else:
+            live = range(len(cid))
+        key = lambda row: (changes[row], -cid[row])
+        gainers = [(changes[r], cid[r], closes[r]) for r in heapq.nlargest(TOP_MOVERS, live, key=key)]
+        losers = [(changes[r], cid[r], closes[r]) for r in heapq.nsmallest(TOP_MOVERS, live, key=key)]
+        bankrupt.sort()
+        self.remove(bankrupt)
+        return {
+            "companies": len(self.cid),
+            "bankrupt": bankrupt,
+            "sector_sum": sector_sum,
+            "sector_count": sector_count,
+            "gainers": gainers,
+            "losers": losers,
+            "elapsed": time.perf_counter() - t0,
+        }
+
+    def digest(self):
+        """샤드 상태 해시 (회사별 해시의 XOR이라 샤드를 어떻게 나눠도 전체 XOR이 같음)"""
+        value = 0
+        for row in range(len(self.cid)):
+            value ^= int.from_bytes(hashlib.blake2b(self._record(row), digest_size=8).digest(), "little")
+        return value
+
+
+def _serve(conn, seed):
+    """워커 프로세스 본체: (메서드 이름, 인자)를 받아 Shard에서 실행하고 (성공 여부, 결과)를 돌려줌"""
+    shard = Shard(seed)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        method, args = message
+        try:
+            conn.send((True, getattr(shard, method)(*args)))
+        except Exception as e:  # 워커는 죽지 않고 오류를 코디네이터에 전달
+            conn.send((False, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class _LocalHandle:
+    """워커 없이 같은 프로세스에서 샤드를 실행 (workers=0, 직렬 기준 실행)"""
+
+    def __init__(self, seed):
+        self.shard = Shard(seed)
+        self._result = None
+
+    def send(self, method, *args):
+        self._result = getattr(self.shard, method)(*args)
+
+    def ready(self):
+        return True
+
+    def recv(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class _ProcessHandle:
+    """워커 프로세스 하나와의 파이프"""
+
+    def __init__(self, seed, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, seed), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, method, *args):
+        self.conn.send((method, args))
+
+    def ready(self):
+        return self.conn.poll()
+
+    def recv(self):
+        ok, result = self.conn.recv()
+        if not ok:
+            raise RuntimeError(f"샤드 워커 오류: {result}")
+        return result
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class UniverseSnapshot:
+    """틱마다 코디네이터가 샤드 요약을 모아 만든 집계 (UI 표시용)"""
+    __slots__ = ("tick", "companies", "bankruptcies", "listings", "merges", "total_bankruptcies",
+                 "economic_condition", "sentiment", "sector_index", "gainers", "losers", "news",
+                 "elapsed", "shard_elapsed")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+
+class ShardedMarket:
+    """
+    샤드 시장 코디네이터.
+
+    workers=0이면 샤드 하나를 같은 프로세스에서 실행하고(직렬 기준), 1 이상이면 워커 프로세스를 그 수만큼
+    띄웁니다. 같은 seed면 워커 수와 무관하게 회사 상태가 비트 단위로 같습니다 (digest()로 확인).
+
+    UI는 begin_tick()으로 틱을 시작하고 매 프레임 poll()로 결과를 확인하면 되고(워커가 계산하는 동안
+    메인 루프가 멈추지 않음), 헤드리스 실행은 step()을 쓰면 됩니다.
+    """
+
+    def __init__(self, companies, workers=0, seed=None, regime_table=None):
+        self.seed = seed if seed is not None else int.from_bytes(hashlib.blake2b(str(time.time_ns()).encode(), digest_size=8).digest(), "little") >> 1
+        self.streams = philox.Streams(self.seed)
+        self.workers = workers
+        if workers > 0:
+            context = multiprocessing.get_context()
+            self.handles = [_ProcessHandle(self.seed, context) for _ in range(workers)]
+        else:
+            self.handles = [_LocalHandle(self.seed)]
+
+        self.tick = 0
+        self.sentiment_amplitude = 20
+        self.sentiment_frequency = 0.1
+        self.sentiment_phase = 0.0
+        self.policy_sentiment_score = 0.0
+        self.economic_factors = dict(economy.INITIAL_ECONOMIC_FACTORS)
+        self.national_factors = dict(economy.INITIAL_NATIONAL_FACTORS)
+        self.regime_engine = economy.RegimeEngine(regime_table)
+
+        self.next_cid = 1  # 회사 번호 (0은 대상 없는 스트림과 겹치므로 1부터)
+        self.alive = bytearray(1)  # cid -> 상장 여부
+        self.count = 0
+        self.total_bankruptcies = 0
+        self.pending_effects = []  # 다음 틱 시작 시 샤드에 보낼 뉴스 효과
+        self.pending_news = []
+        self.snapshot = None
+        self._in_flight = False
+        self._began = 0.0
+        self._economic_condition = economy.REGIME_NORMAL
+
+        self._list(companies)
+
+    # ---- 샤드 배치 ----
+
+    def _shard_of(self, cid):
+        return self.handles[cid % len(self.handles)]
+
+    def _list(self, n):
+        """신규 상장 n개 (번호 순서대로 배정). 새 번호 목록 반환"""
+        start = self.next_cid
+        stop = start + n
+        self.next_cid = stop
+        self.alive.extend(b"\x01" * n)
+        self.count += n
+        shards = len(self.handles)
+        for k, handle in enumerate(self.handles):
+            first = start + (k - start) % shards
+            handle.send("list_companies", range(first, stop, shards))
+        for handle in self.handles:
+            handle.recv()
+        return range(start, stop)
+
+    def _call(self, by_shard, method):
+        """{샤드 번호: 인자 목록}을 각 샤드에 보내고 결과를 모음"""
+        for k, args in by_shard.items():
+            self.handles[k].send(method, args)
+        return {k: self.handles[k].recv() for k in by_shard}
+
+    def _group(self, cids):
+        groups = {}
+        for cid in cids:
+            groups.setdefault(cid % len(self.handles), []).append(cid)
+        return groups
+
+    def fetch(self, cids):
+        """회사 상태 조회: {cid: dict} (상장 폐지된 회사는 빠짐)"""
+        result = {}
+        for records in self._call(self._group(cids), "fetch").values():
+            for rec in records:
+                if rec is not None:
+                    values = _RECORD.unpack(rec)
+                    result[values[0]] = _record_dict(values)
+        return result
+
+    # ---- 틱 진행 ----
+
+    @property
+    def economic_condition(self):
+        return self._economic_condition
+
+    def begin_tick(self):
+        """다음 틱 시작: 코디네이터 몫(정세, 지표)을 계산하고 샤드에 진행을 요청"""
+        if self._in_flight:
+            return False
+        self.tick += 1
+        self.sentiment_phase += self.sentiment_frequency
+        self.policy_sentiment_score = self.sentiment_amplitude * math.sin(self.sentiment_phase)
+        regime = economy.regime_of(self.policy_sentiment_score)
+        self._economic_condition = regime
+        self.regime_engine.step(self.economic_factors, self.national_factors, regime,
+                                self.streams.stream(philox.ECONOMY, self.tick))
+        econ_factor = economy.REGIME_VOLATILITY[regime]
+        adjustment = pricing.price_adjustment(self.economic_factors, self.national_factors)
+        effects = self.pending_effects
+        self.pending_effects = []
+        self._began = time.perf_counter()
+        for handle in self.handles:
+            handle.send("step", self.tick, econ_factor, adjustment, effects)
+        self._in_flight = True
+        return True
+
+    def poll(self):
+        """진행 중인 틱이 끝났으면 마무리하고 UniverseSnapshot 반환, 아니면 None (막히지 않음)"""
+        if not self._in_flight or not all(handle.ready() for handle in self.handles):
+            return None
+        return self._finish_tick([handle.recv() for handle in self.handles])
+
+    def step(self):
+        """한 틱 진행 (결과를 기다림)"""
+        self.begin_tick()
+        summaries = [handle.recv() for handle in self.handles]
+        return self._finish_tick(summaries)
+
+    def _finish_tick(self, summaries):
+        self._in_flight = False
+        shard_elapsed = [s["elapsed"] for s in summaries]
+
+        # 파산: 상장 폐지 후 같은 수만큼 신규 상장 (번호 순서로 처리해 샤드 응답 순서와 무관)
+        bankrupt = sorted(cid for s in summaries for cid in s["bankrupt"])
+        for cid in bankrupt:
+            self.alive[cid] = 0
+        self.count -= len(bankrupt)
+        self.total_bankruptcies += len(bankrupt)
+        listings = len(self._list(len(bankrupt))) if bankrupt else 0
+
+        # 샤드에 걸친 합병과 다음 틱의 뉴스 효과
+        merges = self._structure_events()
+        self.pending_news = []
+        self._generate_news()
+
+        sector_sum = [sum(s["sector_sum"][i] for s in summaries) for i in range(len(SECTORS))]
+        sector_count = [sum(s["sector_count"][i] for s in summaries) for i in range(len(SECTORS))]
+        sector_index = {name: (sector_sum[i] / sector_count[i] / FIXED_POINT if sector_count[i] else 0.0)
+                        for i, name in enumerate(SECTORS)}
+        gainers = heapq.nlargest(TOP_MOVERS, (g for s in summaries for g in s["gainers"]),
+                                 key=lambda g: (g[0], -g[1]))
+        losers = heapq.nsmallest(TOP_MOVERS, (g for s in summaries for g in s["losers"]),
+                                 key=lambda g: (g[0], -g[1]))
+        self.snapshot = UniverseSnapshot(
+            tick=self.tick, companies=self.count, bankruptcies=len(bankrupt), listings=listings,
+            merges=merges, total_bankruptcies=self.total_bankruptcies,
+            economic_condition=self._economic_condition, sentiment=self.policy_sentiment_score,
+            sector_index=sector_index, gainers=gainers, losers=losers, news=list(self.pending_news),
+            elapsed=time.perf_counter() - self._began, shard_elapsed=shard_elapsed)
+        return self.snapshot
+
+    def _random_alive(self, rng, tries=16):
+        """상장 중인 회사 번호 하나 (거절 표본 추출, 실패하면 None)"""
+        for _ in range(tries):
+            cid = 1 + rng.randbelow(self.next_cid - 1)
+            if self.alive[cid]:
+                return cid
+        return None
+
+    def _structure_events(self):
+        """합병: 두 회사(다른 샤드일 수 있음)를 빼서 새 번호의 회사 하나로 합침. 합병 건수 반환"""
+        rng = self.streams.stream(philox.STRUCTURE, self.tick)
+        if self.count < 2 or rng.random() >= MERGE_PROB:
+            return 0
+        a = self._random_alive(rng)
+        b = self._random_alive(rng)
+        if a is None or b is None or a == b:
+            return 0
+        records = {}
+        for recs in self._call(self._group([a, b]), "remove").values():
+            for rec in recs:
+                values = _RECORD.unpack(rec)
+                records[values[0]] = values
+        ra, rb = records[a], records[b]
+        cid = self.next_cid
+        self.next_cid += 1
+        self.alive[a] = self.alive[b] = 0
+        self.alive.append(1)
+        self.count -= 1
+        sector = ra[1] if rng.random() < 0.5 else rb[1]
+        price = (ra[5] + rb[5]) / 2
+        merged = _RECORD.pack(cid, sector, price, price, price, price, ra[6] + rb[6], ra[7] + rb[7],
+                              ra[8] + rb[8], ra[9] + rb[9], 0.0, 0, 0.0)
+        self._call({cid % len(self.handles): [merged]}, "add")
+        self.pending_news.append(f"[합병] {company_name(a)}와 {company_name(b)}가 합병하여 {company_name(cid)}로 출범")
+        return 1
+
+    def _generate_news(self):
+        """Market.add_random_news와 같은 종류/범위의 뉴스를 정하고 효과는 다음 틱 시작 시 샤드에 적용"""
+        rng = self.streams.stream(philox.NEWS, self.tick)
+        if rng.random() >= NEWS_PROB:
+            return
+        msg_type = rng.randbelow(8)
+        if msg_type in (0, 1, 4, 6):
+            cid = self._random_alive(rng)
+            if cid is None:
+                return
+            if msg_type in (0, 4):
+                impact = rng.uniform(0.005, 0.01)
+                days = rng.randint(20, 30)
+                self.pending_news.append(f"[호재] {company_name(cid)}")
+            else:
+                impact = rng.uniform(-0.075, -0.025)
+                days = rng.randint(3, 7)
+                self.pending_news.append(f"[악재] {company_name(cid)}")
+            self.pending_effects.append(("company", cid, impact / days, days))
+        elif msg_type in (2, 3):
+            sector = rng.randbelow(len(SECTORS))
+            cands = Message.POLICY_MESSAGES_BY_SECTOR.get(SECTORS[sector], [])
+            impact = rng.uniform(-0.0025, 0.0025)
+            days = rng.randint(20, 30)
+            if cands:
+                self.pending_news.append(rng.choice(cands).replace("{sector}", SECTORS[sector]))
+            self.pending_effects.append(("sector", sector, 1.0, impact / days, days))
+        else:
+            p_positive = max(0.1, min((self.policy_sentiment_score + 30) / 60, 0.9))
+            if rng.random() < p_positive:
+                impact = rng.uniform(0.001, 0.002)
+                text, delta = rng.choice(Message.ECONOMIC_NEWS_POSITIVE)
+            else:
+                impact = rng.uniform(-0.002, -0.001)
+                text, delta = rng.choice(Message.ECONOMIC_NEWS_NEGATIVE)
+            days = rng.randint(20, 30)
+            self.pending_news.append(text)
+            self.pending_effects.append(("all", ECONOMIC_NEWS_FRACTION, impact / days, days))
+            self.policy_sentiment_score += delta
+
+    # ---- 검증/정리 ----
+
+    def digest(self):
+        """전체 회사 상태 해시 (워커 수와 무관). 진행 중인 틱이 있으면 먼저 끝냄"""
+        if self._in_flight:
+            self._finish_tick([handle.recv() for handle in self.handles])
+        for handle in self.handles:
+            handle.send("digest")
+        value = 0
+        for handle in self.handles:
+            value ^= handle.recv()
+        return f"{value:016x}"
+
+    def close(self):
+        if self._in_flight:
+            for handle in self.handles:
+                try:
+                    handle.recv()
+                except (EOFError, OSError, RuntimeError):
+                    pass
+            self._in_flight = False
+        for handle in self.handles:
+            handle.close()
+        self.handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _record_dict(values):
+    (cid, sector, open_price, high, low, close, capital, debt, revenue, net_income,
+     news_impact, news_days, warning) = values
+    return {
+        "cid": cid, "name": company_name(cid), "sector": SECTORS[sector],
+        "open": open_price, "high": high, "low": low, "close": close,
+        "capital": capital, "debt": debt, "revenue": revenue, "net_income": net_income,
+        "news_impact": news_impact, "news_impact_days": news_days, "bankruptcy_warning_days": warning,
+    }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="샤드 시장 헤드리스 실행")
+    parser.add_argument("--companies", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    with ShardedMarket(args.companies, workers=args.workers, seed=args.seed) as market:
+        print(f"listed {args.companies:,} companies on {args.workers} workers in {time.perf_counter() - t0:.1f} s")
+        for _ in range(args.ticks):
+            snap = market.step()
+            print(f"tick {snap.tick}: {snap.companies:,} companies, bankrupt {snap.bankruptcies}, "
+                  f"merges {snap.merges}, {snap.elapsed * 1000:.0f} ms "
+                  f"({snap.companies / snap.elapsed:,.0f} companies/s)")
+        print("digest", market.digest())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
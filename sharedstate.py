@@ -0,0 +1,394 @@
+# sharedstate.py
+# 시장 상태를 공유 메모리에 올려 다른 로컬 프로세스(분석, 봇, 렌더러)가 복사 없이 읽도록 함
+#
+# 세그먼트 두 개를 씁니다.
+#   제어 세그먼트(이름 = name): 헤더(매직, 시퀀스, 틱, 슬롯 수, 용량, 데이터 세그먼트 이름)
+#   데이터 세그먼트: 회사 슬롯별 id/이름/섹터/상태, 최신 OHLC/자본/부채, 캔들 수, 캔들 이력
+# 용량이 모자라면 더 큰 데이터 세그먼트를 새로 만들고 헤더의 이름을 바꿉니다 (읽는 쪽이 자동으로 다시 붙음).
+#
+# 시퀀스 락: 쓰는 쪽은 쓰기 전에 시퀀스를 홀수로, 다 쓴 뒤 짝수로 올립니다. 읽는 쪽은 짝수 시퀀스를 본 뒤
+# 읽고, 다 읽은 뒤 시퀀스가 그대로면 그 틱의 일관된 상태를 읽은 것이고 아니면 다시 읽습니다.
+
+import mmap
+import os
+import struct
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import shard
+
+MAGIC = b"STKSHM01"
+VERSION = 1
+SECTORS = shard.SECTORS  # 섹터는 이 순서의 번호로 저장 (목록에 없으면 -1)
+
+# 슬롯 상태
+EMPTY = 0
+LISTED = 1
+BANKRUPT = 2  # 파산했지만 아직 상장 폐지 전
+
+ID_BYTES = 16  # uuid
+NAME_BYTES = 32  # utf-8, 남는 자리는 0
+LATEST_FIELDS = ("open", "high", "low", "close", "capital", "debt")
+CANDLE_FIELDS = ("open", "high", "low", "close")
+
+# 헤더: 매직, 시퀀스(8바이트 정렬), 틱, 버전, 슬롯 수(사용한 최대 슬롯 번호 + 1), 슬롯 용량, 슬롯당 캔들 용량,
+# 데이터 세그먼트 이름
+_HEADER = struct.Struct("<8sQqIIII40s")
+_SEQ_OFFSET = 8
+_FIELDS = struct.Struct("<qIIII40s")  # 헤더에서 시퀀스 뒤 부분 (쓰는 쪽은 시퀀스를 따로 갱신)
+_FIELDS_OFFSET = 16
+
+
+def attach_readonly(name):
+    """
+    기존 세그먼트를 읽기 전용으로 매핑. POSIX에서는 shm_open(O_RDONLY) + mmap(ACCESS_READ)로 열어
+    resource tracker에 등록되지 않으므로 읽는 쪽이 종료해도 세그먼트가 지워지지 않습니다.
+    """
+    if os.name == "nt":
+        return shared_memory.SharedMemory(name=name)
+    import _posixshmem
+    fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+    try:
+        return _ReadOnlySegment(mmap.mmap(fd, os.fstat(fd).st_size, access=mmap.ACCESS_READ))
+    finally:
+        os.close(fd)
+
+
+class _ReadOnlySegment:
+    """SharedMemory와 같은 buf/close를 갖는 읽기 전용 매핑"""
+
+    def __init__(self, mapping):
+        self._mmap = mapping
+        self.buf = memoryview(mapping)
+
+    def close(self):
+        self.buf.release()
+        self._mmap.close()
+
+
+def _data_size(capacity, candle_capacity):
+    return _Layout.offsets(capacity, candle_capacity)[-1]
+
+
+class _Layout:
+    """데이터 세그먼트 위의 배열 보기 (memoryview, 복사 없음). 읽는 쪽은 읽기 전용 보기"""
+
+    @staticmethod
+    def offsets(capacity, candle_capacity):
+        """(id, 이름, 섹터, 상태, 최신값, 캔들 수, 캔들, 전체 크기) 오프셋"""
+        ids = 0
+        names = ids + capacity * ID_BYTES
+        sector = names + capacity * NAME_BYTES
+        state = sector + capacity
+        latest = (state + capacity + 7) // 8 * 8
+        counts = latest + len(LATEST_FIELDS) * capacity * 8
+        candles = counts + capacity * 8
+        end = candles + len(CANDLE_FIELDS) * capacity * candle_capacity * 8
+        return ids, names, sector, state, latest, counts, candles, end
+
+    def __init__(self, buf, capacity, candle_capacity, readonly):
+        mv = memoryview(buf)
+        if readonly:
+            mv = mv.toreadonly()
+        ids, names, sector, state, latest, counts, candles, end = self.offsets(capacity, candle_capacity)
+        self.capacity = capacity
+        self.candle_capacity = candle_capacity
+        self.ids = mv[ids:names]
+        self.names = mv[names:sector]
+        self.sector = mv[sector:state].cast("b")
+        self.state = mv[state:state + capacity].cast("B")
+        for k, field in enumerate(LATEST_FIELDS):
+            start = latest + k * capacity * 8
+            setattr(self, field, mv[start:start + capacity * 8].cast("d"))
+        self.candle_count = mv[counts:candles].cast("q")
+        self.candle_data = mv[candles:end].cast("d")
+
+    def candle_base(self, field_index, slot):
+        return (field_index * self.capacity + slot) * self.candle_capacity
+
+    def candles(self, slot):
+        """슬롯의 캔들 열 보기 {"open": memoryview, ...} (복사 없음, read() 안에서만 유효)"""
+        n = self.candle_count[slot]
+        return {field: self.candle_data[self.candle_base(k, slot):self.candle_base(k, slot) + n]
+                for k, field in enumerate(CANDLE_FIELDS)}
+
+    def name(self, slot):
+        return bytes(self.names[slot * NAME_BYTES:(slot + 1) * NAME_BYTES]).rstrip(b"\0").decode("utf-8", "replace")
+
+    def company_id(self, slot):
+        return str(uuid.UUID(bytes=bytes(self.ids[slot * ID_BYTES:(slot + 1) * ID_BYTES])))
+
+    def release(self):
+        for value in list(vars(self).values()):
+            if isinstance(value, memoryview):
+                value.release()
+
+
+class SharedMarketWriter:
+    """
+    게임 프로세스 쪽. 틱마다 publish(market)를 부르면 바뀐 부분만 공유 메모리에 씁니다.
+    회사는 id별로 고정 슬롯을 받고(상장 폐지되면 슬롯 재사용), 캔들은 지난번에 쓴 이후 것만 씁니다.
+    """
+
+    def __init__(self, name=None, capacity=64, candle_capacity=4096):
+        self.name = name or f"stock_{os.getpid()}"
+        self.capacity = capacity
+        self.candle_capacity = candle_capacity
+        self.generation = 0
+        self.control = shared_memory.SharedMemory(name=self.name, create=True, size=_HEADER.size)
+        self._seq = self.control.buf[_SEQ_OFFSET:_SEQ_OFFSET + 8].cast("Q")
+        self.data = None
+        self.layout = None
+        self.slots = {}  # 회사 id -> 슬롯
+        self.free = []  # 비어 있는 슬롯 (작은 번호부터 재사용)
+        self.slot_count = 0
+        self.written = []  # 슬롯별로 공유 메모리에 쓴 캔들 수
+        self.tick = 0
+        self._allocate(capacity, candle_capacity)
+        self.control.buf[:len(MAGIC)] = MAGIC
+        self._write_header()
+
+    def _data_name(self):
+        return f"{self.name}_{self.generation}"
+
+    def _allocate(self, capacity, candle_capacity):
+        """새 데이터 세그먼트 생성 (이전 세그먼트는 헤더를 바꾼 뒤 publish에서 정리)"""
+        self.generation += 1
+        self.capacity = capacity
+        self.candle_capacity = candle_capacity
+        self.data = shared_memory.SharedMemory(name=self._data_name(), create=True,
+                                               size=_data_size(capacity, candle_capacity))
+        self.layout = _Layout(self.data.buf, capacity, candle_capacity, readonly=False)
+        self.written = [0] * capacity
+
+    def _write_header(self):
+        _FIELDS.pack_into(self.control.buf, _FIELDS_OFFSET, self.tick, VERSION, self.slot_count,
+                          self.capacity, self.candle_capacity, self._data_name().encode("ascii"))
+
+    def publish(self, market):
+        """현재 시장 상태를 한 틱 분량으로 공개"""
+        companies = [(c, LISTED) for c in market.companies]
+        companies += [(c, BANKRUPT) for c in market.bankrupt_companies]
+        present = {c.id for c, _ in companies}
+
+        self._seq[0] += 1  # 홀수: 쓰는 중
+        try:
+            for cid in [cid for cid in self.slots if cid not in present]:
+                slot = self.slots.pop(cid)
+                self.layout.state[slot] = EMPTY
+                self.free.append(slot)
+            self.free.sort(reverse=True)
+
+            new = [c for c, _ in companies if c.id not in self.slots]
+            longest = max((len(c.candles) for c, _ in companies), default=0)
+            needed = self.slot_count + max(len(new) - len(self.free), 0)
+            if needed > self.capacity or longest > self.candle_capacity:
+                self._grow(max(needed, self.capacity), longest)
+
+            layout = self.layout
+            for c in new:
+                slot = self.free.pop() if self.free else self._next_slot()
+                self.slots[c.id] = slot
+                self.written[slot] = 0
+                layout.ids[slot * ID_BYTES:(slot + 1) * ID_BYTES] = uuid.UUID(c.id).bytes
+                name = c.name.encode("utf-8")[:NAME_BYTES].ljust(NAME_BYTES, b"\0")
+                layout.names[slot * NAME_BYTES:(slot + 1) * NAME_BYTES] = name
+                layout.sector[slot] = SECTORS.index(c.sector) if c.sector in SECTORS else -1
+
+            for c, state in companies:
+                self._write_company(self.slots[c.id], c, state)
+            self.tick = market.day_count
+            self._write_header()
+        finally:
+            self._seq[0] += 1  # 짝수: 일관된 상태
+
+    def _next_slot(self):
+        slot = self.slot_count
+        self.slot_count += 1
+        return slot
+
+    def _write_company(self, slot, c, state):
+        layout = self.layout
+        series = c.candles
+        n = len(series)
+        layout.state[slot] = state
+        if n:
+            layout.open[slot] = series.open[-1]
+            layout.high[slot] = series.high[-1]
+            layout.low[slot] = series.low[-1]
+            layout.close[slot] = series.close[-1]
+        layout.capital[slot] = c.capital
+        layout.debt[slot] = c.debt
+        # 마지막 캔들은 틱 도중(상호작용, 체결)에 바뀔 수 있으므로 다시 씀. 줄어들었으면 처음부터
+        start = self.written[slot] - 1
+        if start < 0 or start > n:
+            start = 0
+        if start < n:
+            for k, field in enumerate(CANDLE_FIELDS):
+                base = layout.candle_base(k, slot)
+                layout.candle_data[base + start:base + n] = series.columns[field][start:n]
+        layout.candle_count[slot] = n
+        self.written[slot] = n
+
+    def _grow(self, capacity, longest):
+        """더 큰 데이터 세그먼트로 옮김. 회사 정보는 publish가 슬롯마다 다시 씀"""
+        old_data, old_layout, old_capacity = self.data, self.layout, self.capacity
+        candle_capacity = self.candle_capacity
+        while candle_capacity < longest:
+            candle_capacity *= 2
+        if capacity > old_capacity:
+            capacity = max(capacity, old_capacity * 2)
+        self._allocate(capacity, candle_capacity)
+        layout = self.layout
+        n = old_capacity
+        layout.ids[:n * ID_BYTES] = old_layout.ids
+        layout.names[:n * NAME_BYTES] = old_layout.names
+        layout.sector[:n] = old_layout.sector
+        layout.state[:n] = old_layout.state
+        old_layout.release()
+        old_data.close()
+        old_data.unlink()  # 이미 붙어 있는 읽는 쪽의 매핑은 닫을 때까지 유효
+
+    def close(self):
+        """세그먼트 제거 (게임 종료 시)"""
+        if self.control is None:
+            return
+        self.layout.release()
+        self._seq.release()
+        for shm in (self.data, self.control):
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedMarketReader:
+    """
+    다른 프로세스 쪽. 세그먼트를 읽기 전용으로 붙여 read(fn)으로 일관된 틱 상태를 읽습니다.
+    fn(layout)은 공유 메모리 위의 보기를 그대로 받으므로 복사가 없고, 읽는 도중 쓰기가 끼어들면
+    fn을 다시 호출합니다 (fn은 부작용 없이 값만 계산해야 함).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.control = attach_readonly(name)
+        self._header = self.control.buf.toreadonly()
+        self._seq = self._header[_SEQ_OFFSET:_SEQ_OFFSET + 8].cast("Q")
+        magic = bytes(self._header[:8])
+        if magic != MAGIC:
+            raise ValueError(f"공유 시장 세그먼트가 아닙니다: {name}")
+        self.data = None
+        self.layout = None
+        self._data_name = None
+        self.retries = 0  # 쓰기와 겹쳐 다시 읽은 횟수 (누적)
+
+    def _attach_data(self, data_name, capacity, candle_capacity):
+        if self.layout is not None:
+            self.layout.release()
+            self.data.close()
+        self.data = attach_readonly(data_name)
+        self.layout = _Layout(self.data.buf, capacity, candle_capacity, readonly=True)
+        self._data_name = data_name
+
+    def read(self, fn, timeout=1.0):
+        """fn(layout, tick, slot_count)을 일관된 상태에서 실행하고 결과 반환"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            seq = self._seq[0]
+            if seq & 1 == 0:
+                _, _, tick, version, slot_count, capacity, candle_capacity, data_name = _HEADER.unpack_from(self._header)
+                data_name = data_name.rstrip(b"\0").decode("ascii")
+                try:
+                    if data_name != self._data_name:
+                        self._attach_data(data_name, capacity, candle_capacity)
+                    result = fn(self.layout, tick, slot_count)
+                except (FileNotFoundError, IndexError, ValueError):
+                    # 세그먼트 교체 중이거나 찢어진 값으로 실패: 시퀀스가 바뀌었으면 다시 읽음
+                    if self._seq[0] == seq:
+                        raise
+                else:
+                    if self._seq[0] == seq:
+                        return result
+            self.retries += 1
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"공유 시장 상태를 {timeout}초 안에 일관되게 읽지 못했습니다")
+            time.sleep(0)
+
+    @property
+    def tick(self):
+        """마지막으로 공개된 틱 (시퀀스 락 없이 읽는 참고값)"""
+        return _HEADER.unpack_from(self._header)[2]
+
+    def snapshot(self):
+        """틱과 상장 회사 요약 목록 (최신값만 복사, 캔들 이력은 read()로 직접 보기)"""
+        def collect(layout, tick, slot_count):
+            rows = []
+            for slot in range(slot_count):
+                state = layout.state[slot]
+                if state == EMPTY:
+                    continue
+                sector = layout.sector[slot]
+                rows.append({
+                    "slot": slot,
+                    "id": layout.company_id(slot),
+                    "name": layout.name(slot),
+                    "sector": SECTORS[sector] if sector >= 0 else None,
+                    "bankrupt": state == BANKRUPT,
+                    "open": layout.open[slot], "high": layout.high[slot],
+                    "low": layout.low[slot], "close": layout.close[slot],
+                    "capital": layout.capital[slot], "debt": layout.debt[slot],
+                    "candles": layout.candle_count[slot],
+                })
+            return tick, rows
+        return self.read(collect)
+
+    def close(self):
+        if self.control is None:
+            return
+        if self.layout is not None:
+            self.layout.release()
+            self.data.close()
+        self._seq.release()
+        self._header.release()
+        self.control.close()
+        self.control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="공유 메모리 시장 상태 보기 (stock.py --share NAME으로 실행한 게임)")
+    parser.add_argument("name", help="공유 세그먼트 이름")
+    parser.add_argument("--interval", type=float, default=1.0, help="출력 간격 (초)")
+    parser.add_argument("--count", type=int, default=0, help="출력 횟수 (0: 계속)")
+    args = parser.parse_args(argv)
+    with SharedMarketReader(args.name) as reader:
+        shown = 0
+        while True:
+            tick, rows = reader.snapshot()
+            listed = [r for r in rows if not r["bankrupt"]]
+            top = sorted(listed, key=lambda r: r["close"], reverse=True)[:5]
+            print(f"tick {tick} (day {tick / 48:.1f}): {len(listed)} listed, {len(rows) - len(listed)} bankrupt | "
+                  + ", ".join(f"{r['name']} {r['close']:,.0f}" for r in top))
+            shown += 1
+            if args.count and shown >= args.count:
+                return 0
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
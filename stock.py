@@ -2,24 +2,50 @@
 
 import pygame
 import random
+import os
 import sys
 import uuid
 import string
+import shutil
+import argparse
 import math
-import Message  # Message.py가 동일한 디렉토리에 있어야 합니다.
+import time
+from array import array
+import orders
+import orderbook
+import economy
+import history
+import candles
+import persistence
+import profiler
+import hud
+import metrics
+import autosave
+import journal
+import replay
+import philox
+import pricing
+import shard
+import sharedstate
+import logpipe
+import ledger
+import news
+import warmup
+import prebuild
+import timeline
+import forecast
 import logging
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, filename='simulation.log',
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# 로깅은 실행할 때 logpipe.configure()로 설정 (가져오기만 하는 몬테카를로/스윕 워커는 파일에 쓰지 않음)
 
 # ############################
 # 2) 회사/마켓/투자자 정의
 # ############################
 
 class Company:
-    def __init__(self, name, sector, initial_price):
-        self.id = str(uuid.uuid4())
+    def __init__(self, name, sector, initial_price, rng=None):
+        self.rng = rng if rng is not None else random  # 소속 시장의 난수 생성기
+        self.id = str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
         self.name = name
         self.sector = sector
         self.is_bankrupt = False
@@ -30,115 +56,49 @@ class Company:
         self.news_impact = 0.0  # 뉴스로 인한 추가 변동률
         self.news_impact_days = 0  # 뉴스 영향 지속 일수
 
-        # 초기 주가 설정
-        self.candles = [{
-            "open": initial_price,
-            "high": initial_price,
-            "low": initial_price,
-            "close": initial_price
-        }]
-        self.capital = random.randint(5000000, 10000000)
-        self.debt = random.randint(1000, 5000000)
+        # 초기 주가 설정 (캔들은 열 단위 배열로 보관)
+        self.candles = candles.CandleSeries()
+        self.candles.append_ohlc(initial_price, initial_price, initial_price, initial_price)
+        self.capital = self.rng.randint(5000000, 10000000)
+        self.debt = self.rng.randint(1000, 5000000)
 
         # 추가된 재무 정보
-        self.revenue = random.uniform(1000000, 5000000)  # 매출
-        self.net_income = random.uniform(-500000, 500000)  # 순이익
-        self.market_share = random.uniform(1.0, 10.0)  # 시장 점유율 (%)
+        self.revenue = self.rng.uniform(1000000, 5000000)  # 매출
+        self.net_income = self.rng.uniform(-500000, 500000)  # 순이익
+        self.market_share = self.rng.uniform(1.0, 10.0)  # 시장 점유율 (%)
         self.competitors = []  # 경쟁사 목록
 
+        # 이 회사 주식을 보유한 투자자 (역색인, 삽입 순서 유지를 위해 dict 사용)
+        self.holders = {}
+
     @property
     def current_price(self):
         """현재 주가 반환"""
         return self.candles[-1]["close"] if self.candles else 0
 
-    def update_price_daily(self, econ_factor=1.0, economic_factors=None, national_factors=None):
+    def update_price_daily(self, econ_factor=1.0, economic_factors=None, national_factors=None, rng=None,
+                           adjustment=None):
+        """
+        한 틱 주가/재무 갱신 (식은 pricing.step). rng는 이 회사, 이 틱 전용 난수 스트림 (없으면 회사의 생성기),
+        adjustment는 지표에 따른 변동 배율로 주지 않으면 economic_factors/national_factors로 계산합니다.
+        """
         if self.is_bankrupt:
             return
+        if rng is None:
+            rng = self.rng
+        if adjustment is None:
+            adjustment = pricing.price_adjustment(economic_factors, national_factors)
 
-        MAX_PRICE = 30000000
-        prev_close = self.current_price
-
-        # 기본 변동성 축소
-        base_volatility = econ_factor * random.uniform(0.00005, 0.00025)  # 절반으로 축소
-        trend_factor = 1 + random.uniform(-0.00025, 0.00025)  # 절반으로 축소
-
-        # 뉴스로 인한 추가 변동 적용
-        news_impact = self.apply_news_impact()
-        trend_factor += news_impact
-
-        # 경제 요인 및 국가 요인 적용
-        price_adjustment = 1.0
-        if economic_factors:
-            price_adjustment += 0.00005 * economic_factors.get('gdp_growth', 2.0)
-            price_adjustment -= 0.00005 * economic_factors.get('inflation', 2.0)
-            price_adjustment -= 0.00002 * economic_factors.get('interest_rate', 1.5)
-            price_adjustment -= 0.00005 * economic_factors.get('unemployment', 1.0)
-        if national_factors:
-            # 국가 요인이 주가에 미치는 영향 (예시로 총 자산, 출산율, 인구 추가)
-            price_adjustment += 0.00003 * national_factors.get('total_assets', 23000.0)
-            price_adjustment += 0.00002 * national_factors.get('birth_rate', 1.5)
-            price_adjustment += 0.00001 * national_factors.get('population', 1000000)
-
-        # 가격 변동 계산
-        change_factor = random.uniform(-base_volatility, base_volatility)
-        open_price = prev_close * trend_factor
-        high_price = open_price * (1 + random.uniform(0, base_volatility))
-        low_price = open_price * (1 - random.uniform(0, base_volatility))
-        close_price = open_price * (1 + change_factor * price_adjustment)
-
-        # 가격 제한 적용
-        high_price = min(high_price, MAX_PRICE)
-        low_price = max(low_price, 0)
-        close_price = max(min(close_price, MAX_PRICE), 0)
-
-        if high_price < low_price:
-            high_price, low_price = low_price, high_price
-
-        self.candles.append({
-            "open": open_price,
-            "high": high_price,
-            "low": low_price,
-            "close": close_price
-        })
-
-        price_change = (close_price - prev_close) / prev_close if prev_close != 0 else 0
-        capital_change = self.capital * price_change / random.uniform(1.0, 1.5)  # 영향 감소
-        self.capital += capital_change
-
-        # 자본이 음수가 되지 않도록 제한
-        if self.capital < 0:
-            self.capital = 0
-
-        debt_change = self.debt * -1 * price_change / random.uniform(0.5, 0.8)
-        self.debt += debt_change
-        if self.debt < 0:
-            self.debt = 0
-
-        # 재무 정보 업데이트 (매출과 순이익)
-        self.revenue += random.uniform(-50000, 50000)  # 매출 변동
-        self.revenue = max(100000, self.revenue)  # 최소 매출 제한
-
-        self.net_income += random.uniform(-50000, 50000)  # 순이익 변동
-        # 순이익이 음수가 될 수도 있음
+        (open_price, high_price, low_price, close_price, self.capital, self.debt, self.revenue, self.net_income,
+         self.news_impact_days) = pricing.step(self.current_price, self.capital, self.debt, self.revenue,
+                                               self.net_income, self.news_impact, self.news_impact_days,
+                                               econ_factor, adjustment, rng)
+        self.candles.append_ohlc(open_price, high_price, low_price, close_price)
 
     def check_bankruptcy(self, econ_factor=1.0, current_day=0):
-        debt_ratio = self.debt / max(self.capital, 1)  # 자본이 0일 경우 방지
-        high_price_threshold = 70000  # 주가가 높다고 판단하는 기준
-        high_debt_threshold = 2.0  # 부채 비율이 높은 기준 (완화)
-
-        # 주가가 낮으면 파산 경고일수 증가
-        if self.current_price < 10000:  # 낮은 주가 기준
-            self.bankruptcy_warning_days += 0.7  # 더 빠르게 경고일수 증가
-        elif debt_ratio > high_debt_threshold:
-            if self.current_price > high_price_threshold:
-                self.bankruptcy_warning_days += 0.2  # 주가가 높으면 증가량 감소
-            else:
-                self.bankruptcy_warning_days += 0.5
-        else:
-            self.bankruptcy_warning_days = 0  # 부채가 안정되면 초기화
-
-        # 파산 조건 확인
-        if self.bankruptcy_warning_days >= 10 or self.capital < 500:
+        self.bankruptcy_warning_days, bankrupt = pricing.bankruptcy_step(
+            self.current_price, self.capital, self.debt, self.bankruptcy_warning_days)
+        if bankrupt:
             self.is_bankrupt = True
             self.bankrupt_day = current_day
 
@@ -162,16 +122,25 @@ class Company:
 class Market:
     REMOVE_AFTER_DAYS = 7  # 파산 후 제거할 일수
 
-    def __init__(self):
+    def __init__(self, use_order_book=False, regime_table=None, seed=None):
+        # 시장 전용 난수 생성기: 같은 시드와 같은 플레이어 입력이면 같은 세션이 재현됨
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.rng = random.Random(self.seed)  # 회사 생성/합병 등 구조 변화용 (순차)
+        self.streams = philox.Streams(self.seed)  # 주가/뉴스/상호작용/봇용 카운터 기반 스트림
+        self.journal = None  # 플레이어 입력 저널 (journal.Journal, 없으면 기록 안 함)
+        self.profiler = None  # 틱 단계별 시간 기록 (profiler.TickProfiler, 없으면 기록 안 함)
+        self.metrics = None  # 내보낼 지표 기록 (metrics.MarketMetrics, 없으면 기록 안 함)
+        self.pending_capture = None  # 복사 중인 자동 저장 스냅샷 (persistence.Capture, 회사를 바꾸기 전에 알림)
+        self.ledger = ledger.Ledger()  # 체결 원장 (투자자는 attach_ledger()로 연결)
+
         self.companies = []
         self.bankrupt_companies = []  # 파산한 회사를 저장할 리스트 추가
-        self.all_messages = []
-        self.recent_messages = []
+        self.news = news.NewsLog()  # 뉴스/이벤트 기록 (본문은 표시할 때 만듦)
         self.day_count = 0
 
         self.policy_sentiment_score = 0
         self.economic_condition_list = ["호황(boom)", "보통(normal)", "불황(recession)", "위기(crisis)"]
-        self.economic_condition_factor_map = [0.8, 1.0, 1.2, 1.5]
+        self.economic_condition_factor_map = list(economy.REGIME_VOLATILITY)
 
         # 정세 변동을 위한 변수 추가
         self.sentiment_amplitude = 20  # 정세 변동 폭
@@ -186,24 +155,15 @@ class Market:
             "위기(crisis)": 0.0
         }
 
-        # 경제적 요인 초기화 (수정됨)
-        self.economic_factors = {
-            "gdp_growth": 2.0,
-            "inflation": 2.0,
-            "interest_rate": 1.5,
-            "unemployment": 1.0,
-            "exchange_rate": 1300.0,  # 초기 환율 (1달러 = 1300원)
-            "raw_material_cost": 100.0,  # 원자재 비용
-            "political_stability": 1.0,  # 정치적 안정성 (0.0 ~ 2.0)
-            "innovation_index": 1.0  # 기술 혁신 지수 (0.0 ~ 2.0)
-        }
+        # 경제적 요인 및 국가 요인 초기화 (초기값/변동 테이블은 economy.py)
+        self.economic_factors = dict(economy.INITIAL_ECONOMIC_FACTORS)
+        self.national_factors = dict(economy.INITIAL_NATIONAL_FACTORS)
+        self.regime_engine = economy.RegimeEngine(regime_table)
 
-        # 국가 요인 추가
-        self.national_factors = {
-            "total_assets": 23000.0,      # 국가의 총 자산 (예시 단위)
-            "birth_rate": 1.5,           # 출산율 (예: 1.5명)
-            "population": 50000000       # 인구 수 (예: 5천만 명)
-        }
+        # 지표 시계열 기록 (정세 점수와 경제 국면 포함)
+        self.history = history.IndicatorHistory(
+            list(self.economic_factors) + list(self.national_factors)
+            + ["policy_sentiment_score", "economic_condition"])
 
         # 타임프레임 설정 (타임프레임은 차트 표시 용도로만 사용)
         self.timeframes = {
@@ -216,17 +176,24 @@ class Market:
 
         self.time_since_last_update = 0.0  # 주가 업데이트 간격 추적
 
+        # 대기 주문 (지정가/손절/익절)
+        self.company_by_id = {}  # id -> Company (파산한 회사 포함)
+        self.orders = orders.OrderManager()
+
+        # 호가창/매칭 엔진 (선택). None이면 모든 거래가 현재가로 바로 체결됨
+        self.exchange = orderbook.Exchange() if use_order_book else None
+
     def stock_surge_event(self):
         candidates = [c for c in self.companies if not c.is_bankrupt and c.current_price < 50000]
         if not candidates:
             return
 
-        target = random.choice(candidates)
-        reason = random.choice(Message.POSITIVE_MESSAGES_BY_SECTOR.get(target.sector, ["이유 불명"]))
+        target = self.rng.choice(candidates)
+        reason = self.rng.choice(news.POSITIVE.get(target.sector, news.UNKNOWN_REASON))
 
         MAX_PRICE = 300000
-        target_price = min(target.current_price * random.uniform(1.03, 1.05), MAX_PRICE)
-        surge_days = random.randint(5, 10)
+        target_price = min(target.current_price * self.rng.uniform(1.03, 1.05), MAX_PRICE)
+        surge_days = self.rng.randint(5, 10)
         daily_increment = (target_price - target.current_price) / surge_days
         volatility_factor = 0.05
 
@@ -236,25 +203,18 @@ class Market:
         target.daily_increment = daily_increment
         target.volatility_factor = volatility_factor
 
-        msg = {
-            "type": "surge",
-            "sector": target.sector,
-            "company": target.name,
-            "text": f"[주가 상승] {target.name}가 {reason}으로 인해 주가 상승 예정!"
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "surge", target.sector, (target.name,), template=reason)
 
-    def invest_in_company(self, c1, c2):
+    def invest_in_company(self, c1, c2, rng):
         """투자 처리"""
-        investment_amount = random.randint(50000, 500000)
+        investment_amount = rng.randint(50000, 500000)
 
         # 투자금 이전
         c1.capital -= investment_amount
         c2.capital += investment_amount
 
         # 투자 수익 반영
-        profit_factor = random.uniform(0.9, 1.2)  # 수익 또는 손실
+        profit_factor = rng.uniform(0.9, 1.2)  # 수익 또는 손실
         c1.capital += investment_amount * profit_factor
 
         # 자본이 음수가 되지 않도록 제한
@@ -262,24 +222,17 @@ class Market:
             c1.capital = 0
 
         # 부채 변화 적용
-        debt_change = c2.debt * random.uniform(-0.05, 0.05)
+        debt_change = c2.debt * rng.uniform(-0.05, 0.05)
         c2.debt += debt_change
         if c2.debt < 0:
             c2.debt = 0
 
         # 뉴스 메시지 추가
-        msg = {
-            "type": "investment",
-            "sector": c1.sector,
-            "company": f"{c1.name} -> {c2.name}",
-            "text": f"[투자] {c1.name}가 {c2.name}에 {investment_amount:,}원을 투자"
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "investment", c1.sector, (c1.name, c2.name), value=investment_amount)
 
-    def acquire_shares(self, c1, c2):
+    def acquire_shares(self, c1, c2, rng):
         """지분 인수"""
-        share_percentage = random.uniform(10, 30)  # 10~30% 지분 인수
+        share_percentage = rng.uniform(10, 30)  # 10~30% 지분 인수
         acquisition_cost = c2.capital * (share_percentage / 100)
 
         # 자본 조정
@@ -294,28 +247,22 @@ class Market:
             c2.debt = 0
 
         # 뉴스 메시지 추가
-        msg = {
-            "type": "acquisition",
-            "sector": c1.sector,
-            "company": f"{c1.name} -> {c2.name}",
-            "text": f"[지분 인수] {c1.name}가 {c2.name}의 {share_percentage:.1f}% 지분을 인수"
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "acquisition", c1.sector, (c1.name, c2.name), value=share_percentage)
 
     def create_merged_name(self, c1, c2):
         """합병 회사 이름 생성"""
         # 두 회사 이름의 첫 글자만 조합하거나 새 랜덤 이름 생성
-        if random.random() < 0.7:  # 70% 확률로 기존 이름 조합
+        if self.rng.random() < 0.7:  # 70% 확률로 기존 이름 조합
             name_part1 = c1.name[:2]  # 첫 번째 회사 이름의 앞 2글자
             name_part2 = c2.name[:2]  # 두 번째 회사 이름의 앞 2글자
             return f"{name_part1}{name_part2}"  # 조합된 이름 반환
         else:  # 30% 확률로 완전히 새 이름 생성
-            return random_company_name()
+            return random_company_name(self.rng)
 
-    def transfer_holdings_to_merged_company(self, c1, c2, new_company, investors):
-        """합병 후 투자자 주식 처리"""
-        for investor in investors:
+    def transfer_holdings_to_merged_company(self, c1, c2, new_company, investors=None):
+        """합병 후 투자자 주식 처리 (두 회사의 보유자만 확인)"""
+        affected = list(dict.fromkeys([*c1.holders, *c2.holders]))
+        for investor in affected:
             # 기존 회사 주식 보유 여부 확인
             h1 = investor.holdings.get(c1.id, {"quantity": 0, "avg_price": 0})
             h2 = investor.holdings.get(c2.id, {"quantity": 0, "avg_price": 0})
@@ -328,28 +275,26 @@ class Market:
             else:
                 new_avg_price = 0
 
+            # 기존 회사 주식 제거
+            investor.remove_holding(c1, transfer=True)
+            investor.remove_holding(c2, transfer=True)
+
             # 새 회사로 주식 이전
             if new_quantity > 0:
-                investor.holdings[new_company.id] = {"quantity": new_quantity, "avg_price": new_avg_price}
-
-            # 기존 회사 주식 제거
-            if c1.id in investor.holdings:
-                del investor.holdings[c1.id]
-            if c2.id in investor.holdings:
-                del investor.holdings[c2.id]
+                investor.add_holding(new_company, new_quantity, new_avg_price)
 
     def merge_or_partner(self, c1, c2, investors):
         """두 회사의 합병 또는 제휴 처리"""
-        if random.random() < 0.5:  # 50% 확률로 합병
+        if self.rng.random() < 0.5:  # 50% 확률로 합병
             # 새로운 회사 이름 생성
             merged_name = self.create_merged_name(c1, c2)
-            merged_sector = c1.sector if random.random() < 0.5 else c2.sector
+            merged_sector = c1.sector if self.rng.random() < 0.5 else c2.sector
             merged_price = (c1.current_price + c2.current_price) / 2
             merged_capital = c1.capital + c2.capital
             merged_debt = c1.debt + c2.debt
 
             # 새 회사 생성
-            new_company = Company(merged_name, merged_sector, merged_price)
+            new_company = Company(merged_name, merged_sector, merged_price, rng=self.rng)
             new_company.capital = merged_capital
             new_company.debt = merged_debt
             self.add_company(new_company)
@@ -360,16 +305,14 @@ class Market:
             # 기존 회사 제거
             self.companies.remove(c1)
             self.companies.remove(c2)
+            for old in (c1, c2):
+                self.company_by_id.pop(old.id, None)
+                self.orders.cancel_company(old.id)
+                if self.exchange is not None:
+                    self.exchange.remove(old.id)
 
             # 뉴스 메시지 추가
-            msg = {
-                "type": "merge",
-                "sector": merged_sector,
-                "company": merged_name,
-                "text": f"[합병] {c1.name}와 {c2.name}가 합병하여 {merged_name}로 새롭게 출범"
-            }
-            self.all_messages.append(msg)
-            self.recent_messages.append(msg)
+            self.news.add(self.day_count, "merge", merged_sector, (merged_name, c1.name, c2.name))
 
         else:  # 제휴 처리
             # 자본 및 부채 공유 (제휴 효과 적용)
@@ -399,33 +342,19 @@ class Market:
             c2.check_bankruptcy(econ_factor=self.economic_factor, current_day=self.day_count)
 
             # 뉴스 메시지 추가
-            msg = {
-                "type": "partner",
-                "sector": c1.sector,
-                "company": f"{c1.name}-{c2.name}",
-                "text": f"[제휴] {c1.name}와 {c2.name}가 전략적 제휴 체결"
-            }
-            self.all_messages.append(msg)
-            self.recent_messages.append(msg)
+            self.news.add(self.day_count, "partner", c1.sector, (c1.name, c2.name))
 
     def add_random_companies(self, num):
         sector_list = ["IT", "의약", "화학", "게임", "에너지", "금융"]
         for _ in range(num):
-            name = random_company_name()
-            sector = random.choice(sector_list)
-            price = random.uniform(5000, 40000)  # 초기 가격 완화
-            new_company = Company(name, sector, price)
+            name = random_company_name(self.rng)
+            sector = self.rng.choice(sector_list)
+            price = self.rng.uniform(5000, 40000)  # 초기 가격 완화
+            new_company = Company(name, sector, price, rng=self.rng)
             # 경쟁사 추가 (예시로 2개)
-            new_company.competitors = random.sample([c.name for c in self.companies], k=min(2, len(self.companies)))
+            new_company.competitors = self.rng.sample([c.name for c in self.companies], k=min(2, len(self.companies)))
             self.add_company(new_company)
-            msg = {
-                "type": "new",
-                "sector": new_company.sector,
-                "company": new_company.name,
-                "text": f"[신규 상장] {new_company.name} ({new_company.sector})"
-            }
-            self.all_messages.append(msg)
-            self.recent_messages.append(msg)
+            self.news.add(self.day_count, "new", new_company.sector, (new_company.name,))
 
     @property
     def economic_condition(self):
@@ -444,164 +373,30 @@ class Market:
         idx = self.economic_condition_list.index(self.economic_condition)
         return self.economic_condition_factor_map[idx]
 
-    def add_company(self, company):
-        self.companies.append(company)
-
     def update_sentiment(self):
         # 사인 함수를 이용한 정세 변동
         self.sentiment_phase += self.sentiment_frequency
         self.policy_sentiment_score = self.sentiment_amplitude * math.sin(self.sentiment_phase)
 
     def update_economic_factors(self):
-        """경제적 요인 업데이트"""
-        # GDP 및 기본 경제 지표 업데이트
-        if self.policy_sentiment_score >= 15 :
-            self.economic_factors["gdp_growth"] += random.uniform(0.5, 1.0)  # 축소된 변동
-            self.economic_factors["gdp_growth"] = max(-5.0, min(self.economic_factors["gdp_growth"], 10.0))
-
-            self.economic_factors["inflation"] += random.uniform(-0.5, -0.25)  # 축소된 변동
-            self.economic_factors["inflation"] = max(-15.0, min(self.economic_factors["inflation"], 15.0))
-
-            self.economic_factors["interest_rate"] += random.uniform(-0.1, -0.05)  # 축소된 변동
-            self.economic_factors["interest_rate"] = max(0.5, min(self.economic_factors["interest_rate"], 15.0))
-
-            self.economic_factors["unemployment"] += random.uniform(-0.15, -0.05)  # 축소된 변동
-            self.economic_factors["unemployment"] = max(0.0, min(self.economic_factors["unemployment"], 7.0))
-
-            self.economic_factors["exchange_rate"] += random.uniform(-3, -1)  # 축소된 변동
-            self.economic_factors["exchange_rate"] = max(1000, min(self.economic_factors["exchange_rate"], 1500))
-
-            self.economic_factors["raw_material_cost"] += random.uniform(-5, -2.5)  # 축소된 변동
-            self.economic_factors["raw_material_cost"] = max(50, min(self.economic_factors["raw_material_cost"], 200))
-
-            self.economic_factors["political_stability"] += random.uniform(0.0, 0.075)  # 축소된 변동
-            self.economic_factors["political_stability"] = max(0.0, min(self.economic_factors["political_stability"], 2.0))
-
-            self.economic_factors["innovation_index"] += random.uniform(0.0, 0.075)  # 축소된 변동
-            self.economic_factors["innovation_index"] = max(0.0, min(self.economic_factors["innovation_index"], 2.0))
-
-            self.national_factors["total_assets"] += random.uniform(-5, -2.5)  # 축소된 변동
-            self.national_factors["total_assets"] = max(18000.0, min(self.national_factors["total_assets"], 28000.0))
-
-            self.national_factors["birth_rate"] += random.uniform(-0.1, -0.05)  # 축소된 변동
-            self.national_factors["birth_rate"] = max(0.5, min(self.national_factors["birth_rate"], 3.0))
-
-            self.national_factors["population"] += random.randint(-5000, -2500)  # 축소된 변동
-            self.national_factors["population"] = max(10000000, min(self.national_factors["population"], 100000000))
-
-        elif self.policy_sentiment_score >= -5:
-            self.economic_factors["gdp_growth"] += random.uniform(-0.25, 0.1)  # 축소된 변동
-            self.economic_factors["gdp_growth"] = max(-5.0, min(self.economic_factors["gdp_growth"], 10.0))
-
-            self.economic_factors["inflation"] += random.uniform(-0.25, 0.25)  # 축소된 변동
-            self.economic_factors["inflation"] = max(-2.0, min(self.economic_factors["inflation"], 15.0))
-
-            self.economic_factors["interest_rate"] += random.uniform(-0.05, 0.05)  # 축소된 변동
-            self.economic_factors["interest_rate"] = max(0.5, min(self.economic_factors["interest_rate"], 15.0))
-
-            self.economic_factors["unemployment"] += random.uniform(-0.05, 0.1)  # 축소된 변동
-            self.economic_factors["unemployment"] = max(0.0, min(self.economic_factors["unemployment"], 7.0))
-
-            self.economic_factors["exchange_rate"] += random.uniform(-5, 5)  # 축소된 변동
-            self.economic_factors["exchange_rate"] = max(1000, min(self.economic_factors["exchange_rate"], 1500))
-
-            self.economic_factors["raw_material_cost"] += random.uniform(-2.5, 2.5)  # 축소된 변동
-            self.economic_factors["raw_material_cost"] = max(50, min(self.economic_factors["raw_material_cost"], 200))
-
-            self.economic_factors["political_stability"] += random.uniform(-0.025, 0.025)  # 축소된 변동
-            self.economic_factors["political_stability"] = max(0.0, min(self.economic_factors["political_stability"], 2.0))
-
-            self.economic_factors["innovation_index"] += random.uniform(-0.025, 0.025)  # 축소된 변동
-            self.economic_factors["innovation_index"] = max(0.0, min(self.economic_factors["innovation_index"], 2.0))
-
-            self.national_factors["total_assets"] += random.uniform(-2.5, 2.5)  # 축소된 변동
-            self.national_factors["total_assets"] = max(18000.0, min(self.national_factors["total_assets"], 28000.0))
-
-            self.national_factors["birth_rate"] += random.uniform(-0.05, 0.05)  # 축소된 변동
-            self.national_factors["birth_rate"] = max(0.5, min(self.national_factors["birth_rate"], 3.0))
-
-            self.national_factors["population"] += random.randint(-2500, 2500)  # 축소된 변동
-            self.national_factors["population"] = max(10000000, min(self.national_factors["population"], 100000000))
-
-        elif self.policy_sentiment_score > -20 :
-            self.economic_factors["gdp_growth"] += random.uniform(-0.75, 0.05)  # 축소된 변동
-            self.economic_factors["gdp_growth"] = max(-5.0, min(self.economic_factors["gdp_growth"], 10.0))
-
-            self.economic_factors["inflation"] += random.uniform(-0.0125, 0.25)  # 축소된 변동
-            self.economic_factors["inflation"] = max(-2.0, min(self.economic_factors["inflation"], 15.0))
-
-            self.economic_factors["interest_rate"] += random.uniform(-0.025, 0.05)  # 축소된 변동
-            self.economic_factors["interest_rate"] = max(0.5, min(self.economic_factors["interest_rate"], 15.0))
-
-            self.economic_factors["unemployment"] += random.uniform(-0.025, 0.1)  # 축소된 변동
-            self.economic_factors["unemployment"] = max(0.0, min(self.economic_factors["unemployment"], 7.0))
-
-            self.economic_factors["exchange_rate"] += random.uniform(-2.5, 5)  # 축소된 변동
-            self.economic_factors["exchange_rate"] = max(1000, min(self.economic_factors["exchange_rate"], 1500))
-
-            self.economic_factors["raw_material_cost"] += random.uniform(-1.25, 2.5)  # 축소된 변동
-            self.economic_factors["raw_material_cost"] = max(50, min(self.economic_factors["raw_material_cost"], 200))
-
-            self.economic_factors["political_stability"] += random.uniform(-0.0125, 0.025)  # 축소된 변동
-            self.economic_factors["political_stability"] = max(0.0, min(self.economic_factors["political_stability"], 2.0))
-
-            self.economic_factors["innovation_index"] += random.uniform(-0.0125, 0.025)  # 축소된 변동
-            self.economic_factors["innovation_index"] = max(0.0, min(self.economic_factors["innovation_index"], 2.0))
-
-            self.national_factors["total_assets"] += random.uniform(0.0, 2.5)  # 축소된 변동
-            self.national_factors["total_assets"] = max(18000.0, min(self.national_factors["total_assets"], 28000.0))
-
-            self.economic_factors["political_stability"] += random.uniform(-0.03, -0.025)  # 축소된 변동
-            self.economic_factors["political_stability"] = max(0.0, min(self.economic_factors["political_stability"], 2.0))
-
-            self.economic_factors["innovation_index"] += random.uniform(-0.03, -0.025)  # 축소된 변동
-            self.economic_factors["innovation_index"] = max(0.0, min(self.economic_factors["innovation_index"], 2.0))
-
-            self.national_factors["birth_rate"] += random.uniform(0.0, 0.05)  # 축소된 변동
-            self.national_factors["birth_rate"] = max(0.5, min(self.national_factors["birth_rate"], 3.0))
-
-            self.national_factors["population"] += random.randint(0, 2500)  # 축소된 변동
-            self.national_factors["population"] = max(10000000, min(self.national_factors["population"], 100000000))
-
-        else :
-            self.economic_factors["gdp_growth"] += random.uniform(-0.2, -0.1)  # 축소된 변동
-            self.economic_factors["gdp_growth"] = max(-5.0, min(self.economic_factors["gdp_growth"], 10.0))
-
-            self.economic_factors["inflation"] += random.uniform(0.25, 0.5)  # 축소된 변동
-            self.economic_factors["inflation"] = max(-2.0, min(self.economic_factors["inflation"], 15.0))
-
-            self.economic_factors["interest_rate"] += random.uniform(0.05, 0.1)  # 축소된 변동
-            self.economic_factors["interest_rate"] = max(0.5, min(self.economic_factors["interest_rate"], 15.0))
-
-            self.economic_factors["unemployment"] += random.uniform(0.05, 0.1)  # 축소된 변동
-            self.economic_factors["unemployment"] = max(0.0, min(self.economic_factors["unemployment"], 7.0))
-
-            self.economic_factors["exchange_rate"] += random.uniform(5, 10)  # 축소된 변동
-            self.economic_factors["exchange_rate"] = max(1000, min(self.economic_factors["exchange_rate"], 1500))
-
-            self.economic_factors["raw_material_cost"] += random.uniform(2.5, 5.0)  # 축소된 변동
-            self.economic_factors["raw_material_cost"] = max(50, min(self.economic_factors["raw_material_cost"], 200))
-
-            self.economic_factors["political_stability"] += random.uniform(0.0, -0.03)  # 축소된 변동
-            self.economic_factors["political_stability"] = max(0.0, min(self.economic_factors["political_stability"], 2.0))
-
-            self.economic_factors["innovation_index"] += random.uniform(0.0, -0.03)  # 축소된 변동
-            self.economic_factors["innovation_index"] = max(0.0, min(self.economic_factors["innovation_index"], 2.0))
-
-            self.national_factors["total_assets"] += random.uniform(2.5, 5.0)  # 축소된 변동
-            self.national_factors["total_assets"] = max(18000.0, min(self.national_factors["total_assets"], 28000.0))
-
-            self.national_factors["birth_rate"] += random.uniform(0.05, 0.1)  # 축소된 변동
-            self.national_factors["birth_rate"] = max(0.5, min(self.national_factors["birth_rate"], 3.0))
-
-            self.national_factors["population"] += random.randint(-0, 5000)  # 축소된 변동
-            self.national_factors["population"] = max(10000000, min(self.national_factors["population"], 100000000))
+        """경제적 요인 업데이트 (국면별 변동폭/상하한은 economy.REGIME_TABLE)"""
+        regime = self.economic_condition_list.index(self.economic_condition)
+        rng = self.streams.stream(philox.ECONOMY, self.day_count)
+        self.regime_engine.step(self.economic_factors, self.national_factors, regime, rng)
+
+    def record_indicators(self):
+        """이번 틱의 경제/국가 지표, 정세 점수, 경제 국면을 시계열에 기록"""
+        values = dict(self.economic_factors)
+        values.update(self.national_factors)
+        values["policy_sentiment_score"] = self.policy_sentiment_score
+        values["economic_condition"] = self.economic_condition_list.index(self.economic_condition)
+        self.history.record(self.day_count, values)
 
     def handle_special_events(self):
         """특별 이벤트 발생"""
         # 특별 이벤트 로직을 여기에 추가할 수 있습니다.
         # 예: 자연재해, 정치적 사건 등
-        event_chance = random.random()
+        event_chance = self.rng.random()
         if event_chance < 0.02:  # 2% 확률로 자연재해 이벤트
             self.natural_disaster_event()
         elif event_chance < 0.04:  # 추가 2% 확률로 정치적 사건 이벤트
@@ -609,47 +404,32 @@ class Market:
 
     def natural_disaster_event(self):
         """자연재해 이벤트"""
-        affected_sector = random.choice(["에너지", "화학", "의약"])
+        affected_sector = self.rng.choice(["에너지", "화학", "의약"])
         affected_companies = [c for c in self.companies if c.sector == affected_sector and not c.is_bankrupt]
         if not affected_companies:
             return
-        target = random.choice(affected_companies)
-        damage_pct = random.uniform(0.05, 0.15)  # 5% ~ 15% 피해
+        target = self.rng.choice(affected_companies)
+        damage_pct = self.rng.uniform(0.05, 0.15)  # 5% ~ 15% 피해
         self.apply_price_change(target, -damage_pct * 100)
 
-        msg = {
-            "type": "natural_disaster",
-            "sector": affected_sector,
-            "company": target.name,
-            "text": f"[자연재해] {target.name}가 자연재해로 인해 주가가 {damage_pct*100:.2f}% 하락했습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "natural_disaster", affected_sector, (target.name,), value=damage_pct * 100)
 
     def political_event(self):
         """정치적 사건 이벤트"""
-        affected_sector = random.choice(["금융", "IT", "게임"])
+        affected_sector = self.rng.choice(["금융", "IT", "게임"])
         affected_companies = [c for c in self.companies if c.sector == affected_sector and not c.is_bankrupt]
         if not affected_companies:
             return
-        target = random.choice(affected_companies)
-        impact_pct = random.uniform(-0.1, 0.1)  # -10% ~ +10% 영향
+        target = self.rng.choice(affected_companies)
+        impact_pct = self.rng.uniform(-0.1, 0.1)  # -10% ~ +10% 영향
         self.apply_price_change(target, impact_pct * 100)
 
-        event_type = "긍정적인" if impact_pct > 0 else "부정적인"
-        msg = {
-            "type": "political_event",
-            "sector": affected_sector,
-            "company": target.name,
-            "text": f"[정치적 사건] {target.name}가 {event_type} 정치적 사건으로 인해 주가가 {impact_pct*100:.2f}% 변동했습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "political_event", affected_sector, (target.name,), value=impact_pct * 100)
 
-    def add_random_news(self):
+    def add_random_news(self, rng):
         """경제 뉴스와 정책 뉴스의 영향 완화 및 점진적 반영"""
         # 뉴스 유형 선택
-        msg_type = random.choice([0, 1, 2, 3, 4, 5, 6, 7])
+        msg_type = rng.choice([0, 1, 2, 3, 4, 5, 6, 7])
 
         # 회사 관련 뉴스 (Positive/Negative)
         if msg_type in (0, 1, 4, 6):
@@ -657,83 +437,50 @@ class Market:
             if not possible_companies:
                 return
 
-            target = random.choice(possible_companies)
+            target = rng.choice(possible_companies)
 
             if msg_type in (0, 4):  # 호재 (Positive)
-                cands = Message.POSITIVE_MESSAGES_BY_SECTOR.get(target.sector, [])
+                cands = news.POSITIVE.get(target.sector, ())
                 if not cands:
                     return
-                txt = random.choice(cands).replace("{company}", target.name)
-
-                msg_obj = {
-                    "type": "positive",
-                    "sector": target.sector,
-                    "company": target.name,
-                    "text": txt
-                }
-                self.all_messages.append(msg_obj)
-                self.recent_messages.append(msg_obj)
-                if len(self.recent_messages) > 37:
-                    self.recent_messages.pop(0)
+                self.news.add(self.day_count, "positive", target.sector, (target.name,), template=rng.choice(cands))
 
                 # 점진적 상승 효과 설정
-                impact_pct = random.uniform(0.005, 0.01)  # 0.05% ~ 0.1%로 축소
-                duration = random.randint(20, 30)
+                impact_pct = rng.uniform(0.005, 0.01)  # 0.05% ~ 0.1%로 축소
+                duration = rng.randint(20, 30)
                 target.news_impact = impact_pct / duration
                 target.news_impact_days = duration
 
             else:  # 악재 (Negative)
-                cands = Message.NEGATIVE_MESSAGES_BY_SECTOR.get(target.sector, [])
+                cands = news.NEGATIVE.get(target.sector, ())
                 if not cands:
                     return
-                txt = random.choice(cands).replace("{company}", target.name)
-
-                msg_obj = {
-                    "type": "negative",
-                    "sector": target.sector,
-                    "company": target.name,
-                    "text": txt
-                }
-                self.all_messages.append(msg_obj)
-                self.recent_messages.append(msg_obj)
-                if len(self.recent_messages) > 37:
-                    self.recent_messages.pop(0)
+                self.news.add(self.day_count, "negative", target.sector, (target.name,), template=rng.choice(cands))
 
                 # 점진적 하락 효과 설정
-                impact_pct = random.uniform(-0.075, -0.025)  # -0.25% ~ -0.75%로 축소
-                duration = random.randint(3, 7)
+                impact_pct = rng.uniform(-0.075, -0.025)  # -0.25% ~ -0.75%로 축소
+                duration = rng.randint(3, 7)
                 target.news_impact = impact_pct / duration
                 target.news_impact_days = duration
 
         elif msg_type in (2, 3):  # 정책 (Policy)
-            sector_list = list(Message.POLICY_MESSAGES_BY_SECTOR.keys())
-            s = random.choice(sector_list)
-            cands = Message.POLICY_MESSAGES_BY_SECTOR.get(s, [])
+            sector_list = list(news.POLICY.keys())
+            s = rng.choice(sector_list)
+            cands = news.POLICY.get(s, ())
             if not cands:
                 return
-            tx = random.choice(cands).replace("{sector}", s)
-
-            msgp = {
-                "type": "policy",
-                "sector": s,
-                "company": None,
-                "text": tx
-            }
-            self.all_messages.append(msgp)
-            self.recent_messages.append(msgp)
-            if len(self.recent_messages) > 37:
-                self.recent_messages.pop(0)
+            self.news.add(self.day_count, "policy", s, template=rng.choice(cands))
 
             # 섹터 내 회사 리스트 생성
             sector_companies = [c for c in self.companies if c.sector == s]
 
             # 섹터 내 일부 회사만 영향 받도록 설정
             sample_size = min(len(sector_companies), max(1, len(self.companies) // 3))  # 크기 조정
-            selected_companies = random.sample(sector_companies, k=sample_size)
+            selected_companies = rng.sample(sector_companies, k=sample_size)
 
             # 점진적 영향 적용
-            impact_pct = random.uniform(-0.0025, 0.0025)  # ±0.25%로 축소
-            duration = random.randint(20, 30)
+            impact_pct = rng.uniform(-0.0025, 0.0025)  # ±0.25%로 축소
+            duration = rng.randint(20, 30)
             for c in selected_companies:
                 c.news_impact = impact_pct / duration
                 c.news_impact_days = duration
@@ -743,32 +490,23 @@ class Market:
             p_positive = (self.policy_sentiment_score + 30) / 60
             p_positive = max(0.1, min(p_positive, 0.9))
 
-            if random.random() < p_positive:
-                impact_pct = random.uniform(0.001, 0.002)  # 상승 0.5%~1.5%
-                if not Message.ECONOMIC_NEWS_POSITIVE:
+            if rng.random() < p_positive:
+                impact_pct = rng.uniform(0.001, 0.002)  # 상승 0.5%~1.5%
+                if not news.ECONOMIC_POSITIVE:
                     return
-                newstxt, delta = random.choice(Message.ECONOMIC_NEWS_POSITIVE)
+                template = rng.choice(news.ECONOMIC_POSITIVE)
             else:
-                impact_pct = random.uniform(-0.002, -0.001)  # 하락 -0.5%~-1.5%
-                if not Message.ECONOMIC_NEWS_NEGATIVE:
+                impact_pct = rng.uniform(-0.002, -0.001)  # 하락 -0.5%~-1.5%
+                if not news.ECONOMIC_NEGATIVE:
                     return
-                newstxt, delta = random.choice(Message.ECONOMIC_NEWS_NEGATIVE)
-
-            msg_e = {
-                "type": "economic",
-                "sector": None,
-                "company": None,
-                "text": newstxt
-            }
-            self.all_messages.append(msg_e)
-            self.recent_messages.append(msg_e)
-            if len(self.recent_messages) > 37:
-                self.recent_messages.pop(0)
+                template = rng.choice(news.ECONOMIC_NEGATIVE)
+            delta = news.ECONOMIC_DELTA[template]
+            self.news.add(self.day_count, "economic", template=template)
 
             # 전체 적용 대신 랜덤 20%의 회사만 영향 적용
             sample_size = max(1, len(self.companies) // 5)  # 20% 회사만 선택
-            selected_companies = random.sample(self.companies, k=sample_size)
-            duration = random.randint(20, 30)
+            selected_companies = rng.sample(self.companies, k=sample_size)
+            duration = rng.randint(20, 30)
             for c in selected_companies:
                 c.news_impact = impact_pct / duration
                 c.news_impact_days = duration
@@ -782,18 +520,11 @@ class Market:
         # 예시로 특정 회사의 주가를 일시적으로 상승시킴
         if not self.companies:
             return
-        target = random.choice(self.companies)
-        impact_pct = random.uniform(0.05, 0.15)  # 5% ~ 15% 상승
+        target = self.rng.choice(self.companies)
+        impact_pct = self.rng.uniform(0.05, 0.15)  # 5% ~ 15% 상승
         self.apply_price_change(target, impact_pct * 100)
 
-        msg = {
-            "type": "player_event",
-            "sector": target.sector,
-            "company": target.name,
-            "text": f"[플레이어 이벤트] {target.name}에 대한 긍정적인 플레이어 이벤트로 주가가 {impact_pct*100:.2f}% 상승했습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "player_event", target.sector, (target.name,), value=impact_pct * 100)
 
     def handle_company_interactions(self):
         """회사 간 상호작용 관리"""
@@ -810,25 +541,26 @@ class Market:
             if c1.is_bankrupt:
                 continue
 
-            # 상호작용 발생 확률 설정
-            action_prob = random.random()
+            # 상호작용 발생 확률 설정 (주도하는 회사별 난수 스트림이라 처리 순서와 무관)
+            rng = self.streams.stream(philox.INTERACTION, self.day_count, c1.id)
+            action_prob = rng.random()
             if action_prob < 0.005:  # 0.5% 확률로 계약 체결
-                c2 = random.choice(self.companies)
+                c2 = rng.choice(self.companies)
                 if c1.id != c2.id and not c2.is_bankrupt:
-                    self.contract_deal(c1, c2)
+                    self.contract_deal(c1, c2, rng)
 
             elif action_prob < 0.01:  # 추가 0.5% 확률로 투자
-                c2 = random.choice(self.companies)
+                c2 = rng.choice(self.companies)
                 if c1.id != c2.id and not c2.is_bankrupt:
-                    self.invest_in_company(c1, c2)
+                    self.invest_in_company(c1, c2, rng)
 
             elif action_prob < 0.015:  # 추가 0.5% 확률로 지분 인수
-                c2 = random.choice(self.companies)
+                c2 = rng.choice(self.companies)
                 if c1.id != c2.id and not c2.is_bankrupt:
-                    self.acquire_shares(c1, c2)
+                    self.acquire_shares(c1, c2, rng)
 
                 # 상호작용 발생 확률 설정
-                action_prob_inner = random.random()
+                action_prob_inner = rng.random()
                 if action_prob_inner < 0.01:  # 1% 확률로 특허 획득
                     self.patent_acquisition(c1)
                 elif action_prob_inner < 0.02:  # 1% 확률로 신제품 출시
@@ -840,9 +572,9 @@ class Market:
                 elif action_prob_inner < 0.05:  # 1% 확률로 공급망 문제 발생
                     self.supply_chain_disruptions(c1)
 
-    def contract_deal(self, c1, c2):
+    def contract_deal(self, c1, c2, rng):
         """계약 체결"""
-        contract_amount = random.randint(100000, 1000000)
+        contract_amount = rng.randint(100000, 1000000)
 
         # 자본 및 부채 조정
         c1.capital += contract_amount * 0.8  # 80% 수익
@@ -858,77 +590,185 @@ class Market:
             c2.debt = 0
 
         # 뉴스 메시지 추가
-        msg = {
-            "type": "contract",
-            "sector": c1.sector,
-            "company": f"{c1.name} - {c2.name}",
-            "text": f"[계약 체결] {c1.name}와 {c2.name}가 {contract_amount:,}원 규모의 계약을 체결"
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "contract", c1.sector, (c1.name, c2.name), value=contract_amount)
 
     def patent_acquisition(self, company):
         """특허 획득 이벤트"""
         company.capital *= 1.05  # 변동 축소
-        msg = {
-            "type": "patent",
-            "sector": company.sector,
-            "company": company.name,
-            "text": f"[특허 획득] {company.name}가 새로운 특허를 획득했습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "patent", company.sector, (company.name,))
 
     def new_product_release(self, company):
         """신제품 출시 이벤트"""
         company.capital *= 1.075  # 변동 축소
-        msg = {
-            "type": "product",
-            "sector": company.sector,
-            "company": company.name,
-            "text": f"[신제품 출시] {company.name}가 신제품을 발표했습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "product", company.sector, (company.name,))
 
     def regulatory_changes(self, company):
         """규제 강화 이벤트"""
         company.capital *= 0.925  # 변동 축소
-        msg = {
-            "type": "regulation",
-            "sector": company.sector,
-            "company": company.name,
-            "text": f"[규제 강화] {company.name}가 강화된 규제를 받습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "regulation", company.sector, (company.name,))
 
     def labor_disputes(self, company):
         """노사 갈등 이벤트"""
         company.debt *= 1.1  # 변동 축소
-        msg = {
-            "type": "labor",
-            "sector": company.sector,
-            "company": company.name,
-            "text": f"[노사 갈등] {company.name}가 노사 갈등을 겪고 있습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "labor", company.sector, (company.name,))
 
     def supply_chain_disruptions(self, company):
         """공급망 문제 이벤트"""
         company.capital *= 0.95  # 변동 축소
-        msg = {
-            "type": "supply",
-            "sector": company.sector,
-            "company": company.name,
-            "text": f"[공급망 문제] {company.name}가 공급망 문제를 겪고 있습니다."
-        }
-        self.all_messages.append(msg)
-        self.recent_messages.append(msg)
+        self.news.add(self.day_count, "supply", company.sector, (company.name,))
 
     def add_company(self, company):
         self.companies.append(company)
+        self.company_by_id[company.id] = company
+
+    def delist_bankrupt_companies(self):
+        """파산 후 REMOVE_AFTER_DAYS일(48틱 = 1일)이 지난 회사를 상장 폐지하고 보유자의 주식을 정리"""
+        if not self.bankrupt_companies:
+            return
+        cutoff = self.day_count - self.REMOVE_AFTER_DAYS * 48
+        remaining = []
+        for c in self.bankrupt_companies:
+            if c.bankrupt_day is None or c.bankrupt_day > cutoff:
+                remaining.append(c)
+                continue
+            for holder in list(c.holders):
+                holder.remove_holding(c)
+            self.company_by_id.pop(c.id, None)
+            self.news.add(self.day_count, "delist", c.sector, (c.name,), value=self.REMOVE_AFTER_DAYS)
+        self.bankrupt_companies = remaining
+
+    def submit_order(self, investor, company, side, quantity):
+        """
+        시장가 주문. 호가창을 쓰면 매칭 엔진에서 호가를 소진하며 체결되고(가격 변동 발생),
+        아니면 현재가로 바로 체결됩니다. 체결 수량을 반환합니다.
+        """
+        if self.pending_capture is not None:
+            self.pending_capture.preserve(company)
+        if self.exchange is None or company.is_bankrupt:
+            if side == orderbook.SIDE_BUY:
+                ok = investor.buy(company, quantity)
+            else:
+                ok = investor.sell(company, quantity)
+            return quantity if ok else 0
+        return self.exchange.submit(investor, company, side, quantity)
+
+    def place_order(self, investor, company, order_type, price, quantity):
+        """지정가/손절/익절 대기 주문 등록. 등록할 수 없으면 None 반환"""
+        if company.is_bankrupt or company.id not in self.company_by_id:
+            return None
+        if order_type == orders.ORDER_LIMIT_BUY:
+            if price * quantity > investor.cash:
+                return None
+        elif investor.holdings.get(company.id, {}).get("quantity", 0) < quantity:
+            return None
+        return self.orders.place(investor, company.id, order_type, price, quantity)
+
+    # ---- 플레이어 입력 (저널에 기록되어 재생 시 같은 틱에 다시 적용됨) ----
+
+    def add_trade_message(self, text):
+        self.news.add_text(self.day_count, "trade", text)
+
+    def record_input(self, action, **fields):
+        if self.journal is not None:
+            self.journal.record(self.day_count, action, **fields)
+
+    def player_trade(self, investor, company, side, quantity):
+        """플레이어 시장가 매수/매도. 체결 수량 반환"""
+        self.record_input(journal.ACTION_TRADE, company_id=company.id, side=side, quantity=quantity)
+        filled = self.submit_order(investor, company, side, quantity)
+        if filled:
+            verb = "매수" if side == orderbook.SIDE_BUY else "매도"
+            self.add_trade_message(f"{investor.name}이 {company.name}을 {filled}주 {verb}했습니다.")
+        return filled
+
+    def player_place_order(self, investor, company, order_type, price, quantity):
+        """플레이어 대기 주문 등록. 등록할 수 없으면 None 반환"""
+        self.record_input(journal.ACTION_PLACE_ORDER, company_id=company.id, order_type=order_type,
+                          price=price, quantity=quantity)
+        order = self.place_order(investor, company, order_type, price, quantity)
+        if order is not None:
+            label = orders.ORDER_TYPE_LABELS[order_type]
+            self.add_trade_message(f"{investor.name}이 {company.name} {quantity}주 {label} 주문({price:.2f}원)을 등록했습니다.")
+        return order
+
+    def player_cancel_order(self, investor, order_id):
+        """플레이어 대기 주문 취소"""
+        self.record_input(journal.ACTION_CANCEL_ORDER, order_id=order_id)
+        return self.orders.cancel(order_id)
+
+    def player_remove_holding(self, investor, company):
+        """포트폴리오에서 종목 제거"""
+        self.record_input(journal.ACTION_REMOVE_HOLDING, company_id=company.id)
+        if self.pending_capture is not None:
+            self.pending_capture.preserve(company)
+        success = investor.remove_holding(company)
+        if success:
+            self.add_trade_message(f"{investor.name}이 {company.name}을(를) 포트폴리오에서 제거했습니다.")
+        else:
+            self.add_trade_message(f"{company.name}을(를) 포트폴리오에서 제거하지 못했습니다.")
+        return success
+
+    def apply_input(self, investor, entry):
+        """저널 항목 하나를 다시 적용 (재생용)"""
+        action = entry["action"]
+        if action == journal.ACTION_CANCEL_ORDER:
+            return self.player_cancel_order(investor, entry["order_id"])
+        company = self.company_by_id.get(entry["company_id"])
+        if company is None:
+            logging.warning(f"재생: {self.day_count}틱 입력의 회사를 찾을 수 없습니다 ({entry})")
+            return None
+        if action == journal.ACTION_TRADE:
+            return self.player_trade(investor, company, entry["side"], entry["quantity"])
+        if action == journal.ACTION_PLACE_ORDER:
+            return self.player_place_order(investor, company, entry["order_type"], entry["price"], entry["quantity"])
+        if action == journal.ACTION_REMOVE_HOLDING:
+            return self.player_remove_holding(investor, company)
+        logging.warning(f"재생: 알 수 없는 입력 종류 {action}")
+        return None
+
+    def process_resting_orders(self):
+        """대기 주문 발동 검사 (매 틱 주가 갱신 후 호출)"""
+        # 주문이 걸린 회사만 확인하며, 회사별로는 가격대 인덱스에서 발동분만 꺼냄
+        # (회사 순서는 체결 순서라 현금에 영향을 주므로 불러온 게임에서도 같도록 id 순)
+        for cid in self.orders.companies():
+            company = self.company_by_id.get(cid)
+            if company is None or company.is_bankrupt:
+                self.orders.cancel_company(cid)
+                continue
+            cndl = company.candles[-1]
+            high = max(cndl["high"], cndl["close"])
+            low = min(cndl["low"], cndl["close"])
+            for order in self.orders.pop_triggered(cid, high, low):
+                # 같은 틱에 함께 발동한 OCO 짝은 먼저 체결된 쪽이 취소함
+                if order.is_open:
+                    self.execute_order(order, company)
+
+    def execute_order(self, order, company):
+        """발동한 대기 주문 체결"""
+        open_price = company.candles[-1]["open"]
+        # 시가가 이미 주문 가격을 넘어선 경우(갭) 시가로 체결
+        if order.order_type in orders.FALLING_ORDER_TYPES:
+            fill_price = min(order.price, open_price)
+        else:
+            fill_price = max(order.price, open_price)
+
+        if order.is_buy:
+            ok = order.investor.buy(company, order.quantity, price=fill_price)
+        else:
+            ok = order.investor.sell(company, order.quantity, price=fill_price)
+        order.status = orders.STATUS_FILLED if ok else orders.STATUS_REJECTED
+        order.fill_price = fill_price if ok else None
+        if ok:
+            self.orders.cancel_sibling(order)
+
+        # 봇 주문은 뉴스로 알리지 않음
+        if not isinstance(order.investor, Bot):
+            label = orders.ORDER_TYPE_LABELS[order.order_type]
+            if ok:
+                text = f"[{label} 체결] {order.investor.name}이 {company.name} {order.quantity}주를 {fill_price:.2f}원에 체결했습니다."
+            else:
+                text = f"[{label} 실패] {company.name} {order.quantity}주 주문이 잔고/보유 수량 부족으로 취소되었습니다."
+            self.news.add_text(self.day_count, "trade", text)
 
     def apply_price_change(self, company, pct):
         if not company.candles:
@@ -941,97 +781,187 @@ class Market:
         company.check_bankruptcy(econ_factor=self.economic_factor, current_day=self.day_count)
 
     def next_day(self, investors, dt):
+        if self.pending_capture is not None:
+            self.pending_capture.flush()  # 모든 회사를 바꾸므로 자동 저장 스냅샷을 먼저 마저 복사
         self.day_count += 1
+        self.ledger.tick = self.day_count
+        prof = self.profiler  # 단계별 시간 기록 (None이면 기록 안 함)
+        if prof is not None:
+            prof.begin(self)
+        mtr = self.metrics  # 지표 기록 (None이면 기록 안 함)
+        if mtr is not None:
+            mtr.begin(self)
 
         # 정세 업데이트
         self.update_sentiment()
+        if prof is not None:
+            prof.lap(profiler.SENTIMENT)
 
         # 경제적 요인 업데이트
         self.update_economic_factors()
+        if prof is not None:
+            prof.lap(profiler.ECONOMY)
 
         econ_factor = self.economic_factor
+        adjustment = pricing.price_adjustment(self.economic_factors, self.national_factors)
 
         # 새로운 캔들 추가
         for c in self.companies:
             if not c.is_bankrupt:
-                c.update_price_daily(econ_factor=econ_factor, economic_factors=self.economic_factors,
-                                     national_factors=self.national_factors)
+                c.update_price_daily(econ_factor=econ_factor, adjustment=adjustment,
+                                     rng=self.streams.stream(philox.PRICE, self.day_count, c.id))
                 c.check_bankruptcy(econ_factor=econ_factor, current_day=self.day_count)
+        if prof is not None:
+            prof.lap(profiler.PRICES)
 
         # 회사 간 상호작용 추가
         self.handle_company_interactions()
-
-        # 봇들의 투자 행동 추가
+        if prof is not None:
+            prof.lap(profiler.INTERACTIONS)
+
+        # 봇들의 투자 행동 추가 (호가창 사용 시 마켓 메이커 호가를 먼저 갱신)
+        if self.exchange is not None:
+            for c in self.companies:
+                if not c.is_bankrupt:
+                    self.exchange.requote(c)
         for investor in investors:
             if isinstance(investor, Bot):
                 investor.make_decisions(self)
+        if prof is not None:
+            prof.lap(profiler.BOTS)
 
         # 파산 처리
         bk = [c for c in self.companies if c.is_bankrupt]
         for bcp in bk:
-            msg = {
-                "type": "bankrupt",
-                "sector": bcp.sector,
-                "company": bcp.name,
-                "text": f"[파산] {bcp.name} - 장기적 악화로 인한 파산"
-            }
-            self.all_messages.append(msg)
-            self.recent_messages.append(msg)
+            self.news.add(self.day_count, "bankrupt", bcp.sector, (bcp.name,))
             self.bankrupt_companies.append(bcp)
+            self.orders.cancel_company(bcp.id)
+            if self.exchange is not None:
+                self.exchange.remove(bcp.id)
 
-            # 파산 팝업을 위한 전역 변수에 추가
-            # 파산한 회사가 플레이어가 보유한 주식인지 확인
+            # 보유자에게만 파산 알림
             player = investors[0]  # 플레이어가 첫 번째 투자자라고 가정
-            if player.holdings.get(bcp.id, {}).get('quantity', 0) > 0:
-                bankrupt_notifications.append({"text": msg["text"], "timer": 30})  # 3초 동안 표시 (60 FPS 기준)
+            for holder in list(bcp.holders):
+                if holder is player:
+                    # 파산 팝업을 위한 전역 변수에 추가
+                    bankrupt_notifications.append({"text": self.news.text(len(self.news) - 1), "timer": 30})  # 3초 동안 표시 (60 FPS 기준)
+                holder.on_company_bankrupt(bcp)
 
         self.companies = [c for c in self.companies if not c.is_bankrupt]
 
+        # 파산 후 일정 기간이 지난 회사 상장 폐지
+        self.delist_bankrupt_companies()
+        if prof is not None:
+            prof.lap(profiler.BANKRUPTCY)
+
         # 신규 회사 추가
         if len(self.companies) < 10:
             self.add_random_companies(12 - len(self.companies))
-        elif random.random() < self.company_creation_prob_map.get(self.economic_condition, 0.1):
+        elif self.rng.random() < self.company_creation_prob_map.get(self.economic_condition, 0.1):
             self.add_random_companies(1)
+        if prof is not None:
+            prof.lap(profiler.LISTINGS)
 
-        # 뉴스 생성
-        if random.random() < 0.7:
-            self.generate_random_news()
+        # 대기 주문 발동 검사
+        self.process_resting_orders()
+        if prof is not None:
+            prof.lap(profiler.ORDERS)
 
-    def generate_random_news(self):
+        # 보유 종목 재평가 및 자산 곡선 기록
+        for investor in investors:
+            investor.mark_to_market(self)
+        if prof is not None:
+            prof.lap(profiler.MARKING)
+
+        # 뉴스 생성 (틱마다 전용 난수 스트림)
+        news_rng = self.streams.stream(philox.NEWS, self.day_count)
+        if news_rng.random() < 0.7:
+            self.generate_random_news(news_rng)
+        if prof is not None:
+            prof.lap(profiler.NEWS)
+
+        # 지표 시계열 기록
+        self.record_indicators()
+        if prof is not None:
+            prof.lap(profiler.INDICATORS)
+            prof.end(self)
+        if mtr is not None:
+            mtr.end(self, investors)
+
+    def generate_random_news(self, rng):
         """뉴스 생성 로직 수정: 다양한 뉴스 및 이벤트 추가"""
         # 현재는 기존 뉴스 생성 로직을 유지하고, 특별 이벤트를 별도로 처리
-        self.add_random_news()
+        self.add_random_news(rng)
 
 class Investor:
+    trade_log = logpipe.get_logger(logpipe.PLAYER_TRADES)  # 체결 기록 분류 (봇은 따로 수준/샘플링 지정)
+    ledger = None  # 체결 원장 (ledger.Ledger, attach_ledger()로 시장 원장 연결)
+
     def __init__(self, name, cash):
         self.name = name
         self.cash = cash
         self.holdings = {}  # {company.id: {"quantity":Q, "avg_price":P} }
 
-    def buy(self, company, quantity):
+        # 평가액은 거래와 틱마다 보유 종목만 증분 갱신
+        self.holdings_value = 0.0  # 보유 주식 평가액 (현금 제외)
+        self.marks = {}  # {company.id: 평가에 사용한 마지막 가격}
+        self.equity_curve = array("d")  # 틱별 총자산 (현금 + 주식)
+        self.trades = 0  # 체결된 매수/매도 횟수 (지표용, 저장하지 않음)
+
+    def mark(self, company):
+        """보유 종목 하나를 현재가로 재평가 (파산한 회사는 0원)"""
+        holding = self.holdings.get(company.id)
+        if holding is None:
+            return
+        price = 0.0 if company.is_bankrupt else company.current_price
+        old_price = self.marks.get(company.id, price)
+        self.holdings_value += holding["quantity"] * (price - old_price)
+        self.marks[company.id] = price
+
+    def mark_to_market(self, market):
+        """보유 종목 전체 재평가 후 총자산을 자산 곡선에 기록 (매 틱 호출)"""
+        by_id = market.company_by_id
+        for cid in self.holdings:
+            company = by_id.get(cid)
+            if company is not None:
+                self.mark(company)
+        self.equity_curve.append(self.cash + self.holdings_value)
+
+    def buy(self, company, quantity, price=None):
+        """매수. price가 주어지면 해당 가격(지정가 체결가)으로 매수"""
         if quantity <= 0:
             return False
         if company.is_bankrupt:
             return False  # 파산한 회사는 매수 불가
-        cost = company.current_price * quantity
+        if price is None:
+            price = company.current_price
+        cost = price * quantity
         if cost > self.cash:
             return False
         self.cash -= cost
         if company.id not in self.holdings:
             self.holdings[company.id] = {"quantity": 0, "avg_price": 0.0}
+            company.holders[self] = None
+        self.mark(company)
         old_qty = self.holdings[company.id]["quantity"]
         old_avg = self.holdings[company.id]["avg_price"]
         new_qty = old_qty + quantity
         if new_qty > 0:
-            new_avg = (old_qty * old_avg + quantity * company.current_price) / new_qty
+            new_avg = (old_qty * old_avg + quantity * price) / new_qty
         else:
             new_avg = 0
         self.holdings[company.id]["quantity"] = new_qty
         self.holdings[company.id]["avg_price"] = new_avg
-        logging.info(f"{self.name}이 {company.name}을 {quantity}주 매수했습니다.")
+        self.holdings_value += quantity * self.marks[company.id]
+        self.trades += 1
+        led = self.ledger
+        if led is not None:
+            led.record(ledger.BUY, self, company, quantity, price)
+        self.trade_log.info("%s이 %s을 %s주 매수했습니다.", self.name, company.name, quantity)
         return True
 
-    def sell(self, company, quantity):
+    def sell(self, company, quantity, price=None):
+        """매도. price가 주어지면 해당 가격(지정가 체결가)으로 매도"""
         if quantity <= 0:
             return False
         if company.is_bankrupt:
@@ -1041,68 +971,109 @@ class Investor:
         old_qty = self.holdings[company.id]["quantity"]
         if old_qty < quantity:
             return False
+        self.mark(company)
+        self.holdings_value -= quantity * self.marks[company.id]
         self.holdings[company.id]["quantity"] = old_qty - quantity
-        revenue = company.current_price * quantity
+        if price is None:
+            price = company.current_price
+        revenue = price * quantity
         self.cash += revenue
         if self.holdings[company.id]["quantity"] == 0:
             del self.holdings[company.id]
-        logging.info(f"{self.name}이 {company.name}을 {quantity}주 매도했습니다.")
+            del self.marks[company.id]
+            company.holders.pop(self, None)
+        self.trades += 1
+        led = self.ledger
+        if led is not None:
+            led.record(ledger.SELL, self, company, quantity, price)
+        self.trade_log.info("%s이 %s을 %s주 매도했습니다.", self.name, company.name, quantity)
         return True
 
-    def remove_holding(self, company):
-        """보유 주식 제거 (제거 버튼 클릭 시 호출)"""
+    def remove_holding(self, company, transfer=False):
+        """보유 주식 제거 (제거 버튼 클릭, 상장 폐지 시 호출). transfer면 합병으로 넘겨주는 주식"""
         if company.id in self.holdings:
-            del self.holdings[company.id]
+            holding = self.holdings.pop(company.id)
+            self.holdings_value -= holding["quantity"] * self.marks.pop(company.id, 0.0)
+            company.holders.pop(self, None)
+            led = self.ledger
+            if led is not None:
+                led.record(ledger.TRANSFER_OUT if transfer else ledger.WRITE_OFF, self, company, holding["quantity"])
             return True
         return False
 
-    def get_portfolio_value(self, market):
-        val = self.cash
-        for c in market.companies + market.bankrupt_companies:
-            if c.id in self.holdings:
-                q = self.holdings[c.id]["quantity"]
-                p = c.current_price if not c.is_bankrupt else 0  # 파산한 회사는 현재가를 0으로 설정
-                val += p * q
-        return val
+    def add_holding(self, company, quantity, avg_price):
+        """현금 이동 없이 보유 주식 추가 (합병 등 기업 행동)"""
+        self.holdings[company.id] = {"quantity": quantity, "avg_price": avg_price}
+        self.marks[company.id] = 0.0
+        company.holders[self] = None
+        self.mark(company)
+        led = self.ledger
+        if led is not None:
+            led.record(ledger.TRANSFER_IN, self, company, quantity, avg_price)
+
+    def on_company_bankrupt(self, company):
+        """보유 종목 파산 알림. 플레이어는 포트폴리오에서 직접 제거합니다."""
+        pass
+
+    def get_portfolio_value(self, market=None):
+        """총자산 (현금 + 보유 주식 평가액). 평가액은 증분 관리되므로 O(1)"""
+        return self.cash + self.holdings_value
 
 class Bot(Investor):
-    def __init__(self, name, cash, strategy="random"):
+    trade_log = logpipe.get_logger(logpipe.BOT_TRADES)
+
+    def __init__(self, name, cash, strategy="random", rng=None):
         super().__init__(name, cash)
         self.strategy = strategy  # 전략 유형: 'random', 'growth', 'sector', 'value', 'momentum'
-        self.focus_sector = random.choice(["IT", "의약", "화학", "게임", "에너지", "금융"]) if strategy == "sector" else None
+        self.focus_sector = (rng or random).choice(["IT", "의약", "화학", "게임", "에너지", "금융"]) if strategy == "sector" else None
+
+    def on_company_bankrupt(self, company):
+        """봇은 파산한 종목을 바로 정리"""
+        self.remove_holding(company)
+
+    def sell_at_market(self, market, company, quantity):
+        """
+        시장가 매도. 체결되면 그 종목에 걸어 둔 매도 대기 주문(손절/익절)은 보유 수량과 맞지 않게 되므로 취소합니다.
+        체결 수량 반환
+        """
+        filled = market.submit_order(self, company, orderbook.SIDE_SELL, quantity)
+        if filled:
+            market.orders.cancel_sells(self, company.id)
+        return filled
 
     def make_decisions(self, market):
-        """봇의 주식 매매 결정 로직"""
+        """봇의 주식 매매 결정 로직 (틱마다 봇 이름으로 정해지는 난수 스트림 사용)"""
+        rng = market.streams.stream(philox.BOT, market.day_count, self.name)
         if self.strategy == "random":
-            self.random_strategy(market)
+            self.random_strategy(market, rng)
         elif self.strategy == "growth":
-            self.growth_strategy(market)
+            self.growth_strategy(market, rng)
         elif self.strategy == "sector":
-            self.sector_strategy(market)
+            self.sector_strategy(market, rng)
         elif self.strategy == "value":
-            self.value_strategy(market)
+            self.value_strategy(market, rng)
         elif self.strategy == "momentum":
-            self.momentum_strategy(market)
+            self.momentum_strategy(market, rng)
 
-    def random_strategy(self, market):
+    def random_strategy(self, market, rng):
         """무작위 매매 전략"""
-        action = random.choice(["buy", "sell", "hold"])
+        action = rng.choice(["buy", "sell", "hold"])
         if action == "buy":
-            company = random.choice(market.companies)
-            quantity = random.randint(1, 10)
-            self.buy(company, quantity)
+            company = rng.choice(market.companies)
+            quantity = rng.randint(1, 10)
+            market.submit_order(self, company, orderbook.SIDE_BUY, quantity)
             # 뉴스 메시지 추가 가능
         elif action == "sell" and self.holdings:
-            company_id = random.choice(list(self.holdings.keys()))
+            company_id = rng.choice(list(self.holdings.keys()))
             company = next((c for c in market.companies if c.id == company_id), None)
             if company:
                 max_qty = self.holdings[company.id]["quantity"]
                 if max_qty >= 1:
-                    quantity = random.randint(1, min(5, max_qty))  # 매도 수량 조정
-                    self.sell(company, quantity)
+                    quantity = rng.randint(1, min(5, max_qty))  # 매도 수량 조정
+                    self.sell_at_market(market, company, quantity)
                     # 뉴스 메시지 추가 가능
 
-    def growth_strategy(self, market):
+    def growth_strategy(self, market, rng):
         """성장 전략: 저평가된 주식 매수, 고평가된 주식 매도"""
         # 매수: 현재 주가가 최근 평균보다 낮은 회사 선택
         buy_candidates = []
@@ -1116,9 +1087,9 @@ class Bot(Investor):
             if company.current_price < avg_close * 0.95:
                 buy_candidates.append(company)
         if buy_candidates:
-            company = random.choice(buy_candidates)
-            quantity = random.randint(5, 20)
-            self.buy(company, quantity)
+            company = rng.choice(buy_candidates)
+            quantity = rng.randint(5, 20)
+            market.submit_order(self, company, orderbook.SIDE_BUY, quantity)
             # 뉴스 메시지 추가 가능
 
         # 매도: 현재 주가가 최근 평균보다 높은 회사 선택
@@ -1135,38 +1106,38 @@ class Bot(Investor):
             if company.current_price > avg_close * 1.05:
                 sell_candidates.append(company)
         if sell_candidates:
-            company = random.choice(sell_candidates)
+            company = rng.choice(sell_candidates)
             max_qty = self.holdings[company.id]["quantity"]
             if max_qty >= 1:
-                quantity = random.randint(1, min(5, max_qty))  # 매도 수량 조정
-                self.sell(company, quantity)
+                quantity = rng.randint(1, min(5, max_qty))  # 매도 수량 조정
+                self.sell_at_market(market, company, quantity)
                 # 뉴스 메시지 추가 가능
 
-    def sector_strategy(self, market):
+    def sector_strategy(self, market, rng):
         """섹터 집중 전략: 특정 섹터에 집중 투자"""
         if not self.focus_sector:
-            self.focus_sector = random.choice(["IT", "의약", "화학", "게임", "에너지", "금융"])
+            self.focus_sector = rng.choice(["IT", "의약", "화학", "게임", "에너지", "금융"])
         sector_companies = [c for c in market.companies if c.sector == self.focus_sector and not c.is_bankrupt]
         if not sector_companies:
             return
-        action = random.choice(["buy", "sell", "hold"])
+        action = rng.choice(["buy", "sell", "hold"])
         if action == "buy":
-            company = random.choice(sector_companies)
-            quantity = random.randint(10, 30)
-            self.buy(company, quantity)
+            company = rng.choice(sector_companies)
+            quantity = rng.randint(10, 30)
+            market.submit_order(self, company, orderbook.SIDE_BUY, quantity)
             # 뉴스 메시지 추가 가능
 
         elif action == "sell" and self.holdings:
             sector_holdings = [c for c in market.companies if c.id in self.holdings and c.sector == self.focus_sector]
             if sector_holdings:
-                company = random.choice(sector_holdings)
+                company = rng.choice(sector_holdings)
                 max_qty = self.holdings[company.id]["quantity"]
                 if max_qty >= 1:
-                    quantity = random.randint(1, min(5, max_qty))  # 매도 수량 조정
-                    self.sell(company, quantity)
+                    quantity = rng.randint(1, min(5, max_qty))  # 매도 수량 조정
+                    self.sell_at_market(market, company, quantity)
                     # 뉴스 메시지 추가 가능
 
-    def value_strategy(self, market):
+    def value_strategy(self, market, rng):
         """가치 투자 전략: 저평가된 회사 매수, 고평가된 회사 매도"""
         # 매수: P/E 비율이 낮은 회사 선택 (가치 투자 지표)
         buy_candidates = []
@@ -1177,9 +1148,9 @@ class Bot(Investor):
             if pe_ratio < 15:  # 예시 임계값
                 buy_candidates.append(company)
         if buy_candidates:
-            company = random.choice(buy_candidates)
-            quantity = random.randint(5, 20)
-            self.buy(company, quantity)
+            company = rng.choice(buy_candidates)
+            quantity = rng.randint(5, 20)
+            market.submit_order(self, company, orderbook.SIDE_BUY, quantity)
             # 뉴스 메시지 추가 가능
 
         # 매도: P/E 비율이 높은 회사 선택
@@ -1191,14 +1162,14 @@ class Bot(Investor):
             if pe_ratio > 25:  # 예시 임계값
                 sell_candidates.append(company)
         if sell_candidates:
-            company = random.choice(sell_candidates)
+            company = rng.choice(sell_candidates)
             max_qty = self.holdings[company.id]["quantity"]
             if max_qty >= 1:
-                quantity = random.randint(1, min(5, max_qty))  # 매도 수량 조정
-                self.sell(company, quantity)
+                quantity = rng.randint(1, min(5, max_qty))  # 매도 수량 조정
+                self.sell_at_market(market, company, quantity)
                 # 뉴스 메시지 추가 가능
 
-    def momentum_strategy(self, market):
+    def momentum_strategy(self, market, rng):
         """모멘텀 투자 전략: 상승 추세의 주식 매수, 하락 추세의 주식 매도"""
         # 매수: 최근 3일 연속 상승한 회사
         buy_candidates = []
@@ -1209,10 +1180,15 @@ class Bot(Investor):
             if all(change > 0 for change in recent_changes):
                 buy_candidates.append(company)
         if buy_candidates:
-            company = random.choice(buy_candidates)
-            quantity = random.randint(5, 20)
-            self.buy(company, quantity)
-            # 뉴스 메시지 추가 가능
+            company = rng.choice(buy_candidates)
+            quantity = rng.randint(5, 20)
+            filled = market.submit_order(self, company, orderbook.SIDE_BUY, quantity)
+            if filled:
+                # 추세가 꺾일 때를 대비해 손절/익절 주문을 함께 걸어 둠 (한쪽이 체결되면 다른 쪽은 취소)
+                stop = market.place_order(self, company, orders.ORDER_STOP_LOSS, company.current_price * 0.97, filled)
+                take = market.place_order(self, company, orders.ORDER_TAKE_PROFIT, company.current_price * 1.05, filled)
+                if stop is not None and take is not None:
+                    market.orders.link(stop, take)
 
         # 매도: 최근 3일 연속 하락한 회사
         sell_candidates = []
@@ -1223,45 +1199,128 @@ class Bot(Investor):
             if all(change < 0 for change in recent_changes):
                 sell_candidates.append(company)
         if sell_candidates:
-            company = random.choice(sell_candidates)
+            company = rng.choice(sell_candidates)
             max_qty = self.holdings[company.id]["quantity"]
             if max_qty >= 1:
-                quantity = random.randint(1, min(5, max_qty))  # 매도 수량 조정
-                self.sell(company, quantity)
+                quantity = rng.randint(1, min(5, max_qty))  # 매도 수량 조정
+                self.sell_at_market(market, company, quantity)
                 # 뉴스 메시지 추가 가능
 
 # ############################
 # 3) 유틸/차트
 # ############################
 
-def random_company_name():
-    letters = "".join(random.choice(string.ascii_uppercase) for _ in range(3))
-    nums = "".join(random.choice(string.digits) for _ in range(2))
+def random_company_name(rng=random):
+    letters = "".join(rng.choice(string.ascii_uppercase) for _ in range(3))
+    nums = "".join(rng.choice(string.digits) for _ in range(2))
     return f"{letters}{nums}"
 
-def create_initial_market():
-    mk = Market()
+def create_initial_market(use_order_book=False, seed=None, warmup_days=0):
+    """기본 회사 23곳으로 시장 생성. warmup_days만큼 과거 캔들을 미리 만들어 둠 (warmup.py)"""
+    mk = Market(use_order_book=use_order_book, seed=seed)
     sector_list = ["IT", "의약", "화학", "게임", "에너지", "금융"]
     for _ in range(23):
-        nm = random_company_name()
-        st = random.choice(sector_list)
-        ip = random.uniform(1000, 50000)
-        c = Company(nm, st, ip)
+        nm = random_company_name(mk.rng)
+        st = mk.rng.choice(sector_list)
+        ip = mk.rng.uniform(1000, 50000)
+        c = Company(nm, st, ip, rng=mk.rng)
         # 경쟁사 추가 (예시로 2개)
-        c.competitors = random.sample([comp.name for comp in mk.companies], k=min(2, len(mk.companies)))
+        c.competitors = mk.rng.sample([comp.name for comp in mk.companies], k=min(2, len(mk.companies)))
         mk.add_company(c)
+    warmup.warm_up(mk, warmup_days)
     return mk
 
+def create_default_investors(player_cash=25000000, rng=None):
+    """플레이어(첫 번째)와 기본 봇 투자자 목록"""
+    investors = [Investor("플레이어", player_cash)]
+    investors.append(Bot("봇_랜덤1", 5000000, strategy="random", rng=rng))
+    investors.append(Bot("봇_성장1", 7000000, strategy="growth", rng=rng))
+    investors.append(Bot("봇_섹터1", 6000000, strategy="sector", rng=rng))
+    investors.append(Bot("봇_가치1", 8000000, strategy="value", rng=rng))
+    investors.append(Bot("봇_모멘텀1", 7500000, strategy="momentum", rng=rng))
+    return investors
+
+TRADE_KIND_LABELS = {"buy": "매수", "sell": "매도", "write_off": "제거", "transfer_out": "합병 이전", "transfer_in": "합병 편입"}
+
+# 체결 원장 파일 (--ledger, None이면 원장은 메모리에만 두고 저장 파일에 함께 기록)
+LEDGER_PATH = None
+_file_ledger = None
+
+def attach_ledger(market, investors):
+    """투자자의 체결을 시장 원장에 기록하도록 연결"""
+    for inv in investors:
+        inv.ledger = market.ledger
+
+# 시작 전 과거 캔들 수 (--warmup, 0이면 캔들 하나로 시작)
+WARMUP_DAYS = 0
+
+def build_game(seed=None, player_cash=25000000, use_order_book=False, warmup_days=None):
+    """
+    새 게임의 (market, investors)를 만들기만 함 (원장은 메모리). 파일이나 전역 상태를 건드리지 않으므로
+    재시작용 다음 게임을 백그라운드 스레드에서 미리 만들 때도 씁니다.
+    """
+    if warmup_days is None:
+        warmup_days = WARMUP_DAYS
+    mk = create_initial_market(use_order_book=use_order_book, seed=seed, warmup_days=warmup_days)
+    investors = create_default_investors(player_cash, mk.rng)
+    attach_ledger(mk, investors)
+    return mk, investors
+
+def open_game(mk, investors):
+    """만든 게임을 시작할 때 파일 원장(--ledger)으로 바꿈 (메인 스레드에서 호출)"""
+    global _file_ledger
+    if LEDGER_PATH is not None:
+        # 재시작하면 파일을 새로 씀 (이전 게임의 원장은 닫아 디스크에 반영)
+        if _file_ledger is not None:
+            _file_ledger.close()
+        mk.ledger = _file_ledger = ledger.Ledger(LEDGER_PATH)
+        attach_ledger(mk, investors)
+    return mk, investors
+
+def new_game(seed=None, player_cash=25000000, use_order_book=False, warmup_days=None):
+    """새 게임의 (market, investors). 같은 시드와 같은 워밍업 일수면 같은 시장과 봇이 만들어짐"""
+    return open_game(*build_game(seed, player_cash, use_order_book, warmup_days))
+
+# 회사 상세 화면의 관련 뉴스: 회사 이름이 들어간 회사 뉴스와 조건 없이 포함하는 정책/경제/거래 뉴스
+COMPANY_NEWS_TYPES = frozenset(news.TYPE_IDS[t] for t in
+                               ("positive", "negative", "contract", "investment", "acquisition", "merge", "partner"))
+GENERAL_NEWS_TYPES = frozenset(news.TYPE_IDS[t] for t in ("policy", "economic", "trade"))
+
+def company_news(log, name, limit):
+    """회사 관련 최근 뉴스 limit개의 번호 (오래된 순)"""
+    def match(i):
+        kind = log.kind(i)
+        if kind in COMPANY_NEWS_TYPES:
+            return log.mentions(i, name)
+        return kind in GENERAL_NEWS_TYPES
+    return log.latest(limit, match)
+
 def draw_text(surface, text, x, y, color=(0, 0, 0), font=None):
     if font is None:
         font = pygame.font.SysFont("malgungothic", 16)
     img = font.render(text, True, color)
     surface.blit(img, (x, y))
 
+def draw_sparkline(surface, x, y, w, h, values, color=(0, 200, 0)):
+    """값 시퀀스를 w 픽셀 폭의 작은 선 그래프로 그립니다. (긴 시퀀스는 건너뛰며 샘플링)"""
+    n = len(values)
+    if n < 2 or w < 2:
+        return
+    step = max(1, n // w)
+    pts = values[n - 1 - ((n - 1) // step) * step::step]
+    lo = min(pts)
+    hi = max(pts)
+    span = (hi - lo) or 1.0
+    dx = w / max(len(pts) - 1, 1)
+    points = [(x + i * dx, y + h - (v - lo) / span * h) for i, v in enumerate(pts)]
+    if len(points) >= 2:
+        pygame.draw.lines(surface, color, False, points, 1)
+
 # 고정된 캔들 폭 정의
 FIXED_CANDLE_WIDTH = 14  # 픽셀 단위
+FORECAST_SLOTS = 12  # 예측 띠를 그릴 때 오른쪽에 비워 두는 캔들 칸 수
 
-def draw_candlestick_chart(surface, x, y, w, h, candles, font, timeframe_info):
+def draw_candlestick_chart(surface, x, y, w, h, candles, font, timeframe_info, forecast_info=None):
     """
     고정된 캔들 폭으로 캔들스틱 차트를 그립니다.
 
@@ -1274,6 +1333,7 @@ def draw_candlestick_chart(surface, x, y, w, h, candles, font, timeframe_info):
         candles (list): 캔들스틱 데이터 목록.
         font (pygame.font.Font): 텍스트 폰트.
         timeframe_info (dict): 현재 타임프레임 정보 (group_size).
+        forecast_info (dict): 예측 띠 (bands: 백분위별 가격 배열, offset: 시작 캔들 칸, step: 틱당 칸 수, label). 없으면 None.
     """
 
     # 차트 배경
@@ -1297,6 +1357,20 @@ def draw_candlestick_chart(surface, x, y, w, h, candles, font, timeframe_info):
     mxp = max(all_high)
     mnp = min(all_low)
 
+    # 예측 띠의 (x 좌표, 백분위 값) 중 그리드 안에 들어오는 점 (가격 범위에도 포함)
+    band_points = []
+    if forecast_info is not None:
+        bands = forecast_info["bands"]
+        for j in range(len(bands[0])):
+            px = x + 20 + (forecast_info["offset"] + j * forecast_info["step"]) * cndl_w + cndl_w / 2
+            if px > x + w - 120:
+                break
+            if px >= x + 20:
+                band_points.append((px, [band[j] for band in bands]))
+        if band_points:
+            mxp = max(mxp, max(values[-1] for _, values in band_points))
+            mnp = min(mnp, min(values[0] for _, values in band_points))
+
     if mxp == mnp:
         mxp += 1  # 0으로 나누는 것을 방지
 
@@ -1320,6 +1394,16 @@ def draw_candlestick_chart(surface, x, y, w, h, candles, font, timeframe_info):
         label_x = x + w - 100
         surface.blit(label_surf, (label_x, label_y - label_surf.get_height() // 2))
 
+    # 예측 띠: 바깥/안쪽 백분위 구간을 칠하고 중앙값은 선으로
+    if len(band_points) >= 2:
+        n = len(band_points[0][1])
+        for i, color in ((0, (55, 55, 95)), (1, (85, 85, 140))):
+            upper = [(px, toY(values[n - 1 - i])) for px, values in band_points]
+            lower = [(px, toY(values[i])) for px, values in reversed(band_points)]
+            pygame.draw.polygon(surface, color, upper + lower)
+        pygame.draw.lines(surface, (220, 220, 255), False, [(px, toY(values[n // 2])) for px, values in band_points], 2)
+        draw_text(surface, forecast_info["label"], x + 250, y + h + 30, (200, 200, 255), font)
+
     # 이동 평균선 계산
     def calculate_moving_average(candles, window):
         if len(candles) < window:
@@ -1415,11 +1499,67 @@ SCENE_TRADE = 3
 SCENE_PORTFOLIO = 4
 SCENE_GOAL_SUCCESS = 5
 SCENE_GOAL_FAILURE = 6
+SCENE_NAMES = {SCENE_HOME: "홈", SCENE_SIMULATION: "시뮬레이션", SCENE_COMPANY_DETAIL: "회사 상세", SCENE_TRADE: "거래",
+               SCENE_PORTFOLIO: "포트폴리오", SCENE_GOAL_SUCCESS: "목표 달성", SCENE_GOAL_FAILURE: "목표 실패"}
 
 # 목표 설정
 GOAL_AMOUNT = 100_000_000  # 1억 원
 GOAL_DAYS = 90  # 3개월
 
+# 호가창/매칭 엔진 사용 여부 (True면 봇과 플레이어 주문이 호가를 소진하며 주가를 움직임)
+USE_ORDER_BOOK = False
+
+# 저장 파일 경로 (F5 저장, F8 불러오기, 게임 중 창을 닫으면 자동 저장)
+SAVE_PATH = "savegame.stk"
+
+def save_game(market, investors, path=SAVE_PATH):
+    """시장과 투자자 전체 상태를 저장"""
+    persistence.save(path, market, investors)
+
+INVESTOR_CLASSES = {"Investor": Investor, "Bot": Bot}
+
+def load_game(path=SAVE_PATH):
+    """저장 파일에서 (market, investors) 복원"""
+    mk, invs = persistence.load(path, Market, Company, INVESTOR_CLASSES)
+    attach_ledger(mk, invs)
+    return mk, invs
+
+def restore_game(data):
+    """persistence.dumps()로 만든 bytes에서 (market, investors) 복원 (리플레이 체크포인트)"""
+    mk, invs = persistence.loads(data, Market, Company, INVESTOR_CLASSES)
+    attach_ledger(mk, invs)
+    return mk, invs
+
+def restore_sections(meta, sections):
+    """메타데이터와 구역 배열에서 (market, investors) 복원 (타임라인 되감기)"""
+    mk, invs = persistence.restore(meta, sections, Market, Company, INVESTOR_CLASSES)
+    attach_ledger(mk, invs)
+    return mk, invs
+
+# 되감기용 타임라인 스냅샷이 쓸 수 있는 메모리 (--timeline-budget, 0이면 기록 안 함)
+TIMELINE_BUDGET = timeline.BUDGET_BYTES
+
+# 회사 상세 차트의 앞날 예측 틱 수 (--forecast, 0이면 끔)와 경로 수 (--forecast-paths)
+FORECAST_HORIZON = 0
+FORECAST_PATHS = forecast.PATHS
+
+# 플레이어 입력 저널 (게임을 시작하거나 불러올 때마다 새로 기록)
+JOURNAL_PATH = "journal.jsonl"
+JOURNAL_START_PATH = "journal.start.stk"  # 불러온 게임의 시작 상태 사본
+
+def start_game(start):
+    """
+    저널 시작 조건으로 (market, investors) 생성. 재생용이므로 원장은 메모리에만 둠 (open_game을 거치지 않아
+    --ledger 파일, 즉 재생 중인 세션이 남긴 원장을 새로 쓰지 않음)
+    """
+    if "save" in start:
+        return load_game(start["save"])
+    return build_game(start["seed"], start["player_cash"], start["use_order_book"], start.get("warmup_days", 0))
+
+def create_replayer(path=JOURNAL_PATH):
+    """저널 파일을 재생하는 Replayer"""
+    return replay.Replayer(journal.Journal.load(path), start_game, restore_game)
+
 # 전역 변수로 investors 선언
 investors = []
 
@@ -1463,8 +1603,17 @@ def get_current_timeframe():
 # 5) 메인 함수
 # ############################
 
-def main():
+def main(seed=None, replayer=None, universe=None, shared=None, market_metrics=None, exporter=None, capture=None):
+    """
+    게임 실행. seed를 주면 그 시드로 새 게임을 만들고,
+    replayer를 주면 저널을 재생하는 리플레이 뷰어로 실행합니다 (PageUp/PageDown으로 하루씩 이동, F6으로 일시정지).
+    universe(shard.ShardedMarket)를 주면 게임 틱마다 대규모 유니버스도 한 틱씩 진행하고 요약을 표시합니다.
+    shared(sharedstate.SharedMarketWriter)를 주면 틱마다 시장 상태를 공유 메모리에 공개합니다.
+    market_metrics(metrics.MarketMetrics)를 주면 틱마다 지표를 기록하고, exporter(metrics.MetricsExporter)는 종료할 때 닫습니다.
+    capture(profiler.Capture)를 주면 시작부터 그 단위(프레임/틱)로 기록합니다 (게임 중에는 F9/Shift+F9).
+    """
     global timeframe_index, investors, market, restart_btn_goal, exit_btn_goal, restart_btn_fail, exit_btn_fail
+    logpipe.configure()  # 명령줄에서 이미 설정했으면 그대로 씀
 
     # 초기화 및 변수 설정
     current_scene_after_trade = SCENE_COMPANY_DETAIL  # 기본값은 회사 상세 화면
@@ -1502,24 +1651,40 @@ def main():
 
     current_scene = SCENE_HOME
 
-    market = create_initial_market()
-
-    # 플레이어 투자자 추가
-    investors = [Investor("플레이어", 25000000)]  # 여러 투자자가 필요할 경우 리스트로 관리
-
-    # 봇 투자자 추가
-    investors.append(Bot("봇_랜덤1", 5000000, strategy="random"))
-    investors.append(Bot("봇_성장1", 7000000, strategy="growth"))
-    investors.append(Bot("봇_섹터1", 6000000, strategy="sector"))
-    investors.append(Bot("봇_가치1", 8000000, strategy="value"))
-    investors.append(Bot("봇_모멘텀1", 7500000, strategy="momentum"))
+    # 플레이어(첫 번째)와 봇 투자자
+    if replayer is not None:
+        market, investors = replayer.market, list(replayer.investors)
+        current_scene = SCENE_SIMULATION
+    else:
+        market, investors = new_game(seed, use_order_book=USE_ORDER_BOOK)
+    session_journal = None
+    replay_paused = False
+    universe_snapshot = None  # 유니버스의 마지막 틱 요약
+    tick_profiler = None  # F7로 켜는 틱 단계별 시간 기록
+    frame_stats = None  # F3로 켜는 성능 HUD 기록
+    hud_panel = None  # HUD 글자 판 (초당 한 번 다시 만듦)
+    hud_panel_samples = -1
+    text_cache = hud.TextCache()  # 바뀌지 않은 글자는 다시 렌더링하지 않음
 
     investor = investors[0]  # 현재 플레이어를 첫 번째 투자자로 설정
     selected_company = None
 
     trade_mode = "BUY"
     trade_quantity_str = ""
+    trade_price_str = ""  # 지정가/손절/익절 가격 입력
+    trade_order_type = None  # None이면 시장가
+    trade_input_field = "qty"  # 입력 중인 칸 ("qty" 또는 "price")
     error_message = ""
+    status_message = ""  # 저장/불러오기 결과 안내
+    status_timer = 0
+
+    # 자동 저장 (스냅샷만 메인 루프에서 잡고 기록은 백그라운드 스레드)
+    autosaver = autosave.AutoSaver()
+    prebuilder = prebuild.GamePrebuilder()  # 목표 화면에서 재시작용 다음 게임을 미리 만듦
+    # 하루마다 남기는 되감기 스냅샷 (리플레이는 자체 체크포인트로 탐색)
+    session_timeline = timeline.Timeline(budget=TIMELINE_BUDGET) if TIMELINE_BUDGET > 0 and replayer is None else None
+    # 회사 상세 차트의 예측 띠 (워커 프로세스에서 계산하고 화면은 끝난 결과만 그림)
+    forecaster = forecast.Forecaster(restore_game, FORECAST_PATHS, FORECAST_HORIZON) if FORECAST_HORIZON > 0 else None
 
     # DAY_INTERVAL은 이제 고정된 0.5초로 설정
     DAY_INTERVAL = 0.5  # 0.5초마다 주가 업데이트
@@ -1536,8 +1701,7 @@ def main():
 
     def draw_text_local(surf, txt, x, y, color=WHITE, font=base_font):
         """로컬 텍스트 그리기 함수"""
-        t = font.render(txt, True, color)
-        surf.blit(t, (x, y))
+        surf.blit(text_cache.render(font, txt, color), (x, y))
 
     class Button:
         """버튼 클래스 정의"""
@@ -1558,7 +1722,7 @@ def main():
             else:
                 current_color = self.hover_color if self.hovered else self.color
             pygame.draw.rect(surf, current_color, self.rect, border_radius=5)
-            txt_surf = self.font.render(self.text, True, (255, 255, 255))
+            txt_surf = text_cache.render(self.font, self.text, (255, 255, 255))
             tx = self.rect.centerx - txt_surf.get_width() // 2
             ty = self.rect.centery - txt_surf.get_height() // 2
             surf.blit(txt_surf, (tx, ty))
@@ -1579,32 +1743,186 @@ def main():
         current_scene = SCENE_SIMULATION
 
     def on_exit_clicked():
+        end_journal()
+        autosaver.close()
+        close_background()
         pygame.quit()
         sys.exit()
 
+    def close_background():
+        """게임 밖 프로세스/스레드와 나누는 자원 정리 (유니버스 워커, 공유 메모리, 지표 내보내기, 다음 게임 준비, 예측 워커)"""
+        prebuilder.close()
+        if forecaster is not None:
+            forecaster.close()
+        if universe is not None:
+            universe.close()
+        if shared is not None:
+            shared.close()
+        if exporter is not None:
+            exporter.close()
+        if market_metrics is not None:
+            market_metrics.close()
+        if capture is not None:
+            end_capture()
+
+    def set_status(text):
+        nonlocal status_message, status_timer
+        status_message = text
+        status_timer = 90  # 3초 동안 표시 (30 FPS 기준)
+
+    def end_capture():
+        """함수 단위 기록을 파일로 쓰고 끝냄 (count를 채웠거나 F9를 다시 눌렀을 때)"""
+        nonlocal capture
+        paths = capture.finish()
+        logging.info(f"프로파일 기록 {capture.done}{'프레임' if capture.unit == profiler.FRAMES else '틱'}: {', '.join(paths)}")
+        set_status(f"프로파일 저장: {paths[-1]}")
+        capture = None
+
+    def run_tick(fn, *args):
+        """틱 진행. 틱 단위 기록 중이면 그 틱을 기록"""
+        if capture is not None and capture.unit == profiler.TICKS:
+            capture.run(fn, *args)
+            if capture.finished:
+                end_capture()
+        else:
+            fn(*args)
+
+    def start_journal(start):
+        """현재 market의 플레이어 입력을 JOURNAL_PATH에 새로 기록 (이전 저널은 닫음)"""
+        nonlocal session_journal
+        if replayer is not None:
+            return
+        if session_journal is not None:
+            session_journal.close()
+        try:
+            session_journal = journal.Journal(start, JOURNAL_PATH)
+        except OSError as e:
+            logging.error(f"저널 기록 실패: {e}")
+            session_journal = None
+        market.journal = session_journal
+
+    def end_journal():
+        """세션 종료 상태 해시를 남기고 저널을 닫음 (재생 결과 검증용)"""
+        nonlocal session_journal
+        if session_journal is None:
+            return
+        session_journal.record(market.day_count, journal.ACTION_END,
+                               fingerprint=persistence.fingerprint(market, investors))
+        session_journal.close()
+        session_journal = None
+
+    def replay_blocked():
+        """리플레이 중이면 안내하고 True (플레이어 거래 차단)"""
+        if replayer is None:
+            return False
+        set_status("리플레이 중에는 거래할 수 없습니다.")
+        return True
+
+    def on_replay_seek(tick):
+        nonlocal investor, selected_company, current_scene, day_timer
+        global market
+        replayer.seek(tick)
+        market = replayer.market
+        market.current_timeframe = get_current_timeframe()
+        investors[:] = replayer.investors
+        investor = investors[0]
+        if selected_company is not None:
+            selected_company = market.company_by_id.get(selected_company.id)
+            if selected_company is None and current_scene in [SCENE_COMPANY_DETAIL, SCENE_TRADE]:
+                current_scene = SCENE_SIMULATION
+        bankrupt_notifications.clear()
+        day_timer = 0
+        set_status(f"리플레이: Day {market.day_count / 48:.1f} / {replayer.end_tick / 48:.1f}")
+
+    def on_rewind():
+        """타임라인의 직전 스냅샷으로 되감음. 되감은 상태에서 저널을 새로 시작하고 이전 게임은 백그라운드에서 정리"""
+        nonlocal investor, selected_company, current_scene, day_timer
+        global market
+        rewound = session_timeline.rewind(market.day_count - 1, restore_sections)
+        if rewound is None:
+            set_status("되감을 스냅샷이 없습니다.")
+            return
+        end_journal()
+        prebuilder.release(market, investors)
+        market, investors[:] = rewound
+        market.current_timeframe = get_current_timeframe()
+        investor = investors[0]
+        if selected_company is not None:
+            selected_company = market.company_by_id.get(selected_company.id)
+            if selected_company is None and current_scene in [SCENE_COMPANY_DETAIL, SCENE_TRADE]:
+                current_scene = SCENE_SIMULATION
+        bankrupt_notifications.clear()
+        day_timer = 0
+        try:
+            persistence.save(JOURNAL_START_PATH, market, investors)
+            start_journal({"save": JOURNAL_START_PATH})
+        except OSError as e:
+            logging.error(f"저널 시작 상태 저장 실패: {e}")
+        set_status(f"되감기: Day {market.day_count / 48:.1f} ({session_timeline.last_rewind_time * 1000:.1f} ms, "
+                   f"남은 스냅샷 {len(session_timeline)}개)")
+
+    def on_save_game():
+        try:
+            save_game(market, investors)
+        except OSError as e:
+            logging.error(f"저장 실패: {e}")
+            set_status(f"저장 실패: {e}")
+            return
+        set_status(f"저장 완료: {SAVE_PATH} (Day {int(market.day_count / 48)})")
+
+    def on_load_game():
+        nonlocal current_scene, investor, selected_company, day_timer
+        global market, timeframe_index
+        # 수동 저장과 가장 최근 자동 저장 중 더 최근 파일을 불러옴 (비정상 종료 대비)
+        candidates = [p for p in (SAVE_PATH, autosaver.latest_path()) if p and os.path.exists(p)]
+        path = max(candidates, key=os.path.getmtime) if candidates else SAVE_PATH
+        try:
+            loaded_market, loaded_investors = load_game(path)
+        except (OSError, persistence.SaveFormatError) as e:
+            logging.error(f"불러오기 실패: {e}")
+            set_status(f"불러오기 실패: {e}")
+            return
+        market = loaded_market
+        investors[:] = loaded_investors
+        investor = investors[0]
+        selected_company = None
+        day_timer = 0
+        bankrupt_notifications.clear()
+        if market.current_timeframe in TIMEFRAME_OPTIONS:
+            timeframe_index = TIMEFRAME_OPTIONS.index(market.current_timeframe)
+        current_scene = SCENE_SIMULATION
+        # 불러온 상태의 사본을 저널 시작점으로 삼음 (저장 파일이 나중에 덮어써져도 재생 가능)
+        try:
+            shutil.copyfile(path, JOURNAL_START_PATH)
+            start_journal({"save": JOURNAL_START_PATH})
+        except OSError as e:
+            logging.error(f"저널 시작 상태 복사 실패: {e}")
+        set_status(f"불러오기 완료: {path} (Day {int(market.day_count / 48)})")
+
     # 홈화면 버튼 생성
     start_btn = Button(WIDTH // 2 - 100, 400, 200, 60, "시뮬레이션 시작", on_start_clicked, color=DARK_BLUE, hover_color=BLUE)
-    exit_btn = Button(WIDTH // 2 - 100, 480, 200, 60, "종료하기", on_exit_clicked, color=RED, hover_color=LIGHT_GRAY)
+    load_btn = Button(WIDTH // 2 - 100, 480, 200, 60, "이어하기", on_load_game, color=DARK_BLUE, hover_color=BLUE)
+    exit_btn = Button(WIDTH // 2 - 100, 560, 200, 60, "종료하기", on_exit_clicked, color=RED, hover_color=LIGHT_GRAY)
 
     # 목표 성공 버튼 (전역으로 생성)
     def on_restart_clicked_goal():
         nonlocal current_scene, investor, day_timer
         global market, bankrupt_notifications
-        # 초기화
-        market = create_initial_market()
-        investors.clear()
-        investors.append(Investor("플레이어", 25000000))
-        investors.append(Bot("봇_랜덤1", 5000000, strategy="random"))
-        investors.append(Bot("봇_성장1", 7000000, strategy="growth"))
-        investors.append(Bot("봇_섹터1", 6000000, strategy="sector"))
-        investors.append(Bot("봇_가치1", 8000000, strategy="value"))
-        investors.append(Bot("봇_모멘텀1", 7500000, strategy="momentum"))
+        # 초기화 (목표 화면에 들어올 때 미리 만든 게임으로 교체하고, 끝난 게임은 백그라운드에서 정리)
+        game = prebuilder.take(25000000) or build_game(player_cash=25000000, use_order_book=USE_ORDER_BOOK)
+        prebuilder.release(market, investors)
+        market, investors[:] = open_game(*game)
+        start_journal({"seed": market.seed, "player_cash": 25000000, "use_order_book": USE_ORDER_BOOK,
+                       "warmup_days": WARMUP_DAYS})
         investor = investors[0]
         current_scene = SCENE_HOME
         day_timer = 0
         bankrupt_notifications.clear()
 
     def on_exit_clicked_goal():
+        end_journal()
+        autosaver.close()
+        close_background()
         pygame.quit()
         sys.exit()
 
@@ -1615,21 +1933,21 @@ def main():
     def on_restart_clicked_fail():
         nonlocal current_scene, investor, day_timer
         global market, bankrupt_notifications
-        # 초기화
-        market = create_initial_market()
-        investors.clear()
-        investors.append(Investor("플레이어", 10000000))
-        investors.append(Bot("봇_랜덤1", 5000000, strategy="random"))
-        investors.append(Bot("봇_성장1", 7000000, strategy="growth"))
-        investors.append(Bot("봇_섹터1", 6000000, strategy="sector"))
-        investors.append(Bot("봇_가치1", 8000000, strategy="value"))
-        investors.append(Bot("봇_모멘텀1", 7500000, strategy="momentum"))
+        # 초기화 (목표 화면에 들어올 때 미리 만든 게임으로 교체하고, 끝난 게임은 백그라운드에서 정리)
+        game = prebuilder.take(10000000) or build_game(player_cash=10000000, use_order_book=USE_ORDER_BOOK)
+        prebuilder.release(market, investors)
+        market, investors[:] = open_game(*game)
+        start_journal({"seed": market.seed, "player_cash": 10000000, "use_order_book": USE_ORDER_BOOK,
+                       "warmup_days": WARMUP_DAYS})
         investor = investors[0]
         current_scene = SCENE_HOME
         day_timer = 0
         bankrupt_notifications.clear()
 
     def on_exit_clicked_fail():
+        end_journal()
+        autosaver.close()
+        close_background()
         pygame.quit()
         sys.exit()
 
@@ -1645,6 +1963,8 @@ def main():
         title_rect = title_surf.get_rect(center=(WIDTH // 2, 200))
         screen.blit(title_surf, title_rect)
         start_btn.draw(screen)
+        load_btn.disabled = not (os.path.exists(SAVE_PATH) or autosaver.latest_path())
+        load_btn.draw(screen)
         exit_btn.draw(screen)
 
     # 포트폴리오 버튼 콜백 함수
@@ -1685,12 +2005,16 @@ def main():
     def initiate_trade(mode, return_scene):
         """거래를 시작할 때 호출되는 함수"""
         nonlocal trade_mode, trade_quantity_str, error_message, current_scene, selected_company, current_scene_after_trade
+        nonlocal trade_price_str, trade_order_type, trade_input_field
         if selected_company.is_bankrupt and mode == "SELL":
             # 파산한 회사는 매도할 수 없지만 제거는 가능
             error_message = "파산한 회사는 매도할 수 없습니다."
             return
         trade_mode = mode
         trade_quantity_str = ""
+        trade_price_str = ""
+        trade_order_type = None
+        trade_input_field = "qty"
         error_message = ""
         selected_company = selected_company  # 이미 설정된 회사
         current_scene_after_trade = return_scene
@@ -1698,61 +2022,28 @@ def main():
 
     def initiate_remove(company):
         """포트폴리오에서 회사 제거"""
-        nonlocal investor
-        success = investor.remove_holding(company)
-        if success:
-            # 제거 성공 시 메시지 추가
-            msg_text = f"{investor.name}이 {company.name}을(를) 포트폴리오에서 제거했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
-        else:
-            # 제거 실패 시 메시지 추가
-            msg_text = f"{company.name}을(를) 포트폴리오에서 제거하지 못했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
+        if replay_blocked():
+            return
+        market.player_remove_holding(investor, company)
 
     def remove_holding(company):
         """포트폴리오에서 회사 제거"""
-        nonlocal investor
-        success = investor.remove_holding(company)
-        if success:
-            # 제거 성공 시 메시지 추가
-            msg_text = f"{investor.name}이 {company.name}을(를) 포트폴리오에서 제거했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
-        else:
-            # 제거 실패 시 메시지 추가
-            msg_text = f"{company.name}을(를) 포트폴리오에서 제거하지 못했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
+        if replay_blocked():
+            return
+        market.player_remove_holding(investor, company)
 
     def aggregate_candles(candles, group_size):
         """
         주어진 캔들 데이터를 group_size만큼 집계하여 새로운 캔들 데이터를 반환합니다.
 
         매개변수:
-            candles (list): 원본 캔들 데이터 리스트.
+            candles (CandleSeries): 원본 캔들 시계열.
             group_size (int): 집계할 그룹 크기.
 
         반환값:
             aggregated (list): 집계된 캔들 데이터 리스트.
         """
-        aggregated = []
-        for i in range(0, len(candles), group_size):
-            group = candles[i:i + group_size]
-            if len(group) == 0:
-                continue
-            open_price = group[0]["open"]
-            close_price = group[-1]["close"]
-            high_price = max(c["high"] for c in group)
-            low_price = min(c["low"] for c in group)
-            aggregated.append({
-                "open": open_price,
-                "high": high_price,
-                "low": low_price,
-                "close": close_price
-            })
-        return aggregated
+        return candles.aggregate(group_size)
 
     def show_simulation_screen(dt):
         """시뮬레이션 화면 그리기 함수"""
@@ -1770,6 +2061,17 @@ def main():
             color = WHITE
         draw_text_local(screen, f"정세: {market.economic_condition} (점수: {market.policy_sentiment_score:.2f})", 450,
                        top_info_y, color, base_font)
+        draw_sparkline(screen, 800, top_info_y + 2, 150, 18, market.history.sparkline("policy_sentiment_score", 150), color)
+        if universe_snapshot is not None:
+            u = universe_snapshot
+            draw_text_local(screen, f"유니버스: {u.companies:,}개 (워커 {universe.workers}) 틱 {u.tick} "
+                                    f"{u.elapsed * 1000:.0f}ms | 파산 {u.total_bankruptcies:,} 합병 {u.merges}",
+                            980, top_info_y, LIGHT_GRAY, base_font)
+            if u.gainers and u.losers:
+                best, worst = u.gainers[0], u.losers[0]
+                draw_text_local(screen, f"최고 {shard.company_name(best[1])} {best[0] * 100:+.2f}%  "
+                                        f"최저 {shard.company_name(worst[1])} {worst[0] * 100:+.2f}%",
+                                980, top_info_y + 25, LIGHT_GRAY, base_font)
         portfolio_btn.draw(screen)
         tf_prev_btn.draw(screen)
         tf_next_btn.draw(screen)
@@ -1887,25 +2189,37 @@ def main():
         draw_text_local(screen, f"{current_progress_pct:.2f}% 달성", cx + 5, cy + 2, BLACK, base_font)
         cy += 40
 
+        def draw_indicator_sparkline(name, y):
+            """지표 이름 오른쪽에 최근 추이 스파크라인 표시"""
+            draw_sparkline(screen, cx + 300, y + 4, 110, 16, market.history.sparkline(name, 110), LIGHT_GRAY)
+
         # 중앙 패널에 경제 지표 추가
         econ_factors = market.economic_factors
         draw_text_local(screen, "[경제 지표]", cx, cy, WHITE, title_font)
         cy += 30
         draw_text_local(screen, f"GDP 성장률: {econ_factors['gdp_growth']:.2f}%", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("gdp_growth", cy)
         cy += 25
         draw_text_local(screen, f"인플레이션율: {econ_factors['inflation']:.2f}%", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("inflation", cy)
         cy += 25
         draw_text_local(screen, f"금리: {econ_factors['interest_rate']:.2f}%", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("interest_rate", cy)
         cy += 25
         draw_text_local(screen, f"실업률: {econ_factors['unemployment']:.2f}%", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("unemployment", cy)
         cy += 25
         draw_text_local(screen, f"환율: {econ_factors['exchange_rate']:.2f}원/USD", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("exchange_rate", cy)
         cy += 25
         draw_text_local(screen, f"원자재 비용: {econ_factors['raw_material_cost']:.2f}", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("raw_material_cost", cy)
         cy += 25
         draw_text_local(screen, f"정치적 안정성: {econ_factors['political_stability']:.2f}", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("political_stability", cy)
         cy += 25
         draw_text_local(screen, f"기술 혁신 지수: {econ_factors['innovation_index']:.2f}", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("innovation_index", cy)
         cy += 40
 
         # 중앙 패널에 국가 지표 추가
@@ -1913,10 +2227,13 @@ def main():
         draw_text_local(screen, "[국가 지표]", cx, cy, WHITE, title_font)
         cy += 30
         draw_text_local(screen, f"국가 총 자산: {national_factors['total_assets']:.2f}조", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("total_assets", cy)
         cy += 25
         draw_text_local(screen, f"출산율: {national_factors['birth_rate']:.2f}명", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("birth_rate", cy)
         cy += 25
         draw_text_local(screen, f"인구: {national_factors['population']:,}명", cx, cy, WHITE, base_font)
+        draw_indicator_sparkline("population", cy)
         cy += 40
 
         # 검색 결과 수 표시
@@ -1932,10 +2249,10 @@ def main():
         pygame.draw.rect(screen, PANEL_COLOR, (right_x, 100, RIGHT_PANEL_WIDTH, HEIGHT - 150), border_radius=10)
         draw_text_local(screen, "최신 뉴스", right_x + 20, 120, WHITE, title_font)
         ny = 160
-        for msg in market.recent_messages[-27:]:
+        for i in market.news.latest(27):
             if ny > HEIGHT:
                 break
-            draw_text_local(screen, "- " + msg["text"], right_x + 20, ny, WHITE, base_font)
+            draw_text_local(screen, "- " + market.news.text(i), right_x + 20, ny, WHITE, base_font)
             ny += 25
 
         # 파산 팝업 표시
@@ -1981,6 +2298,8 @@ def main():
         group_size = market.timeframes[market.current_timeframe]["group_size"]
         aggregated_candles = aggregate_candles(company.candles, group_size)
         candles_to_display = (800 - 40) // FIXED_CANDLE_WIDTH - 7  # 차트 너비가 800이라고 가정
+        if forecaster is not None:
+            candles_to_display -= FORECAST_SLOTS
         display_candles = aggregated_candles[-candles_to_display:]
 
         chart_x, chart_y = 50, 400
@@ -1989,7 +2308,22 @@ def main():
             "group_size": group_size
         }
 
-        draw_candlestick_chart(screen, chart_x, chart_y, chart_w, chart_h, display_candles, base_font, timeframe_info)
+        # 예측 띠는 예측을 시작한 캔들이 든 칸에서 시작 (이후 틱이 진행됐으면 실제 캔들과 겹쳐 보임)
+        forecast_info = None
+        prediction = forecaster.latest(market, investors, company) if forecaster is not None else None
+        if prediction is not None:
+            forecast_info = {
+                "bands": prediction.bands,
+                "offset": (prediction.count - 1) // group_size - (len(aggregated_candles) - len(display_candles)),
+                "step": 1 / group_size,
+                "label": f"예측 {prediction.paths}경로 {forecaster.horizon}틱 "
+                         f"({forecast.PERCENTILES[0]}~{forecast.PERCENTILES[-1]}%, Day {prediction.tick / 48:.1f} 기준)",
+            }
+
+        draw_candlestick_chart(screen, chart_x, chart_y, chart_w, chart_h, display_candles, base_font, timeframe_info,
+                               forecast_info)
+        if forecaster is not None and prediction is None:
+            draw_text_local(screen, "예측 계산 중...", chart_x + 250, chart_y + chart_h + 30, (200, 200, 255), base_font)
 
         py = 30
         if len(company.candles) > 1:
@@ -2042,45 +2376,42 @@ def main():
         right_x = 900
         draw_text_local(screen, "[관련 뉴스]", right_x - 20, 50, WHITE, title_font)
         ny = 90
-        detail_filtered = []
-
-        # 관련 뉴스 필터링 수정: economic 타입은 무조건 포함
-        for msg_obj in market.all_messages:
-            if msg_obj["type"] in ["positive", "negative", "random", "contract", "investment", "acquisition", "merge", "partner"]:
-                # 회사 이름이 포함된 뉴스 필터링
-                if company.name in msg_obj.get("company", ""):
-                    detail_filtered.append(msg_obj["text"])
-            elif msg_obj["type"] in ["policy", "economic", "trade"]:
-                # 정책, 경제, 거래 뉴스는 조건없이 포함
-                detail_filtered.append(msg_obj["text"])
-
-        # 필터링된 뉴스 출력
-        for tx in detail_filtered[-29:]:
+
+        # 최근 관련 뉴스 29개만 골라 본문을 만듦 (경제/정책/거래 뉴스는 무조건 포함)
+        for i in company_news(market.news, company.name, 29):
             if ny > HEIGHT - 100:
                 break
-            draw_text_local(screen, "- " + tx, right_x - 15, ny, WHITE, base_font)
+            draw_text_local(screen, "- " + market.news.text(i), right_x - 15, ny, WHITE, base_font)
             ny += 25
 
         back_btn.draw(screen)
 
     def on_buy_clicked():
         nonlocal current_scene, trade_mode, trade_quantity_str, error_message, current_scene_after_trade
+        nonlocal trade_price_str, trade_order_type, trade_input_field
         if selected_company.is_bankrupt:
             error_message = "파산한 회사는 매수할 수 없습니다."
             return
         trade_mode = "BUY"
         trade_quantity_str = ""
+        trade_price_str = ""
+        trade_order_type = None
+        trade_input_field = "qty"
         error_message = ""
         current_scene_after_trade = SCENE_COMPANY_DETAIL
         current_scene = SCENE_TRADE
 
     def on_sell_clicked():
         nonlocal current_scene, trade_mode, trade_quantity_str, error_message, current_scene_after_trade
+        nonlocal trade_price_str, trade_order_type, trade_input_field
         if selected_company.is_bankrupt:
             error_message = "파산한 회사는 매도할 수 없습니다."
             return
         trade_mode = "SELL"
         trade_quantity_str = ""
+        trade_price_str = ""
+        trade_order_type = None
+        trade_input_field = "qty"
         error_message = ""
         current_scene_after_trade = SCENE_COMPANY_DETAIL
         current_scene = SCENE_TRADE
@@ -2098,6 +2429,8 @@ def main():
 
     def on_trade_confirm():
         nonlocal current_scene, trade_quantity_str, selected_company, error_message, current_scene_after_trade
+        if replay_blocked():
+            return
         try:
             qty = int(trade_quantity_str)
         except ValueError:
@@ -2110,13 +2443,31 @@ def main():
             error_message = "파산한 회사는 거래할 수 없습니다!"
             return
 
+        # 지정가/손절/익절 주문은 대기 주문으로 등록
+        if trade_order_type is not None:
+            try:
+                order_price = float(trade_price_str)
+            except ValueError:
+                error_message = "주문 가격을 입력하세요!"
+                return
+            if order_price <= 0 or qty <= 0:
+                error_message = "가격과 수량은 0보다 커야 합니다!"
+                return
+            order = market.player_place_order(investor, selected_company, trade_order_type, order_price, qty)
+            if order is None:
+                error_message = "주문 실패!(잔고/보유 수량 부족)"
+                return
+            error_message = ""
+            current_scene = current_scene_after_trade
+            return
+
         if trade_mode == "BUY":
             max_buy_qty = int(investor.cash // selected_company.current_price) if selected_company.current_price > 0 else 0
             if qty > max_buy_qty:
                 error_message = f"최대 매수 가능 수량은 {max_buy_qty}입니다."
                 return
-            ok = investor.buy(selected_company, qty)
-            if not ok:
+            qty = market.player_trade(investor, selected_company, orderbook.SIDE_BUY, qty)
+            if not qty:
                 error_message = "매수 실패!(잔고 부족/수량 <= 0)"
                 return
         elif trade_mode == "SELL":
@@ -2124,21 +2475,11 @@ def main():
             if qty > max_sell_qty:
                 error_message = f"최대 매도 가능 수량은 {max_sell_qty}입니다."
                 return
-            ok = investor.sell(selected_company, qty)
-            if not ok:
+            qty = market.player_trade(investor, selected_company, orderbook.SIDE_SELL, qty)
+            if not qty:
                 error_message = "매도 실패!(수량 부족/수량 <= 0)"
                 return
 
-        # 거래 성공 시 알림 메시지 추가
-        if trade_mode == "BUY":
-            msg_text = f"{investor.name}이 {selected_company.name}을 {qty}주 매수했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
-        elif trade_mode == "SELL":
-            msg_text = f"{investor.name}이 {selected_company.name}을 {qty}주 매도했습니다."
-            market.all_messages.append({"type": "trade", "text": msg_text})
-            market.recent_messages.append({"type": "trade", "text": msg_text})
-
         error_message = ""
         current_scene = current_scene_after_trade  # 거래 완료 후 원래 화면으로 돌아감
 
@@ -2146,6 +2487,22 @@ def main():
         nonlocal current_scene
         current_scene = current_scene_after_trade  # 거래 취소 시 원래 화면으로 돌아감
 
+    # 매수/매도 모드별 선택 가능한 주문 유형 (None = 시장가)
+    BUY_ORDER_TYPES = [None, orders.ORDER_LIMIT_BUY]
+    SELL_ORDER_TYPES = [None, orders.ORDER_LIMIT_SELL, orders.ORDER_STOP_LOSS, orders.ORDER_TAKE_PROFIT]
+
+    def on_order_type_clicked():
+        """주문 유형 순환 (시장가 -> 지정가 -> 손절 -> 익절)"""
+        nonlocal trade_order_type, trade_input_field, error_message
+        options = BUY_ORDER_TYPES if trade_mode == "BUY" else SELL_ORDER_TYPES
+        trade_order_type = options[(options.index(trade_order_type) + 1) % len(options)]
+        trade_input_field = "price" if trade_order_type is not None else "qty"
+        error_message = ""
+
+    order_type_btn = Button(WIDTH // 2 - 100, 340, 200, 40, "주문 유형", on_order_type_clicked, color=DARK_BLUE, hover_color=BLUE)
+    trade_qty_rect = pygame.Rect(WIDTH // 2 - 100, 200, 200, 40)
+    trade_price_rect = pygame.Rect(WIDTH // 2 - 100, 420, 200, 40)
+
     # 확인/취소 버튼 생성
     confirm_btn = Button(WIDTH // 2 - 130, 700, 120, 50, "확인", on_trade_confirm, color=GREEN, hover_color=LIGHT_GRAY)
     cancel_btn = Button(WIDTH // 2 + 10, 700, 120, 50, "취소", on_trade_cancel, color=RED, hover_color=LIGHT_GRAY)
@@ -2158,10 +2515,24 @@ def main():
         draw_text_local(screen, "수량 입력 후 확인 또는 취소", WIDTH // 2 - 115, 160, GRAY, base_font)
 
         # 입력 박스 그리기
-        in_rect = pygame.Rect(WIDTH // 2 - 100, 200, 200, 40)
+        in_rect = trade_qty_rect
         pygame.draw.rect(screen, WHITE, in_rect, border_radius=5)
+        if trade_input_field == "qty":
+            pygame.draw.rect(screen, BLUE, in_rect, 2, border_radius=5)
         draw_text_local(screen, trade_quantity_str, in_rect.x + 10, in_rect.y + 10, BLACK, base_font)
 
+        # 주문 유형 및 가격 입력
+        order_type_btn.text = "시장가" if trade_order_type is None else orders.ORDER_TYPE_LABELS[trade_order_type]
+        order_type_btn.draw(screen)
+        if trade_order_type is not None:
+            draw_text_local(screen, "주문 가격:", trade_price_rect.x - 100, trade_price_rect.y + 10, WHITE, base_font)
+            pygame.draw.rect(screen, WHITE, trade_price_rect, border_radius=5)
+            if trade_input_field == "price":
+                pygame.draw.rect(screen, BLUE, trade_price_rect, 2, border_radius=5)
+            draw_text_local(screen, trade_price_str, trade_price_rect.x + 10, trade_price_rect.y + 10, BLACK, base_font)
+            draw_text_local(screen, f"현재가: {selected_company.current_price:.2f}원 (Tab: 입력 칸 전환)",
+                            trade_price_rect.x, trade_price_rect.y + 50, GRAY, base_font)
+
         # 매수/매도 최대 수량 계산 및 표시
         if trade_mode == "BUY":
             max_buy_qty = int(
@@ -2188,19 +2559,7 @@ def main():
 
     def get_related_news(company):
         """특정 회사와 관련된 뉴스 필터링"""
-        related_news = []
-
-        # 뉴스 메시지 필터링
-        for msg in market.all_messages:
-            if msg["type"] in ["positive", "negative", "random", "contract", "investment", "acquisition", "merge", "partner"]:
-                # 회사 이름이 포함된 뉴스 필터링
-                if company.name in msg.get("company", ""):
-                    related_news.append(msg["text"])
-            elif msg["type"] in ["policy", "economic", "trade"]:
-                # 정책, 경제, 거래 뉴스는 조건없이 포함
-                related_news.append(msg["text"])
-
-        return related_news[-30:]  # 최근 30개의 관련 뉴스 반환
+        return [market.news.text(i) for i in company_news(market.news, company.name, 30)]  # 최근 30개
 
     def show_portfolio_screen():
         """포트폴리오 화면 그리기 함수"""
@@ -2214,6 +2573,21 @@ def main():
         py += 30
         val = investor.get_portfolio_value(market)
         draw_text_local(screen, f"총 자산: {val:.2f}원", 50, py, WHITE, base_font)
+
+        # 자산 곡선 (틱마다 기록된 총자산)
+        curve = investor.equity_curve
+        if len(curve) >= 2:
+            pnl = curve[-1] - curve[0]
+            draw_text_local(screen, f"손익: {pnl:+,.0f}원", 350, py - 30, GREEN if pnl >= 0 else RED, base_font)
+            draw_sparkline(screen, 350, py - 5, 300, 30, curve, GREEN if pnl >= 0 else RED)
+
+        # 체결 원장의 선입선출 손익 (실현: 매도/제거한 주식, 평가: 남은 매수 묶음)
+        prices = {cid: (0.0 if c.is_bankrupt else c.current_price)
+                  for cid, c in market.company_by_id.items() if cid in investor.holdings}
+        realized = market.ledger.realized_pnl(investor)
+        unrealized = market.ledger.unrealized_pnl(investor, prices)
+        draw_text_local(screen, f"실현 손익: {realized:+,.0f}원", 680, py - 30, GREEN if realized >= 0 else RED, base_font)
+        draw_text_local(screen, f"평가 손익: {unrealized:+,.0f}원", 680, py, GREEN if unrealized >= 0 else RED, base_font)
         py += 50
 
         # 테이블 헤더 그리기
@@ -2234,7 +2608,7 @@ def main():
         portfolio_sell_buttons.clear()
 
         # 보유 종목 표시 (활성 회사 + 파산 회사)
-        held_companies = [c for c in (market.companies + market.bankrupt_companies) if c.id in investor.holdings]
+        held_companies = [market.company_by_id[cid] for cid in investor.holdings if cid in market.company_by_id]
         for c in held_companies:
             data = investor.holdings[c.id]
             qty = data["quantity"]
@@ -2294,6 +2668,37 @@ def main():
 
             py += 40
 
+        # 대기 주문 목록
+        pending_orders = market.orders.orders_for(investor)
+        if pending_orders:
+            py += 10
+            draw_text_local(screen, "[대기 주문]", 50, py, WHITE, title_font)
+            py += 40
+            for order in pending_orders:
+                if py > HEIGHT - 120:
+                    break
+                oc = market.company_by_id.get(order.company_id)
+                oc_name = oc.name if oc else "?"
+                label = orders.ORDER_TYPE_LABELS[order.order_type]
+                draw_text_local(screen, f"{oc_name}  {label}  {order.price:.2f}원  {order.quantity}주", 50, py, LIGHT_GRAY, base_font)
+                cancel_order_btn = Button(820, py - 3, 60, 30, "취소", lambda oid=order.order_id: replay_blocked() or market.player_cancel_order(investor, oid),
+                                          color=GRAY, hover_color=LIGHT_GRAY, font=button_font)
+                portfolio_sell_buttons.append(cancel_order_btn)
+                py += 35
+
+        # 최근 체결 (원장의 투자자 색인으로 조회)
+        recent_trades = market.ledger.trades(investor, limit=5)
+        if recent_trades and py <= HEIGHT - 160:
+            py += 10
+            draw_text_local(screen, "[최근 체결]", 50, py, WHITE, title_font)
+            py += 40
+            for t in reversed(recent_trades):
+                if py > HEIGHT - 120:
+                    break
+                draw_text_local(screen, f"Day {t.tick / 48:.1f}  {t.name}  {TRADE_KIND_LABELS[t.kind]}  {t.quantity}주  {t.price:,.2f}원",
+                                50, py, LIGHT_GRAY, base_font)
+                py += 30
+
         # 우측 상단에 보유 주식 관련 뉴스 표시
         right_x = 900  # 포트폴리오 테이블이 끝나는 x 위치에 따라 조정
         news_y = 150
@@ -2304,24 +2709,25 @@ def main():
         held_sectors = set(c.sector for c in held_companies)
         held_company_names = set(c.name for c in held_companies)
 
-        related_news = []
-        for msg_obj in market.all_messages:
-            if msg_obj["type"] == "policy":
-                if msg_obj.get("sector") in held_sectors:
-                    related_news.append(msg_obj["text"])
-            elif msg_obj["type"] == "economic":
-                related_news.append(msg_obj["text"])
-            elif msg_obj.get("company") in held_company_names:
-                related_news.append(msg_obj["text"])
-            elif msg_obj["type"] in ["merge", "investment", "contract", "partner", "trade"]:
-                if any(comp in msg_obj.get("company", "") for comp in held_company_names):
-                    related_news.append(msg_obj["text"])
-
-        # 최신 30개의 관련 뉴스 표시
-        for news in related_news[-27:]:
+        log = market.news
+
+        def is_related(i):
+            kind = log.kind_name(i)
+            if kind == "policy":
+                return log.sector(i) in held_sectors
+            if kind == "economic":
+                return True
+            if log.company(i) in held_company_names:
+                return True
+            if kind in ("merge", "investment", "contract", "partner", "trade"):
+                return any(log.mentions(i, comp) for comp in held_company_names)
+            return False
+
+        # 최신 27개의 관련 뉴스 표시
+        for i in log.latest(27, is_related):
             if news_y > HEIGHT:  # 화면 아래로 넘어가지 않도록 제한
                 break
-            draw_text_local(screen, "- " + news, right_x + 10, news_y, WHITE, base_font)
+            draw_text_local(screen, "- " + log.text(i), right_x + 10, news_y, WHITE, base_font)
             news_y += 25
 
         portfolio_back_btn.draw(screen)
@@ -2365,35 +2771,163 @@ def main():
         restart_btn_fail.draw(screen)
         exit_btn_fail.draw(screen)
 
+    HUD_X, HUD_Y, HUD_WIDTH, HUD_LINE = WIDTH - 490, 105, 470, 20
+
+    def draw_perf_hud():
+        """
+        F3 성능 HUD. 글자와 초당 기록 스파크라인은 초당 기록이 갱신될 때만 판에 다시 그리고,
+        프레임마다 불투명한 판 복사와 프레임 시간 스파크라인 하나만 그림 (반투명 판은 복사가 몇 배 느림)
+        """
+        nonlocal hud_panel, hud_panel_samples
+        started = time.perf_counter()
+        stats = frame_stats
+        if hud_panel is None or hud_panel_samples != stats.samples:
+            hud_panel_samples = stats.samples
+            phase_ms = " / ".join(f"{name} {t * 1000:.2f}" for name, t in zip(hud.PHASES, stats.scene_means(current_scene)))
+            lines = [
+                f"FPS {stats.fps.last:.1f}",
+                f"프레임 {stats.frame.mean() * 1000:.2f}ms (최대 {stats.frame.max() * 1000:.2f})",
+                f"{SCENE_NAMES.get(current_scene, current_scene)}: {phase_ms} ms",
+                f"틱/초 {stats.tick_rate.last:.2f}",
+                f"텍스트 캐시 적중 {text_cache.hit_rate() * 100:.1f}% ({len(text_cache.surfaces)}개)",
+                f"캔들 {stats.candle_bytes / 1048576:.2f}MB ({stats.candle_count:,}개) | "
+                f"메시지 {stats.message_bytes / 1048576:.2f}MB ({stats.message_count:,}개)",
+                f"HUD {stats.hud.mean() * 1000:.3f}ms (최대 {stats.hud.max() * 1000:.3f})",
+            ]
+            hud_panel = pygame.Surface((HUD_WIDTH, len(lines) * HUD_LINE + 12)).convert()
+            hud_panel.fill(BLACK)
+            for i, line in enumerate(lines):
+                # 매초 바뀌는 숫자라 텍스트 캐시를 거치지 않음 (적중률 집계에서도 제외)
+                hud_panel.blit(base_font.render(line, True, WHITE), (8, 6 + i * HUD_LINE))
+            draw_sparkline(hud_panel, HUD_WIDTH - 130, 8, 120, 14, stats.fps.values(), GREEN)
+            draw_sparkline(hud_panel, HUD_WIDTH - 130, 8 + 3 * HUD_LINE, 120, 14, stats.tick_rate.values(), BLUE)
+        screen.blit(hud_panel, (HUD_X, HUD_Y))
+        draw_sparkline(screen, HUD_X + HUD_WIDTH - 130, HUD_Y + 8 + HUD_LINE, 120, 14, stats.frame.values(), RED)
+        stats.hud.push(time.perf_counter() - started)
+
     # ############################
     # 7) 메인 루프 및 실행
     # ############################
 
+    # 새 게임의 플레이어 입력 기록 시작
+    start_journal({"seed": market.seed, "player_cash": investor.cash, "use_order_book": USE_ORDER_BOOK,
+                   "warmup_days": WARMUP_DAYS})
+
     # 메인 루프
     running = True
     while running:
         dt = clock.tick(30) / 400.0  # 초 단위로 변경 (60 FPS 기준)
+        if frame_stats is not None:
+            frame_stats.begin()
+        if capture is not None and capture.unit == profiler.FRAMES:
+            capture.start()
 
         if current_scene in [SCENE_SIMULATION, SCENE_PORTFOLIO, SCENE_COMPANY_DETAIL]:
             day_timer += dt
+            # 자동 저장 스냅샷은 프레임마다 조금씩 복사 (틱은 미루지 않음, 남은 복사는 next_day가 먼저 마침)
+            autosaver.step(market)
             if day_timer >= DAY_INTERVAL:
                 day_timer -= DAY_INTERVAL
-                market.next_day(investors, dt)
-
-            # 목표 달성 여부 확인
-            portfolio_value = investor.get_portfolio_value(market)
-            if investor.cash >= GOAL_AMOUNT:
-                current_scene = SCENE_GOAL_SUCCESS
-            elif market.day_count/48 >= GOAL_DAYS:
-                current_scene = SCENE_GOAL_FAILURE
+                market.profiler = tick_profiler  # 불러오기/재시작으로 market이 바뀌어도 유지
+                market.metrics = market_metrics
+                if replayer is None:
+                    if session_timeline is not None:
+                        session_timeline.maybe_record(market, investors)
+                    run_tick(market.next_day, investors, dt)
+                    autosaver.maybe_save(market, investors)
+                    if frame_stats is not None:
+                        frame_stats.tick()
+                elif not replay_paused and market.day_count < replayer.end_tick:
+                    run_tick(replayer.step)
+                    if frame_stats is not None:
+                        frame_stats.tick()
+                if shared is not None:
+                    shared.publish(market)
+                # 유니버스는 워커가 계산하는 동안 기다리지 않음 (이전 틱이 아직이면 이번 틱은 건너뜀)
+                if universe is not None:
+                    universe.begin_tick()
+
+            # 목표 달성 여부 확인 (리플레이는 목표와 무관하게 저널 끝까지 재생)
+            if replayer is None:
+                if investor.cash >= GOAL_AMOUNT:
+                    current_scene = SCENE_GOAL_SUCCESS
+                    prebuilder.prepare(25000000, build_game, None, 25000000, USE_ORDER_BOOK)
+                elif market.day_count/48 >= GOAL_DAYS:
+                    current_scene = SCENE_GOAL_FAILURE
+                    prebuilder.prepare(10000000, build_game, None, 10000000, USE_ORDER_BOOK)
+
+        if universe is not None:
+            universe_snapshot = universe.poll() or universe_snapshot
+        if frame_stats is not None:
+            frame_stats.lap(hud.SIMULATION)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                # 진행 중인 게임은 닫기 전에 저장
+                if replayer is None and market.day_count > 0 and current_scene not in [SCENE_GOAL_SUCCESS, SCENE_GOAL_FAILURE]:
+                    on_save_game()
+                end_journal()
                 running = False
 
+            # 성능 HUD는 모든 장면에서 켜고 끔
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if frame_stats is None:
+                    frame_stats = hud.FrameStats()
+                else:
+                    frame_stats = hud_panel = None
+                continue
+
+            # 함수 단위 기록: F9는 다음 프레임들, Shift+F9는 다음 틱들 (기록 중 다시 누르면 거기까지 저장)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                if capture is not None:
+                    end_capture()
+                elif event.mod & pygame.KMOD_SHIFT:
+                    capture = profiler.Capture(profiler.CAPTURE_TICKS, profiler.TICKS)
+                    set_status(f"다음 {profiler.CAPTURE_TICKS}틱 프로파일 기록 중 (F9로 중단)")
+                else:
+                    capture = profiler.Capture(profiler.CAPTURE_FRAMES, profiler.FRAMES)
+                    set_status(f"다음 {profiler.CAPTURE_FRAMES}프레임 프로파일 기록 중 (F9로 중단)")
+                continue
+
+            # 리플레이 탐색: PageUp/PageDown 하루씩, F6 일시정지
+            if replayer is not None and event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_PAGEUP:
+                    on_replay_seek(market.day_count - 48)
+                    continue
+                elif event.key == pygame.K_PAGEDOWN:
+                    on_replay_seek(min(market.day_count + 48, replayer.end_tick))
+                    continue
+                elif event.key == pygame.K_F6:
+                    replay_paused = not replay_paused
+                    set_status("리플레이 일시정지" if replay_paused else "리플레이 재개")
+                    continue
+
+            # 저장/불러오기 단축키
+            if event.type == pygame.KEYDOWN and current_scene in [SCENE_SIMULATION, SCENE_PORTFOLIO, SCENE_COMPANY_DETAIL]:
+                if event.key == pygame.K_F7:
+                    if tick_profiler is None:
+                        tick_profiler = profiler.TickProfiler()
+                        set_status("틱 프로파일 기록 시작 (F7로 종료)")
+                    else:
+                        logging.info(f"틱 프로파일\n{tick_profiler.report()}")
+                        set_status(f"틱 프로파일 종료: {tick_profiler.ticks}틱, 결과는 simulation.log")
+                        tick_profiler = None
+                        market.profiler = None
+                    continue
+                elif event.key == pygame.K_F5:
+                    on_save_game()
+                    continue
+                elif event.key == pygame.K_F8 and replayer is None:
+                    on_load_game()
+                    continue
+                elif event.key == pygame.K_PAGEUP and session_timeline is not None:
+                    on_rewind()
+                    continue
+
             # 홈화면
             if current_scene == SCENE_HOME:
                 start_btn.handle_event(event)
+                load_btn.handle_event(event)
                 exit_btn.handle_event(event)
 
             elif current_scene == SCENE_SIMULATION:
@@ -2481,11 +3015,25 @@ def main():
             elif current_scene == SCENE_TRADE:
                 confirm_btn.handle_event(event)
                 cancel_btn.handle_event(event)
+                order_type_btn.handle_event(event)
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    if trade_qty_rect.collidepoint(event.pos):
+                        trade_input_field = "qty"
+                    elif trade_order_type is not None and trade_price_rect.collidepoint(event.pos):
+                        trade_input_field = "price"
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         current_scene = current_scene_after_trade
                     elif event.key == pygame.K_RETURN:
                         on_trade_confirm()
+                    elif event.key == pygame.K_TAB:
+                        if trade_order_type is not None:
+                            trade_input_field = "price" if trade_input_field == "qty" else "qty"
+                    elif trade_input_field == "price":
+                        if event.key == pygame.K_BACKSPACE:
+                            trade_price_str = trade_price_str[:-1]
+                        elif event.unicode.isdigit() or (event.unicode == "." and "." not in trade_price_str):
+                            trade_price_str += event.unicode
                     elif event.key == pygame.K_BACKSPACE:
                         trade_quantity_str = trade_quantity_str[:-1]
                     else:
@@ -2509,6 +3057,9 @@ def main():
                     restart_btn_fail.handle_event(event)
                     exit_btn_fail.handle_event(event)
 
+        if frame_stats is not None:
+            frame_stats.lap(hud.EVENTS)
+
         # 장면별 그리기
         if current_scene == SCENE_HOME:
             show_home_screen()
@@ -2525,10 +3076,137 @@ def main():
         elif current_scene == SCENE_GOAL_FAILURE:
             show_goal_failure_screen()
 
-        pygame.display.flip()
+        if tick_profiler is not None and tick_profiler.ticks and current_scene == SCENE_SIMULATION:
+            p50, p95 = tick_profiler.percentiles(profiler.TOTAL, (50, 95))
+            draw_text_local(screen, f"틱 p50 {p50 * 1000:.2f}ms p95 {p95 * 1000:.2f}ms | "
+                                    f"느린 단계: {profiler.PHASES[tick_profiler.slowest()]}",
+                            900, HEIGHT - 35, LIGHT_GRAY, base_font)
+
+        if status_timer > 0:
+            draw_text_local(screen, status_message, 20, HEIGHT - 35, LIGHT_GRAY, base_font)
+            status_timer -= 1
 
+        if frame_stats is not None:
+            draw_perf_hud()
+        pygame.display.flip()
+        if frame_stats is not None:
+            frame_stats.lap(hud.DRAWING)
+            frame_stats.end(current_scene, market)
+        if capture is not None and capture.unit == profiler.FRAMES and capture.stop():
+            end_capture()
+
+    autosaver.close()
+    close_background()
     pygame.quit()
     sys.exit()
 
+def run_headless(ticks=None, seed=None, replayer=None, profile=False, market_metrics=None, capture=None):
+    """
+    화면 없이 최대 속도로 시뮬레이션하고 결과를 출력합니다.
+    replayer가 있으면 저널을 재생하며(기본: 저널 끝까지), 기록된 종료 상태 해시와 비교합니다.
+    profile이면 틱 단계별 시간과 이벤트 수를 함께 출력합니다. market_metrics(metrics.MarketMetrics)는 틱마다 기록합니다.
+    capture(profiler.Capture)를 주면 처음 capture.count틱을 함수 단위로 기록합니다.
+    반환값은 종료 코드 (재생 결과가 원래 세션과 다르면 1)
+    """
+    tick_profiler = profiler.TickProfiler() if profile else None
+    if replayer is not None:
+        replayer.market.profiler = tick_profiler
+        replayer.market.metrics = market_metrics
+        end = replayer.end_tick if ticks is None else ticks
+        while capture is not None and not capture.finished and replayer.market.day_count < end:
+            capture.run(replayer.step)
+        replayer.run_to(end)
+        mk, invs = replayer.market, replayer.investors
+    else:
+        mk, invs = new_game(seed, use_order_book=USE_ORDER_BOOK)
+        mk.profiler = tick_profiler
+        mk.metrics = market_metrics
+        for _ in range(GOAL_DAYS * 48 if ticks is None else ticks):
+            if capture is not None and not capture.finished:
+                capture.run(mk.next_day, invs, 0)
+            else:
+                mk.next_day(invs, 0)
+    player = invs[0]
+    print(f"seed={mk.seed} tick={mk.day_count} day={mk.day_count / 48:.1f} "
+          f"companies={len(mk.companies)} cash={player.cash:.0f} total={player.get_portfolio_value():.0f} "
+          f"fingerprint={persistence.fingerprint(mk, invs)}")
+    if tick_profiler is not None:
+        print(tick_profiler.report())
+    if capture is not None:
+        print(f"capture: {capture.done} ticks -> {', '.join(capture.finish())}")
+    if replayer is not None:
+        verified = replayer.verify()
+        if verified is not None:
+            print("replay: 원래 세션과 일치" if verified else "replay: 원래 세션과 다름")
+            if verified and mk.day_count > replayer.start_tick:
+                # 중간 체크포인트에서 복원해 다시 재생해도 같은 결과인지 (리플레이 뷰어의 되감기와 같은 경로)
+                middle = (replayer.start_tick + mk.day_count) // 2
+                verified = replayer.verify_seek(middle, mk.day_count)
+                print(f"replay: {middle}틱으로 되감아 다시 재생해도 " + ("일치" if verified else "다름"))
+            return 0 if verified else 1
+    return 0
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="모의 주식 시뮬레이션")
+    parser.add_argument("--seed", type=int, help="시장 난수 시드 (같은 시드와 같은 입력이면 같은 세션)")
+    parser.add_argument("--replay", metavar="JOURNAL", help="플레이어 입력 저널을 재생 (예: journal.jsonl)")
+    parser.add_argument("--headless", action="store_true", help="화면 없이 최대 속도로 실행하고 결과만 출력")
+    parser.add_argument("--ticks", type=int, help="헤드리스 실행 틱 수 (기본: 새 게임은 목표 기간, 재생은 저널 끝)")
+    parser.add_argument("--profile", action="store_true", help="헤드리스 실행 후 틱 단계별 시간(백분위)과 이벤트 수 출력")
+    parser.add_argument("--seek", type=int, metavar="TICK", help="리플레이 뷰어를 이 틱에서 시작")
+    parser.add_argument("--universe", type=int, metavar="N", help="게임과 함께 진행할 샤드 유니버스 회사 수 (예: 1000000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="샤드 유니버스 워커 프로세스 수 (0: 같은 프로세스)")
+    parser.add_argument("--share", metavar="NAME", help="시장 상태를 이 이름의 공유 메모리에 공개 (python sharedstate.py NAME으로 보기)")
+    parser.add_argument("--metrics", metavar="PATH", help="지표를 PATH.prom(Prometheus 텍스트)과 PATH.csv에 주기적으로 기록")
+    parser.add_argument("--metrics-interval", type=float, default=metrics.EXPORT_INTERVAL, help="지표 파일 기록 간격 (초)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="127.0.0.1:PORT/metrics로 지표 제공")
+    parser.add_argument("--capture", type=int, metavar="N", help=f"처음 N프레임(또는 N틱)을 함수 단위로 기록해 {profiler.CAPTURE_DIR}/에 pstats와 접힌 스택 저장")
+    parser.add_argument("--capture-unit", choices=(profiler.FRAMES, profiler.TICKS), default=profiler.FRAMES,
+                        help="--capture 단위 (헤드리스는 항상 틱)")
+    parser.add_argument("--log-level", metavar="SPEC", help="분류별 로그 수준 (예: trade.bot=off,trade.player=info)")
+    parser.add_argument("--log-sample", metavar="SPEC", help="분류별 샘플링 (예: trade.bot=100이면 봇 체결 100건 중 1건만 기록)")
+    parser.add_argument("--log-max-bytes", type=int, default=logpipe.MAX_BYTES, help="simulation.log 회전 크기 (바이트)")
+    parser.add_argument("--log-rotate-interval", type=float, metavar="SEC", help="이 시간(초)마다도 회전")
+    parser.add_argument("--ledger", metavar="PATH", help="체결 원장을 PATH(바이너리)와 PATH.ids에 기록 (python ledger.py PATH로 분석)")
+    parser.add_argument("--capture-sample", type=float, metavar="MS", help="cProfile 대신 MS 밀리초 간격 스택 샘플링으로 기록")
+    parser.add_argument("--timeline-budget", type=int, default=timeline.BUDGET_BYTES // (1024 * 1024), metavar="MB",
+                        help="PageUp 되감기용 하루 단위 스냅샷이 쓸 메모리 (넘으면 오래된 것부터 버림, 0이면 끔)")
+    parser.add_argument("--warmup", type=int, default=0, metavar="DAYS", help=f"시작 전에 과거 캔들 DAYS개를 미리 생성 (예: {warmup.DAYS_PER_YEAR}이면 1년)")
+    parser.add_argument("--forecast", type=int, default=0, metavar="TICKS",
+                        help=f"회사 상세 차트에 TICKS틱 뒤까지의 예측 띠 표시 (예: {forecast.HORIZON}이면 게임 내 2일)")
+    parser.add_argument("--forecast-paths", type=int, default=forecast.PATHS, metavar="N", help="예측 띠를 만드는 시뮬레이션 경로 수")
+    args = parser.parse_args()
+
+    try:
+        logpipe.configure(max_bytes=args.log_max_bytes, interval=args.log_rotate_interval,
+                          levels=logpipe.parse_levels(args.log_level), samples=logpipe.parse_samples(args.log_sample))
+    except ValueError as e:
+        parser.error(str(e))
+    LEDGER_PATH = args.ledger
+    WARMUP_DAYS = max(0, args.warmup)
+    TIMELINE_BUDGET = max(0, args.timeline_budget) * 1024 * 1024
+    FORECAST_HORIZON = max(0, args.forecast)
+    FORECAST_PATHS = max(1, args.forecast_paths)
+    replayer = create_replayer(args.replay) if args.replay else None
+    market_metrics = exporter = None
+    if args.metrics or args.metrics_port is not None:
+        market_metrics = metrics.MarketMetrics()
+        exporter = metrics.MetricsExporter(market_metrics.registry, args.metrics, args.metrics_interval, args.metrics_port)
+    capture = None
+    if args.capture:
+        capture = profiler.Capture(args.capture, profiler.TICKS if args.headless else args.capture_unit,
+                                   args.capture_sample / 1000 if args.capture_sample else None)
+    if args.headless:
+        try:
+            code = run_headless(args.ticks, args.seed, replayer, args.profile, market_metrics, capture)
+        finally:
+            if exporter is not None:
+                exporter.close()
+                market_metrics.close()
+        sys.exit(code)
+    if replayer is not None and args.seek is not None:
+        replayer.seek(args.seek)
+    universe = shard.ShardedMarket(args.universe, workers=args.workers, seed=args.seed) if args.universe else None
+    shared = sharedstate.SharedMarketWriter(args.share) if args.share else None
+    main(seed=args.seed, replayer=replayer, universe=universe, shared=shared, market_metrics=market_metrics, exporter=exporter,
+         capture=capture)
@@ -0,0 +1,330 @@
+# sweep.py
+# 시뮬레이션 상수 파라미터 스윕 (격자/무작위 탐색) + 디스크 결과 캐시
+#
+# (파라미터 조합, 시드)마다 헤드리스 게임을 한 판 돌리고 결과를 SWEEP_CACHE_DIR에 저장합니다.
+# 캐시 키는 (코드 버전, 파라미터, 시드, 일수)이고 코드 버전은 시뮬레이션 소스 파일 내용의 해시라서,
+# 같은 스윕을 다시 돌리면 새 조합만 계산하고 코드를 고치면 자동으로 다시 계산합니다.
+
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import modulefinder
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import montecarlo
+import pricing
+import stock
+
+SWEEP_CACHE_DIR = ".sweep_cache"
+VERSION_ROOTS = ("stock.py", "montecarlo.py")  # 결과를 만드는 코드 (게임과 몬테카를로 실행기)
+
+# 스윕할 수 있는 파라미터: 이름 -> (대상, 속성/키). 대상 "market"은 시장 속성, "creation"은 회사 생성 확률 맵,
+# "pricing"은 pricing 모듈 상수
+PARAMETERS = {
+    "sentiment_amplitude": ("market", "sentiment_amplitude"),
+    "sentiment_frequency": ("market", "sentiment_frequency"),
+    "creation_prob_boom": ("creation", "호황(boom)"),
+    "creation_prob_normal": ("creation", "보통(normal)"),
+    "creation_prob_recession": ("creation", "불황(recession)"),
+    "creation_prob_crisis": ("creation", "위기(crisis)"),
+    "volatility_min": ("pricing", "VOLATILITY_MIN"),
+    "volatility_max": ("pricing", "VOLATILITY_MAX"),
+    "trend_range": ("pricing", "TREND_RANGE"),
+    "low_price_threshold": ("pricing", "LOW_PRICE_THRESHOLD"),
+    "high_price_threshold": ("pricing", "HIGH_PRICE_THRESHOLD"),
+    "high_debt_threshold": ("pricing", "HIGH_DEBT_THRESHOLD"),
+    "bankruptcy_warning_days": ("pricing", "BANKRUPTCY_WARNING_DAYS"),
+    "min_capital": ("pricing", "MIN_CAPITAL"),
+}
+
+# 워커가 조합을 바꿔 가며 실행하므로 pricing 상수는 매번 기본값에서 시작
+_PRICING_DEFAULTS = {attr: getattr(pricing, attr) for target, attr in PARAMETERS.values() if target == "pricing"}
+
+# 결과 표에 보이는 지표 (게임 결과에서 뽑는 방법)
+METRICS = {
+    "bankruptcies": lambda r: r["bankruptcies"],
+    "companies": lambda r: r["companies"],
+    "volatility": lambda r: r["volatility"],
+    "bot_return": lambda r: sum(s["return"] for s in r["strategies"].values()) / max(len(r["strategies"]), 1),
+    "goal_hits": lambda r: sum(s["goal_day"] is not None for s in r["strategies"].values()),
+}
+
+
+def source_files(root=None):
+    """
+    코드 버전 해시에 넣을 소스: VERSION_ROOTS에서 import로 닿는 root 폴더의 .py 파일 이름.
+    modulefinder로 바이트코드의 import를 따라가므로(함수 안 import 포함) 목록을 손으로 관리하지 않아도 되고,
+    실행한 스크립트나 그 밖에 불러온 도구(bench 등)와 관계없이 같은 코드면 같은 버전이 나옵니다.
+    """
+    root = os.path.realpath(root or os.path.dirname(os.path.abspath(__file__)))
+    finder = modulefinder.ModuleFinder(path=[root])  # root 밖(표준 라이브러리, pygame)은 따라가지 않음
+    for name in VERSION_ROOTS:
+        finder.run_script(os.path.join(root, name))
+    names = set()
+    for module in finder.modules.values():
+        path = module.__file__
+        if path and path.endswith(".py") and os.path.dirname(os.path.realpath(path)) == root:
+            names.add(os.path.basename(path))
+    return sorted(names)
+
+
+def code_version(root=None):
+    """시뮬레이션 소스 파일 내용의 해시 (16자리)"""
+    root = root or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in source_files(root):
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(root, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """(코드 버전, 파라미터, 시드, 일수) -> 게임 결과 JSON. 코드 버전마다 하위 폴더"""
+
+    def __init__(self, root=SWEEP_CACHE_DIR, version=None):
+        self.version = version or code_version()
+        self.path = os.path.join(root, self.version)
+
+    @staticmethod
+    def key(params, seed, days, stake):
+        text = json.dumps({"params": params, "seed": seed, "days": days, "stake": stake}, sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + ".json")
+
+    def get(self, params, seed, days, stake):
+        try:
+            with open(self._file(self.key(params, seed, days, stake)), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, params, seed, days, stake, result):
+        """임시 파일에 쓴 뒤 교체 (중단되거나 동시에 써도 깨진 파일이 남지 않음)"""
+        path = self._file(self.key(params, seed, days, stake))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "result": result}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def apply_pricing(params):
+    """pricing 상수를 기본값으로 되돌린 뒤 params 적용 (워커 프로세스 안에서만 호출)"""
+    for attr, value in _PRICING_DEFAULTS.items():
+        setattr(pricing, attr, value)
+    for name, value in params.items():
+        target, attr = PARAMETERS[name]
+        if target == "pricing":
+            setattr(pricing, attr, value)
+
+
+def configure_market(params):
+    def configure(market):
+        for name, value in params.items():
+            target, attr = PARAMETERS[name]
+            if target == "market":
+                setattr(market, attr, value)
+            elif target == "creation":
+                market.company_creation_prob_map[attr] = value
+    return configure
+
+
+def run_point(params, seed, days, stake=None):
+    """파라미터 조합 하나와 시드 하나로 게임 한 판 (워커 프로세스에서 실행)"""
+    apply_pricing(params)
+    try:
+        return montecarlo.run_game(seed, days, stake, configure=configure_market(params))
+    finally:
+        apply_pricing({})
+
+
+def grid_points(grid):
+    """{이름: [값, ...]} -> 모든 조합 목록"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_points(ranges, count, seed=0):
+    """{이름: (최소, 최대)} -> 균등 분포 무작위 조합 count개 (정수 범위면 정수)"""
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        point = {}
+        for name, (low, high) in ranges.items():
+            if isinstance(low, int) and isinstance(high, int):
+                point[name] = rng.randint(low, high)
+            else:
+                point[name] = rng.uniform(low, high)
+        points.append(point)
+    return points
+
+
+def sweep(points, seeds, days=stock.GOAL_DAYS, stake=None, workers=None, cache=None, on_result=None):
+    """
+    points x seeds 전체를 실행하고 [(params, [결과, ...])] 를 반환합니다. 캐시에 있는 (조합, 시드)는 건너뜁니다.
+    on_result(params, seed, result, cached)는 결과가 나올 때마다 호출됩니다.
+    """
+    results = [[] for _ in points]
+    todo = []
+    for i, params in enumerate(points):
+        for seed in seeds:
+            result = cache.get(params, seed, days, stake) if cache is not None else None
+            if result is not None:
+                results[i].append(result["result"])
+                if on_result is not None:
+                    on_result(params, seed, result["result"], True)
+            else:
+                todo.append((i, seed))
+
+    def finish(i, seed, result):
+        if cache is not None:
+            cache.put(points[i], seed, days, stake, result)
+        results[i].append(result)
+        if on_result is not None:
+            on_result(points[i], seed, result, False)
+
+    if workers == 0:
+        for i, seed in todo:
+            finish(i, seed, run_point(points[i], seed, days, stake))
+    elif todo:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            futures = {pool.submit(run_point, points[i], seed, days, stake): (i, seed) for i, seed in todo}
+            for future in concurrent.futures.as_completed(futures):
+                i, seed = futures[future]
+                finish(i, seed, future.result())
+    for runs in results:
+        runs.sort(key=lambda r: r["seed"])
+    return list(zip(points, results))
+
+
+def summarize(params, runs):
+    """조합 하나의 지표별 (평균, 95% 반폭)"""
+    summary = {}
+    for name, metric in METRICS.items():
+        stat = montecarlo.Stat()
+        for r in runs:
+            stat.add(metric(r))
+        summary[name] = (stat.mean, stat.half_width() if stat.n > 1 else 0.0)
+    return summary
+
+
+def table(rows, sort=None):
+    names = sorted({name for params, _ in rows for name in params})
+    summaries = [(params, runs, summarize(params, runs)) for params, runs in rows]
+    if sort:
+        summaries.sort(key=lambda item: item[2][sort][0])
+    widths = {n: max(12, len(n)) for n in names}
+    header = " ".join(f"{n:>{widths[n]}}" for n in names) + f" {'seeds':>5} " + " ".join(f"{m:>20}" for m in METRICS)
+    lines = [header]
+    for params, runs, summary in summaries:
+        cells = " ".join(f"{params[n]:>{widths[n]}.6g}" if n in params else " " * widths[n] for n in names)
+        metrics = " ".join(f"{mean:>12.4g} ±{half:<6.2g}" for mean, half in summary.values())
+        lines.append(f"{cells} {len(runs):>5} {metrics}")
+    return "\n".join(lines)
+
+
+def _parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _parse_grid(items):
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"unknown parameter: {name} (choose from {', '.join(PARAMETERS)})")
+        grid[name] = [_parse_value(v) for v in values.split(",") if v]
+    return grid
+
+
+def _parse_ranges(items):
+    ranges = {}
+    for item in items:
+        name, _, span = item.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"unknown parameter: {name} (choose from {', '.join(PARAMETERS)})")
+        low, _, high = span.partition(":")
+        ranges[name] = (_parse_value(low), _parse_value(high))
+    return ranges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시뮬레이션 파라미터 스윕 (결과는 디스크에 캐시)")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...", help="격자 탐색 파라미터")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=MIN:MAX", help="무작위 탐색 범위")
+    parser.add_argument("--samples", type=int, default=20, help="무작위 탐색 조합 수")
+    parser.add_argument("--sample-seed", type=int, default=0, help="무작위 탐색 조합을 뽑는 시드")
+    parser.add_argument("--seeds", type=int, default=4, help="조합마다 돌릴 게임 수")
+    parser.add_argument("--seed", type=int, default=0, help="첫 게임 시드")
+    parser.add_argument("--days", type=int, default=30, help="게임당 진행 일수")
+    parser.add_argument("--stake", type=float, default=None, help="모든 봇의 시작 자금 (montecarlo.py와 같음)")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수, 0: 같은 프로세스)")
+    parser.add_argument("--cache", default=SWEEP_CACHE_DIR, help="결과 캐시 폴더")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 읽거나 쓰지 않음")
+    parser.add_argument("--sort", choices=list(METRICS), help="결과 표 정렬 지표")
+    parser.add_argument("--csv", metavar="PATH", help="조합/시드별 결과를 CSV로 기록")
+    parser.add_argument("--list", action="store_true", help="스윕할 수 있는 파라미터와 기본값 출력")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        market = stock.Market(seed=0)
+        for name, (target, attr) in PARAMETERS.items():
+            if target == "market":
+                value = getattr(market, attr)
+            elif target == "creation":
+                value = market.company_creation_prob_map[attr]
+            else:
+                value = getattr(pricing, attr)
+            print(f"{name:<26} {value}")
+        return 0
+
+    points = grid_points(_parse_grid(args.grid)) if args.grid else []
+    if args.range:
+        points += random_points(_parse_ranges(args.range), args.samples, args.sample_seed)
+    if not points:
+        points = [{}]  # 기본값 한 점
+    seeds = list(range(args.seed, args.seed + args.seeds))
+    cache = None if args.no_cache else ResultCache(args.cache)
+
+    counts = {"cached": 0, "computed": 0}
+    started = time.perf_counter()
+
+    def on_result(params, seed, result, cached):
+        counts["cached" if cached else "computed"] += 1
+        if not cached:
+            print(f"[{counts['computed']}] {params} seed={seed}: bankruptcies={result['bankruptcies']} "
+                  f"volatility={result['volatility']:.5f}", flush=True)
+
+    rows = sweep(points, seeds, args.days, args.stake, args.workers, cache, on_result)
+    version = f", code version {cache.version}" if cache is not None else ""
+    print(f"=== {len(points)} points x {len(seeds)} seeds x {args.days} days: {counts['computed']} computed, "
+          f"{counts['cached']} from cache in {time.perf_counter() - started:.1f} s{version} ===")
+    print(table(rows, args.sort))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            names = sorted({name for params, _ in rows for name in params})
+            writer.writerow(names + ["seed"] + list(METRICS))
+            for params, runs in rows:
+                for r in runs:
+                    writer.writerow([params.get(n) for n in names] + [r["seed"]] + [m(r) for m in METRICS.values()])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# timeline.py
+# 세션 타임라인: 일정 틱마다 시장 상태 스냅샷을 남기고, 남아 있는 틱으로 바로 되감기
+#
+# 스냅샷은 persistence.capture()의 구역(캔들 열, 자산 곡선, 뉴스, 체결 원장, 지표 기록)을 CHUNK_BYTES 조각으로 나눠 보관합니다.
+# 덧붙이기만 하는 버퍼는 다 찬 조각을 한 번만 bytes로 봉인하고 이후 스냅샷은 같은 조각 목록을 공유하므로,
+# 스냅샷마다 새로 복사하는 것은 덜 찬 마지막 조각과 바뀐 링 버퍼 조각, 작은 메타데이터뿐입니다.
+
+import itertools
+import json
+import time
+import weakref
+import zlib
+from array import array
+
+import candles
+import ledger
+import persistence
+
+CHUNK_BYTES = 512  # 조각 크기 (캔들 열 64개, 체결 레코드 16개). 모든 배열 원소 크기의 배수여야 함
+EVERY_TICKS = 48  # 스냅샷 간격 (게임 내 1일)
+BUDGET_BYTES = 64 * 1024 * 1024  # 스냅샷이 쓸 수 있는 메모리 (넘으면 오래된 스냅샷부터 버림)
+RING_PREFIX = "history."  # 제자리에서 덮어쓰는 링 버퍼 구역 (조각을 직전 스냅샷과 비교해 같으면 공유)
+
+
+def _read(source, start, stop):
+    """버퍼의 [start, stop) 바이트 사본 (체결 원장은 레코드 단위로 읽음)"""
+    if isinstance(source, ledger.Ledger):
+        return source.records(start // ledger.RECORD_SIZE, stop // ledger.RECORD_SIZE)
+    with memoryview(source) as view, view.cast("B") as raw:
+        return raw[start:stop].tobytes()
+
+
+class Frame:
+    """
+    스냅샷 하나. meta는 persistence 메타데이터의 JSON을 zlib으로 압축한 bytes이고,
+    sections는 [(구역 이름, 타입코드, [(조각 목록, 쓰는 조각 수, 꼬리 bytes)])]입니다.
+    봉인된 조각 목록은 덧붙이기만 하므로 앞의 "쓰는 조각 수"개는 이후에도 바뀌지 않습니다.
+    """
+    __slots__ = ("tick", "meta", "sections", "nbytes")
+
+    def __init__(self, tick, meta, sections, nbytes):
+        self.tick = tick
+        self.meta = meta
+        self.sections = sections
+        self.nbytes = nbytes  # 이 스냅샷만 가진 바이트 (메타데이터와 꼬리)
+
+    def arrays(self):
+        """{구역 이름: 배열} (persistence.parse()와 같은 모양)"""
+        sections = {}
+        for name, typecode, parts in self.sections:
+            arr = array(typecode)
+            for chunks, count, tail in parts:
+                for piece in itertools.islice(chunks, count):
+                    arr.frombytes(piece)
+                arr.frombytes(tail)
+            sections[name] = arr
+        return sections
+
+
+class Timeline:
+    """
+    주기적 스냅샷과 되감기.
+
+    maybe_record()는 메인 루프에서 next_day() 직후(틱 경계)에 호출하며 every_ticks마다 스냅샷을 남깁니다.
+    재시작/불러오기로 시장이 바뀌면 이전 게임의 스냅샷은 버리고 새로 시작합니다.
+    스냅샷이 쓰는 메모리(공유 조각은 한 번만 셈)가 budget을 넘으면 가장 오래된 스냅샷부터 버립니다.
+    rewind(tick)은 tick 이하의 가장 가까운 스냅샷에서 (market, investors)를 복원하고, 그 뒤의 스냅샷은
+    더 이상 이어지지 않는 미래이므로 버립니다.
+    """
+
+    def __init__(self, every_ticks=EVERY_TICKS, budget=BUDGET_BYTES, chunk=CHUNK_BYTES):
+        self.every_ticks = every_ticks
+        self.budget = budget
+        self.chunk = chunk
+        self.frames = []  # 오래된 순
+        self.last_tick = None
+        self.nbytes = 0  # 남아 있는 스냅샷 전체가 쓰는 바이트
+        self._market = None  # 기록 중인 시장 (약한 참조, 바뀌면 처음부터)
+        self._sealed = {}  # id(버퍼) -> (버퍼, 봉인된 조각 목록)
+        self._rings = {}  # (구역 이름, 번호) -> 직전 스냅샷의 링 버퍼 조각 목록
+        self._lists = {}  # id(봉인된 조각 목록) -> [목록, 참조하는 스냅샷 수, 가장 많이 쓰는 조각 수]
+        self._pieces = {}  # id(링 버퍼 조각) -> [조각, 참조하는 스냅샷 수]
+
+        # 통계
+        self.recorded = 0
+        self.evicted = 0
+        self.last_record_time = 0.0
+        self.last_rewind_time = 0.0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def ticks(self):
+        return [frame.tick for frame in self.frames]
+
+    def clear(self):
+        self.frames = []
+        self.last_tick = None
+        self.nbytes = 0
+        self._market = None
+        self._sealed = {}
+        self._rings = {}
+        self._lists = {}
+        self._pieces = {}
+
+    def maybe_record(self, market, investors):
+        """주기가 되었으면 스냅샷을 남깁니다. 남겼으면 True"""
+        if self._market is None or self._market() is not market:
+            self.clear()
+            self._market = weakref.ref(market)
+        elif market.day_count - self.last_tick < self.every_ticks:
+            return False
+        self.record(market, investors)
+        return True
+
+    def record(self, market, investors):
+        """지금 틱의 스냅샷을 남깁니다. 틱 사이(next_day 호출 밖)에서 호출해야 합니다."""
+        t0 = time.perf_counter()
+        snapshot = persistence.capture(market, investors)
+        meta = zlib.compress(json.dumps(snapshot.meta(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+        led = market.ledger
+        chunk = self.chunk
+        sealed, rings = {}, {}
+        sections = []
+        own = len(meta)
+        for name, typecode, parts in snapshot.sections():
+            if name == "ledger":
+                # capture()의 레코드 사본 대신 원장에서 조각 단위로 읽음
+                parts = [(led, led.count * ledger.RECORD_SIZE, None)]
+            frame_parts = []
+            for index, (source, n, last) in enumerate(parts):
+                itemsize = getattr(source, "itemsize", 1)
+                nbytes = n * itemsize
+                if name.startswith(RING_PREFIX):
+                    chunks = self._ring_chunks(rings, (name, index), source, nbytes)
+                    frame_parts.append((chunks, len(chunks), b""))
+                    continue
+                entry = self._sealed.get(id(source))
+                if entry is None or entry[0] is not source:
+                    entry = (source, [])
+                sealed[id(source)] = entry
+                chunks = entry[1]
+                # 마지막 캔들은 다음 틱 전에도 바뀔 수 있으므로 봉인하지 않음
+                count = ((n - 1) * itemsize if last is not None and n else nbytes) // chunk
+                for k in range(len(chunks), count):
+                    chunks.append(_read(source, k * chunk, (k + 1) * chunk))
+                tail = _read(source, count * chunk, nbytes)
+                own += len(tail)
+                frame_parts.append((chunks, count, tail))
+            sections.append((name, typecode, frame_parts))
+        self._sealed = sealed
+        self._rings = rings
+
+        frame = Frame(market.day_count, meta, sections, own)
+        self._retain(frame)
+        self.frames.append(frame)
+        self.last_tick = market.day_count
+        while self.nbytes > self.budget and len(self.frames) > 1:
+            self._release(self.frames.pop(0))
+            self.evicted += 1
+        self.recorded += 1
+        self.last_record_time = time.perf_counter() - t0
+        return frame
+
+    def frame_at(self, tick):
+        """tick 이하의 가장 가까운 스냅샷 (없으면 None)"""
+        for frame in reversed(self.frames):
+            if frame.tick <= tick:
+                return frame
+        return None
+
+    def rewind(self, tick, restore_fn):
+        """
+        tick 이하의 가장 가까운 스냅샷으로 되감은 (market, investors). 남은 스냅샷이 없으면 None.
+        restore_fn(meta, sections)는 persistence.restore()처럼 상태를 복원합니다.
+        복원한 시장의 버퍼는 스냅샷의 조각 목록을 이어서 쓰므로 되감은 뒤의 스냅샷도 앞선 스냅샷과 조각을 공유합니다.
+        """
+        frame = self.frame_at(tick)
+        if frame is None:
+            return None
+        t0 = time.perf_counter()
+        while self.frames[-1] is not frame:
+            self._release(self.frames.pop())
+        meta = json.loads(zlib.decompress(frame.meta))
+        companies = [rec["id"] for rec in meta["companies"]]
+        market, investors = restore_fn(meta, frame.arrays())
+        self._adopt(frame, companies, market, investors)
+        self._market = weakref.ref(market)
+        self.last_tick = frame.tick
+        self.last_rewind_time = time.perf_counter() - t0
+        return market, investors
+
+    def _adopt(self, frame, company_ids, market, investors):
+        """복원한 버퍼를 스냅샷의 봉인된 조각 목록에 연결 (버린 미래의 조각은 목록에서 잘라냄)"""
+        by_id = dict(market.company_by_id)
+        for c in market.companies + market.bankrupt_companies:
+            by_id.setdefault(c.id, c)
+        companies = [by_id[cid] for cid in company_ids]
+        sources = {f"candles.{name}": [c.candles.columns[name] for c in companies] for name in candles.FIELDS}
+        sources["equity"] = [inv.equity_curve for inv in investors]
+        sources["news"] = [market.news.data]
+        sources["ledger"] = [market.ledger]
+        self._sealed = {}
+        for name, _, parts in frame.sections:
+            for source, (chunks, count, _) in zip(sources.get(name, ()), parts):
+                del chunks[count:]
+                self._sealed[id(source)] = (source, chunks)
+                entry = self._lists[id(chunks)]
+                if entry[2] > count:
+                    self.nbytes -= (entry[2] - count) * self.chunk
+                    entry[2] = count
+
+    def _ring_chunks(self, rings, key, source, nbytes):
+        """링 버퍼 사본을 조각으로 나누고, 직전 스냅샷의 같은 자리 조각과 같으면 그 조각을 씀"""
+        previous = self._rings.get(key, ())
+        chunks = []
+        for k, start in enumerate(range(0, nbytes, self.chunk)):
+            piece = _read(source, start, min(start + self.chunk, nbytes))
+            if k < len(previous) and previous[k] == piece:
+                piece = previous[k]
+            chunks.append(piece)
+        rings[key] = chunks
+        return chunks
+
+    def _retain(self, frame):
+        self.nbytes += frame.nbytes
+        for name, _, parts in frame.sections:
+            ring = name.startswith(RING_PREFIX)
+            for chunks, count, _ in parts:
+                if ring:
+                    for piece in chunks:
+                        ref = self._pieces.get(id(piece))
+                        if ref is None:
+                            self._pieces[id(piece)] = [piece, 1]
+                            self.nbytes += len(piece)
+                        else:
+                            ref[1] += 1
+                    continue
+                entry = self._lists.get(id(chunks))
+                if entry is None:
+                    entry = self._lists[id(chunks)] = [chunks, 0, 0]
+                entry[1] += 1
+                if count > entry[2]:
+                    self.nbytes += (count - entry[2]) * self.chunk
+                    entry[2] = count
+
+    def _release(self, frame):
+        self.nbytes -= frame.nbytes
+        for name, _, parts in frame.sections:
+            ring = name.startswith(RING_PREFIX)
+            for chunks, _, _ in parts:
+                if ring:
+                    for piece in chunks:
+                        ref = self._pieces[id(piece)]
+                        ref[1] -= 1
+                        if not ref[1]:
+                            self.nbytes -= len(piece)
+                            del self._pieces[id(piece)]
+                    continue
+                entry = self._lists[id(chunks)]
+                entry[1] -= 1
+                if not entry[1]:
+                    self.nbytes -= entry[2] * self.chunk
+                    del self._lists[id(chunks)]
@@ -0,0 +1,61 @@
+# warmup.py
+# 게임 시작 전 과거 주가 기록: 모든 회사의 캔들을 미리 N개 만들어 차트/이동평균/봇 전략이 첫 틱부터 동작하도록 함
+
+import random
+from array import array
+
+import philox
+import pricing
+
+DAYS_PER_YEAR = 360  # 차트의 "1년" 타임프레임 (캔들 하나가 차트의 하루)
+
+
+def company_rng(streams, company_id):
+    """
+    회사 하나의 워밍업 난수 생성기. 시드는 시장 시드와 회사 id로 정해지는 전용 스트림에서 뽑으므로
+    같은 시드면 같은 기록이 만들어지고, 게임 진행에 쓰는 다른 스트림과 market.rng는 건드리지 않습니다.
+    캔들 하나에 난수 9개를 쓰므로 Philox 스트림 대신 그 시드로 만든 random.Random에서 뽑습니다.
+    """
+    stream = streams.stream(philox.WARMUP, 0, company_id)
+    return random.Random(stream.next_word() | stream.next_word() << 32)
+
+
+def simulate(company, days, econ_factor, adjustment, rng):
+    """
+    회사 하나의 캔들 days개를 pricing.step으로 만들어 열 배열에 한 번에 덧붙이고 재무 값도 마지막 상태로 바꿉니다.
+    캔들마다 Company 속성을 읽고 쓰지 않도록 지역 변수로 진행합니다. 워밍업 중에는 파산 판정을 하지 않습니다.
+    """
+    series = company.candles
+    opens, highs, lows, closes = array("d"), array("d"), array("d"), array("d")
+    price = series.close[-1]
+    capital, debt, revenue, net_income = company.capital, company.debt, company.revenue, company.net_income
+    news_impact, news_impact_days = company.news_impact, company.news_impact_days
+    step = pricing.step
+    for _ in range(days):
+        (open_price, high_price, low_price, price, capital, debt, revenue, net_income,
+         news_impact_days) = step(price, capital, debt, revenue, net_income, news_impact, news_impact_days,
+                                  econ_factor, adjustment, rng)
+        opens.append(open_price)
+        highs.append(high_price)
+        lows.append(low_price)
+        closes.append(price)
+    series.open.extend(opens)
+    series.high.extend(highs)
+    series.low.extend(lows)
+    series.close.extend(closes)
+    company.capital, company.debt, company.revenue, company.net_income = capital, debt, revenue, net_income
+    company.news_impact_days = news_impact_days
+
+
+def warm_up(market, days):
+    """
+    시장의 모든 상장 회사에 과거 캔들 days개를 만듭니다 (시작 시점의 경제 국면과 지표를 그대로 사용).
+    틱(day_count)은 0으로 두므로 게임 기간과 목표 판정에는 영향이 없습니다.
+    """
+    if days <= 0:
+        return
+    econ_factor = market.economic_factor
+    adjustment = pricing.price_adjustment(market.economic_factors, market.national_factors)
+    for c in market.companies:
+        if not c.is_bankrupt:
+            simulate(c, days, econ_factor, adjustment, company_rng(market.streams, c.id))